@@ -0,0 +1,150 @@
+"""Bounded worker pool for action checks.
+
+Checks for one action tick are fanned out over a shared thread pool.
+Each service has its own concurrency cap so a slow upstream cannot hog
+every worker, and a tick deadline stops queued work once it would overrun
+the next tick.
+
+Actions with a native `check_async` skip the thread pool: their checks run
+as tasks on the service I/O loop under the same per-service cap and
+deadline rules (`run_bounded_async`), with a much higher cap since a
+waiting coroutine does not hold a thread.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import BoundedSemaphore, Lock
+from typing import Awaitable, Callable, Dict, List, Set
+
+from core.config import settings
+from core.event_loop import run_coroutine
+from core.logger import logger
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.ACTION_POOL_WORKERS, thread_name_prefix="action-check"
+)
+_service_slots: Dict[str, BoundedSemaphore] = {}
+_slots_lock = Lock()
+_async_slots: Dict[str, asyncio.Semaphore] = {}
+_running_tasks: Set[asyncio.Task] = set()
+
+
+def _service_slot(service_name: str) -> BoundedSemaphore:
+    with _slots_lock:
+        slot = _service_slots.get(service_name)
+        if slot is None:
+            slot = BoundedSemaphore(settings.ACTION_SERVICE_CONCURRENCY)
+            _service_slots[service_name] = slot
+        return slot
+
+
+def _run_job(service_name: str, job: Callable[[], None], deadline: float) -> bool:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return False
+    slot = _service_slot(service_name)
+    if not slot.acquire(timeout=remaining):
+        return False
+    try:
+        if time.monotonic() >= deadline:
+            return False
+        job()
+        return True
+    except Exception as e:
+        logger.error(f"{service_name}: action check failed: {e}")
+        return True
+    finally:
+        slot.release()
+
+
+def run_bounded(
+    service_name: str, jobs: List[Callable[[], None]], deadline: float
+) -> int:
+    """Run jobs concurrently until `deadline` (time.monotonic based).
+
+    Returns the number of jobs that were skipped because the deadline was
+    reached before they could start.
+    """
+    futures = [
+        _executor.submit(_run_job, service_name, job, deadline) for job in jobs
+    ]
+    done, not_done = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+
+    skipped = sum(1 for future in done if future.result() is False)
+    for future in not_done:
+        if future.cancel():
+            skipped += 1
+    if not_done:
+        logger.warning(
+            f"{service_name}: tick deadline reached, {len(not_done)} checks unfinished"
+        )
+    return skipped
+
+
+def _async_service_slot(service_name: str) -> asyncio.Semaphore:
+    slot = _async_slots.get(service_name)
+    if slot is None:
+        slot = asyncio.Semaphore(settings.ACTION_ASYNC_SERVICE_CONCURRENCY)
+        _async_slots[service_name] = slot
+    return slot
+
+
+async def _run_job_async(
+    service_name: str, job: Callable[[], Awaitable[None]], deadline: float
+) -> bool:
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return False
+    slot = _async_service_slot(service_name)
+    try:
+        await asyncio.wait_for(slot.acquire(), remaining)
+    except asyncio.TimeoutError:
+        return False
+    try:
+        if time.monotonic() >= deadline:
+            return False
+        await job()
+        return True
+    except Exception as e:
+        logger.error(f"{service_name}: action check failed: {e}")
+        return True
+    finally:
+        slot.release()
+
+
+async def _run_all_async(
+    service_name: str, jobs: List[Callable[[], Awaitable[None]]], deadline: float
+) -> int:
+    tasks = [
+        asyncio.create_task(_run_job_async(service_name, job, deadline))
+        for job in jobs
+    ]
+    if not tasks:
+        return 0
+    done, not_done = await asyncio.wait(
+        tasks, timeout=max(0.0, deadline - time.monotonic())
+    )
+
+    skipped = sum(1 for task in done if task.result() is False)
+    # Checks already talking to the upstream finish in the background, like
+    # running threads do; queued ones give up on their own at the deadline.
+    for task in not_done:
+        _running_tasks.add(task)
+        task.add_done_callback(_running_tasks.discard)
+    if not_done:
+        logger.warning(
+            f"{service_name}: tick deadline reached, {len(not_done)} checks unfinished"
+        )
+    return skipped
+
+
+def run_bounded_async(
+    service_name: str, jobs: List[Callable[[], Awaitable[None]]], deadline: float
+) -> int:
+    """`run_bounded` for coroutine jobs, run on the service I/O loop.
+
+    Blocks the calling thread until every job finished or the deadline
+    passed, and returns the number of skipped jobs.
+    """
+    return run_coroutine(_run_all_async(service_name, jobs, deadline))
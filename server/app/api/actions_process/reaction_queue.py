@@ -0,0 +1,306 @@
+"""Durable reaction queue in the `reaction_job` table.
+
+A triggered area enqueues one job per reaction, with an idempotency key
+made of the area reaction and the trigger, so a replayed trigger does not
+run reactions twice. Workers in any process claim due jobs with
+`SELECT ... FOR UPDATE SKIP LOCKED` and run them on the service I/O loop
+(`reactions.execute_reaction`).
+
+Jobs keep the stages of `reactions`: a job is due once every job of an
+earlier stage of its run is done and its `delay` has elapsed since they
+finished (since the trigger for the first stage). A failing job is retried
+with exponential backoff, or after the delay the upstream asked for
+(`ReactionRetryError.retry_after`), up to `REACTION_JOB_MAX_ATTEMPTS`;
+then it fails and the later stages of its run are skipped. A claimed job
+is leased for `REACTION_JOB_LEASE` seconds: if its worker dies, another one
+claims it again once the lease expired, so reactions run at least once.
+A reaction running longer than `REACTION_JOB_TIMEOUT` counts as a failed
+attempt, and a batch records the outcomes it has before half its lease is
+over, so one hanging reaction does not keep its batch from finishing.
+
+Selected with `REACTION_QUEUE_BACKEND=postgres`; `memory` runs reactions
+in-process with `reactions.dispatch_reactions`.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, exists, func, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from api.actions_process.reactions import (
+    PlannedReaction,
+    execute_reaction,
+    plan_reactions,
+)
+from core.config import settings
+from core.event_loop import run_coroutine
+from core.logger import logger
+from core.periodic import PeriodicTask
+from models import ReactionJob
+from services.services_classes import ReactionRetryError
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+def retry_delay(attempts: int, error: Exception) -> float:
+    """Seconds before the next attempt of a job that failed `attempts` times."""
+    if isinstance(error, ReactionRetryError) and error.retry_after is not None:
+        return float(error.retry_after)
+    delay = settings.REACTION_RETRY_BASE_DELAY * 2 ** (attempts - 1)
+    return min(delay, settings.REACTION_RETRY_MAX_DELAY)
+
+
+class ReactionQueue:
+    """Enqueues triggered reactions and runs due jobs in batches."""
+
+    def __init__(
+        self,
+        engine=None,
+        batch_size: int = settings.REACTION_QUEUE_BATCH_SIZE,
+        lease: float = settings.REACTION_JOB_LEASE,
+        max_attempts: int = settings.REACTION_JOB_MAX_ATTEMPTS,
+        job_timeout: float = settings.REACTION_JOB_TIMEOUT,
+    ) -> None:
+        self._engine = engine
+        self.batch_size = batch_size
+        self.lease = lease
+        self.job_timeout = job_timeout
+        self.max_attempts = max_attempts
+        self.enqueued = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self._lock = Lock()
+        self._worker = PeriodicTask("Reaction queue", self.run_due)
+        self._purge = PeriodicTask("Reaction job purge", self.purge_finished)
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from core.engine import engine
+
+            self._engine = engine
+        return self._engine
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def enqueue(self, session: Session, area_id: int, trigger_key: str) -> int:
+        """Queue the area's reactions for one trigger; returns the new jobs.
+
+        `trigger_key` identifies the trigger (see `router.trigger_key`):
+        triggers carrying the same key are only queued once.
+        """
+        plan = plan_reactions(session, area_id)
+        if plan is None or not plan.stages:
+            return 0
+        run_id = f"{area_id}:{trigger_key}"
+        now = datetime.now(timezone.utc)
+        rows = [
+            dict(
+                idempotency_key=f"{planned.area_reaction_id}:{trigger_key}",
+                run_id=run_id,
+                area_id=area_id,
+                area_reaction_id=planned.area_reaction_id,
+                user_id=plan.user_id,
+                service_name=planned.service_name,
+                reaction_name=planned.reaction_name,
+                stage=stage,
+                delay=planned.delay,
+                status=PENDING,
+                attempts=0,
+                run_after=now + timedelta(seconds=planned.delay),
+            )
+            for stage, planned_stage in enumerate(plan.stages)
+            for planned in planned_stage
+        ]
+        with Session(self.engine) as queue_session:
+            result = queue_session.exec(
+                insert(ReactionJob)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["idempotency_key"])
+            )
+            queue_session.commit()
+        self._count("enqueued", result.rowcount)
+        return result.rowcount
+
+    def claim(self, limit: Optional[int] = None) -> List[ReactionJob]:
+        """Lease up to `limit` due jobs; concurrent workers get disjoint jobs."""
+        earlier = aliased(ReactionJob)
+        now = func.now()
+        blocked = exists().where(
+            earlier.run_id == ReactionJob.run_id,
+            earlier.stage < ReactionJob.stage,
+            or_(
+                earlier.status != DONE,
+                earlier.finished_at
+                + func.make_interval(0, 0, 0, 0, 0, 0, ReactionJob.delay)
+                > now,
+            ),
+        )
+        with Session(self.engine, expire_on_commit=False) as session:
+            jobs = session.exec(
+                select(ReactionJob)
+                .where(
+                    or_(
+                        and_(
+                            ReactionJob.status == PENDING, ReactionJob.run_after <= now
+                        ),
+                        and_(
+                            ReactionJob.status == RUNNING,
+                            ReactionJob.locked_until < now,
+                        ),
+                    ),
+                    ~blocked,
+                )
+                .order_by(ReactionJob.run_after)
+                .limit(limit or self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            locked_until = datetime.now(timezone.utc) + timedelta(seconds=self.lease)
+            for job in jobs:
+                job.status = RUNNING
+                job.attempts += 1
+                job.locked_until = locked_until
+            session.commit()
+        return jobs
+
+    async def _execute(
+        self, jobs: List[ReactionJob]
+    ) -> List[Optional[BaseException]]:
+        tasks = [
+            asyncio.create_task(
+                execute_reaction(
+                    job.user_id,
+                    PlannedReaction(
+                        job.area_reaction_id, job.service_name, job.reaction_name, 0
+                    ),
+                    self.job_timeout,
+                )
+            )
+            for job in jobs
+        ]
+        # Record outcomes long before another worker may claim the jobs again
+        _, late = await asyncio.wait(tasks, timeout=self.lease / 2)
+        for task in late:
+            task.cancel()
+        outcomes: List[Optional[BaseException]] = []
+        for job, task in zip(jobs, tasks):
+            if task in late:
+                outcomes.append(
+                    TimeoutError(
+                        f"{job.service_name} - {job.reaction_name}: "
+                        "not run before the end of its batch"
+                    )
+                )
+            else:
+                outcomes.append(task.exception())
+        return outcomes
+
+    def _finish(
+        self, outcomes: List[Tuple[ReactionJob, Optional[BaseException]]]
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        with Session(self.engine) as session:
+            for job, error in outcomes:
+                values: Dict[str, Any] = {"locked_until": None}
+                if error is None:
+                    values.update(status=DONE, finished_at=now, last_error=None)
+                    self._count("succeeded")
+                elif job.attempts < self.max_attempts:
+                    delay = retry_delay(job.attempts, error)
+                    values.update(
+                        status=PENDING,
+                        run_after=now + timedelta(seconds=delay),
+                        last_error=str(error),
+                    )
+                    self._count("retried")
+                    logger.warning(
+                        f"{job.service_name} - {job.reaction_name}: attempt "
+                        f"{job.attempts} failed, retrying in {delay:.0f}s: {error}"
+                    )
+                else:
+                    values.update(status=FAILED, finished_at=now, last_error=str(error))
+                    self._count("failed")
+                    logger.error(
+                        f"{job.service_name} - {job.reaction_name}: giving up after "
+                        f"{job.attempts} attempts: {error}"
+                    )
+                    session.exec(
+                        update(ReactionJob)
+                        .where(
+                            ReactionJob.run_id == job.run_id,
+                            ReactionJob.stage > job.stage,
+                            ReactionJob.status == PENDING,
+                        )
+                        .values(status=SKIPPED, finished_at=now)
+                    )
+                session.exec(
+                    update(ReactionJob)
+                    .where(
+                        ReactionJob.id == job.id,
+                        # Another worker took over an expired lease
+                        ReactionJob.attempts == job.attempts,
+                    )
+                    .values(**values)
+                )
+            session.commit()
+
+    def run_due(self) -> int:
+        """Run due jobs batch after batch until none is left; returns how many ran."""
+        ran = 0
+        while True:
+            jobs = self.claim()
+            if not jobs:
+                return ran
+            results = run_coroutine(self._execute(jobs))
+            self._finish(list(zip(jobs, results)))
+            ran += len(jobs)
+            if len(jobs) < self.batch_size:
+                return ran
+
+    def purge_finished(self) -> int:
+        """Delete jobs finished more than `REACTION_JOB_RETENTION` seconds ago."""
+        cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.REACTION_JOB_RETENTION
+        )
+        with Session(self.engine) as session:
+            result = session.exec(
+                delete(ReactionJob).where(ReactionJob.finished_at < cutoff)
+            )
+            session.commit()
+        return result.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": settings.REACTION_QUEUE_BACKEND,
+                "enqueued": self.enqueued,
+                "succeeded": self.succeeded,
+                "retried": self.retried,
+                "failed": self.failed,
+            }
+
+    def start(self, interval: float = settings.REACTION_QUEUE_POLL_INTERVAL) -> None:
+        """Start the worker and the purge of finished jobs on the event loop."""
+        if settings.REACTION_QUEUE_BACKEND != "postgres":
+            return
+        self._worker.start(interval)
+        self._purge.start(settings.REACTION_JOB_PURGE_INTERVAL)
+
+    async def stop(self) -> None:
+        await self._worker.stop()
+        await self._purge.stop()
+
+
+reaction_queue = ReactionQueue()
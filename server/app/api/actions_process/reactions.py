@@ -0,0 +1,178 @@
+"""Staged, concurrent execution of the reactions of a triggered area.
+
+An area's reactions are grouped by `order_index` into stages run in
+ascending order; the reactions of a stage run concurrently and the next
+stage starts once they all finished. A failing reaction stops the later
+stages, as it stopped the rest of the area when reactions ran one by one.
+
+Runs are coroutines on the service I/O loop, so the check that triggered
+them returns at once. A reaction's `delay` is an `asyncio.sleep`, holding
+neither a thread nor a database session. When it actually runs, a reaction
+runs in the loop's default thread pool with a session created there: no
+session is ever opened on the loop. Each service has its own concurrency
+cap, `REACTION_SERVICE_CONCURRENCY`, and `REACTION_CONCURRENCY` caps all of
+them below the engine's pool size.
+
+This is the `memory` backend of `REACTION_QUEUE_BACKEND`: runs are lost if
+the process stops. The `postgres` backend (`reaction_queue`) persists them
+and runs each reaction with `execute_reaction`.
+"""
+
+import asyncio
+from concurrent.futures import Future
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, List, Optional, Set
+
+from sqlmodel import Session, select
+
+from core.config import settings
+from core.engine import engine
+from core.event_loop import get_loop
+from core.logger import logger
+from models import Area, AreaReaction, Reaction, Service
+from services.services import services_dico
+from services.services_classes import db_call
+
+
+@dataclass(frozen=True)
+class PlannedReaction:
+    area_reaction_id: int
+    service_name: str
+    reaction_name: str
+    delay: int
+
+
+@dataclass(frozen=True)
+class ReactionPlan:
+    area_id: int
+    user_id: int
+    stages: List[List[PlannedReaction]]
+
+
+_service_slots: Dict[str, asyncio.Semaphore] = {}
+_reaction_slot: Optional[asyncio.Semaphore] = None
+_running: Set[asyncio.Task] = set()
+
+
+def plan_reactions(session: Session, area_id: int) -> Optional[ReactionPlan]:
+    """Load the area's reactions, grouped into stages by `order_index`."""
+    area: Area = session.get(Area, area_id)
+    if not area:
+        return None
+    rows = session.exec(
+        select(
+            AreaReaction.id,
+            AreaReaction.order_index,
+            AreaReaction.delay,
+            Service.name,
+            Reaction.name,
+        )
+        .join(Reaction, Reaction.id == AreaReaction.reaction_id)
+        .join(Service, Service.id == Reaction.service_id)
+        .where(AreaReaction.area_id == area_id)
+        .order_by(AreaReaction.order_index, AreaReaction.id)
+    ).all()
+    stages = [
+        [
+            PlannedReaction(area_reaction_id, service_name, reaction_name, delay)
+            for area_reaction_id, _, delay, service_name, reaction_name in stage
+        ]
+        for _, stage in groupby(rows, key=lambda row: row[1])
+    ]
+    return ReactionPlan(area_id, area.user_id, stages)
+
+
+def _service_slot(service_name: str) -> asyncio.Semaphore:
+    slot = _service_slots.get(service_name)
+    if slot is None:
+        slot = asyncio.Semaphore(settings.REACTION_SERVICE_CONCURRENCY)
+        _service_slots[service_name] = slot
+    return slot
+
+
+def _execute_blocking(user_id: int, planned: PlannedReaction) -> None:
+    with Session(engine, expire_on_commit=False) as session:
+        area_reaction = session.get(AreaReaction, planned.area_reaction_id)
+        if area_reaction is None:
+            return
+        # Give the connection back while the reaction waits on its upstream
+        session.commit()
+        services_dico[planned.service_name].execute(
+            planned.reaction_name, session, area_reaction, user_id
+        )
+
+
+async def execute_reaction(
+    user_id: int, planned: PlannedReaction, timeout: Optional[float] = None
+) -> None:
+    """Run one reaction now in a worker thread, under its service's cap.
+
+    Raises `TimeoutError` when the reaction has not returned after `timeout`
+    seconds (not counting the wait for a slot). The worker thread cannot be
+    interrupted: it finishes in the background.
+    """
+    global _reaction_slot
+    if _reaction_slot is None:
+        _reaction_slot = asyncio.Semaphore(settings.REACTION_CONCURRENCY)
+    async with _service_slot(planned.service_name), _reaction_slot:
+        try:
+            await asyncio.wait_for(
+                asyncio.to_thread(_execute_blocking, user_id, planned), timeout
+            )
+        except TimeoutError:
+            raise TimeoutError(
+                f"{planned.service_name} - {planned.reaction_name}: "
+                f"no outcome after {timeout}s"
+            ) from None
+
+
+async def _run_reaction(user_id: int, planned: PlannedReaction) -> None:
+    if planned.delay > 0:
+        await asyncio.sleep(planned.delay)
+    await execute_reaction(user_id, planned)
+
+
+async def run_plan(plan: ReactionPlan) -> bool:
+    """Run the stages of `plan` in order; returns whether every reaction ran."""
+    for index, stage in enumerate(plan.stages):
+        results = await asyncio.gather(
+            *(_run_reaction(plan.user_id, planned) for planned in stage),
+            return_exceptions=True,
+        )
+        failures = [result for result in results if isinstance(result, Exception)]
+        for error in failures:
+            logger.error(f"Area {plan.area_id}: reaction failed: {error}")
+        if failures:
+            if index + 1 < len(plan.stages):
+                logger.warning(
+                    f"Area {plan.area_id}: skipping {len(plan.stages) - index - 1} "
+                    "later reaction stages"
+                )
+            return False
+    return True
+
+
+def _track(task: asyncio.Task) -> asyncio.Task:
+    # The loop only keeps weak references to tasks
+    _running.add(task)
+    task.add_done_callback(_running.discard)
+    return task
+
+
+def dispatch_reactions(session: Session, area_id: int) -> Optional[Future]:
+    """Start the area's reactions on the service loop without waiting for them."""
+    plan = plan_reactions(session, area_id)
+    if plan is None or not plan.stages:
+        return None
+    return asyncio.run_coroutine_threadsafe(run_plan(plan), get_loop())
+
+
+async def dispatch_reactions_async(
+    session: Session, area_id: int
+) -> Optional[asyncio.Task]:
+    """`dispatch_reactions` from a coroutine already on the service loop."""
+    plan = await db_call(plan_reactions, session, area_id)
+    if plan is None or not plan.stages:
+        return None
+    return _track(asyncio.create_task(run_plan(plan)))
@@ -1,59 +1,157 @@
-from typing import List
+import time
+from functools import partial
+from datetime import datetime
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException
 from services.services import services_dico
-from sqlmodel import select
+from services.services_classes import db_call
+from sqlmodel import Session, select
 
 from models import (
     AreaAction,
     Action,
     Area,
     Service,
-    Reaction,
-    AreaReaction,
     User,
 )
 from dependencies.db import SessionDep
+from core.config import settings
+from core.engine import engine
+from core.logger import logger
 from cron.cron import deleteJob
+from cron.scheduler import CronExpression, next_fire
+from api.actions_process.pool import run_bounded, run_bounded_async
+from api.actions_process.reactions import dispatch_reactions, dispatch_reactions_async
+from api.actions_process.reaction_queue import reaction_queue
+from api.actions_process.state_buffer import StateBuffer
 
 router = APIRouter(prefix="/actions_process", tags=["actions_process"])
 
 
-def reaction_process(session: SessionDep, area_id: int):
-    area: Area = session.exec(select(Area).where(Area.id == area_id)).first()
-    if not area:
-        return
+def trigger_key(area_action_id: int, tick: int) -> str:
+    """Identifies one trigger: the area action and the tick that checked it."""
+    return f"{area_action_id}:{tick}"
+
+
+def reaction_process(session: SessionDep, area_id: int, trigger: str):
+    """Queue the area's reactions, or start them in-process (`memory`)."""
+    if settings.REACTION_QUEUE_BACKEND == "memory":
+        return dispatch_reactions(session, area_id)
+    return reaction_queue.enqueue(session, area_id, trigger)
 
-    reactions_data: list[tuple[str, str, AreaReaction]] = session.exec(
-        select(Service.name, Reaction.name, AreaReaction)
-        .join(Reaction, Reaction.id == AreaReaction.reaction_id)
-        .join(Service, Service.id == Reaction.service_id)
-        .where(AreaReaction.area_id == area.id)
-    ).all()
-    if not reactions_data:
-        return
 
-    for service_name, reaction_name, area_reaction in reactions_data:
-        services_dico[service_name].execute(
-            reaction_name, session, area_reaction, area.user_id
+async def reaction_process_async(session: Session, area_id: int, trigger: str):
+    if settings.REACTION_QUEUE_BACKEND == "memory":
+        return await dispatch_reactions_async(session, area_id)
+    return await db_call(reaction_queue.enqueue, session, area_id, trigger)
+
+
+def check_area_action(
+    area_action_id: int,
+    user_id: int,
+    service_name: str,
+    action_name: str,
+    tick: int,
+    state_buffer: StateBuffer | None = None,
+):
+    """Run one check with its own session, then the reactions if triggered."""
+    with Session(engine) as session:
+        session.info["state_buffer"] = state_buffer
+        user_action: AreaAction = session.get(AreaAction, area_action_id)
+        if not user_action:
+            return
+        if not services_dico[service_name].check(
+            action_name, session, user_action, user_id
+        ):
+            return
+        reaction_process(
+            session, user_action.area_id, trigger_key(area_action_id, tick)
         )
 
 
+async def check_area_action_async(
+    area_action_id: int,
+    user_id: int,
+    service_name: str,
+    action_name: str,
+    tick: int,
+    state_buffer: StateBuffer | None = None,
+):
+    """`check_area_action` for actions with a native async check.
+
+    Runs on the service loop: the session is only used through `db_call`,
+    and keeps its rows loaded between calls instead of expiring them.
+    """
+    with Session(engine, expire_on_commit=False) as session:
+        session.info["state_buffer"] = state_buffer
+        user_action: AreaAction = await db_call(
+            Session.get, session, AreaAction, area_action_id
+        )
+        if not user_action:
+            return
+        if not await services_dico[service_name].check_async(
+            action_name, session, user_action, user_id
+        ):
+            return
+        await reaction_process_async(
+            session, user_action.area_id, trigger_key(area_action_id, tick)
+        )
+
+
+def get_tick_deadline(action: Action) -> float:
+    """Monotonic deadline before the next tick of this action is due."""
+    budget = float(settings.ACTION_TICK_DEADLINE)
+    try:
+        now = datetime.now()
+        until_next = next_fire(CronExpression(action.interval), action.id, now) - now
+        budget = min(budget, until_next.total_seconds())
+    except ValueError:
+        pass
+    return time.monotonic() + budget
+
+
 def compare_action_data(
-    session: SessionDep,
     user_actions_config: dict[int, list[AreaAction]],
     action_data: tuple[Action, Service],
+    tick: int,
 ):
-    for user_id, user_actions in user_actions_config.items():
-        for user_action in user_actions:
-            if not services_dico[action_data[1].name].check(
-                action_data[0].name, session, user_action, user_id
-            ):
-                continue
-            reaction_process(session, user_action.area_id)
+    action, service = action_data
+    if services_dico[service.name].has_async_check(action.name):
+        check_job, run = check_area_action_async, run_bounded_async
+    else:
+        check_job, run = check_area_action, run_bounded
+    state_buffer = StateBuffer()
+    jobs = [
+        partial(
+            check_job,
+            user_action.id,
+            user_id,
+            service.name,
+            action.name,
+            tick,
+            state_buffer,
+        )
+        for user_id, user_actions in user_actions_config.items()
+        for user_action in user_actions
+    ]
+    skipped = run(service.name, jobs, get_tick_deadline(action))
+    state_buffer.flush()
+    if skipped:
+        logger.warning(
+            f"{service.name} - {action.name}: {skipped} checks skipped this tick"
+        )
 
 
 @router.post("/")
-def process_action(action_id: int, session: SessionDep):
+def process_action(action_id: int, session: SessionDep, tick: Optional[int] = None):
+    """Check every enabled area of the action once.
+
+    `tick` identifies this round (the scheduled fire time, in epoch seconds)
+    so replaying it does not queue the same reactions twice; manual calls
+    default to the current second.
+    """
+    if tick is None:
+        tick = int(time.time())
     action_data: tuple[Action, Service] = session.exec(
         select(Action, Service)
         .join(Service, Service.id == Action.service_id)
@@ -84,5 +182,5 @@ def process_action(action_id: int, session: SessionDep):
     for id, data in user_actions_config_data:
         user_actions_config[id].append(data)
 
-    compare_action_data(session, user_actions_config, action_data)
+    compare_action_data(user_actions_config, action_data, tick)
     return {}
@@ -0,0 +1,69 @@
+"""Per-tick buffer for action state writes.
+
+Checks record their new `AreaAction.last_state` through
+`services_classes.save_last_state`. Inside a tick the writes are collected
+here and written by `flush` as a few bulk UPDATE statements in one
+transaction, instead of one commit per check.
+"""
+
+import json
+from threading import Lock
+from typing import Any, Dict
+
+from sqlalchemy import Integer, Text, cast, column, update, values
+from sqlmodel import JSON, Session
+
+from core.config import settings
+from core.engine import engine
+from models import AreaAction
+
+
+class StateBuffer:
+    """Collects the last_state writes of one action tick."""
+
+    def __init__(self) -> None:
+        self._states: Dict[int, Any] = {}
+        self._lock = Lock()
+        self._closed = False
+
+    def record(self, area_action_id: int, state: Any) -> bool:
+        """Queue a write; returns False once the buffer has been flushed."""
+        with self._lock:
+            if self._closed:
+                return False
+            self._states[area_action_id] = state
+            return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._states)
+
+    def flush(self) -> int:
+        """Write every queued state and close the buffer.
+
+        Late writes from checks still running past the tick deadline are
+        refused by `record` and committed by their own session instead.
+        """
+        with self._lock:
+            states, self._states = self._states, {}
+            self._closed = True
+        if not states:
+            return 0
+
+        rows = [
+            (area_action_id, None if state is None else json.dumps(state))
+            for area_action_id, state in states.items()
+        ]
+        batch_size = max(1, settings.STATE_FLUSH_BATCH_SIZE)
+        with Session(engine) as session:
+            for start in range(0, len(rows), batch_size):
+                new_state = values(
+                    column("id", Integer), column("last_state", Text), name="new_state"
+                ).data(rows[start : start + batch_size])
+                session.exec(
+                    update(AreaAction)
+                    .where(AreaAction.id == new_state.c.id)
+                    .values(last_state=cast(new_state.c.last_state, JSON))
+                )
+            session.commit()
+        return len(rows)
@@ -10,7 +10,14 @@ from api import (
     actions,
     reactions,
 )
-from core.oauth_state import cleanup_expired_states
+from core.oauth_state import state_store
+from dependencies.roles import CurrentAdmin
+from core.user_cache import user_cache
+from services.token_manager import token_manager
+from services.connection_state import connection_revalidator
+from services.fetch_cache import fetch_cache
+from services.rate_limit import rate_limiter
+from api.actions_process.reaction_queue import reaction_queue
 
 api_router = APIRouter()
 
@@ -22,10 +29,23 @@ async def root():
 
 @api_router.get("/health")
 async def health():
-    cleanup_expired_states()
     return {"status": "ok"}
 
 
+@api_router.get("/metrics")
+def metrics(_: CurrentAdmin):
+    # Sync: the Postgres state store counts its rows
+    return {
+        "fetch_cache": fetch_cache.stats(),
+        "oauth_state": state_store.stats(),
+        "user_cache": user_cache.stats(),
+        "tokens": token_manager.stats(),
+        "connections": connection_revalidator.stats(),
+        "reaction_queue": reaction_queue.stats(),
+        "rate_limits": rate_limiter.stats(),
+    }
+
+
 api_router.include_router(about.router)
 api_router.include_router(auth.router)
 api_router.include_router(oauth.router)
@@ -1,6 +1,10 @@
+import base64
+import json
+from datetime import datetime
 from fastapi import APIRouter, HTTPException
+from sqlalchemy import tuple_
 from sqlmodel import select
-from models import Area, Action, AreaAction, Service, AreaReaction, Reaction
+from models import Area, Action, AreaAction, Service, AreaReaction, Reaction, User
 from schemas import (
     ActionBasicInfo,
     ReactionBasicInfo,
@@ -13,6 +17,74 @@ from dependencies.db import SessionDep
 router = APIRouter(prefix="/areas", tags=["areas"])
 
 
+def get_areas_with_service(
+    session: SessionDep, *criteria, order_by=(Area.id,), limit: int | None = None
+) -> list[tuple[Area, User, Service]]:
+    """List areas with their owner and action service in a single query."""
+    rows = session.exec(
+        select(Area, User, Service)
+        .join(User, User.id == Area.user_id)
+        .outerjoin(AreaAction, AreaAction.area_id == Area.id)
+        .outerjoin(Action, Action.id == AreaAction.action_id)
+        .outerjoin(Service, Service.id == Action.service_id)
+        .where(*criteria)
+        .order_by(*order_by)
+        .limit(limit)
+    ).all()
+    if any(service is None for _, _, service in rows):
+        raise HTTPException(status_code=404, detail="Action area not found")
+    return rows
+
+
+def encode_area_cursor(area: Area) -> str:
+    """Opaque keyset position after `area` in the public areas listing."""
+    position = json.dumps([area.created_at.isoformat(), area.id])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_area_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, area_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), int(area_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def get_public_areas_page(
+    session: SessionDep,
+    limit: int | None,
+    cursor: str | None = None,
+    service_id: int | None = None,
+    category: str | None = None,
+    action_id: int | None = None,
+) -> tuple[list[tuple[Area, User, Service]], str | None]:
+    """Page through public areas, newest first, keyed on (created_at, id).
+
+    Returns the page and the cursor of the next one, None on the last page.
+    Without a `limit`, every matching area is returned as a single page.
+    """
+    criteria = [Area.is_public == True]
+    if cursor:
+        criteria.append(tuple_(Area.created_at, Area.id) < decode_area_cursor(cursor))
+    if service_id is not None:
+        criteria.append(Service.id == service_id)
+    if category is not None:
+        criteria.append(Service.category == category)
+    if action_id is not None:
+        criteria.append(Action.id == action_id)
+
+    rows = get_areas_with_service(
+        session,
+        *criteria,
+        order_by=(Area.created_at.desc(), Area.id.desc()),
+        limit=None if limit is None else limit + 1,
+    )
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_area_cursor(rows[-1][0])
+
+
 def get_area_action_info(session: SessionDep, area: Area) -> ActionInfo:
     """Get action configuration for an area."""
     action_area: AreaAction = session.exec(
@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Response
 from sqlmodel import select
+from core.config import settings
 from models import Area, User
 from schemas import (
     AreaGet,
@@ -17,7 +19,7 @@ from schemas import (
 from dependencies.db import SessionDep
 from dependencies.roles import CurrentUser
 from api.users.areas.db import create_copy_area
-from api.areas.db import get_area_action_basic_info, get_area_action_info, get_area_reactions_basic_info, get_area_reactions_info
+from api.areas.db import get_area_action_basic_info, get_area_action_info, get_area_reactions_basic_info, get_area_reactions_info, get_public_areas_page
 
 router = APIRouter(prefix="/areas", tags=["areas"])
 
@@ -26,18 +28,33 @@ router = APIRouter(prefix="/areas", tags=["areas"])
     "/public",
     response_model=list[AreaGetPublic],
     summary="Get public areas",
-    description="Browse automation areas shared by the community",
+    description=(
+        "Browse automation areas shared by the community, newest first. "
+        "Without `limit` nor `cursor` every area is returned. Otherwise results "
+        "are paged: pass the X-Next-Cursor response header back as `cursor` "
+        "to fetch the next page, it is absent on the last page."
+    ),
+    responses={400: {"description": "Invalid cursor"}},
 )
-def get_areas_public(session: SessionDep) -> list[AreaGetPublic]:
-    areas: list[Area] = session.exec(select(Area).where(Area.is_public == True)).all()
+def get_areas_public(
+    session: SessionDep,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PUBLIC_AREAS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    service_id: Optional[int] = Query(None),
+    category: Optional[str] = Query(None),
+    action_id: Optional[int] = Query(None),
+) -> list[AreaGetPublic]:
+    if limit is None and cursor is not None:
+        limit = settings.PUBLIC_AREAS_PAGE_SIZE
+    rows, next_cursor = get_public_areas_page(
+        session, limit, cursor, service_id, category, action_id
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     areas_data: list[AreaGetPublic] = []
-    for area in areas:
-        user: User = session.exec(select(User).where(User.id == area.user_id)).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="Data not found")
-
-        action_data: ActionBasicInfo = get_area_action_info(session, area)
+    for area, user, service in rows:
         user_data = UserShortInfo(id=user.id, name=user.name)
         area_data = AreaGetPublic(
             id=area.id,
@@ -45,7 +62,7 @@ def get_areas_public(session: SessionDep) -> list[AreaGetPublic]:
             description=area.description,
             user=user_data,
             created_at=area.created_at,
-            color=action_data.service.color,
+            color=service.color,
         )
         areas_data.append(area_data)
     return areas_data
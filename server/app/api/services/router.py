@@ -1,12 +1,15 @@
 from core.logger import logger
 from models.users.user_service import UserService
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from sqlalchemy import and_
 from sqlmodel import select
-from models import Service, Action, Reaction
-from schemas import ServiceGet, ServiceIdGet, ActionShortInfo, ReactionShortInfo
+from core.catalog import catalog_response, get_catalog
+from models import Service
+from schemas import ServiceGet, ServiceIdGet, ServiceConnectionGet, ActionShortInfo, ReactionShortInfo
 from dependencies.db import SessionDep
 from dependencies.roles import CurrentUser, CurrentUserNoFail
-from services.services import services_dico
+from services.connection_state import connection_revalidator, connection_valid
+from services.token_manager import token_manager
 
 router = APIRouter(prefix="/services", tags=["services"])
 
@@ -17,18 +20,47 @@ router = APIRouter(prefix="/services", tags=["services"])
     summary="List all services",
     description="Get all available services for automation",
 )
-def get_service(session: SessionDep) -> list[ServiceGet]:
-    services: list[Service] = session.exec(
-        select(
-            Service.id,
-            Service.name,
-            Service.image_url,
-            Service.category,
-            Service.color,
-            Service.oauth_required,
+def get_service(request: Request, session: SessionDep) -> list[ServiceGet]:
+    return catalog_response(request, get_catalog(session).services)
+
+
+@router.get(
+    "/connected",
+    response_model=list[ServiceConnectionGet],
+    summary="Check all service connections",
+    description="Connection status of every service for the current user",
+)
+def get_connected_services(
+    session: SessionDep, user: CurrentUser
+) -> list[ServiceConnectionGet]:
+    rows = session.exec(
+        select(Service, UserService)
+        .outerjoin(
+            UserService,
+            and_(UserService.service_id == Service.id, UserService.user_id == user.id),
         )
+        .order_by(Service.id)
     ).all()
-    return services
+
+    # Links the background job has not confirmed lately are probed now,
+    # concurrently and within CONNECTION_PROBE_DEADLINE
+    stale = [
+        (user_service.id, service.name)
+        for service, user_service in rows
+        if user_service is not None and connection_revalidator.is_stale(user_service)
+    ]
+    probed = connection_revalidator.probe_many(stale)
+
+    return [
+        ServiceConnectionGet(
+            id=service.id,
+            name=service.name,
+            oauth_required=service.oauth_required,
+            is_connected=user_service is not None
+            and probed.get(user_service.id, connection_valid(user_service)),
+        )
+        for service, user_service in rows
+    ]
 
 
 @router.get(
@@ -61,19 +93,9 @@ def get_service_by_id(id: int, session: SessionDep, _: CurrentUser) -> ServiceId
     description="List all trigger actions available for this service",
 )
 def get_actions_of_service(
-    id: int, session: SessionDep, _: CurrentUser
+    id: int, request: Request, session: SessionDep, _: CurrentUser
 ) -> list[ActionShortInfo]:
-    actions_data: list[ActionShortInfo] = []
-
-    actions: list[Action] = session.exec(
-        select(Action).where(Action.service_id == id)
-    ).all()
-    for action in actions:
-        action_data = ActionShortInfo(
-            id=action.id, name=action.name, description=action.description
-        )
-        actions_data.append(action_data)
-    return actions_data
+    return catalog_response(request, get_catalog(session).actions_of(id))
 
 
 @router.get(
@@ -83,19 +105,9 @@ def get_actions_of_service(
     description="List all response reactions available for this service",
 )
 def get_reactions_of_service(
-    id: int, session: SessionDep, _: CurrentUser
+    id: int, request: Request, session: SessionDep, _: CurrentUser
 ) -> list[ReactionShortInfo]:
-    reactions_data: list[ReactionShortInfo] = []
-
-    reactions: list[Reaction] = session.exec(
-        select(Reaction).where(Reaction.service_id == id)
-    ).all()
-    for reaction in reactions:
-        reaction_data = ReactionShortInfo(
-            id=reaction.id, name=reaction.name, description=reaction.description
-        )
-        reactions_data.append(reaction_data)
-    return reactions_data
+    return catalog_response(request, get_catalog(session).reactions_of(id))
 
 
 @router.get(
@@ -105,27 +117,23 @@ def get_reactions_of_service(
     description="Check if current user has connected this service",
 )
 def is_service_connected(id: int, session: SessionDep, user: CurrentUserNoFail) -> dict:
-    service_name: str = session.exec(
-        select(Service.name)
-        .join(UserService, UserService.service_id == Service.id)
-        .where(UserService.service_id == id, UserService.user_id == user.id)
-    ).first()
-    if service_name is None:
+    if user is None:
         return {"is_connected": False}
-
-    if services_dico[service_name].is_connected(session, user.id) is True:
-        return {"is_connected": True}
-
     user_service: UserService = session.exec(
-        select(UserService)
-        .join(Service, Service.id == UserService.service_id)
-        .where(Service.name == service_name)
+        select(UserService).where(
+            UserService.service_id == id, UserService.user_id == user.id
+        )
     ).first()
     if not user_service:
         return {"is_connected": False}
 
+    # Served from the stored connection state, see services.connection_state
+    if connection_valid(user_service):
+        return {"is_connected": True}
+
     session.delete(user_service)
     session.commit()
+    token_manager.forget(user.id)
     return {"is_connected": False}
 
 
@@ -141,6 +149,7 @@ def disconnect_service(id: int, session: SessionDep, user: CurrentUser):
 
     session.delete(user_service)
     session.commit()
+    token_manager.forget(user.id)
     return {
         "message": "Service disconnected",
         "service_id": user_service.id,
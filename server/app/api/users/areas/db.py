@@ -1,88 +1,180 @@
+from typing import Optional
 from fastapi import HTTPException
-from sqlmodel import select
-from models import Area, Action, AreaAction, Service, AreaReaction
-from schemas import ActionBasicInfo, ServiceGet
+from sqlmodel import Session, select
+from models import Action, Area, AreaAction, AreaReaction, Reaction
+from schemas import CreateArea, UpdateArea
 from dependencies.db import SessionDep
 
 
-def create_copy_area_action(
-    session: SessionDep, new_area_id: int, area_action: AreaAction
-):
-    new_area_action = AreaAction(
-        area_id=new_area_id, action_id=area_action.action_id, config=area_action.config
+def check_references(
+    session: Session, action_ids: set[int], reaction_ids: set[int]
+) -> None:
+    """Check every referenced action and reaction exists, in two queries."""
+    if action_ids:
+        found = set(
+            session.exec(select(Action.id).where(Action.id.in_(action_ids))).all()
+        )
+        if found != action_ids:
+            raise HTTPException(status_code=404, detail="Action not found")
+
+    if reaction_ids:
+        found = set(
+            session.exec(select(Reaction.id).where(Reaction.id.in_(reaction_ids))).all()
+        )
+        if found != reaction_ids:
+            raise HTTPException(status_code=404, detail="Reaction not found")
+
+
+def check_area_references(session: Session, areas: list[CreateArea]) -> None:
+    check_references(
+        session,
+        {area.action.action_id for area in areas},
+        {reaction.reaction_id for area in areas for reaction in area.reactions},
     )
-    session.add(new_area_action)
-    session.commit()
 
 
-def create_copy_area_reaction(
-    session: SessionDep, new_area_id: int, area_reactions: list[AreaReaction]
-):
+def build_area(
+    area: Area, area_action: AreaAction, area_reactions: list[AreaReaction]
+) -> list:
+    """Attach the action and reactions to `area`, ready to be added to a session.
+
+    Linking through the relationships lets a single flush insert the area
+    before its children, without a commit in between to obtain its id.
+    """
+    area_action.area = area
     for area_reaction in area_reactions:
-        new_area_reaction = AreaReaction(
-            area_id=new_area_id,
-            reaction_id=area_reaction.reaction_id,
-            config=area_reaction.config,
-        )
-        session.add(new_area_reaction)
-        session.commit()
+        area_reaction.area = area
+    return [area, area_action, *area_reactions]
 
 
-def create_copy_area(session: SessionDep, area: Area, user_id: int, is_public: bool):
-    new_area = Area(
-        user_id=user_id,
-        name=area.name,
-        description=area.description,
-        enable=False,
-        created_at=None,
-        is_public=is_public,
+def new_area_rows(area: CreateArea, user_id: int, is_public: bool = False) -> list:
+    return build_area(
+        Area(
+            user_id=user_id,
+            name=area.name,
+            description=area.description,
+            enable=False,
+            created_at=None,
+            is_public=is_public,
+        ),
+        AreaAction(action_id=area.action.action_id, config=area.action.config),
+        [
+            AreaReaction(reaction_id=reaction.reaction_id, config=reaction.config)
+            for reaction in area.reactions
+        ],
     )
-    session.add(new_area)
+
+
+def create_areas(session: Session, areas: list[CreateArea], user_id: int) -> list[int]:
+    """Create `areas` for the user as one unit of work; returns their ids."""
+    check_area_references(session, areas)
+
+    created: list[Area] = []
+    for area in areas:
+        rows = new_area_rows(area, user_id)
+        session.add_all(rows)
+        created.append(rows[0])
+    session.flush()
+    area_ids = [area.id for area in created]
     session.commit()
-    session.refresh(new_area)
+    return area_ids
+
 
+def create_copy_area(session: SessionDep, area: Area, user_id: int, is_public: bool):
     area_action: AreaAction = session.exec(
         select(AreaAction).where(AreaAction.area_id == area.id)
     ).first()
     if not area_action:
         raise HTTPException(status_code=404, detail="Area action not found")
-    create_copy_area_action(session, new_area.id, area_action)
 
     area_reactions: list[AreaReaction] = session.exec(
         select(AreaReaction).where(AreaReaction.area_id == area.id)
     ).all()
     if not area_reactions:
         raise HTTPException(status_code=404, detail="Area reactions not found")
-    create_copy_area_reaction(session, new_area.id, area_reactions)
 
+    rows = build_area(
+        Area(
+            user_id=user_id,
+            name=area.name,
+            description=area.description,
+            enable=False,
+            created_at=None,
+            is_public=is_public,
+        ),
+        AreaAction(action_id=area_action.action_id, config=area_action.config),
+        [
+            AreaReaction(
+                reaction_id=area_reaction.reaction_id,
+                order_index=area_reaction.order_index,
+                delay=area_reaction.delay,
+                config=area_reaction.config,
+            )
+            for area_reaction in area_reactions
+        ],
+    )
+    session.add_all(rows)
+    session.commit()
+    return rows[0]
 
-def get_area_action_info(session: SessionDep, area: Area) -> ActionBasicInfo:
-    action_area: AreaAction = session.exec(
-        select(AreaAction).where(AreaAction.area_id == area.id)
-    ).first()
-    if not action_area:
-        raise HTTPException(status_code=404, detail="Action area not found")
 
-    action: Action = session.exec(
-        select(Action).where(Action.id == action_area.action_id)
-    ).first()
-    if not action:
-        raise HTTPException(status_code=404, detail="Action not found")
+def update_area(session: Session, area: Area, changes: UpdateArea) -> Optional[int]:
+    """Patch `area` in place with the fields set in `changes`, in one commit.
 
-    service: Service = session.exec(
-        select(Service).where(Service.id == action.service_id)
-    ).first()
-    if not service:
-        raise HTTPException(status_code=404, detail="Service not found")
-
-    service = ServiceGet(
-        id=service.id,
-        name=service.name,
-        image_url=service.image_url,
-        category=service.category,
-        color=service.color,
-    )
-    area_action_data = ActionBasicInfo(
-        id=action.id, name=action.name, description=action.description, service=service
+    Rows keep their ids. The action's `last_state` survives unless the
+    action or its config changes, so triggers do not re-baseline. Reactions
+    are matched by position; extra ones are added and missing ones deleted.
+    Returns the new action id when the trigger action changed, else None.
+    """
+    check_references(
+        session,
+        {changes.action.action_id} if changes.action else set(),
+        {reaction.reaction_id for reaction in changes.reactions or []},
     )
-    return area_action_data
+
+    if changes.name is not None:
+        area.name = changes.name
+    if changes.description is not None:
+        area.description = changes.description
+
+    new_action_id = None
+    if changes.action is not None:
+        area_action: AreaAction = session.exec(
+            select(AreaAction).where(AreaAction.area_id == area.id)
+        ).first()
+        if not area_action:
+            raise HTTPException(status_code=404, detail="Area action not found")
+        if area_action.action_id != changes.action.action_id:
+            area_action.action_id = new_action_id = changes.action.action_id
+            area_action.config = changes.action.config
+            area_action.last_state = None
+        elif area_action.config != changes.action.config:
+            area_action.config = changes.action.config
+            area_action.last_state = None
+
+    if changes.reactions is not None:
+        current: list[AreaReaction] = session.exec(
+            select(AreaReaction)
+            .where(AreaReaction.area_id == area.id)
+            .order_by(AreaReaction.order_index, AreaReaction.id)
+        ).all()
+        for area_reaction, wanted in zip(current, changes.reactions):
+            if area_reaction.reaction_id != wanted.reaction_id:
+                area_reaction.reaction_id = wanted.reaction_id
+            if area_reaction.config != wanted.config:
+                area_reaction.config = wanted.config
+        for area_reaction in current[len(changes.reactions):]:
+            session.delete(area_reaction)
+        order_index = current[-1].order_index if current else 0
+        session.add_all(
+            AreaReaction(
+                area_id=area.id,
+                reaction_id=wanted.reaction_id,
+                order_index=order_index,
+                config=wanted.config,
+            )
+            for wanted in changes.reactions[len(current):]
+        )
+
+    session.commit()
+    return new_action_id
@@ -1,24 +1,24 @@
 from cron.cron import newJob, isCronExists
 from fastapi import APIRouter, HTTPException
 from sqlmodel import select
-from models import Area, Action, AreaAction, AreaReaction, Reaction
-from schemas import AreaGet, UserShortInfo, ActionBasicInfo, CreateArea, Role
+from models import Area, AreaAction
+from schemas import AreaGet, UserShortInfo, CreateArea, UpdateArea, ImportAreas, Role
 from dependencies.db import SessionDep
 from dependencies.roles import CurrentUser
-from api.users.areas.db import get_area_action_info, create_copy_area
+from api.users.areas.db import create_areas, create_copy_area, update_area
+from api.areas.db import get_areas_with_service
 
 router = APIRouter(prefix="/users/areas", tags=["users_areas"])
 
 
 @router.get("/me", response_model=list[AreaGet])
 def get_user_areas(session: SessionDep, user: CurrentUser) -> list[AreaGet]:
-    areas: list[Area] = session.exec(
-        select(Area).where(Area.user_id == user.id, Area.is_public == False)
-    ).all()
+    rows = get_areas_with_service(
+        session, Area.user_id == user.id, Area.is_public == False
+    )
 
     areas_data: list[AreaGet] = []
-    for area in areas:
-        action_data: ActionBasicInfo = get_area_action_info(session, area)
+    for area, _, service in rows:
         user_data = UserShortInfo(id=user.id, name=user.name)
         area_data = AreaGet(
             id=area.id,
@@ -27,7 +27,7 @@ def get_user_areas(session: SessionDep, user: CurrentUser) -> list[AreaGet]:
             user=user_data,
             enable=area.enable,
             created_at=area.created_at,
-            color=action_data.service.color,
+            color=service.color,
         )
         areas_data.append(area_data)
     return areas_data
@@ -35,13 +35,12 @@ def get_user_areas(session: SessionDep, user: CurrentUser) -> list[AreaGet]:
 
 @router.get("/public", response_model=list[AreaGet])
 def get_public_user_areas(session: SessionDep, user: CurrentUser) -> list[AreaGet]:
-    areas: list[Area] = session.exec(
-        select(Area).where(Area.user_id == user.id, Area.is_public == True)
-    ).all()
+    rows = get_areas_with_service(
+        session, Area.user_id == user.id, Area.is_public == True
+    )
 
     areas_data: list[AreaGet] = []
-    for area in areas:
-        action_data: ActionBasicInfo = get_area_action_info(session, area)
+    for area, _, service in rows:
         user_data = UserShortInfo(id=user.id, name=user.name)
         area_data = AreaGet(
             id=area.id,
@@ -50,7 +49,7 @@ def get_public_user_areas(session: SessionDep, user: CurrentUser) -> list[AreaGe
             user=user_data,
             enable=area.enable,
             created_at=area.created_at,
-            color=action_data.service.color,
+            color=service.color,
         )
         areas_data.append(area_data)
     return areas_data
@@ -58,53 +57,20 @@ def get_public_user_areas(session: SessionDep, user: CurrentUser) -> list[AreaGe
 
 @router.post("/me")
 def create_area(area: CreateArea, session: SessionDep, user: CurrentUser):
-    action: Action = session.exec(
-        select(Action).where(Action.id == area.action.action_id)
-    ).first()
-    if not action:
-        raise HTTPException(status_code=404, detail="Action not found")
-
-    for area_reaction in area.reactions:
-        reaction: Reaction = session.exec(
-            select(Reaction).where(Reaction.id == area_reaction.reaction_id)
-        ).first()
-        if not reaction:
-            raise HTTPException(status_code=404, detail="Reaction not found")
-
-    new_area = Area(
-        user_id=user.id,
-        name=area.name,
-        description=area.description,
-        enable=False,
-        created_at=None,
-        is_public=False,
-    )
-    session.add(new_area)
-    session.commit()
-    session.refresh(new_area)
+    [area_id] = create_areas(session, [area], user.id)
+    return {"message": "Area created", "area_id": area_id, "user_id": user.id}
 
-    new_area_action = AreaAction(
-        area_id=new_area.id, action_id=area.action.action_id, config=area.action.config
-    )
-    session.add(new_area_action)
-    session.commit()
-    session.refresh(new_area_action)
 
-    for reaction in area.reactions:
-        new_area_reaction = AreaReaction(
-            area_id=new_area.id,
-            reaction_id=reaction.reaction_id,
-            config=reaction.config,
-        )
-        session.add(new_area_reaction)
-        session.commit()
-        session.refresh(new_area_reaction)
-    return {"message": "Area created", "area_id": new_area.id, "user_id": user.id}
+@router.post("/me/import")
+def import_areas(areas: ImportAreas, session: SessionDep, user: CurrentUser):
+    """Create many areas at once, all or none, e.g. from templates."""
+    area_ids = create_areas(session, areas.areas, user.id)
+    return {"message": "Areas created", "area_ids": area_ids, "user_id": user.id}
 
 
 @router.patch("/{id}")
 def update_user_area(
-    id: int, newArea: CreateArea, session: SessionDep, user: CurrentUser
+    id: int, changes: UpdateArea, session: SessionDep, user: CurrentUser
 ):
     area: Area = session.exec(select(Area).where(Area.id == id)).first()
     if not area:
@@ -112,8 +78,12 @@ def update_user_area(
     if area.user_id != user.id and user.role != Role.ADMIN:
         raise HTTPException(status_code=403, detail="Permission Denied")
 
-    session.delete(area)
-    return create_area(newArea, session, user)
+    enabled = area.enable
+    new_action_id = update_area(session, area, changes)
+    # The previous action's job stops by itself once no area uses it
+    if enabled and new_action_id is not None and isCronExists(new_action_id) is False:
+        newJob(new_action_id)
+    return {"message": "Area updated", "area_id": id, "user_id": user.id}
 
 
 @router.patch("/{id}/enable")
@@ -1,55 +1,98 @@
+from typing import Iterator, Optional
+
+from sqlalchemy import and_, func, true
 from sqlmodel import select
-from models import UserService, User
+from models import User
 from sqlmodel import Session
 from fastapi import HTTPException
 from schemas import UserIdGet, UserOauthLoginGet
 
-from models import UserOAuthLogin, OAuthLogin, Service
+from models import UserOAuthLogin, OAuthLogin
 from dependencies.db import SessionDep
+from services.token_manager import token_manager
 
 
 def get_user_service_token(session: Session, user_id: int, service_name: str) -> str | None:
-    user_service: UserService = session.exec(
-        select(UserService)
-        .join(Service, Service.id == UserService.service_id)
-        .join(User, User.id == UserService.user_id)
-        .where(user_id == UserService.user_id, Service.name == service_name)
-    ).first()
-    if not user_service:
-        return None
-    token = user_service.access_token
-    return token
+    return token_manager.get_token(session, user_id, service_name)
 
 
-def get_user_data(session: SessionDep, user: User) -> UserIdGet:
-    oauths_login: list[OAuthLogin] = session.exec(select(OAuthLogin)).all()
+def _users_data(session: Session, users) -> list[UserIdGet]:
+    """Profiles of the users selected by `users`, in one LEFT JOIN aggregation.
 
-    if not oauths_login:
-        raise HTTPException(status_code=404, detail="Oauth login not found")
-    oauth_login_list: list[UserOauthLoginGet] = []
-    for oauth_login in oauths_login:
-        connected: bool = False
-        user_oauth_login: UserOAuthLogin = session.exec(
-            select(UserOAuthLogin).where(
-                UserOAuthLogin.oauth_login_id == oauth_login.id,
-                UserOAuthLogin.user_id == user.id,
+    Every user is crossed with every OAuth login provider and the provider is
+    marked connected when a matching UserOAuthLogin row exists.
+    """
+    rows = session.exec(
+        select(User, OAuthLogin, func.count(UserOAuthLogin.id) > 0)
+        .join(users, users.c.id == User.id)
+        .join(OAuthLogin, true())
+        .outerjoin(
+            UserOAuthLogin,
+            and_(
+                UserOAuthLogin.user_id == User.id,
+                UserOAuthLogin.oauth_login_id == OAuthLogin.id,
+            ),
+        )
+        .group_by(User.id, OAuthLogin.id)
+        .order_by(User.id, OAuthLogin.id)
+    ).all()
+
+    users_data: list[UserIdGet] = []
+    for user, oauth_login, connected in rows:
+        if not users_data or users_data[-1].id != user.id:
+            users_data.append(
+                UserIdGet(
+                    id=user.id,
+                    name=user.name,
+                    email=user.email,
+                    role=user.role,
+                    oauth_login=[],
+                )
+            )
+        users_data[-1].oauth_login.append(
+            UserOauthLoginGet(
+                id=oauth_login.id,
+                name=oauth_login.name,
+                image_url=oauth_login.image_url,
+                color=oauth_login.color,
+                connected=connected,
             )
-        ).first()
-        if user_oauth_login:
-            connected = True
-        oauth_data: UserOauthLoginGet = UserOauthLoginGet(
-            id=oauth_login.id,
-            name=oauth_login.name,
-            image_url=oauth_login.image_url,
-            color=oauth_login.color,
-            connected=connected,
         )
-        oauth_login_list.append(oauth_data)
-    user_data = UserIdGet(
-        id=user.id,
-        name=user.name,
-        email=user.email,
-        role=user.role,
-        oauth_login=oauth_login_list,
-    )
-    return user_data
+    return users_data
+
+
+def get_user_data(session: SessionDep, user: User) -> UserIdGet:
+    users = select(User.id).where(User.id == user.id).subquery()
+    users_data = _users_data(session, users)
+    if not users_data:
+        raise HTTPException(status_code=404, detail="Oauth login not found")
+    return users_data[0]
+
+
+def get_users_data_page(
+    session: Session, limit: int, after_id: Optional[int] = None
+) -> tuple[list[UserIdGet], Optional[int]]:
+    """One page of user profiles by id, and the cursor of the next page."""
+    users = select(User.id).order_by(User.id).limit(limit + 1)
+    if after_id is not None:
+        users = users.where(User.id > after_id)
+    users_data = _users_data(session, users.subquery())
+    if len(users_data) > limit:
+        users_data = users_data[:limit]
+        return users_data, users_data[-1].id
+    return users_data, None
+
+
+def stream_users_data(engine, page_size: int) -> Iterator[str]:
+    """Every user profile as a JSON array, fetched and sent page by page."""
+    with Session(engine) as session:
+        yield "["
+        after_id, first = None, True
+        while True:
+            users_data, after_id = get_users_data_page(session, page_size, after_id)
+            for user_data in users_data:
+                yield ("" if first else ",") + user_data.model_dump_json()
+                first = False
+            if after_id is None:
+                break
+        yield "]"
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlmodel import select
 from schemas import UserIdGet, UserDeletionResponse, UserUpdate, UserUpdatePassword
 
 from models import User
 from dependencies.db import SessionDep
 from dependencies.roles import CurrentUser, CurrentAdmin
-from api.users.db import get_user_data
+from api.users.db import get_user_data, get_users_data_page, stream_users_data
+from core.config import settings
 from core.security import hash_password, verify_password
+from core.user_cache import user_cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -40,6 +45,7 @@ def update_user_infos(updateUser: UserUpdate, session: SessionDep, user: Current
     user_data.email = updateUser.email
     session.add(user_data)
     session.commit()
+    user_cache.invalidate(user.id)
     return {"message": "User updated", "user_id": user.id}
 
 
@@ -63,6 +69,7 @@ def update_user_password(
     user_data.password = hash_password(updateUserPassword.new_password)
     session.add(user_data)
     session.commit()
+    user_cache.invalidate(user.id)
     return {"message": "User password updated", "user_id": user.id}
 
 
@@ -78,6 +85,7 @@ def delete_current_user(session: SessionDep, user: CurrentUser) -> UserDeletionR
         raise HTTPException(status_code=404, detail="Data not found")
     session.delete(user_data)
     session.commit()
+    user_cache.invalidate(user.id)
     return UserDeletionResponse(message="User deleted", user_id=user.id)
 
 
@@ -85,16 +93,32 @@ def delete_current_user(session: SessionDep, user: CurrentUser) -> UserDeletionR
     "/",
     response_model=list[UserIdGet],
     summary="List all users",
-    description="Admin only: get all users with their connected services",
+    description=(
+        "Admin only: get all users with their connected services, by id. "
+        "Without `limit` the whole list is streamed; with it, one page is "
+        "returned and the X-Next-Cursor response header is the `cursor` of "
+        "the next page, absent on the last page."
+    ),
 )
-def get_users(session: SessionDep, _: CurrentAdmin) -> list[User]:
-    users: list[User] = session.exec(select(User)).all()
+def get_users(
+    session: SessionDep,
+    response: Response,
+    _: CurrentAdmin,
+    limit: Optional[int] = Query(
+        None, ge=1, le=settings.ADMIN_USERS_MAX_PAGE_SIZE
+    ),
+    cursor: Optional[int] = Query(None),
+) -> list[UserIdGet]:
+    if limit is None:
+        return StreamingResponse(
+            stream_users_data(session.get_bind(), settings.ADMIN_USERS_PAGE_SIZE),
+            media_type="application/json",
+        )
 
-    users_list: list[User] = []
-    for user in users:
-        user_data: UserIdGet = get_user_data(session, user)
-        users_list.append(user_data)
-    return users_list
+    users_data, next_cursor = get_users_data_page(session, limit, cursor)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return users_data
 
 
 @router.get(
@@ -129,4 +153,5 @@ def delete_user_by_id(
 
     session.delete(user_data)
     session.commit()
+    user_cache.invalidate(id)
     return UserDeletionResponse(message="User deleted", user_id=id)
@@ -0,0 +1,170 @@
+"""In-memory snapshot of the service catalog.
+
+The catalog (services, actions, reactions) only changes when
+`sync_services_catalog_to_db` runs, so the endpoints listing it serve
+pre-serialized JSON from this snapshot instead of querying the database.
+Each document carries a strong ETag so clients can revalidate with
+If-None-Match and get a 304.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlmodel import Session, select
+
+from core.logger import logger
+from models import Action, Reaction, Service
+from schemas import ActionShortInfo, ReactionShortInfo, ServiceGet
+
+
+@dataclass(frozen=True)
+class CatalogDocument:
+    """Pre-serialized JSON body and its strong ETag."""
+
+    body: bytes
+    etag: str
+
+
+def _document(body: bytes) -> CatalogDocument:
+    return CatalogDocument(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def _dump(adapter: TypeAdapter, items: list) -> CatalogDocument:
+    return _document(adapter.dump_json(items))
+
+
+_services_adapter = TypeAdapter(List[ServiceGet])
+_actions_adapter = TypeAdapter(List[ActionShortInfo])
+_reactions_adapter = TypeAdapter(List[ReactionShortInfo])
+EMPTY_LIST = _document(b"[]")
+
+
+class CatalogSnapshot:
+    """Serialized views of the catalog, built once per sync."""
+
+    def __init__(
+        self,
+        services: List[Service],
+        actions: List[Action],
+        reactions: List[Reaction],
+    ) -> None:
+        actions_by_service: Dict[int, List[Action]] = {}
+        for action in actions:
+            actions_by_service.setdefault(action.service_id, []).append(action)
+        reactions_by_service: Dict[int, List[Reaction]] = {}
+        for reaction in reactions:
+            reactions_by_service.setdefault(reaction.service_id, []).append(reaction)
+
+        self.services = _dump(
+            _services_adapter,
+            [ServiceGet.model_validate(s, from_attributes=True) for s in services],
+        )
+        self.service_actions: Dict[int, CatalogDocument] = {
+            service_id: _dump(
+                _actions_adapter,
+                [ActionShortInfo.model_validate(a, from_attributes=True) for a in items],
+            )
+            for service_id, items in actions_by_service.items()
+        }
+        self.service_reactions: Dict[int, CatalogDocument] = {
+            service_id: _dump(
+                _reactions_adapter,
+                [ReactionShortInfo.model_validate(r, from_attributes=True) for r in items],
+            )
+            for service_id, items in reactions_by_service.items()
+        }
+
+        about_services = [
+            {
+                "name": service.name,
+                "description": service.description or "",
+                "actions": [
+                    {"name": a.name, "description": a.description or ""}
+                    for a in actions_by_service.get(service.id, [])
+                ],
+                "reactions": [
+                    {"name": r.name, "description": r.description or ""}
+                    for r in reactions_by_service.get(service.id, [])
+                ],
+            }
+            for service in services
+        ]
+        self.about_services = _document(json.dumps(about_services).encode())
+
+    def actions_of(self, service_id: int) -> CatalogDocument:
+        return self.service_actions.get(service_id, EMPTY_LIST)
+
+    def reactions_of(self, service_id: int) -> CatalogDocument:
+        return self.service_reactions.get(service_id, EMPTY_LIST)
+
+    def about(self, host: str) -> CatalogDocument:
+        """The /about.json document; only the catalog part is validated by its ETag."""
+        body = (
+            b'{"client":{"host":%s},"server":{"current_time":%d,"services":%s}}'
+            % (
+                json.dumps(host).encode(),
+                int(datetime.now().timestamp()),
+                self.about_services.body,
+            )
+        )
+        # current_time differs on every response, so the validator is weak
+        tag = hashlib.sha256(self.about_services.etag.encode() + host.encode())
+        return CatalogDocument(body, f'W/"{tag.hexdigest()[:32]}"')
+
+
+_snapshot: Optional[CatalogSnapshot] = None
+_lock = Lock()
+
+
+def build_catalog(session: Session) -> CatalogSnapshot:
+    """Build and install a new snapshot from the synced catalog tables."""
+    global _snapshot
+    snapshot = CatalogSnapshot(
+        session.exec(select(Service).order_by(Service.id)).all(),
+        session.exec(select(Action).order_by(Action.id)).all(),
+        session.exec(select(Reaction).order_by(Reaction.id)).all(),
+    )
+    with _lock:
+        _snapshot = snapshot
+    logger.info("Service catalog snapshot built")
+    return snapshot
+
+
+def invalidate_catalog() -> None:
+    """Drop the snapshot, the next read rebuilds it."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
+
+
+def get_catalog(session: Session) -> CatalogSnapshot:
+    """Current snapshot, built on first use."""
+    snapshot = _snapshot
+    if snapshot is None:
+        snapshot = build_catalog(session)
+    return snapshot
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def catalog_response(request: Request, document: CatalogDocument) -> Response:
+    """Serve a catalog document, or a 304 if the client already has it."""
+    headers: Dict[str, Any] = {"ETag": document.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request, document.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(document.body, media_type="application/json", headers=headers)
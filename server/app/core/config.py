@@ -59,9 +59,80 @@ class Settings(BaseSettings):
     CALENDLY_CLIENT_ID: str
     CALENDLY_CLIENT_SECRET: str
     FRONT_URL: str
-    CRON_USER: str = "root"
+    DB_MIGRATIONS: bool = True
+    ACTION_POOL_WORKERS: int = 8
+    ACTION_SERVICE_CONCURRENCY: int = 4
+    ACTION_TICK_DEADLINE: int = 55
+    # Actions fire up to this many seconds after their cron minute
+    SCHEDULER_SPREAD: float = 50
+    ACTION_ASYNC_SERVICE_CONCURRENCY: int = 100
+    # Below the engine's pool size (5 + 10 overflow)
+    ASYNC_DB_CONCURRENCY: int = 8
+    REACTION_SERVICE_CONCURRENCY: int = 8
+    # Below the engine's pool size (5 + 10 overflow)
+    REACTION_CONCURRENCY: int = 8
+    REACTION_QUEUE_BACKEND: str = "postgres"
+    REACTION_QUEUE_POLL_INTERVAL: float = 1
+    REACTION_QUEUE_BATCH_SIZE: int = 50
+    REACTION_JOB_LEASE: int = 300
+    # Well below the lease: a batch of 50 runs in ~7 rounds of 8
+    REACTION_JOB_TIMEOUT: float = 30
+    REACTION_JOB_MAX_ATTEMPTS: int = 5
+    REACTION_RETRY_BASE_DELAY: float = 10
+    REACTION_RETRY_MAX_DELAY: float = 900
+    REACTION_JOB_RETENTION: int = 86400
+    REACTION_JOB_PURGE_INTERVAL: int = 3600
+    STATE_FLUSH_BATCH_SIZE: int = 500
+    SEEN_IDS_LIMIT: int = 200
+    REDDIT_CURSOR_MAX_EMPTY_POLLS: int = 30
+    PUBLIC_AREAS_PAGE_SIZE: int = 50
+    PUBLIC_AREAS_MAX_PAGE_SIZE: int = 200
+    ADMIN_USERS_PAGE_SIZE: int = 500
+    ADMIN_USERS_MAX_PAGE_SIZE: int = 1000
+    FETCH_CACHE_TTL: int = 30
+    USER_CACHE_TTL: float = 30
+    USER_CACHE_SIZE: int = 1024
+    TOKEN_REFRESH_AHEAD: int = 300
+    TOKEN_REFRESH_INTERVAL: int = 60
+    TOKEN_REFRESH_BATCH_SIZE: int = 100
+    TOKEN_REFRESH_WORKERS: int = 4
+    TOKEN_REFRESH_RETRY: int = 300
+    TOKEN_CACHE_TTL: int = 60
+    CONNECTION_FRESHNESS: int = 3600
+    CONNECTION_REVALIDATE_INTERVAL: int = 300
+    CONNECTION_REVALIDATE_BATCH_SIZE: int = 50
+    CONNECTION_REVALIDATE_WORKERS: int = 4
+    CONNECTION_PROBE_DEADLINE: float = 2
+    OAUTH_STATE_BACKEND: str = "memory"
+    OAUTH_STATE_TTL: int = 600
+    OAUTH_STATE_EVICTION_INTERVAL: int = 60
+    HTTP_TIMEOUT: float = 10
+    HTTP_CONNECT_TIMEOUT: float = 5
+    HTTP_POOL_SIZE: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30
+    HTTP_HTTP2: bool = False
+    HTTP_ASYNC_POOL_SIZE: int = 100
+    HTTP_RATE_LIMIT_ENABLED: bool = True
+    HTTP_RATE_LIMIT: float = 10
+    HTTP_RATE_BURST: int = 20
+    # (requests per second, burst) by host or parent domain, per credential
+    # (and per channel/guild/webhook on discord.com)
+    HTTP_RATE_LIMITS: dict[str, tuple[float, int]] = {
+        "api.github.com": (1.3, 50),
+        "oauth.reddit.com": (1.5, 10),
+        "api.riotgames.com": (0.8, 20),
+        "api.clashroyale.com": (5, 10),
+        "proxy.royaleapi.dev": (5, 10),
+        "discord.com": (5, 10),
+    }
+    # (requests per second, burst) for OAuth token endpoints, per host and client
+    HTTP_RATE_LIMIT_TOKEN_ENDPOINT: tuple[float, int] = (2, 20)
+    HTTP_RATE_LIMIT_MAX_WAIT: float = 2
+    HTTP_RATE_LIMIT_DEFAULT_BACKOFF: float = 5
+    HTTP_RATE_LIMIT_MAX_BUCKETS: int = 10000
     EMAIL: str
     EMAIL_PASSWORD: str
+    SMTP_TIMEOUT: float = 20
 
     class Config:
         env_file = get_env_file()
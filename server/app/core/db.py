@@ -1,105 +1,109 @@
+import hashlib
+import json
+from contextlib import contextmanager
 from models.oauth.oauth_login import OAuthLogin
 from sqlmodel import SQLModel, select, Session
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy import or_
-from models import Service, Action, Reaction, Area
+from sqlalchemy import or_, func
+from models import Service, Action, Reaction, Area, CatalogState
 from core.engine import engine
+from core.catalog import build_catalog, invalidate_catalog
+from core.config import settings
+from core.migrations import upgrade_schema
 from core.logger import logger
 
+# Key of the Postgres advisory lock serializing catalog syncs across replicas
+CATALOG_SYNC_LOCK_ID = 0x41524541
+
 
 def upsert_data(
     session: Session,
     model,
-    values: dict,
+    values: dict | list[dict],
     conflict_target,
-    update_fields: dict,
+    update_fields: dict | list[str],
     returning_column=None,
 ):
-    stmt = (
-        insert(model)
-        .values(**values)
-        .on_conflict_do_update(
-            index_elements=conflict_target
-            if isinstance(conflict_target, list)
-            else None,
-            constraint=conflict_target if isinstance(conflict_target, str) else None,
-            set_=update_fields,
-        )
+    """Insert one or many rows, updating the existing ones on conflict.
+
+    `update_fields` maps columns to new values, or lists the columns to take
+    from each proposed row, which is what a multi-row upsert needs.
+    """
+    stmt = insert(model).values(values)
+    if not isinstance(update_fields, dict):
+        update_fields = {field: stmt.excluded[field] for field in update_fields}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=conflict_target
+        if isinstance(conflict_target, list)
+        else None,
+        constraint=conflict_target if isinstance(conflict_target, str) else None,
+        set_=update_fields,
     )
     if returning_column is not None:
         stmt = stmt.returning(returning_column)
     return session.exec(stmt)
 
 
-def sync_reactions_for_service(session: Session, service_data: dict, service_id: int):
-    existing_reactions = session.exec(
-        select(Reaction).where(Reaction.service_id == service_id)
-    ).all()
-    existing_reaction_names = {reaction.name for reaction in existing_reactions}
-
-    json_reactions = service_data.get("reactions", [])
-    json_reaction_names = {reaction["name"] for reaction in json_reactions}
-
-    reactions_to_delete = existing_reaction_names - json_reaction_names
-    if reactions_to_delete:
-        for reaction in existing_reactions:
-            if reaction.name in reactions_to_delete:
-                session.delete(reaction)
-                logger.info(
-                    f"Deleted reaction: {reaction.name} from service {service_id}"
-                )
-
-    for reaction in json_reactions:
+def sync_reactions(session: Session, catalog: dict, service_ids: dict[str, int]):
+    """Sync the reactions of every catalog service with one upsert."""
+    json_reactions = [
+        dict(
+            service_id=service_ids[service_data["name"]],
+            name=reaction["name"],
+            description=reaction.get("description"),
+            config_schema=reaction.get("config_schema"),
+        )
+        for service_data in catalog.values()
+        for reaction in service_data.get("reactions", [])
+    ]
+    json_reaction_keys = {(row["service_id"], row["name"]) for row in json_reactions}
+
+    for reaction in session.exec(select(Reaction)).all():
+        if (reaction.service_id, reaction.name) not in json_reaction_keys:
+            session.delete(reaction)
+            logger.info(
+                f"Deleted reaction: {reaction.name} from service {reaction.service_id}"
+            )
+
+    if json_reactions:
         upsert_data(
             session=session,
             model=Reaction,
-            values=dict(
-                service_id=service_id,
-                name=reaction["name"],
-                description=reaction.get("description"),
-                config_schema=reaction.get("config_schema"),
-            ),
+            values=json_reactions,
             conflict_target="uq_reaction_service_name",
-            update_fields=dict(
-                description=reaction.get("description"),
-                config_schema=reaction.get("config_schema"),
-            ),
+            update_fields=["description", "config_schema"],
         )
 
 
-def sync_actions_for_service(session: Session, service_data: dict, service_id: int):
-    existing_actions = session.exec(
-        select(Action).where(Action.service_id == service_id)
-    ).all()
-    existing_action_names = {action.name for action in existing_actions}
-
-    json_actions = service_data.get("actions", [])
-    json_action_names = {action["name"] for action in json_actions}
-
-    actions_to_delete = existing_action_names - json_action_names
-    if actions_to_delete:
-        for action in existing_actions:
-            if action.name in actions_to_delete:
-                session.delete(action)
-                logger.info(f"Deleted action: {action.name} from service {service_id}")
-
-    for action in json_actions:
+def sync_actions(session: Session, catalog: dict, service_ids: dict[str, int]):
+    """Sync the actions of every catalog service with one upsert."""
+    json_actions = [
+        dict(
+            service_id=service_ids[service_data["name"]],
+            name=action["name"],
+            interval=action["interval"],
+            description=action.get("description"),
+            config_schema=action.get("config_schema"),
+        )
+        for service_data in catalog.values()
+        for action in service_data.get("actions", [])
+    ]
+    json_action_keys = {(row["service_id"], row["name"]) for row in json_actions}
+
+    for action in session.exec(select(Action)).all():
+        if (action.service_id, action.name) not in json_action_keys:
+            session.delete(action)
+            logger.info(
+                f"Deleted action: {action.name} from service {action.service_id}"
+            )
+
+    if json_actions:
         upsert_data(
             session=session,
             model=Action,
-            values=dict(
-                service_id=service_id,
-                name=action["name"],
-                interval=action["interval"],
-                description=action.get("description"),
-                config_schema=action.get("config_schema"),
-            ),
+            values=json_actions,
             conflict_target="uq_action_service_name",
-            update_fields=dict(
-                description=action.get("description"),
-                interval=action["interval"],
-                config_schema=action.get("config_schema"),
-            ),
+            update_fields=["description", "interval", "config_schema"],
         )
 
 
@@ -117,21 +121,20 @@ def sync_services_oauth_catalog_to_db(session: Session, catalog: dict):
                 session.delete(service)
                 logger.info(f"Deleted service: {service.name}")
 
-    for service_data in catalog.values():
-        result = upsert_data(
+    if catalog:
+        upsert_data(
             session=session,
             model=OAuthLogin,
-            values=dict(
-                name=service_data["name"],
-                image_url=service_data.get("image_url"),
-                color=service_data.get("color"),
-            ),
+            values=[
+                dict(
+                    name=service_data["name"],
+                    image_url=service_data.get("image_url"),
+                    color=service_data.get("color"),
+                )
+                for service_data in catalog.values()
+            ],
             conflict_target=["name"],
-            update_fields=dict(
-                image_url=service_data.get("image_url"),
-                color=service_data.get("color"),
-            ),
-            returning_column=OAuthLogin.id,
+            update_fields=["image_url", "color"],
         )
 
     session.commit()
@@ -176,42 +179,83 @@ def sync_services_catalog_to_db(session: Session, catalog: dict):
                     f"Deleted service: {service.name} with {len(actions_to_delete)} actions and {len(reactions_to_delete)} reactions"
                 )
 
-    for service_data in catalog.values():
-        result = upsert_data(
+    if catalog:
+        upsert_data(
             session=session,
             model=Service,
-            values=dict(
-                name=service_data["name"],
-                description=service_data.get("description"),
-                image_url=service_data.get("image_url"),
-                color=service_data.get("color"),
-                category=service_data.get("category"),
-                oauth_required=service_data.get("oauth_required"),
-            ),
+            values=[
+                dict(
+                    name=service_data["name"],
+                    description=service_data.get("description"),
+                    image_url=service_data.get("image_url"),
+                    color=service_data.get("color"),
+                    category=service_data.get("category"),
+                    oauth_required=service_data.get("oauth_required"),
+                )
+                for service_data in catalog.values()
+            ],
             conflict_target=["name"],
-            update_fields=dict(
-                description=service_data.get("description"),
-                image_url=service_data.get("image_url"),
-                color=service_data.get("color"),
-                category=service_data.get("category"),
-                oauth_required=service_data.get("oauth_required"),
-            ),
-            returning_column=Service.id,
+            update_fields=[
+                "description",
+                "image_url",
+                "color",
+                "category",
+                "oauth_required",
+            ],
         )
 
-        service_id = result.scalar_one()
-        sync_actions_for_service(session, service_data, service_id)
-        sync_reactions_for_service(session, service_data, service_id)
+    service_ids = dict(session.exec(select(Service.name, Service.id)).all())
+    sync_actions(session, catalog, service_ids)
+    sync_reactions(session, catalog, service_ids)
 
     delete_invalid_areas(session)
 
     session.commit()
     logger.info("Database synchronization completed")
+    invalidate_catalog()
+
+
+def catalog_fingerprint(*catalogs: dict) -> str:
+    """Stable hash of the catalog JSON, used to skip syncing an unchanged catalog."""
+    payload = json.dumps(catalogs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@contextmanager
+def catalog_sync_lock():
+    """Hold the catalog sync advisory lock on a dedicated connection.
+
+    Replicas booting together wait here instead of racing on the upserts. The
+    lock is session-level so that it survives the commits done by the sync.
+    """
+    with engine.connect() as connection:
+        connection.execute(select(func.pg_advisory_lock(CATALOG_SYNC_LOCK_ID)))
+        connection.commit()
+        try:
+            yield connection
+        finally:
+            connection.rollback()
+            connection.execute(select(func.pg_advisory_unlock(CATALOG_SYNC_LOCK_ID)))
+            connection.commit()
 
 
 def init_db(catalog: dict, oauths_catalog: dict) -> None:
-    """Initialize database and sync service catalogs."""
-    SQLModel.metadata.create_all(engine)
-    with Session(engine) as session:
-        sync_services_catalog_to_db(session, catalog)
-        sync_services_oauth_catalog_to_db(session, oauths_catalog)
+    """Migrate the schema and sync service catalogs if they changed.
+
+    With `DB_MIGRATIONS` off (tests), tables are created from the models.
+    """
+    fingerprint = catalog_fingerprint(catalog, oauths_catalog)
+    with catalog_sync_lock() as connection, Session(connection) as session:
+        if settings.DB_MIGRATIONS:
+            upgrade_schema(connection)
+        else:
+            SQLModel.metadata.create_all(engine)
+        state = session.get(CatalogState, "services")
+        if state is not None and state.fingerprint == fingerprint:
+            logger.info("Service catalog unchanged, skipping synchronization")
+        else:
+            sync_services_catalog_to_db(session, catalog)
+            sync_services_oauth_catalog_to_db(session, oauths_catalog)
+            session.merge(CatalogState(name="services", fingerprint=fingerprint))
+            session.commit()
+        build_catalog(session)
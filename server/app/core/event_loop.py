@@ -0,0 +1,57 @@
+"""Background event loop for non-blocking service I/O.
+
+Async action checks run on one long-lived loop in a daemon thread, so
+many polls can wait on the network at the same time and the async HTTP
+clients keep their connections between ticks. Synchronous code hands
+coroutines to this loop with `run_coroutine`.
+"""
+
+import asyncio
+from threading import Lock, Thread
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[Thread] = None
+_lock = Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the service I/O loop, starting it on first use."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _thread = Thread(
+                target=_loop.run_forever, name="service-io", daemon=True
+            )
+            _thread.start()
+        return _loop
+
+
+def run_coroutine(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    """Run `coro` on the service loop and block until it returns."""
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_coroutine() cannot block the service loop itself")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+def stop_loop() -> None:
+    """Stop the service loop and wait for its thread to exit."""
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop = _thread = None
+    if loop is None:
+        return
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+    if not loop.is_running():
+        loop.close()
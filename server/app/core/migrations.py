@@ -0,0 +1,42 @@
+"""Schema migrations, applied with Alembic at startup.
+
+The schema evolves through the revisions in `migrations/versions`.
+Databases created with `SQLModel.metadata.create_all` before migrations
+existed have tables but no `alembic_version`; they are stamped with the
+initial revision, which matches that schema, and upgraded from there.
+
+After changing a model, add a revision from server/app:
+
+    alembic revision --autogenerate -m "describe the change"
+"""
+
+from pathlib import Path
+
+from sqlalchemy import inspect
+
+from core.logger import logger
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection=None):
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_INI))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def upgrade_schema(connection) -> None:
+    """Upgrade the database behind `connection` to the latest revision."""
+    from alembic import command
+
+    config = alembic_config(connection)
+    tables = set(inspect(connection).get_table_names())
+    if "users" in tables and "alembic_version" not in tables:
+        logger.info(f"Existing schema without revision, stamping {BASELINE_REVISION}")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+    connection.commit()
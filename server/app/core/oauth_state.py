@@ -1,24 +1,230 @@
-"""OAuth state management for all authentication flows."""
+"""OAuth state management for all authentication flows.
 
+A state token maps the OAuth callback back to the user (and platform) that
+started the flow. Tokens are single-use and expire after
+`OAUTH_STATE_TTL` seconds. Two backends are available, selected with
+`OAUTH_STATE_BACKEND`:
+
+- `memory`: a dict plus a min-heap of expiry times, for a single process.
+- `postgres`: the `oauth_state` table with an index on `expires_at`, shared
+  by every worker and replica, so the callback may land on any of them.
+
+Expired tokens are evicted by a background task started with the app.
+"""
+
+import heapq
 import time
-from typing import Dict, Optional, Tuple
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
 from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func
+from sqlmodel import Session, select
+
+from core.config import settings
 from core.logger import logger
+from core.periodic import PeriodicTask
+from models import OAuthState
+
+STATE_EXPIRY_SECONDS = settings.OAUTH_STATE_TTL
+
+
+class OAuthStateStore(ABC):
+    """Single-use state tokens with a TTL, and counters for /metrics."""
+
+    backend = ""
+
+    def __init__(self, ttl: float = STATE_EXPIRY_SECONDS) -> None:
+        self.ttl = ttl
+        self.stored = 0
+        self.consumed = 0
+        self.expired = 0
+        self.missing = 0
+        self.evicted = 0
+        self._counter_lock = Lock()
+        self._eviction = PeriodicTask("OAuth state eviction", self.cleanup)
+
+    @abstractmethod
+    def put(self, state: str, user_id: int, is_mobile: bool) -> None:
+        """Store `state` for `user_id` until the TTL elapses."""
+
+    @abstractmethod
+    def take(self, state: str) -> Optional[Tuple[int, bool, bool]]:
+        """Remove `state`, returning (user_id, is_mobile, expired) if it existed."""
+
+    @abstractmethod
+    def evict_expired(self) -> int:
+        """Delete expired tokens, returning how many were removed."""
+
+    @abstractmethod
+    def size(self) -> int:
+        """Number of stored tokens, expired ones included until evicted."""
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def store(self, state: str, user_id: int, is_mobile: bool = False) -> None:
+        self.put(state, user_id, is_mobile)
+        self._count("stored")
+
+    def pop(self, state: str) -> Optional[Tuple[int, bool]]:
+        entry = self.take(state)
+        if entry is None:
+            self._count("missing")
+            return None
+        user_id, is_mobile, expired = entry
+        if expired:
+            self._count("expired")
+            return None
+        self._count("consumed")
+        return (user_id, is_mobile)
+
+    def cleanup(self) -> int:
+        evicted = self.evict_expired()
+        if evicted:
+            self._count("evicted", evicted)
+            logger.debug(f"OAuth state: evicted {evicted} expired tokens")
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counter_lock:
+            return {
+                "backend": self.backend,
+                "size": self.size(),
+                "stored": self.stored,
+                "consumed": self.consumed,
+                "expired": self.expired,
+                "missing": self.missing,
+                "evicted": self.evicted,
+            }
+
+    def start(self, interval: float = settings.OAUTH_STATE_EVICTION_INTERVAL) -> None:
+        """Start background eviction on the running event loop."""
+        self._eviction.start(interval)
+
+    async def stop(self) -> None:
+        await self._eviction.stop()
+
+
+class MemoryStateStore(OAuthStateStore):
+    """Process-local store; eviction pops the expiry heap, O(log n) per token."""
+
+    backend = "memory"
+
+    def __init__(self, ttl: float = STATE_EXPIRY_SECONDS) -> None:
+        super().__init__(ttl)
+        self._states: Dict[str, Tuple[int, float, bool]] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = Lock()
+
+    def put(self, state: str, user_id: int, is_mobile: bool) -> None:
+        expiry = time.monotonic() + self.ttl
+        with self._lock:
+            self._states[state] = (user_id, expiry, is_mobile)
+            heapq.heappush(self._heap, (expiry, state))
+
+    def take(self, state: str) -> Optional[Tuple[int, bool, bool]]:
+        with self._lock:
+            entry = self._states.pop(state, None)
+        if entry is None:
+            return None
+        user_id, expiry, is_mobile = entry
+        return (user_id, is_mobile, time.monotonic() > expiry)
+
+    def evict_expired(self) -> int:
+        now = time.monotonic()
+        evicted = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expiry, state = heapq.heappop(self._heap)
+                entry = self._states.get(state)
+                # Consumed or re-stored tokens leave stale heap entries behind
+                if entry is not None and entry[1] == expiry:
+                    del self._states[state]
+                    evicted += 1
+            if len(self._heap) > 2 * len(self._states) + 64:
+                self._heap = [(e[1], s) for s, e in self._states.items()]
+                heapq.heapify(self._heap)
+        return evicted
+
+    def size(self) -> int:
+        return len(self._states)
+
+
+class PostgresStateStore(OAuthStateStore):
+    """Store shared by every worker through the `oauth_state` table."""
+
+    backend = "postgres"
+
+    def __init__(self, engine=None, ttl: float = STATE_EXPIRY_SECONDS) -> None:
+        super().__init__(ttl)
+        if engine is None:
+            from core.engine import engine
+        self.engine = engine
+
+    def put(self, state: str, user_id: int, is_mobile: bool) -> None:
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl)
+        with Session(self.engine) as session:
+            session.merge(
+                OAuthState(
+                    state=state,
+                    user_id=user_id,
+                    is_mobile=is_mobile,
+                    expires_at=expires_at,
+                )
+            )
+            session.commit()
+
+    def take(self, state: str) -> Optional[Tuple[int, bool, bool]]:
+        # DELETE ... RETURNING makes the token single-use across workers
+        with Session(self.engine) as session:
+            row = session.exec(
+                delete(OAuthState)
+                .where(OAuthState.state == state)
+                .returning(
+                    OAuthState.user_id,
+                    OAuthState.is_mobile,
+                    OAuthState.expires_at < func.now(),
+                )
+            ).first()
+            session.commit()
+        if row is None:
+            return None
+        user_id, is_mobile, expired = row
+        return (user_id, is_mobile, expired)
+
+    def evict_expired(self) -> int:
+        with Session(self.engine) as session:
+            result = session.exec(
+                delete(OAuthState).where(OAuthState.expires_at < func.now())
+            )
+            session.commit()
+            return result.rowcount
 
-_oauth_states: Dict[str, Tuple[int, float, bool]] = {}
-_state_lock = Lock()
+    def size(self) -> int:
+        with Session(self.engine) as session:
+            return session.exec(select(func.count()).select_from(OAuthState)).one()
 
-STATE_EXPIRY_SECONDS = 600
+
+def create_state_store(backend: str = settings.OAUTH_STATE_BACKEND) -> OAuthStateStore:
+    if backend == "memory":
+        return MemoryStateStore()
+    if backend == "postgres":
+        return PostgresStateStore()
+    raise ValueError(f"Unknown OAUTH_STATE_BACKEND: '{backend}'")
+
+
+state_store = create_state_store()
 
 
 def store_oauth_state(state: str, user_id: int, is_mobile: bool = False) -> None:
     """Store OAuth state token with associated user ID and platform info."""
-    expiry = time.time() + STATE_EXPIRY_SECONDS
-    with _state_lock:
-        _oauth_states[state] = (user_id, expiry, is_mobile)
-        logger.debug(
-            f"Stored state: {state} -> user_id={user_id}, is_mobile={is_mobile}, expires_in={STATE_EXPIRY_SECONDS}s, total_states={len(_oauth_states)}"
-        )
+    state_store.store(state, user_id, is_mobile)
+    logger.debug(
+        f"Stored state: {state} -> user_id={user_id}, is_mobile={is_mobile}, expires_in={state_store.ttl}s"
+    )
 
 
 def get_user_from_state(state: str) -> Optional[Tuple[int, bool]]:
@@ -33,35 +239,16 @@ def get_user_from_state(state: str) -> Optional[Tuple[int, bool]]:
     Returns:
         Tuple of (user_id, is_mobile) if state is valid and not expired, None otherwise
     """
-    with _state_lock:
+    state_data = state_store.pop(state)
+    if state_data is None:
+        logger.debug(f"State not found or expired: {state}")
+    else:
         logger.debug(
-            f"Looking up state: {state}, available_states={list(_oauth_states.keys())}"
+            f"State valid: {state} -> user_id={state_data[0]}, is_mobile={state_data[1]}"
         )
-        if state not in _oauth_states:
-            logger.debug(f"State not found: {state}")
-            return None
-
-        user_id, expiry, is_mobile = _oauth_states[state]
-
-        del _oauth_states[state]
-
-        if time.time() > expiry:
-            logger.debug(f"State expired: {state}")
-            return None
-
-        logger.debug(
-            f"State valid: {state} -> user_id={user_id}, is_mobile={is_mobile}"
-        )
-        return (user_id, is_mobile)
+    return state_data
 
 
-def cleanup_expired_states() -> None:
+def cleanup_expired_states() -> int:
     """Remove expired state tokens from storage."""
-    current_time = time.time()
-    with _state_lock:
-        expired = []
-        for state, (_, expiry, _) in _oauth_states.items():
-            if current_time > expiry:
-                expired.append(state)
-        for state in expired:
-            del _oauth_states[state]
+    return state_store.cleanup()
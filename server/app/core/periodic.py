@@ -0,0 +1,38 @@
+"""Background maintenance jobs running on the app's event loop."""
+
+import asyncio
+from typing import Callable, Optional
+
+from core.logger import logger
+
+
+class PeriodicTask:
+    """Call a blocking function every `interval` seconds in a worker thread."""
+
+    def __init__(self, name: str, func: Callable[[], object]) -> None:
+        self.name = name
+        self.func = func
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.func)
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
+
+    def start(self, interval: float) -> None:
+        """Start the job on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(interval))
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
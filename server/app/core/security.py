@@ -10,9 +10,11 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def sign_jwt(user_id: int) -> str:
     """Generate JWT token for user authentication."""
-    expire = datetime.now(timezone.utc) + timedelta(hours=settings.ACCESS_TOKEN_EXPIRE_HOURS)
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(hours=settings.ACCESS_TOKEN_EXPIRE_HOURS)
     payload = {
         "sub": str(user_id),
+        "iat": now,
         "exp": expire
     }
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
@@ -0,0 +1,95 @@
+"""Short-lived cache of authenticated users.
+
+Every authenticated request resolves the JWT subject to a `User`. Entries
+are keyed by (user id, token `iat`) and hold the user's column values for
+`USER_CACHE_TTL` seconds, so chatty clients cost one primary-key query per
+TTL instead of one per request. The cache is bounded to `USER_CACHE_SIZE`
+entries (least recently used first out) and is invalidated by the
+endpoints that change or delete a user. Other workers see such changes
+once their entry expires.
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import Session
+
+from core.config import settings
+from models import User
+
+
+class UserCache:
+    """Thread-safe TTL + LRU cache of user rows."""
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Tuple[int, Hashable], Tuple[float, Dict]] = (
+            OrderedDict()
+        )
+        self._lock = Lock()
+
+    def _lookup(self, key: Tuple[int, Hashable]) -> Optional[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def _remember(self, key: Tuple[int, Hashable], values: Dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, values)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_user(
+        self, session: Session, user_id: int, issued_at: Hashable = None
+    ) -> Optional[User]:
+        """Return the user attached to `session`, querying only on a miss."""
+        key = (user_id, issued_at)
+        values = self._lookup(key)
+        if values is None:
+            user = session.get(User, user_id)
+            if isinstance(user, User):
+                self._remember(key, user.model_dump())
+            return user
+
+        cached = User(**values)
+        make_transient_to_detached(cached)
+        # load=False attaches the row to the session without a SELECT
+        return session.merge(cached, load=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop every entry of `user_id`, whatever token it was cached for."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+user_cache = UserCache(settings.USER_CACHE_TTL, settings.USER_CACHE_SIZE)
@@ -1,61 +1,57 @@
-from crontab import CronTab
-from core.config import settings
+from fastapi import HTTPException
 from sqlmodel import select
-from pathlib import Path
 from core.engine import engine
 from sqlmodel import Session
 from core.logger import logger
 
+from cron.scheduler import TriggerScheduler
 from models.services.action import Action
 
 
-def print_jobs():
-    cron = CronTab(user=settings.CRON_USER)
-    for job in cron:
-        logger.debug(job)
-
+def run_action(action_id: int, fire_at: float):
+    """Process one action tick, as the crontab script used to via HTTP.
 
-def newJob(action_id: int):
-    cron = CronTab(user=settings.CRON_USER)
+    The scheduled fire time identifies the tick, so reactions it triggers
+    are only queued once.
+    """
+    from api.actions_process.router import process_action
 
-    job = cron.new(
-        command=f"python {Path(__file__).resolve().parent}/cron_scripts/time.py {action_id}"
-    )
     with Session(engine) as session:
-        actions_config: Action = session.exec(
-            select(Action).where(
-                Action.id == action_id,
-            )
-        ).first()
-        if not actions_config:
-            logger.error(f"Cron Error: action_id not found {action_id}")
-            return
-    job.setall(actions_config.interval)
+        try:
+            process_action(action_id, session, tick=int(fire_at))
+        except HTTPException as e:
+            logger.error(f"Cron Error: action {action_id}: {e.detail}")
 
-    cron.write()
-    logger.debug(f"Cron: new cron for action {action_id}")
 
-    print_jobs()
+scheduler = TriggerScheduler(run_action)
 
 
-def deleteJob(action_id: int):
-    cron = CronTab(user=settings.CRON_USER)
+def print_jobs():
+    for action_id, interval in scheduler.jobs().items():
+        logger.debug(f"{interval} action {action_id}")
+
+
+def newJob(action_id: int, interval: str | None = None):
+    if interval is None:
+        with Session(engine) as session:
+            interval = session.exec(
+                select(Action.interval).where(
+                    Action.id == action_id,
+                )
+            ).first()
+        if not interval:
+            logger.error(f"Cron Error: action_id not found {action_id}")
+            return
+    scheduler.add(action_id, interval)
+    logger.debug(f"Cron: new cron for action {action_id}")
 
-    jobs_to_remove = [job for job in cron if str(action_id) in job.command]
 
-    if not jobs_to_remove:
+def deleteJob(action_id: int):
+    if not scheduler.remove(action_id):
         logger.error(f"Cron Error: action_id not found {action_id}")
         return
-    for job in jobs_to_remove:
-        logger.debug(f"Cron: deleted action, {action_id}")
-        cron.remove(job)
-    cron.write()
+    logger.debug(f"Cron: deleted action, {action_id}")
 
 
 def isCronExists(action_id: int):
-    cron = CronTab(user=settings.CRON_USER)
-
-    existing_jobs: list = [job for job in cron if " " + str(action_id) in job.command]
-    if len(existing_jobs) == 0:
-        return False
-    return True
+    return scheduler.has(action_id)
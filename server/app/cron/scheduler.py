@@ -0,0 +1,250 @@
+"""In-process trigger scheduler.
+
+Replaces the system crontab: every registered action is kept in a min-heap
+ordered by its next fire time, and a single asyncio task sleeps until the
+earliest one is due, then runs the action processing in a worker thread.
+
+Each action fires at a fixed offset within `SCHEDULER_SPREAD` seconds after
+its cron minute, so the polls of a minute are spread over it instead of
+all hitting the upstream APIs at second 0.
+
+Jobs live in the memory of the process that registered them: the server
+must run a single worker process, or every trigger fires once per worker.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from core.config import settings
+from core.logger import logger
+
+_GOLDEN_RATIO = 0.6180339887498949
+
+
+class CronExpression:
+    """Minimal 5-field cron expression (minute hour day month weekday)."""
+
+    _BOUNDS: List[Tuple[int, int]] = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Invalid cron expression: '{expression}'")
+        self.expression: str = expression
+        parsed = [
+            self._parse_field(field, low, high)
+            for field, (low, high) in zip(fields, self._BOUNDS)
+        ]
+        self.minutes, self.hours, self.days, self.months, self.weekdays = parsed
+        if 7 in self.weekdays:
+            self.weekdays = (self.weekdays - {7}) | {0}
+        self._any_day: bool = fields[2] == "*"
+        self._any_weekday: bool = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> set[int]:
+        values: set[int] = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_str = part.split("/", 1)
+                step = int(step_str)
+                if step <= 0:
+                    raise ValueError(f"Invalid cron step: '{field}'")
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start_str, end_str = part.split("-", 1)
+                start, end = int(start_str), int(end_str)
+            else:
+                start = int(part)
+                end = high if step != 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field out of range: '{field}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Return the first matching minute strictly after `moment`."""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + (candidate.month == 12)
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(
+                    year=year, month=month, day=1, hour=0, minute=0
+                )
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+
+def spread_offset(action_id: int) -> float:
+    """Seconds after its cron minute the action fires, stable across restarts."""
+    return (action_id * _GOLDEN_RATIO) % 1 * settings.SCHEDULER_SPREAD
+
+
+def next_fire(expression: CronExpression, action_id: int, moment: datetime) -> datetime:
+    """First fire time of the action strictly after `moment`, offset included."""
+    offset = timedelta(seconds=spread_offset(action_id))
+    return expression.next_after(moment - offset) + offset
+
+
+class TriggerScheduler:
+    """Min-heap of next fire times, one entry per registered action.
+
+    Registration and removal are O(1) dictionary operations; stale heap
+    entries are discarded lazily when they reach the top of the heap.
+    """
+
+    def __init__(self, runner: Callable[[int, float], None]) -> None:
+        """`runner(action_id, fire_at)` processes one tick of an action."""
+        self._runner = runner
+        self._jobs: Dict[int, Tuple[CronExpression, int]] = {}
+        self._heap: List[Tuple[float, int, int]] = []
+        self._generation = itertools.count()
+        self._running: set[int] = set()
+        self._fires: set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def add(self, action_id: int, interval: str) -> None:
+        """Register (or reschedule) an action with its cron interval."""
+        expression = CronExpression(interval)
+        generation = next(self._generation)
+        self._jobs[action_id] = (expression, generation)
+        fire_at = next_fire(expression, action_id, datetime.now()).timestamp()
+        self._call_threadsafe(self._push, fire_at, generation, action_id)
+
+    def remove(self, action_id: int) -> bool:
+        """Unregister an action; returns False if it was not scheduled."""
+        return self._jobs.pop(action_id, None) is not None
+
+    def has(self, action_id: int) -> bool:
+        return action_id in self._jobs
+
+    def clear(self) -> None:
+        self._jobs.clear()
+
+    def jobs(self) -> Dict[int, str]:
+        return {
+            action_id: expression.expression
+            for action_id, (expression, _) in self._jobs.items()
+        }
+
+    def _call_threadsafe(self, callback: Callable, *args) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            callback(*args)
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is loop:
+            callback(*args)
+        else:
+            loop.call_soon_threadsafe(callback, *args)
+
+    def _push(self, fire_at: float, generation: int, action_id: int) -> None:
+        heapq.heappush(self._heap, (fire_at, generation, action_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _is_current(self, generation: int, action_id: int) -> bool:
+        job = self._jobs.get(action_id)
+        return job is not None and job[1] == generation
+
+    async def _fire(self, action_id: int, fire_at: float) -> None:
+        if action_id in self._running:
+            logger.warning(f"Scheduler: action {action_id} still running, skipped")
+            return
+        self._running.add(action_id)
+        try:
+            await asyncio.to_thread(self._runner, action_id, fire_at)
+        except Exception as e:
+            logger.error(f"Scheduler: action {action_id} failed: {e}")
+        finally:
+            self._running.discard(action_id)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Scheduler: tick failed")
+                await asyncio.sleep(1)
+
+    async def _tick(self) -> None:
+        """Wait for the earliest job, or fire it if it is due."""
+        while self._heap and not self._is_current(*self._heap[0][1:]):
+            heapq.heappop(self._heap)
+
+        timeout = None
+        if self._heap:
+            timeout = max(0.0, self._heap[0][0] - time.time())
+        self._wakeup.clear()
+        if timeout is None or timeout > 0:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        scheduled, generation, action_id = heapq.heappop(self._heap)
+        # remove() may run from a request thread since the check above
+        job = self._jobs.get(action_id)
+        if job is None or job[1] != generation:
+            return
+        fire_at = next_fire(job[0], action_id, datetime.now()).timestamp()
+        heapq.heappush(self._heap, (fire_at, generation, action_id))
+        task = asyncio.create_task(self._fire(action_id, scheduled))
+        # The loop only keeps weak references to tasks
+        self._fires.add(task)
+        task.add_done_callback(self._fires.discard)
+
+    def start(self) -> None:
+        """Start the scheduling loop on the running event loop."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+        logger.info(f"Scheduler started with {len(self._jobs)} actions")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+        self._wakeup = None
+        logger.info("Scheduler stopped")
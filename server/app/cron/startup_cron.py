@@ -1,8 +1,6 @@
-from crontab import CronTab
-from core.config import settings
 from models.services.action import Action
 from models.areas.area import Area
-from cron.cron import newJob
+from cron.cron import newJob, scheduler
 from models.areas import AreaAction
 from core.logger import logger
 from sqlmodel import select
@@ -12,21 +10,20 @@ from core.engine import engine
 
 
 def startupCron():
-    cron = CronTab(user=settings.CRON_USER)
-    if cron.lines != 0:
-        cron.remove_all()
+    scheduler.clear()
 
     with Session(engine) as session:
-        actions: List[AreaAction] = session.exec(
-            select(AreaAction)
-            .join(Action, Action.id == AreaAction.action_id)
+        actions: List[tuple[int, str]] = session.exec(
+            select(Action.id, Action.interval)
+            .join(AreaAction, Action.id == AreaAction.action_id)
             .join(Area, Area.id == AreaAction.area_id)
             .where(
                 Area.enable == True,
                 Area.is_public == False,
             )
+            .distinct()
         ).all()
-        for i in actions:
-            newJob(i.action_id)
+        for action_id, interval in actions:
+            newJob(action_id, interval)
 
     logger.debug(f"Cron startup: {actions}")
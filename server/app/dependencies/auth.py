@@ -4,6 +4,7 @@ from typing import Optional
 from dependencies.db import SessionDep
 
 from core.security import decode_jwt
+from core.user_cache import user_cache
 from models import User
 
 cookie_scheme = APIKeyCookie(name="access_token", auto_error=False)
@@ -27,7 +28,7 @@ def get_current_user(
         raise HTTPException(status_code=403, detail="Invalid token.")
     user_id = int(user_id)
 
-    user = session.get(User, user_id)
+    user = user_cache.get_user(session, user_id, payload.get("iat"))
     if not user:
         raise HTTPException(status_code=403, detail="User not found.")
     return user
@@ -50,5 +51,4 @@ def get_current_user_no_fail(
         user_id = int(user_id)
     except (ValueError, TypeError):
         return None
-    user = session.get(User, user_id)
-    return user
+    return user_cache.get_user(session, user_id, payload.get("iat"))
@@ -6,6 +6,14 @@ from fastapi.templating import Jinja2Templates
 from contextlib import asynccontextmanager
 
 from core.db import init_db
+from core.oauth_state import state_store
+from services.token_manager import token_manager
+from services.connection_state import connection_revalidator
+from api.actions_process.reaction_queue import reaction_queue
+from cron.cron import scheduler
+from cron.startup_cron import startupCron
+from services.http_client import http, async_http
+from core.event_loop import run_coroutine, stop_loop
 from core.logger import logger
 from api.api import api_router
 from fastapi.middleware.cors import CORSMiddleware
@@ -16,7 +24,21 @@ async def lifespan(app: FastAPI):
     """Application lifespan: initialize DB, services and cron jobs."""
     logger.info("Server starting...")
     init_db(get_json_services(), get_json_services_login())
+    startupCron()
+    scheduler.start()
+    state_store.start()
+    token_manager.start()
+    connection_revalidator.start()
+    reaction_queue.start()
     yield
+    await reaction_queue.stop()
+    await connection_revalidator.stop()
+    await token_manager.stop()
+    await state_store.stop()
+    await scheduler.stop()
+    run_coroutine(async_http.aclose(), timeout=5)
+    stop_loop()
+    http.close()
     logger.info("Server shutting down...")
 
 
@@ -49,6 +71,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.mount("/images", StaticFiles(directory="./images"), name="images")
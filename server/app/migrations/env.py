@@ -0,0 +1,50 @@
+"""Alembic environment: the SQLModel metadata against the app's database.
+
+`core.migrations.upgrade_schema` passes its own connection through
+`config.attributes["connection"]`; the `alembic` CLI connects with the
+app's engine.
+"""
+
+from alembic import context
+from sqlmodel import SQLModel
+
+import models  # noqa: F401 - registers every table on the metadata
+
+config = context.config
+target_metadata = SQLModel.metadata
+
+
+def run_migrations_offline() -> None:
+    from core.engine import engine
+
+    context.configure(
+        url=engine.url.render_as_string(hide_password=False),
+        target_metadata=target_metadata,
+        literal_binds=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection) -> None:
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+
+    from core.engine import engine
+
+    with engine.connect() as connection:
+        run_migrations(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
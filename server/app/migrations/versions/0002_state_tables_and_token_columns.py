@@ -0,0 +1,71 @@
+"""Catalog and OAuth state tables, token expiry and connection columns
+
+Databases created with create_all after these models were added already
+have some of these objects, hence the if_not_exists guards.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:05:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "catalog_state",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "oauth_state",
+        sa.Column("state", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("is_mobile", sa.Boolean(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("state"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_oauth_state_expires_at", "oauth_state", ["expires_at"], if_not_exists=True
+    )
+
+    for column in ("token_expires_at", "last_success_at", "last_unauthorized_at"):
+        op.add_column(
+            "user_service",
+            sa.Column(column, sa.DateTime(timezone=True), nullable=True),
+            if_not_exists=True,
+        )
+    op.create_index(
+        "ix_user_service_token_expires_at",
+        "user_service",
+        ["token_expires_at"],
+        if_not_exists=True,
+    )
+
+    op.create_index(
+        "ix_area_public_recent",
+        "area",
+        ["created_at", "id"],
+        postgresql_where=sa.text("is_public"),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_area_public_recent", table_name="area")
+    op.drop_index("ix_user_service_token_expires_at", table_name="user_service")
+    for column in ("last_unauthorized_at", "last_success_at", "token_expires_at"):
+        op.drop_column("user_service", column)
+    op.drop_index("ix_oauth_state_expires_at", table_name="oauth_state")
+    op.drop_table("oauth_state")
+    op.drop_table("catalog_state")
@@ -0,0 +1,82 @@
+"""Indexes for the hot lookup paths
+
+- area_action.action_id: process_action and the trigger scheduler;
+- area_action.area_id, area_reaction.area_id, reaction_condition
+  .area_reaction_id: loading an area's actions, reactions and conditions;
+- area (user_id, is_public, id): a user's private and public areas;
+- area (id) WHERE enable AND NOT is_public: the areas actions are run for;
+- a single user_service row per (user_id, service_id), which also serves
+  the token and connection lookups. Duplicate links are dropped first,
+  keeping the most recent one.
+
+Like 0002, it tolerates objects already created by create_all.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:10:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_area_action_action_id", "area_action", ["action_id"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_area_action_area_id", "area_action", ["area_id"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_area_reaction_area_id", "area_reaction", ["area_id"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_reaction_condition_area_reaction_id",
+        "reaction_condition",
+        ["area_reaction_id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_area_user_public",
+        "area",
+        ["user_id", "is_public", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_area_enabled_private",
+        "area",
+        ["id"],
+        postgresql_where=sa.text("enable AND NOT is_public"),
+        if_not_exists=True,
+    )
+
+    existing = sa.inspect(op.get_bind()).get_unique_constraints("user_service")
+    if any(c["name"] == "uq_user_service_user_service" for c in existing):
+        return
+
+    op.execute(
+        "DELETE FROM user_service older USING user_service newer "
+        "WHERE older.user_id = newer.user_id "
+        "AND older.service_id = newer.service_id "
+        "AND older.id < newer.id"
+    )
+    op.create_unique_constraint(
+        "uq_user_service_user_service", "user_service", ["user_id", "service_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_user_service_user_service", "user_service", type_="unique")
+    op.drop_index("ix_area_enabled_private", table_name="area")
+    op.drop_index("ix_area_user_public", table_name="area")
+    op.drop_index(
+        "ix_reaction_condition_area_reaction_id", table_name="reaction_condition"
+    )
+    op.drop_index("ix_area_reaction_area_id", table_name="area_reaction")
+    op.drop_index("ix_area_action_area_id", table_name="area_action")
+    op.drop_index("ix_area_action_action_id", table_name="area_action")
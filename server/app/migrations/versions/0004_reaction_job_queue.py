@@ -0,0 +1,73 @@
+"""Durable reaction job queue
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "reaction_job",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("idempotency_key", sa.String(), nullable=False),
+        sa.Column("run_id", sa.String(), nullable=False),
+        sa.Column("area_id", sa.Integer(), nullable=False),
+        sa.Column("area_reaction_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("service_name", sa.String(), nullable=False),
+        sa.Column("reaction_name", sa.String(), nullable=False),
+        sa.Column("stage", sa.Integer(), nullable=False),
+        sa.Column("delay", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["area_id"], ["area.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(
+            ["area_reaction_id"], ["area_reaction.id"], ondelete="CASCADE"
+        ),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_reaction_job_idempotency_key",
+        "reaction_job",
+        ["idempotency_key"],
+        unique=True,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_reaction_job_due",
+        "reaction_job",
+        ["run_after"],
+        postgresql_where=sa.text("status IN ('pending', 'running')"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_reaction_job_run_stage",
+        "reaction_job",
+        ["run_id", "stage"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_reaction_job_finished", "reaction_job", ["finished_at"], if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_reaction_job_finished", table_name="reaction_job")
+    op.drop_index("ix_reaction_job_run_stage", table_name="reaction_job")
+    op.drop_index("ix_reaction_job_due", table_name="reaction_job")
+    op.drop_index("ix_reaction_job_idempotency_key", table_name="reaction_job")
+    op.drop_table("reaction_job")
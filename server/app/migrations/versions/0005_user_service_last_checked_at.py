@@ -0,0 +1,26 @@
+"""Last connection probe attempt of linked services
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "user_service",
+        sa.Column("last_checked_at", sa.DateTime(timezone=True), nullable=True),
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("user_service", "last_checked_at")
@@ -1,18 +1,21 @@
-from .services import Service, Action, Reaction
+from .services import Service, Action, Reaction, CatalogState
 from .users import User, UserService, UserOAuthLogin
-from .areas import Area, AreaAction, AreaReaction, ReactionCondition
-from .oauth import OAuthLogin
+from .areas import Area, AreaAction, AreaReaction, ReactionCondition, ReactionJob
+from .oauth import OAuthLogin, OAuthState
 
 __all__ = [
     "Service",
     "Action", 
     "Reaction",
+    "CatalogState",
     "User",
     "UserService",
     "Area",
     "AreaAction",
     "AreaReaction",
     "ReactionCondition",
+    "ReactionJob",
     "OAuthLogin",
+    "OAuthState",
     "UserOAuthLogin"
 ]
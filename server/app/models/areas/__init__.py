@@ -2,10 +2,12 @@ from .area import Area
 from .area_action import AreaAction
 from .area_reaction import AreaReaction
 from .reaction_condition import ReactionCondition
+from .reaction_job import ReactionJob
 
 __all__ = [
     "Area",
     "AreaAction",
     "AreaReaction",
     "ReactionCondition",
+    "ReactionJob",
 ]
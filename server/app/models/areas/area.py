@@ -1,5 +1,5 @@
 from typing import Optional, TYPE_CHECKING, List
-from sqlmodel import SQLModel, Field, Relationship, Column, TIMESTAMP, text
+from sqlmodel import SQLModel, Field, Relationship, Column, TIMESTAMP, Index, text
 from datetime import datetime
 
 if TYPE_CHECKING:
@@ -20,6 +20,21 @@ class Area(SQLModel, table=True):
         server_default=text("CURRENT_TIMESTAMP"),
     ))
     is_public: bool = Field(default=False)
+    __table_args__ = (
+        Index("ix_area_user_public", "user_id", "is_public", "id"),
+        # Areas the trigger scheduler and process_action poll
+        Index(
+            "ix_area_enabled_private",
+            "id",
+            postgresql_where=text("enable AND NOT is_public"),
+        ),
+        Index(
+            "ix_area_public_recent",
+            "created_at",
+            "id",
+            postgresql_where=text("is_public"),
+        ),
+    )
 
     user: Optional["User"] = Relationship(back_populates="areas")
     actions: "AreaAction" = Relationship(back_populates="area", sa_relationship_kwargs={"cascade": "all, delete-orphan"})
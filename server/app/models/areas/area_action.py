@@ -8,8 +8,8 @@ if TYPE_CHECKING:
 class AreaAction(SQLModel, table=True):
     __tablename__ = "area_action"
     id: int = Field(default=None, primary_key=True)
-    area_id: int = Field(foreign_key="area.id", ondelete="CASCADE")
-    action_id: int = Field(foreign_key="action.id", ondelete="CASCADE")
+    area_id: int = Field(foreign_key="area.id", ondelete="CASCADE", index=True)
+    action_id: int = Field(foreign_key="action.id", ondelete="CASCADE", index=True)
     config: dict = Field(default_factory=dict, sa_column=Column(JSON))
     last_state: Optional[dict] = Field(default=None, sa_column=Column(JSON))
 
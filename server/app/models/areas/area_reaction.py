@@ -9,7 +9,7 @@ if TYPE_CHECKING:
 class AreaReaction(SQLModel, table=True):
     __tablename__ = "area_reaction"
     id: int = Field(default=None, primary_key=True)
-    area_id: int = Field(foreign_key="area.id", ondelete="CASCADE")
+    area_id: int = Field(foreign_key="area.id", ondelete="CASCADE", index=True)
     reaction_id: int = Field(foreign_key="reaction.id", ondelete="CASCADE")
     order_index: int = Field(default=0)
     delay: int = Field(default=0)
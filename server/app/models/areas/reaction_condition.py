@@ -7,7 +7,7 @@ if TYPE_CHECKING:
 class ReactionCondition(SQLModel, table=True):
     __tablename__ = "reaction_condition"
     id: int = Field(default=None, primary_key=True)
-    area_reaction_id: int = Field(foreign_key="area_reaction.id")
+    area_reaction_id: int = Field(foreign_key="area_reaction.id", index=True)
     field: str
     operator: str
     value: str
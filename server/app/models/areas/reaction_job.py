@@ -0,0 +1,41 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, Index, text
+from sqlmodel import SQLModel, Field
+
+
+class ReactionJob(SQLModel, table=True):
+    __tablename__ = "reaction_job"
+    id: int = Field(default=None, primary_key=True)
+    idempotency_key: str = Field(unique=True, index=True)
+    run_id: str
+    area_id: int = Field(foreign_key="area.id", ondelete="CASCADE")
+    area_reaction_id: int = Field(foreign_key="area_reaction.id", ondelete="CASCADE")
+    user_id: int
+    service_name: str
+    reaction_name: str
+    stage: int = Field(default=0)
+    delay: int = Field(default=0)
+    status: str = Field(default="pending")
+    attempts: int = Field(default=0)
+    run_after: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
+    locked_until: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+    finished_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+    last_error: Optional[str] = None
+    __table_args__ = (
+        # Jobs a worker may claim
+        Index(
+            "ix_reaction_job_due",
+            "run_after",
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+        Index("ix_reaction_job_run_stage", "run_id", "stage"),
+        Index("ix_reaction_job_finished", "finished_at"),
+    )
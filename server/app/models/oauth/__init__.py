@@ -1,5 +1,7 @@
 from .oauth_login import OAuthLogin
+from .oauth_state import OAuthState
 
 __all__ = [
-    "OAuthLogin"
+    "OAuthLogin",
+    "OAuthState",
 ]
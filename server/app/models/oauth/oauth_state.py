@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime
+from sqlmodel import SQLModel, Field
+
+
+class OAuthState(SQLModel, table=True):
+    __tablename__ = "oauth_state"
+    state: str = Field(primary_key=True)
+    user_id: int
+    is_mobile: bool = Field(default=False)
+    expires_at: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False, index=True)
+    )
@@ -1,9 +1,11 @@
 from .service import Service
 from .action import Action
 from .reaction import Reaction
+from .catalog_state import CatalogState
 
 __all__ = [
     "Service",
     "Action", 
     "Reaction",
+    "CatalogState",
 ]
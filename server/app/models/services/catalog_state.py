@@ -0,0 +1,7 @@
+from sqlmodel import SQLModel, Field
+
+
+class CatalogState(SQLModel, table=True):
+    __tablename__ = "catalog_state"
+    name: str = Field(primary_key=True)
+    fingerprint: str
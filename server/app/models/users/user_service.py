@@ -1,6 +1,7 @@
+from datetime import datetime
 from typing import TYPE_CHECKING, Optional, Dict, Any
-from sqlmodel import SQLModel, Field, Relationship, Column
-from sqlalchemy import JSON
+from sqlmodel import SQLModel, Field, Relationship, Column, UniqueConstraint
+from sqlalchemy import JSON, DateTime
 
 if TYPE_CHECKING:
     from .user import User
@@ -13,7 +14,22 @@ class UserService(SQLModel, table=True):
     service_id: int = Field(foreign_key="service.id", ondelete="CASCADE")
     access_token: str
     refresh_token: Optional[str] = None
+    token_expires_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), index=True)
+    )
+    last_success_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+    last_unauthorized_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+    last_checked_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
     service_metadata: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    __table_args__ = (
+        UniqueConstraint("user_id", "service_id", name="uq_user_service_user_service"),
+    )
 
     user: "User" = Relationship(back_populates="services")
     service: "Service" = Relationship(back_populates="users")
@@ -1,5 +1,5 @@
-from .services import ServiceGet, ServiceIdGet, ActionIdGet, ActionBasicInfo, ActionShortInfo, ActionInfo, ReactionInfo, ReactionIdGet, ReactionBasicInfo, ReactionShortInfo, CreateAreaAction, CreateAreaReaction
-from .areas import AreaGet, AreaIdGet, AreaGetPublic, AreaIdGetPublic, CreateArea, UpdateArea
+from .services import ServiceGet, ServiceIdGet, ServiceConnectionGet, ActionIdGet, ActionBasicInfo, ActionShortInfo, ActionInfo, ReactionInfo, ReactionIdGet, ReactionBasicInfo, ReactionShortInfo, CreateAreaAction, CreateAreaReaction
+from .areas import AreaGet, AreaIdGet, AreaGetPublic, AreaIdGetPublic, CreateArea, UpdateArea, ImportAreas
 from .users import UserCreate, TokenResponse, UserIdGet, Role, UserOauthLoginGet, UserShortInfo, UserUpdate, UserServiceGet, UserUpdatePassword
 from .oauth import OauthLoginGet
 from .responses import MessageResponse, UserRegistrationResponse, UserDeletionResponse, AreaDeletionResponse, ErrorResponse
@@ -7,6 +7,7 @@ from .responses import MessageResponse, UserRegistrationResponse, UserDeletionRe
 __all__ = [
     "ServiceGet",
     "ServiceIdGet",
+    "ServiceConnectionGet",
     "ActionIdGet",
     "ActionBasicInfo",
     "ActionInfo",
@@ -33,6 +34,7 @@ __all__ = [
     "UserServiceGet",
     "OauthLoginGet",
     "UpdateArea",
+    "ImportAreas",
     "MessageResponse",
     "UserRegistrationResponse",
     "UserDeletionResponse",
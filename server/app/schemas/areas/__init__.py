@@ -1,4 +1,4 @@
-from .area import AreaGet, AreaIdGet, AreaGetPublic, AreaIdGetPublic, CreateArea, UpdateArea
+from .area import AreaGet, AreaIdGet, AreaGetPublic, AreaIdGetPublic, CreateArea, UpdateArea, ImportAreas
 
 __all__ = [
     "AreaGet",
@@ -7,4 +7,5 @@ __all__ = [
     "AreaIdGetPublic",
     "CreateArea",
     "UpdateArea",
+    "ImportAreas",
 ]
@@ -48,3 +48,7 @@ class UpdateArea(BaseModel):
     description: Optional[str] = Field(None, min_length=1, max_length=500, description="Updated area description")
     action: Optional[CreateAreaAction] = Field(None, description="Updated trigger action")
     reactions: Optional[list[CreateAreaReaction]] = Field(None, min_items=1, description="Updated reactions list")
+
+class ImportAreas(BaseModel):
+    """Schema for creating many areas in one request."""
+    areas: list[CreateArea] = Field(min_length=1, max_length=500, description="Areas to create, all or none")
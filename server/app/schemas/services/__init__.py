@@ -1,10 +1,11 @@
-from .service import ServiceGet, ServiceIdGet
+from .service import ServiceGet, ServiceIdGet, ServiceConnectionGet
 from .action import ActionIdGet, ActionShortInfo, ActionBasicInfo, CreateAreaAction, ActionInfo
 from .reaction import ReactionIdGet, ReactionShortInfo, ReactionBasicInfo, CreateAreaReaction, ReactionInfo
 
 __all__ = [
     "ServiceGet",
     "ServiceIdGet",
+    "ServiceConnectionGet",
     "ActionIdGet",
     "ActionBasicInfo",
     "ActionShortInfo",
@@ -18,3 +18,10 @@ class ServiceIdGet(BaseModel):
     category: str = Field(description="Service category", example="Development")
     color: str = Field(description="Service theme color", example="#f97316")
     oauth_required: bool = Field(description="Requires OAuth authentication", example=True)
+
+class ServiceConnectionGet(BaseModel):
+    """Connection status of a service for the current user."""
+    id: int = Field(description="Service ID", example=1)
+    name: str = Field(description="Service name", example="GitHub")
+    oauth_required: bool = Field(description="Requires OAuth authentication", example=True)
+    is_connected: bool = Field(description="User has a working link to the service", example=True)
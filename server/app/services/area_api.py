@@ -1,6 +1,6 @@
 from urllib.parse import urlencode
 from typing import Callable
-import requests
+from services.http_client import http, async_http, HttpError
 
 
 
@@ -10,22 +10,33 @@ class AreaApi:
     
     def get(self, url, params={}, headers=None, good_status_code=[200]):
         try:
-            r = requests.get(url=url, params=params, headers=headers)
+            r = http.get(url=url, params=params, headers=headers)
 
             if r.status_code not in good_status_code:
                 raise self.exception_class(f"Can't access resource (link = {url + "?" + urlencode(params)}, header = {headers})")
             
             return r.json()
-        except requests.exceptions.ConnectionError:
+        except HttpError:
+            raise self.exception_class(f"Can't connect to the website \"{url}\"")
+
+    async def get_async(self, url, params={}, headers=None, good_status_code=[200]):
+        try:
+            r = await async_http.get(url=url, params=params, headers=headers)
+
+            if r.status_code not in good_status_code:
+                raise self.exception_class(f"Can't access resource (link = {url + "?" + urlencode(params)}, header = {headers})")
+
+            return r.json()
+        except HttpError:
             raise self.exception_class(f"Can't connect to the website \"{url}\"")
 
     def post(self, url, data=None, auth=None, headers=None, good_status_code=[200]):
         try:
-            r = requests.post(url, json=data, auth=auth, headers=headers)
+            r = http.post(url, json=data, auth=auth, headers=headers)
             
             if r.status_code not in good_status_code:
                 raise self.exception_class(f"Can't access resource (link = {url}, header = {headers}), data = {data}, auth = {auth}, res = {r.content}, error code = {r.status_code}")
             
             return r.json()
-        except requests.exceptions.ConnectionError:
+        except HttpError:
             raise self.exception_class(f"Can't connect to the website \"{url}\"")
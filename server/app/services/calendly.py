@@ -1,4 +1,4 @@
-import requests
+from services.http_client import http
 from urllib.parse import urlencode
 from sqlmodel import Session, select
 from fastapi import HTTPException, Response, Request
@@ -8,11 +8,14 @@ from pydantic import BaseModel
 from core.config import settings
 from core.logger import logger
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint
 from services.services_classes import (
     Service as ServiceClass,
     Action,
     Reaction,
     get_component,
+    save_last_state,
+    SeenIds,
 )
 from models import AreaAction, UserService, Service, User, AreaReaction
 from api.users.db import get_user_service_token
@@ -39,6 +42,12 @@ class CalendlyApiError(Exception):
 class Calendly(ServiceClass):
     """Calendly automation service."""
 
+    token_endpoint = TokenEndpoint(
+        "https://auth.calendly.com/oauth/token",
+        settings.CALENDLY_CLIENT_ID,
+        settings.CALENDLY_CLIENT_SECRET,
+    )
+
     def __init__(self) -> None:
         super().__init__(
             "Calendly", "productivity", "#006BFF", "images/Calendly_logo.webp", True
@@ -64,19 +73,17 @@ class Calendly(ServiceClass):
                     "Content-Type": "application/json",
                 }
                 params = {"user": user_uri}
-                r = requests.get(url, headers=headers, params=params)
+                r = http.get(url, headers=headers, params=params)
                 if r.status_code != 200:
                     raise CalendlyApiError(f"Failed to fetch events: {r.text}")
 
                 events = [
                     event["event_type"] for event in r.json().get("collection", [])
                 ]
-                last_events = (area_action.last_state or {}).get("events", [])
-
-                new_events = [e for e in events if e not in last_events]
-                area_action.last_state = {"events": events}
-                session.add(area_action)
-                session.commit()
+                seen = SeenIds.load(area_action.last_state, "events")
+                new_events = seen.update(events)
+                area_action.last_state = {"events": seen.to_state()}
+                save_last_state(session, area_action)
 
                 return len(new_events) > 0
             except CalendlyApiError as e:
@@ -106,7 +113,7 @@ class Calendly(ServiceClass):
                     "status": "canceled",
                     "user": user_uri,
                 }
-                r = requests.get(url, headers=headers, params=params)
+                r = http.get(url, headers=headers, params=params)
                 if r.status_code != 200:
                     raise CalendlyApiError(
                         f"Failed to fetch cancelled events: {r.text}"
@@ -115,16 +122,10 @@ class Calendly(ServiceClass):
                 cancelled_events = [
                     event["uri"] for event in r.json().get("collection", [])
                 ]
-                last_cancelled = (area_action.last_state or {}).get(
-                    "cancelled_events", []
-                )
-
-                new_cancelled = [
-                    event for event in cancelled_events if event not in last_cancelled
-                ]
-                area_action.last_state = {"cancelled_events": cancelled_events}
-                session.add(area_action)
-                session.commit()
+                seen = SeenIds.load(area_action.last_state, "cancelled_events")
+                new_cancelled = seen.update(cancelled_events)
+                area_action.last_state = {"cancelled_events": seen.to_state()}
+                save_last_state(session, area_action)
 
                 return len(new_cancelled) > 0
             except CalendlyApiError as e:
@@ -173,7 +174,7 @@ class Calendly(ServiceClass):
                     "active": True,
                     "owner": user_uri,
                 }
-                r = requests.post(url, headers=headers, json=data)
+                r = http.post(url, headers=headers, json=data)
                 if r.status_code != 201:
                     raise CalendlyApiError(f"Failed to create event: {r.text}")
                 logger.info(f"{self.service.name} - {self.name} - Created event '{event_name}' - User: {user_id}")
@@ -225,7 +226,7 @@ class Calendly(ServiceClass):
             "client_secret": settings.CALENDLY_CLIENT_SECRET,
             "redirect_uri": redirect,
         }
-        r = requests.post(url, data=data)
+        r = http.post(url, data=data)
         if r.status_code != 200:
             logger.error(f"Calendly token error: {r.text}")
             raise CalendlyApiError(f"Failed to get Calendly token: {r.text}")
@@ -237,7 +238,7 @@ class Calendly(ServiceClass):
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
-        r = requests.get(url, headers=headers)
+        r = http.get(url, headers=headers)
         if r.status_code != 200:
             raise CalendlyApiError(f"Failed to get Calendly user info: {r.text}")
         return r.json().get("resource", {})
@@ -256,6 +257,13 @@ class Calendly(ServiceClass):
             raise HTTPException(status_code=400, detail=e.message)
 
         if user:
-            return oauth_add_link(session, self.name, user, token_res.access_token)
+            return oauth_add_link(
+                session,
+                self.name,
+                user,
+                token_res.access_token,
+                refresh_token=token_res.refresh_token,
+                expires_in=token_res.expires_in,
+            )
         else:
             raise HTTPException(status_code=400, detail="User not found")
@@ -9,14 +9,16 @@ from services.services_classes import (
     Service as ServiceClass,
     Action,
     get_component,
+    save_last_state,
 )
 from models.areas import AreaAction
 from core.config import settings
 from core.categories import ServiceCategory
 from sqlmodel import Session
 from pydantic import BaseModel
-import requests
+from services.http_client import http, HttpError
 from core.logger import logger
+from services.fetch_cache import fetch_cache
 
 
 class ClashRoyaleApiError(Exception):
@@ -120,8 +122,7 @@ class ClashRoyale(ServiceClass):
                     area_action.last_state = {
                         "last_battle_time": latest_battle.battleTime
                     }
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return False
 
                 last_battle_time_str = last_state.get("last_battle_time", "")
@@ -129,8 +130,7 @@ class ClashRoyale(ServiceClass):
                     area_action.last_state = {
                         "last_battle_time": latest_battle.battleTime
                     }
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return True
 
                 return False
@@ -179,8 +179,7 @@ class ClashRoyale(ServiceClass):
                     area_action.last_state = {
                         "last_battle_time": battle_result.battleTime
                     }
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return False
 
                 last_battle_time_str = last_state.get("last_battle_time", "")
@@ -188,8 +187,7 @@ class ClashRoyale(ServiceClass):
                     area_action.last_state = {
                         "last_battle_time": battle_result.battleTime
                     }
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return battle_result.is_victory
 
                 return False
@@ -238,8 +236,7 @@ class ClashRoyale(ServiceClass):
                     area_action.last_state = {
                         "last_battle_time": battle_result.battleTime
                     }
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return False
 
                 last_battle_time_str = last_state.get("last_battle_time", "")
@@ -247,8 +244,7 @@ class ClashRoyale(ServiceClass):
                     area_action.last_state = {
                         "last_battle_time": battle_result.battleTime
                     }
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return not battle_result.is_victory
 
                 return False
@@ -297,8 +293,7 @@ class ClashRoyale(ServiceClass):
                     area_action.last_state = {
                         "last_battle_time": battle_result.battleTime
                     }
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return False
 
                 last_battle_time_str = last_state.get("last_battle_time", "")
@@ -306,8 +301,7 @@ class ClashRoyale(ServiceClass):
                     area_action.last_state = {
                         "last_battle_time": battle_result.battleTime
                     }
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return battle_result.is_victory and battle_result.crowns_won == 3
 
                 return False
@@ -359,8 +353,7 @@ class ClashRoyale(ServiceClass):
                 previous_streak = last_state.get("win_streak", 0) if last_state else 0
 
                 area_action.last_state = {"win_streak": current_streak}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
 
                 return current_streak >= threshold and previous_streak < threshold
 
@@ -405,16 +398,14 @@ class ClashRoyale(ServiceClass):
                 last_state = area_action.last_state
                 if last_state is None or "last_trophy_count" not in last_state:
                     area_action.last_state = {"last_trophy_count": player_info.trophies}
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return False
 
                 last_trophy_count = last_state.get("last_trophy_count", 0)
                 trophy_gain = player_info.trophies - last_trophy_count
 
                 area_action.last_state = {"last_trophy_count": player_info.trophies}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
 
                 return trophy_gain >= threshold
 
@@ -459,16 +450,14 @@ class ClashRoyale(ServiceClass):
                 last_state = area_action.last_state
                 if last_state is None or "last_trophy_count" not in last_state:
                     area_action.last_state = {"last_trophy_count": player_info.trophies}
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return False
 
                 last_trophy_count = last_state.get("last_trophy_count", 0)
                 trophy_loss = last_trophy_count - player_info.trophies
 
                 area_action.last_state = {"last_trophy_count": player_info.trophies}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
 
                 return trophy_loss >= threshold
 
@@ -534,9 +523,7 @@ class ClashRoyale(ServiceClass):
         }
 
         try:
-            response = requests.get(
-                f"{base_url}{endpoint}", headers=headers, timeout=10
-            )
+            response = http.get(f"{base_url}{endpoint}", headers=headers)
 
             if response.status_code == 200:
                 return response.json()
@@ -559,20 +546,33 @@ class ClashRoyale(ServiceClass):
                     f"API error: {response.status_code}", response.status_code
                 )
 
-        except requests.RequestException as e:
+        except HttpError as e:
             raise ClashRoyaleApiError(f"Network error: {str(e)}")
 
     def _get_player_info(self, player_tag: str) -> PlayerInfo:
         """Get player profile information."""
         formatted_tag = self._format_player_tag(player_tag)
-        data = self._api_request(f"/players/{formatted_tag}")
-        return PlayerInfo(**data)
+        return fetch_cache.get_or_fetch(
+            self.name,
+            "/players",
+            formatted_tag,
+            lambda: PlayerInfo(**self._api_request(f"/players/{formatted_tag}")),
+        )
 
     def _get_player_battlelog(self, player_tag: str) -> list[Battle]:
         """Get player's recent battles."""
         formatted_tag = self._format_player_tag(player_tag)
-        data = self._api_request(f"/players/{formatted_tag}/battlelog")
+        return fetch_cache.get_or_fetch(
+            self.name,
+            "/players/battlelog",
+            formatted_tag,
+            lambda: self._parse_battlelog(
+                self._api_request(f"/players/{formatted_tag}/battlelog")
+            ),
+        )
 
+    def _parse_battlelog(self, data: Any) -> list[Battle]:
+        """Parse a raw battlelog response into battles."""
         battle_list = []
         if isinstance(data, list):
             battles_data = data
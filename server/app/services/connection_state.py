@@ -0,0 +1,209 @@
+"""Connection validity of linked services, tracked as state.
+
+`GET /services/{id}/is_connected` used to probe the provider live on every
+call. Validity is now derived from what is stored on the `UserService`
+row:
+
+- `last_success_at`: last proof the token works (OAuth link, token
+  refresh, successful probe);
+- `last_unauthorized_at`: last time the provider rejected it;
+- `token_expires_at`: an expired token without a refresh token is dead.
+
+A background job re-probes links whose last evidence is older than
+`CONNECTION_FRESHNESS` seconds, through the services' `is_connected`.
+Each attempt is stamped in `last_checked_at`, so a link whose probe keeps
+failing waits `CONNECTION_FRESHNESS` like the others instead of taking
+the head of every batch.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from core.config import settings
+from core.logger import logger
+from core.periodic import PeriodicTask
+from models import Service, UserService
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _aware(moment: Optional[datetime]) -> datetime:
+    if moment is None:
+        return EPOCH
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+def connection_valid(user_service: UserService) -> bool:
+    """Whether the stored evidence says the link still works."""
+    if _aware(user_service.last_unauthorized_at) > _aware(user_service.last_success_at):
+        return False
+    expires_at = user_service.token_expires_at
+    if expires_at is not None and user_service.refresh_token is None:
+        return _aware(expires_at) > datetime.now(timezone.utc)
+    return True
+
+
+def record_success(user_service: UserService) -> None:
+    """Note a successful use of the token; the caller commits."""
+    user_service.last_success_at = datetime.now(timezone.utc)
+
+
+def record_unauthorized(user_service: UserService) -> None:
+    """Note the provider rejected the token; the caller commits."""
+    user_service.last_unauthorized_at = datetime.now(timezone.utc)
+
+
+def mark_unauthorized(session: Session, user_id: int, service_name: str) -> None:
+    """Record a 401 from the provider for the user's link to `service_name`."""
+    user_service = session.exec(
+        select(UserService)
+        .join(Service, Service.id == UserService.service_id)
+        .where(UserService.user_id == user_id, Service.name == service_name)
+    ).first()
+    if user_service is None:
+        return
+    record_unauthorized(user_service)
+    session.add(user_service)
+    session.commit()
+
+
+class ConnectionRevalidator:
+    """Re-probes the links with the oldest evidence, in batches."""
+
+    def __init__(
+        self,
+        freshness: float = settings.CONNECTION_FRESHNESS,
+        batch_size: int = settings.CONNECTION_REVALIDATE_BATCH_SIZE,
+        workers: int = settings.CONNECTION_REVALIDATE_WORKERS,
+    ) -> None:
+        self.freshness = freshness
+        self.batch_size = batch_size
+        self.workers = workers
+        self.valid = 0
+        self.invalid = 0
+        self.errors = 0
+        self._lock = Lock()
+        self._job = PeriodicTask("Connection revalidation", self.revalidate_stale)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _probe(
+        self, engine, user_service_id: int, service_name: str
+    ) -> Optional[bool]:
+        """Probe one link live and record the outcome; None if inconclusive."""
+        from services.services import services_dico
+
+        with Session(engine) as session:
+            user_service = session.get(UserService, user_service_id)
+            if user_service is None:
+                return None
+            user_service.last_checked_at = datetime.now(timezone.utc)
+            session.add(user_service)
+            session.commit()
+            if service_name not in services_dico:
+                return None
+            try:
+                connected = services_dico[service_name].is_connected(
+                    session, user_service.user_id
+                )
+            except Exception as e:
+                self._count("errors")
+                logger.error(f"{service_name}: connection probe failed: {e}")
+                return None
+            # is_connected may have committed (token refresh, metadata)
+            user_service = session.get(UserService, user_service_id)
+            if user_service is None:
+                return None
+            if connected:
+                record_success(user_service)
+                self._count("valid")
+            else:
+                record_unauthorized(user_service)
+                self._count("invalid")
+            session.add(user_service)
+            session.commit()
+            return bool(connected)
+
+    def is_stale(self, user_service: UserService) -> bool:
+        checked_at = max(
+            _aware(user_service.last_success_at),
+            _aware(user_service.last_unauthorized_at),
+        )
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.freshness)
+        return checked_at < cutoff
+
+    def probe_many(
+        self,
+        links: List[Tuple[int, str]],
+        deadline: float = settings.CONNECTION_PROBE_DEADLINE,
+        engine=None,
+    ) -> Dict[int, bool]:
+        """Probe (user_service id, service name) links concurrently.
+
+        Returns the conclusive results known after `deadline` seconds; slower
+        probes keep running and record their outcome for the next read.
+        """
+        if not links:
+            return {}
+        if engine is None:
+            from core.engine import engine
+        pool = ThreadPoolExecutor(max_workers=min(self.workers, len(links)))
+        futures = {
+            pool.submit(self._probe, engine, user_service_id, name): user_service_id
+            for user_service_id, name in links
+        }
+        pool.shutdown(wait=False)
+        done, _ = wait(futures, timeout=deadline)
+        results = {}
+        for future in done:
+            if future.exception() is None and future.result() is not None:
+                results[futures[future]] = future.result()
+        return results
+
+    def revalidate_stale(self, engine=None) -> int:
+        """Probe the links not confirmed for `freshness` seconds; returns how many."""
+        if engine is None:
+            from core.engine import engine
+        checked_at = func.greatest(
+            func.coalesce(UserService.last_success_at, EPOCH),
+            func.coalesce(UserService.last_unauthorized_at, EPOCH),
+            func.coalesce(UserService.last_checked_at, EPOCH),
+        )
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.freshness)
+        with Session(engine) as session:
+            stale = session.exec(
+                select(UserService.id, Service.name)
+                .join(Service, Service.id == UserService.service_id)
+                .where(checked_at < cutoff)
+                .order_by(checked_at)
+                .limit(self.batch_size)
+            ).all()
+        if not stale:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(lambda row: self._probe(engine, *row), stale))
+        logger.debug(f"Connection revalidation: probed {len(stale)} links")
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"valid": self.valid, "invalid": self.invalid, "errors": self.errors}
+
+    def start(self, interval: float = settings.CONNECTION_REVALIDATE_INTERVAL) -> None:
+        """Start background revalidation on the running event loop."""
+        self._job.start(interval)
+
+    async def stop(self) -> None:
+        await self._job.stop()
+
+
+connection_revalidator = ConnectionRevalidator()
@@ -6,7 +6,7 @@ No OAuth required - purely time-based condition checking.
 
 from models import AreaAction
 from sqlmodel import Session
-from services.services_classes import Service, Action, get_component
+from services.services_classes import Service, Action, get_component, save_last_state
 from core.categories import ServiceCategory
 from datetime import datetime, time as dt_time
 from core.logger import logger
@@ -86,8 +86,7 @@ class DateAndTime(Service):
 
                     if last_trigger != current_hour_key:
                         area_action.last_state = {"last_trigger_hour": current_hour_key}
-                        session.add(area_action)
-                        session.commit()
+                        save_last_state(session, area_action)
                         return True
 
                 return False
@@ -151,8 +150,7 @@ class DateAndTime(Service):
 
                     if last_trigger != current_day_key:
                         area_action.last_state = {"last_trigger_day": current_day_key}
-                        session.add(area_action)
-                        session.commit()
+                        save_last_state(session, area_action)
                         return True
 
                 return False
@@ -262,8 +260,7 @@ class DateAndTime(Service):
 
                     if last_trigger != current_day_key:
                         area_action.last_state = {"last_trigger_day": current_day_key}
-                        session.add(area_action)
-                        session.commit()
+                        save_last_state(session, area_action)
                         return True
 
                 return False
@@ -323,8 +320,7 @@ class DateAndTime(Service):
                         area_action.last_state = {
                             "last_trigger_minute": current_minute_key
                         }
-                        session.add(area_action)
-                        session.commit()
+                        save_last_state(session, area_action)
                         return True
 
                 return False
@@ -410,8 +406,7 @@ class DateAndTime(Service):
                     and current_time.minute == target_minute
                 ):
                     area_action.last_state = {"triggered": True}
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return True
 
                 return False
@@ -503,8 +498,7 @@ class DateAndTime(Service):
                 )
 
                 area_action.last_state = {"in_range": in_range}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
 
                 return in_range and not was_in_range
 
@@ -548,8 +542,7 @@ class DateAndTime(Service):
 
                 if current_time.weekday() > 4:
                     area_action.last_state = {"in_business_hours": False}
-                    session.add(area_action)
-                    session.commit()
+                    save_last_state(session, area_action)
                     return False
 
                 start_hour_str = get_component(
@@ -573,8 +566,7 @@ class DateAndTime(Service):
                 )
 
                 area_action.last_state = {"in_business_hours": in_business_hours}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
 
                 return in_business_hours and not was_in_business_hours
 
@@ -1,7 +1,9 @@
 from urllib.parse import urlencode
 from fastapi import HTTPException, Request, Response
-import requests
-from typing import Dict, Any, List
+from services.http_client import http, async_http, HttpError
+from services.rate_limit import RateLimitedError
+from services.http_client import Response as HttpResponse
+from typing import Dict, Any, List, Optional
 from sqlmodel import Session, select
 from pydantic import BaseModel
 
@@ -9,6 +11,9 @@ from models.services.service import Service
 from models.users.user import User
 from models.users.user_service import UserService
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint, token_manager
+from services.connection_state import mark_unauthorized
+from api.users.db import get_user_service_token
 from core.config import settings
 from core.logger import logger
 from core.categories import ServiceCategory
@@ -17,6 +22,10 @@ from services.services_classes import (
     Action,
     Reaction,
     get_component,
+    save_last_state,
+    db_call,
+    SeenIds,
+    ReactionRetryError,
 )
 from models import AreaAction, AreaReaction
 
@@ -27,6 +36,18 @@ class DiscordApiError(Exception):
         super().__init__(self.message)
 
 
+class DiscordRateLimitError(DiscordApiError, ReactionRetryError):
+    """Discord asked to retry later.
+
+    Checks handle it as any DiscordApiError; reactions let it propagate so
+    the reaction queue retries them after `retry_after`.
+    """
+
+    def __init__(self, message, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class DiscordOAuthTokenRes(BaseModel):
     """Discord OAuth2 token response."""
 
@@ -38,6 +59,12 @@ class DiscordOAuthTokenRes(BaseModel):
 
 
 class Discord(ServiceClass):
+    token_endpoint = TokenEndpoint(
+        "https://discord.com/api/v10/oauth2/token",
+        settings.DISCORD_CLIENT_ID,
+        settings.DISCORD_CLIENT_SECRET,
+    )
+
     def __init__(self) -> None:
         super().__init__(
             description=f"Discord Bot for server and channel automation. Invite the bot after connecting: [here]({self.get_bot_invite_link()})",
@@ -59,40 +86,27 @@ class Discord(ServiceClass):
                 "*/1 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
                 channel_id = get_component(area_action.config, "Channel ID", "values")
                 keyword = get_component(area_action.config, "Keyword Filter", "values")
 
-                messages = self.service._get_channel_messages(channel_id, limit=10)
+                messages = await self.service._get_channel_messages(channel_id, limit=10)
 
                 if not messages:
                     return False
 
-                message_ids = {msg["id"] for msg in messages}
-                previous_ids = set(
-                    area_action.last_state.get("message_ids", [])
-                    if area_action.last_state
-                    else []
+                seen = SeenIds.load(
+                    area_action.last_state, "message_ids", monotonic=True
                 )
+                first_poll = not seen.initialized
+                new_ids = set(seen.update(msg["id"] for msg in messages))
+                area_action.last_state = {"message_ids": seen.to_state()}
+                await db_call(save_last_state, session, area_action)
 
-                if (
-                    not area_action.last_state
-                    or "message_ids" not in area_action.last_state
-                ):
-                    area_action.last_state = {"message_ids": list(message_ids)}
-                    session.add(area_action)
-                    session.commit()
-                    return False
-
-                new_ids = message_ids - previous_ids
-                area_action.last_state = {"message_ids": list(message_ids)}
-                session.add(area_action)
-                session.commit()
-
-                if not new_ids:
+                if first_poll or not new_ids:
                     return False
 
                 if keyword and keyword.strip():
@@ -119,14 +133,16 @@ class Discord(ServiceClass):
                 "*/5 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
-                guild_id = self.service.get_user_guild_id(session, user_id)
+                guild_id = await db_call(
+                    self.service.get_user_guild_id, session, user_id
+                )
                 if not guild_id:
                     return False
-                guild_info = self.service._get_guild(guild_id)
+                guild_info = await self.service._get_guild_async(guild_id)
 
                 current_count = guild_info.get("approximate_member_count", 0)
                 previous_count = (
@@ -140,13 +156,11 @@ class Discord(ServiceClass):
                     or "member_count" not in area_action.last_state
                 ):
                     area_action.last_state = {"member_count": current_count}
-                    session.add(area_action)
-                    session.commit()
+                    await db_call(save_last_state, session, area_action)
                     return False
 
                 area_action.last_state = {"member_count": current_count}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
 
                 return current_count > previous_count
 
@@ -166,7 +180,7 @@ class Discord(ServiceClass):
                 "*/1 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -177,32 +191,22 @@ class Discord(ServiceClass):
                     return False
 
                 keywords = [k.strip().lower() for k in keywords_str.split(",")]
-                messages = self.service._get_channel_messages(channel_id, limit=10)
+                messages = await self.service._get_channel_messages(channel_id, limit=10)
 
                 if not messages:
                     return False
 
-                message_ids = {msg["id"] for msg in messages}
-                previous_ids = set(
-                    area_action.last_state.get("message_ids", [])
-                    if area_action.last_state
-                    else []
+                seen = SeenIds.load(
+                    area_action.last_state, "message_ids", monotonic=True
                 )
+                first_poll = not seen.initialized
+                new_ids = set(seen.update(msg["id"] for msg in messages))
+                area_action.last_state = {"message_ids": seen.to_state()}
+                await db_call(save_last_state, session, area_action)
 
-                if (
-                    not area_action.last_state
-                    or "message_ids" not in area_action.last_state
-                ):
-                    area_action.last_state = {"message_ids": list(message_ids)}
-                    session.add(area_action)
-                    session.commit()
+                if first_poll:
                     return False
 
-                new_ids = message_ids - previous_ids
-                area_action.last_state = {"message_ids": list(message_ids)}
-                session.add(area_action)
-                session.commit()
-
                 for msg in messages:
                     if msg["id"] in new_ids:
                         content = msg.get("content", "").lower()
@@ -225,37 +229,26 @@ class Discord(ServiceClass):
                 "*/5 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
-                guild_id = self.service.get_user_guild_id(session, user_id)
+                guild_id = await db_call(
+                    self.service.get_user_guild_id, session, user_id
+                )
                 if not guild_id:
                     return False
-                channels = self.service._get_guild_channels(guild_id)
+                channels = await self.service._get_guild_channels(guild_id)
 
-                channel_ids = {ch["id"] for ch in channels}
-                previous_ids = set(
-                    area_action.last_state.get("channel_ids", [])
-                    if area_action.last_state
-                    else []
+                seen = SeenIds.load(
+                    area_action.last_state, "channel_ids", monotonic=True
                 )
+                first_poll = not seen.initialized
+                new_channels = seen.update(ch["id"] for ch in channels)
+                area_action.last_state = {"channel_ids": seen.to_state()}
+                await db_call(save_last_state, session, area_action)
 
-                if (
-                    not area_action.last_state
-                    or "channel_ids" not in area_action.last_state
-                ):
-                    area_action.last_state = {"channel_ids": list(channel_ids)}
-                    session.add(area_action)
-                    session.commit()
-                    return False
-
-                area_action.last_state = {"channel_ids": list(channel_ids)}
-                session.add(area_action)
-                session.commit()
-
-                new_channels = channel_ids - previous_ids
-                return len(new_channels) > 0
+                return not first_poll and len(new_channels) > 0
 
             except DiscordApiError as e:
                 logger.error(f"{self.service.name}: {e.message}")
@@ -273,39 +266,29 @@ class Discord(ServiceClass):
                 "*/2 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
                 channel_id = get_component(area_action.config, "Channel ID", "values")
                 target_user_id = get_component(area_action.config, "User ID", "values")
 
-                messages = self.service._get_channel_messages(channel_id, limit=10)
+                messages = await self.service._get_channel_messages(channel_id, limit=10)
 
                 if not messages:
                     return False
 
-                message_ids = {msg["id"] for msg in messages}
-                previous_ids = set(
-                    area_action.last_state.get("message_ids", [])
-                    if area_action.last_state
-                    else []
+                seen = SeenIds.load(
+                    area_action.last_state, "message_ids", monotonic=True
                 )
+                first_poll = not seen.initialized
+                new_ids = set(seen.update(msg["id"] for msg in messages))
+                area_action.last_state = {"message_ids": seen.to_state()}
+                await db_call(save_last_state, session, area_action)
 
-                if (
-                    not area_action.last_state
-                    or "message_ids" not in area_action.last_state
-                ):
-                    area_action.last_state = {"message_ids": list(message_ids)}
-                    session.add(area_action)
-                    session.commit()
+                if first_poll:
                     return False
 
-                new_ids = message_ids - previous_ids
-                area_action.last_state = {"message_ids": list(message_ids)}
-                session.add(area_action)
-                session.commit()
-
                 for msg in messages:
                     if msg["id"] in new_ids:
                         mentions = msg.get("mentions", [])
@@ -339,6 +322,8 @@ class Discord(ServiceClass):
                 self.service._send_message(channel_id, content)
                 logger.info(f"{self.service.name} - {self.name} - Sent message to channel {channel_id} - User: {user_id}")
 
+            except DiscordRateLimitError:
+                raise
             except DiscordApiError as e:
                 logger.error(f"{self.service.name}: {e.message}")
 
@@ -373,6 +358,8 @@ class Discord(ServiceClass):
                 self.service._create_channel(guild_id, name, type_int)
                 logger.info(f"{self.service.name} - {self.name} - Created channel '{name}' in guild {guild_id} - User: {user_id}")
 
+            except DiscordRateLimitError:
+                raise
             except DiscordApiError as e:
                 logger.error(f"{self.service.name}: {e.message}")
 
@@ -400,6 +387,8 @@ class Discord(ServiceClass):
                 self.service._add_role_to_member(guild_id, target_user_id, role_id)
                 logger.info(f"{self.service.name} - {self.name} - Added role {role_id} to user {target_user_id} - User: {user_id}")
 
+            except DiscordRateLimitError:
+                raise
             except DiscordApiError as e:
                 logger.error(f"{self.service.name}: {e.message}")
 
@@ -424,6 +413,8 @@ class Discord(ServiceClass):
                 self.service._add_reaction(channel_id, message_id, emoji)
                 logger.info(f"{self.service.name} - {self.name} - Added reaction {emoji} to message {message_id} - User: {user_id}")
 
+            except DiscordRateLimitError:
+                raise
             except DiscordApiError as e:
                 logger.error(f"{self.service.name}: {e.message}")
 
@@ -443,6 +434,8 @@ class Discord(ServiceClass):
                 self.service._delete_message(channel_id, message_id)
                 logger.info(f"{self.service.name} - {self.name} - Deleted message {message_id} from channel {channel_id} - User: {user_id}")
 
+            except DiscordRateLimitError:
+                raise
             except DiscordApiError as e:
                 logger.error(f"{self.service.name}: {e.message}")
 
@@ -480,6 +473,8 @@ class Discord(ServiceClass):
                 self.service._send_embed_message(channel_id, title, description, color)
                 logger.info(f"{self.service.name} - {self.name} - Sent embed message to channel {channel_id} - User: {user_id}")
 
+            except DiscordRateLimitError:
+                raise
             except DiscordApiError as e:
                 logger.error(f"{self.service.name}: {e.message}")
 
@@ -500,38 +495,58 @@ class Discord(ServiceClass):
 
         try:
             if method == "GET":
-                r = requests.get(url, headers=headers, timeout=10)
+                r = http.get(url, headers=headers)
             elif method == "POST":
-                r = requests.post(url, headers=headers, json=data, timeout=10)
+                r = http.post(url, headers=headers, json=data)
             elif method == "PUT":
-                r = requests.put(url, headers=headers, json=data, timeout=10)
+                r = http.put(url, headers=headers, json=data)
             elif method == "PATCH":
-                r = requests.patch(url, headers=headers, json=data, timeout=10)
+                r = http.patch(url, headers=headers, json=data)
             elif method == "DELETE":
-                r = requests.delete(url, headers=headers, timeout=10)
+                r = http.delete(url, headers=headers)
             else:
                 raise DiscordApiError(f"Unsupported HTTP method: {method}")
 
-            if r.status_code == 429:
-                retry_after = r.json().get("retry_after", 5)
-                raise DiscordApiError(f"Rate limited. Retry after {retry_after}s")
+            return self._handle_bot_response(r)
 
-            if r.status_code == 204:
-                return {}
+        except RateLimitedError as e:
+            raise DiscordRateLimitError(str(e), e.retry_after)
+        except HttpError as e:
+            raise DiscordApiError(f"Request failed: {str(e)}")
 
-            if r.status_code not in [200, 201, 204]:
-                error_msg = r.text if r.text else f"Status code: {r.status_code}"
-                raise DiscordApiError(f"Discord API error: {error_msg}")
+    async def _make_bot_get_async(self, endpoint: str) -> Any:
+        """Non-blocking bot GET request."""
+        url = f"https://discord.com/api/v10{endpoint}"
+        try:
+            r = await async_http.get(url, headers=self._get_bot_headers())
+        except RateLimitedError as e:
+            raise DiscordRateLimitError(str(e), e.retry_after)
+        except HttpError as e:
+            raise DiscordApiError(f"Request failed: {str(e)}")
+        return self._handle_bot_response(r)
 
-            return r.json() if r.text else {}
+    def _handle_bot_response(self, r: HttpResponse) -> Any:
+        if r.status_code == 429:
+            retry_after = r.json().get("retry_after", 5)
+            raise DiscordRateLimitError(
+                f"Discord: rate limited. Retry after {retry_after}s", retry_after
+            )
 
-        except requests.RequestException as e:
-            raise DiscordApiError(f"Request failed: {str(e)}")
+        if r.status_code == 204:
+            return {}
 
-    def _get_channel_messages(
+        if r.status_code not in [200, 201, 204]:
+            error_msg = r.text if r.text else f"Status code: {r.status_code}"
+            raise DiscordApiError(f"Discord API error: {error_msg}")
+
+        return r.json() if r.text else {}
+
+    async def _get_channel_messages(
         self, channel_id: str, limit: int = 100
     ) -> List[Dict[str, Any]]:
-        return self._make_bot_request(f"/channels/{channel_id}/messages?limit={limit}")
+        return await self._make_bot_get_async(
+            f"/channels/{channel_id}/messages?limit={limit}"
+        )
 
     def _send_message(self, channel_id: str, content: str) -> Dict[str, Any]:
         data = {"content": content}
@@ -548,8 +563,11 @@ class Discord(ServiceClass):
     def _get_guild(self, guild_id: str) -> Dict[str, Any]:
         return self._make_bot_request(f"/guilds/{guild_id}?with_counts=true")
 
-    def _get_guild_channels(self, guild_id: str) -> List[Dict[str, Any]]:
-        return self._make_bot_request(f"/guilds/{guild_id}/channels")
+    async def _get_guild_async(self, guild_id: str) -> Dict[str, Any]:
+        return await self._make_bot_get_async(f"/guilds/{guild_id}?with_counts=true")
+
+    async def _get_guild_channels(self, guild_id: str) -> List[Dict[str, Any]]:
+        return await self._make_bot_get_async(f"/guilds/{guild_id}/channels")
 
     def _create_channel(
         self, guild_id: str, name: str, channel_type: int
@@ -594,76 +612,27 @@ class Discord(ServiceClass):
         }
 
         try:
-            r = requests.post(url, data=data, timeout=10)
+            r = http.post(url, data=data)
             if r.status_code != 200:
                 error_msg = r.text if r.text else f"Status code: {r.status_code}"
                 raise DiscordApiError(f"Token exchange failed: {error_msg}")
 
             token_data = r.json()
             return DiscordOAuthTokenRes(**token_data)
-        except requests.RequestException as e:
+        except HttpError as e:
             raise DiscordApiError(f"Token request failed: {str(e)}")
 
     def _get_user_headers(self, session: Session, user_id: int) -> Dict[str, str]:
         """Get headers with user's OAuth token."""
-        user_service = session.exec(
-            select(UserService)
-            .join(Service)
-            .where(
-                UserService.user_id == user_id,
-                Service.name == self.name,
-            )
-        ).first()
-
-        if not user_service or not user_service.access_token:
+        token = get_user_service_token(session, user_id, self.name)
+        if not token:
             raise DiscordApiError("User not connected to Discord")
 
         return {
-            "Authorization": f"Bearer {user_service.access_token}",
+            "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
 
-    def _refresh_token(self, session: Session, user_id: int) -> bool:
-        """Refresh user's OAuth token."""
-        user_service = session.exec(
-            select(UserService)
-            .join(Service)
-            .where(
-                UserService.user_id == user_id,
-                Service.name == self.name,
-            )
-        ).first()
-
-        if not user_service or not user_service.refresh_token:
-            return False
-
-        url = "https://discord.com/api/v10/oauth2/token"
-        data = {
-            "client_id": settings.DISCORD_CLIENT_ID,
-            "client_secret": settings.DISCORD_CLIENT_SECRET,
-            "grant_type": "refresh_token",
-            "refresh_token": user_service.refresh_token,
-        }
-
-        try:
-            r = requests.post(url, data=data, timeout=10)
-            if r.status_code != 200:
-                logger.error(f"Token refresh failed: {r.text}")
-                return False
-
-            token_data = r.json()
-            user_service.access_token = token_data["access_token"]
-            user_service.refresh_token = token_data.get(
-                "refresh_token", user_service.refresh_token
-            )
-            session.add(user_service)
-            session.commit()
-            logger.info(f"Refreshed Discord token for user {user_id}")
-            return True
-        except Exception as e:
-            logger.error(f"Token refresh failed: {str(e)}")
-            return False
-
     def is_connected(self, session: Session, user_id: int) -> bool:
         """Check if user has a valid OAuth token and bot has access to at least one mutual guild."""
         user_service = session.exec(
@@ -687,6 +656,9 @@ class Discord(ServiceClass):
             try:
                 self._get_guild(guild_id)
                 return True
+            except DiscordRateLimitError:
+                # Throttled, not evicted: keep the guild
+                return True
             except DiscordApiError:
                 current_metadata = user_service.service_metadata or {}
                 if isinstance(current_metadata, dict):
@@ -745,47 +717,6 @@ class Discord(ServiceClass):
 
         try:
             token_response = self._get_token(code)
-
-            user_service = session.exec(
-                select(UserService)
-                .join(Service)
-                .where(
-                    UserService.user_id == user.id,
-                    Service.name == self.name,
-                )
-            ).first()
-
-            if user_service:
-                user_service.access_token = token_response.access_token
-                user_service.refresh_token = token_response.refresh_token
-                session.add(user_service)
-                session.commit()
-            else:
-                response = oauth_add_link(
-                    session,
-                    self.name,
-                    user,
-                    token_response.access_token,
-                    request,
-                    is_mobile,
-                )
-
-                user_service = session.exec(
-                    select(UserService)
-                    .join(Service)
-                    .where(
-                        UserService.user_id == user.id,
-                        Service.name == self.name,
-                    )
-                ).first()
-
-                if user_service:
-                    user_service.refresh_token = token_response.refresh_token
-                    session.add(user_service)
-                    session.commit()
-
-                return response
-
             return oauth_add_link(
                 session,
                 self.name,
@@ -793,6 +724,8 @@ class Discord(ServiceClass):
                 token_response.access_token,
                 request,
                 is_mobile,
+                refresh_token=token_response.refresh_token,
+                expires_in=token_response.expires_in,
             )
 
         except DiscordApiError as e:
@@ -814,12 +747,14 @@ class Discord(ServiceClass):
             headers = self._get_user_headers(session, user_id)
 
             url = "https://discord.com/api/v10/users/@me/guilds"
-            r = requests.get(url, headers=headers, timeout=10)
+            r = http.get(url, headers=headers)
 
             if r.status_code == 401:
-                if self._refresh_token(session, user_id):
+                if token_manager.force_refresh(session, user_id, self.name):
                     headers = self._get_user_headers(session, user_id)
-                    r = requests.get(url, headers=headers, timeout=10)
+                    r = http.get(url, headers=headers)
+            if r.status_code == 401:
+                mark_unauthorized(session, user_id, self.name)
 
             if r.status_code != 200:
                 raise DiscordApiError(f"Failed to fetch guilds: {r.text}")
@@ -1,4 +1,4 @@
-import requests
+from services.http_client import http
 from urllib.parse import urlencode
 from sqlmodel import Session, select
 from fastapi import HTTPException, Response, Request
@@ -8,11 +8,14 @@ from pydantic import BaseModel
 from core.config import settings
 from core.logger import logger
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint
 from services.services_classes import (
     Service as ServiceClass,
     Action,
     Reaction,
     get_component,
+    save_last_state,
+    SeenIds,
 )
 import json
 from models import AreaAction, UserService, Service, User, AreaReaction
@@ -42,6 +45,12 @@ class DropboxApiError(Exception):
 class Dropbox(ServiceClass):
     """Dropbox automation service."""
 
+    token_endpoint = TokenEndpoint(
+        "https://api.dropboxapi.com/oauth2/token",
+        settings.DROPBOX_CLIENT_ID,
+        settings.DROPBOX_CLIENT_SECRET,
+    )
+
     def __init__(self) -> None:
         super().__init__(
             "Dropbox", "storage", "#0061FE", "images/Dropbox_logo.webp", True
@@ -69,7 +78,7 @@ class Dropbox(ServiceClass):
                     "Content-Type": "application/json",
                 }
                 data = {"path": folder, "limit": 15}
-                r = requests.post(url, headers=headers, json=data)
+                r = http.post(url, headers=headers, json=data)
                 if r.status_code != 200:
                     raise DropboxApiError(f"Failed to list folder: {r.text}")
 
@@ -78,12 +87,10 @@ class Dropbox(ServiceClass):
                     for entry in r.json().get("entries", [])
                     if entry[".tag"] == "file"
                 ]
-                last_files = (area_action.last_state or {}).get("files", [])
-
-                new_files = [f for f in files if f not in last_files]
-                area_action.last_state = {"files": files}
-                session.add(area_action)
-                session.commit()
+                seen = SeenIds.load(area_action.last_state, "files")
+                new_files = seen.update(files)
+                area_action.last_state = {"files": seen.to_state()}
+                save_last_state(session, area_action)
 
                 return len(new_files) > 0
             except DropboxApiError as e:
@@ -112,7 +119,7 @@ class Dropbox(ServiceClass):
                     "Content-Type": "application/json",
                 }
                 data = {"path": folder, "limit": 15}
-                r = requests.post(url, headers=headers, json=data)
+                r = http.post(url, headers=headers, json=data)
                 if r.status_code != 200:
                     raise DropboxApiError(f"Failed to list folder: {r.text}")
 
@@ -121,12 +128,10 @@ class Dropbox(ServiceClass):
                     for entry in r.json().get("entries", [])
                     if entry[".tag"] == "file" and entry["name"].endswith(".txt")
                 ]
-                last_files = (area_action.last_state or {}).get("files", [])
-
-                new_files = [f for f in files if f not in last_files]
-                area_action.last_state = {"files": files}
-                session.add(area_action)
-                session.commit()
+                seen = SeenIds.load(area_action.last_state, "files")
+                new_files = seen.update(files)
+                area_action.last_state = {"files": seen.to_state()}
+                save_last_state(session, area_action)
 
                 return len(new_files) > 0
             except DropboxApiError as e:
@@ -150,17 +155,15 @@ class Dropbox(ServiceClass):
                     "Content-Type": "application/json",
                 }
                 data = {"direct_only": True}
-                r = requests.post(url, headers=headers, json=data)
+                r = http.post(url, headers=headers, json=data)
                 if r.status_code != 200:
                     raise DropboxApiError(f"Failed to fetch shared links: {r.text}")
 
                 links = [link["id"] for link in r.json().get("links", [])]
-                prev = (area_action.last_state or {}).get("links", [])
-
-                new_links = [link for link in links if link not in prev]
-                area_action.last_state = {"links": links}
-                session.add(area_action)
-                session.commit()
+                seen = SeenIds.load(area_action.last_state, "links")
+                new_links = seen.update(links)
+                area_action.last_state = {"links": seen.to_state()}
+                save_last_state(session, area_action)
 
                 return len(new_links) > 0
             except DropboxApiError as e:
@@ -191,7 +194,7 @@ class Dropbox(ServiceClass):
                     "Dropbox-API-Arg": json.dumps({"path": file_path, "mode": "add"}),
                     "Content-Type": "application/octet-stream",
                 }
-                r = requests.post(url, headers=headers, data=content.encode("utf-8"))
+                r = http.post(url, headers=headers, data=content.encode("utf-8"))
                 if r.status_code != 200:
                     raise DropboxApiError(f"Failed to create text file: {r.text}")
                 logger.info(f"{self.service.name} - {self.name} - File create {file_path} - User: {user_id}")
@@ -223,7 +226,7 @@ class Dropbox(ServiceClass):
                 }
                 data = {"from_path": from_path, "to_path": to_path}
 
-                r = requests.post(url, headers=headers, json=data)
+                r = http.post(url, headers=headers, json=data)
                 if r.status_code != 200:
                     raise DropboxApiError(f"Failed to move file/folder: {r.text}")
                 logger.info(f"{self.service.name} - {self.name} - Move {from_path} to {to_path} - User: {user_id}")
@@ -251,7 +254,7 @@ class Dropbox(ServiceClass):
                 }
                 data = {"url": url_to_revoke}
 
-                r = requests.post(url, headers=headers, json=data)
+                r = http.post(url, headers=headers, json=data)
                 if r.status_code != 200:
                     raise DropboxApiError(f"Failed to revoke shared link: {r.text}")
                 logger.info(f"{self.service.name} - {self.name} - Revoke shared link {url_to_revoke}  - User: {user_id}")
@@ -303,7 +306,7 @@ class Dropbox(ServiceClass):
             "client_secret": settings.DROPBOX_CLIENT_SECRET,
             "redirect_uri": redirect,
         }
-        r = requests.post(url, data=data)
+        r = http.post(url, data=data)
         if r.status_code != 200:
             logger.error(f"Dropbox token error: {r.text}")
             raise DropboxApiError(f"Failed to get Dropbox token: {r.text}")
@@ -315,7 +318,7 @@ class Dropbox(ServiceClass):
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json",
         }
-        r = requests.post(url, headers=headers, json={})
+        r = http.post(url, headers=headers, json={})
         if r.status_code != 200:
             raise DropboxApiError(f"Failed to get Dropbox user info: {r.text}")
         return r.json()
@@ -333,4 +336,11 @@ class Dropbox(ServiceClass):
         except DropboxApiError as e:
             raise HTTPException(status_code=400, detail=e.message)
 
-        return oauth_add_link(session, self.name, user, token_res.access_token)
+        return oauth_add_link(
+            session,
+            self.name,
+            user,
+            token_res.access_token,
+            refresh_token=token_res.refresh_token,
+            expires_in=token_res.expires_in,
+        )
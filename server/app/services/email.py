@@ -55,7 +55,9 @@ class Email(Service):
                 message["To"] = to_address
                 message["Subject"] = subject
                 message.set_content(body)
-                with smtplib.SMTP_SSL(smtp_server, smtp_port) as server:
+                with smtplib.SMTP_SSL(
+                    smtp_server, smtp_port, timeout=settings.SMTP_TIMEOUT
+                ) as server:
                     server.login(username, password)
                     server.send_message(message)
 
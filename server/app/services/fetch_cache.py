@@ -0,0 +1,172 @@
+"""Short-lived fetch coalescing shared by all service integrations.
+
+Public resources (RSS feeds, weather coordinates, player tags) are often
+polled by many areas during the same tick. Results are keyed by
+(service, endpoint, params) and kept for a few seconds, so N subscribers
+cost one upstream request and one parse. Concurrent callers for the same
+key wait for the in-flight fetch instead of starting their own, whether
+they are threads (`get_or_fetch`) or coroutines (`get_or_fetch_async`).
+
+Cached values are shared between callers and must not be mutated.
+"""
+
+import asyncio
+import time
+from threading import Event, Lock
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from core.config import settings
+
+T = TypeVar("T")
+
+
+class _Entry:
+    def __init__(self) -> None:
+        self.ready = Event()
+        self.expires_at: float = 0.0
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters: List[asyncio.Future] = []
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class FetchCache:
+    """Thread-safe TTL cache with in-flight request coalescing."""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def make_key(service: str, endpoint: str, params: Any = None) -> Tuple:
+        if isinstance(params, dict):
+            params = tuple(sorted((k, str(v)) for k, v in params.items()))
+        return (service, endpoint, params)
+
+    def _claim(self, key: Hashable) -> Tuple[_Entry, bool]:
+        """Return the live entry for `key` and whether the caller must fill it."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                not entry.ready.is_set() or entry.expires_at > now
+            ):
+                self.hits += 1
+                return entry, False
+            self.misses += 1
+            entry = _Entry()
+            self._entries[key] = entry
+            self._evict_expired(now)
+            return entry, True
+
+    def _fail(self, key: Hashable, entry: _Entry, error: BaseException) -> None:
+        entry.error = error
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+
+    def _finish(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.ready.set()
+            waiters, entry.waiters = entry.waiters, []
+        for waiter in waiters:
+            waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+
+    @staticmethod
+    def _result(entry: _Entry) -> Any:
+        if entry.error is not None:
+            raise entry.error
+        return entry.value
+
+    def get_or_fetch(
+        self, service: str, endpoint: str, params: Any, fetch: Callable[[], T]
+    ) -> T:
+        """Return the cached result for the key, calling `fetch` at most once."""
+        key = self.make_key(service, endpoint, params)
+        entry, owner = self._claim(key)
+        if not owner:
+            entry.ready.wait()
+            return self._result(entry)
+
+        try:
+            entry.value = fetch()
+            entry.expires_at = time.monotonic() + self.ttl
+            return entry.value
+        except BaseException as e:
+            self._fail(key, entry, e)
+            raise
+        finally:
+            self._finish(entry)
+
+    async def get_or_fetch_async(
+        self,
+        service: str,
+        endpoint: str,
+        params: Any,
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T:
+        """Async `get_or_fetch`: waiting for an in-flight fetch never blocks the loop."""
+        key = self.make_key(service, endpoint, params)
+        entry, owner = self._claim(key)
+        if not owner:
+            with self._lock:
+                waiter = None
+                if not entry.ready.is_set():
+                    waiter = asyncio.get_running_loop().create_future()
+                    entry.waiters.append(waiter)
+            if waiter is not None:
+                await waiter
+            return self._result(entry)
+
+        try:
+            entry.value = await fetch()
+            entry.expires_at = time.monotonic() + self.ttl
+            return entry.value
+        except BaseException as e:
+            self._fail(key, entry, e)
+            raise
+        finally:
+            self._finish(entry)
+
+    def _evict_expired(self, now: float) -> None:
+        expired = [
+            key
+            for key, entry in self._entries.items()
+            if entry.ready.is_set() and entry.expires_at <= now
+        ]
+        for key in expired:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+            }
+
+
+fetch_cache = FetchCache(settings.FETCH_CACHE_TTL)
@@ -4,7 +4,7 @@ from typing import Dict, Any, List
 from sqlmodel import Session, select
 from fastapi import HTTPException, Request, Response
 from pydantic import BaseModel
-import requests
+from services.http_client import http
 import json
 import re
 from urllib.parse import urlencode
@@ -17,8 +17,11 @@ from services.services_classes import (
     Action,
     Reaction,
     get_component,
+    save_last_state,
+    SeenIds,
 )
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint
 from models import AreaAction, AreaReaction, UserService, User, Service
 from api.users.db import get_user_service_token
 
@@ -39,6 +42,13 @@ class FigmaOAuthTokenRes(BaseModel):
 
 
 class Figma(ServiceClass):
+    token_endpoint = TokenEndpoint(
+        "https://api.figma.com/v1/oauth/token",
+        settings.FIGMA_CLIENT_ID,
+        settings.FIGMA_CLIENT_SECRET,
+        basic_auth=True,
+    )
+
     def __init__(self) -> None:
         super().__init__("Figma", "design", "#0dc07b", "images/Figma_logo.png", True)
 
@@ -63,7 +73,7 @@ class Figma(ServiceClass):
                 logger.error(project_id)
                 url = f"https://api.figma.com/v1/projects/{project_id}/files"
                 headers = {"Authorization": f"Bearer {token}"}
-                r = requests.get(url, headers=headers)
+                r = http.get(url, headers=headers)
                 if r.status_code != 200:
                     raise FigmaApiError(f"Failed to list project files: {r.text}")
 
@@ -74,12 +84,10 @@ class Figma(ServiceClass):
                         files.append(f["key"])
                     elif "id" in f:
                         files.append(f["id"])
-                last_files = (area_action.last_state or {}).get("files", [])
-                new_files = [f for f in files if f not in last_files]
-
-                area_action.last_state = {"files": files}
-                session.add(area_action)
-                session.commit()
+                seen = SeenIds.load(area_action.last_state, "files")
+                new_files = seen.update(files)
+                area_action.last_state = {"files": seen.to_state()}
+                save_last_state(session, area_action)
 
                 return len(new_files) > 0
             except FigmaApiError as e:
@@ -105,17 +113,15 @@ class Figma(ServiceClass):
 
                 url = f"https://api.figma.com/v1/files/{file_id}/comments"
                 headers = {"Authorization": f"Bearer {token}"}
-                r = requests.get(url, headers=headers)
+                r = http.get(url, headers=headers)
                 if r.status_code != 200:
                     raise FigmaApiError(f"Failed to get comments: {r.text}")
 
                 comments = [c["id"] for c in r.json().get("comments", [])]
-                last_comments = (area_action.last_state or {}).get("comments", [])
-                new_comments = [c for c in comments if c not in last_comments]
-
-                area_action.last_state = {"comments": comments}
-                session.add(area_action)
-                session.commit()
+                seen = SeenIds.load(area_action.last_state, "comments")
+                new_comments = seen.update(comments)
+                area_action.last_state = {"comments": seen.to_state()}
+                save_last_state(session, area_action)
 
                 return len(new_comments) > 0
             except FigmaApiError as e:
@@ -147,7 +153,7 @@ class Figma(ServiceClass):
                     "Content-Type": "application/json",
                 }
                 payload = {"message": text}
-                r = requests.post(url, headers=headers, data=json.dumps(payload))
+                r = http.post(url, headers=headers, data=json.dumps(payload))
                 if r.status_code != 200:
                     raise FigmaApiError(f"Failed to create comment: {r.text}")
 
@@ -209,7 +215,7 @@ class Figma(ServiceClass):
     def _get_user_info(self, token: str) -> Dict[str, Any]:
         url = "https://api.figma.com/v1/me"
         headers = {"Authorization": f"Bearer {token}"}
-        r = requests.get(url, headers=headers)
+        r = http.get(url, headers=headers)
         if r.status_code != 200:
             raise FigmaApiError(f"Failed to get Figma user info: {r.text}")
         return r.json()
@@ -228,7 +234,7 @@ class Figma(ServiceClass):
             "code": code,
             "redirect_uri": redirect,
         }
-        r = requests.post(url, headers=headers, data=data)
+        r = http.post(url, headers=headers, data=data)
         if r.status_code != 200:
             logger.error(f"Figma token error: {r.status_code} {r.text}")
             raise FigmaApiError("Failed to exchange code for token")
@@ -247,7 +253,14 @@ class Figma(ServiceClass):
         try:
             token_data = self._get_token(code)
             return oauth_add_link(
-                session, self.name, user, token_data.access_token, request, is_mobile
+                session,
+                self.name,
+                user,
+                token_data.access_token,
+                request,
+                is_mobile,
+                refresh_token=token_data.refresh_token,
+                expires_in=token_data.expires_in,
             )
         except FigmaApiError as e:
             raise HTTPException(status_code=400, detail=e.message)
@@ -8,7 +8,8 @@ Also provides GitHub automation service for repository and issue management.
 
 from typing import Dict, Any, List
 from services.oauth_lib import oauth_add_login, oauth_add_link
-import requests
+from services.http_client import http, async_http
+from services.http_client import Response as HttpResponse
 from urllib.parse import urlencode
 from models.users.user import User
 from models.users.user_service import UserService
@@ -25,6 +26,10 @@ from services.services_classes import (
     Action,
     Reaction,
     get_component,
+    save_last_state,
+    db_call,
+    SeenIds,
+    PollCursor,
 )
 from sqlmodel import Session
 from pydantic_core import ValidationError
@@ -60,7 +65,7 @@ class GithubOauth(oauth_service):
         base_url = "https://github.com/login/oauth/access_token"
         params = {"client_id": client_id, "client_secret": client_secret, "code": code}
 
-        r = requests.post(
+        r = http.post(
             f"{base_url}?{urlencode(params)}", headers={"Accept": "application/json"}
         )
 
@@ -75,7 +80,7 @@ class GithubOauth(oauth_service):
     def _get_email(self, token):
         """Fetch user email from GitHub API."""
         base_url = "https://api.github.com/user/emails"
-        email_r = requests.get(
+        email_r = http.get(
             f"{base_url}",
             headers={"Authorization": f"token {token}", "Accept": "application/json"},
         )
@@ -157,34 +162,24 @@ class Github(ServiceClass):
                 [],
             )
 
-        def check(self, session, area_action, user_id):
-            token = get_user_service_token(session, user_id, self.service.name)
+        async def check_async(self, session, area_action, user_id):
+            token = await db_call(
+                get_user_service_token, session, user_id, self.service.name
+            )
 
             try:
-                repositories = self.service._get_user_repositories(token)
+                repositories = await self.service._get_user_repositories(token)
             except GithubApiError as e:
                 logger.error(f"GitHub new_repository check error: {e.message}")
                 return False
 
-            repo_ids = {repo["id"] for repo in repositories}
-            previous_repo_ids = set(
-                area_action.last_state.get("repo_ids", [])
-                if area_action.last_state
-                else []
-            )
-
-            if not area_action.last_state or "repo_ids" not in area_action.last_state:
-                area_action.last_state = {"repo_ids": list(repo_ids)}
-                session.add(area_action)
-                session.commit()
-                return False
-
-            area_action.last_state = {"repo_ids": list(repo_ids)}
-            session.add(area_action)
-            session.commit()
+            seen = SeenIds.load(area_action.last_state, "repo_ids", monotonic=True)
+            first_poll = not seen.initialized
+            new_repos = seen.update(repo["id"] for repo in repositories)
+            area_action.last_state = {"repo_ids": seen.to_state()}
+            await db_call(save_last_state, session, area_action)
 
-            new_repos = repo_ids - previous_repo_ids
-            return len(new_repos) > 0
+            return not first_poll and len(new_repos) > 0
 
     class new_issue(Action):
         """Triggered when a new issue is created in a watched repository."""
@@ -201,36 +196,32 @@ class Github(ServiceClass):
                 config_schema,
             )
 
-        def check(self, session, area_action, user_id):
-            token = get_user_service_token(session, user_id, self.service.name)
+        async def check_async(self, session, area_action, user_id):
+            token = await db_call(
+                get_user_service_token, session, user_id, self.service.name
+            )
             owner = get_component(area_action.config, "Repository Owner", "values")
             repo = get_component(area_action.config, "Repository Name", "values")
 
+            cursor = self.load_cursor(area_action)
             try:
-                issues = self.service._get_repository_issues(token, owner, repo)
+                issues = await self.service._get_repository_issues(
+                    token, owner, repo, cursor
+                )
             except GithubApiError as e:
                 logger.error(f"GitHub new_issue check error: {e.message}")
                 return False
-
-            issue_ids = {issue["id"] for issue in issues}
-            previous_issue_ids = set(
-                area_action.last_state.get("issue_ids", [])
-                if area_action.last_state
-                else []
-            )
-
-            if not area_action.last_state or "issue_ids" not in area_action.last_state:
-                area_action.last_state = {"issue_ids": list(issue_ids)}
-                session.add(area_action)
-                session.commit()
+            if issues is None:
                 return False
 
-            area_action.last_state = {"issue_ids": list(issue_ids)}
-            session.add(area_action)
-            session.commit()
+            seen = SeenIds.load(area_action.last_state, "issue_ids", monotonic=True)
+            first_poll = not seen.initialized
+            new_issues = seen.update(issue["id"] for issue in issues)
+            created = [issue.get("created_at") or "" for issue in issues]
+            cursor.since = max([cursor.since or "", *created]) or None
+            await db_call(cursor.save, session, area_action, issue_ids=seen.to_state())
 
-            new_issues = issue_ids - previous_issue_ids
-            return len(new_issues) > 0
+            return not first_poll and len(new_issues) > 0
 
     class new_pull_request(Action):
         """Triggered when a new pull request is created in a watched repository."""
@@ -247,36 +238,30 @@ class Github(ServiceClass):
                 config_schema,
             )
 
-        def check(self, session, area_action, user_id):
-            token = get_user_service_token(session, user_id, self.service.name)
+        async def check_async(self, session, area_action, user_id):
+            token = await db_call(
+                get_user_service_token, session, user_id, self.service.name
+            )
             owner = get_component(area_action.config, "Repository Owner", "values")
             repo = get_component(area_action.config, "Repository Name", "values")
 
+            cursor = self.load_cursor(area_action)
             try:
-                pulls = self.service._get_repository_pulls(token, owner, repo)
+                pulls = await self.service._get_repository_pulls(
+                    token, owner, repo, cursor
+                )
             except GithubApiError as e:
                 logger.error(f"GitHub new_pull_request check error: {e.message}")
                 return False
-
-            pr_ids = {pr["id"] for pr in pulls}
-            previous_pr_ids = set(
-                area_action.last_state.get("pr_ids", [])
-                if area_action.last_state
-                else []
-            )
-
-            if not area_action.last_state or "pr_ids" not in area_action.last_state:
-                area_action.last_state = {"pr_ids": list(pr_ids)}
-                session.add(area_action)
-                session.commit()
+            if pulls is None:
                 return False
 
-            area_action.last_state = {"pr_ids": list(pr_ids)}
-            session.add(area_action)
-            session.commit()
+            seen = SeenIds.load(area_action.last_state, "pr_ids", monotonic=True)
+            first_poll = not seen.initialized
+            new_prs = seen.update(pr["id"] for pr in pulls)
+            await db_call(cursor.save, session, area_action, pr_ids=seen.to_state())
 
-            new_prs = pr_ids - previous_pr_ids
-            return len(new_prs) > 0
+            return not first_poll and len(new_prs) > 0
 
     class repo_star_threshold(Action):
         """Triggered when a repository reaches a star count threshold."""
@@ -294,8 +279,10 @@ class Github(ServiceClass):
                 config_schema,
             )
 
-        def check(self, session, area_action, user_id):
-            token = get_user_service_token(session, user_id, self.service.name)
+        async def check_async(self, session, area_action, user_id):
+            token = await db_call(
+                get_user_service_token, session, user_id, self.service.name
+            )
             owner = get_component(area_action.config, "Repository Owner", "values")
             repo = get_component(area_action.config, "Repository Name", "values")
             threshold_str = get_component(
@@ -309,7 +296,7 @@ class Github(ServiceClass):
                 return False
 
             try:
-                repo_data = self.service._get_repository(token, owner, repo)
+                repo_data = await self.service._get_repository(token, owner, repo)
             except GithubApiError as e:
                 logger.error(f"GitHub repo_star_threshold check error: {e.message}")
                 return False
@@ -323,13 +310,11 @@ class Github(ServiceClass):
 
             if current_stars >= threshold and not previous_triggered:
                 area_action.last_state = {"triggered": True}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
                 return True
 
             area_action.last_state = {"triggered": previous_triggered}
-            session.add(area_action)
-            session.commit()
+            await db_call(save_last_state, session, area_action)
             return False
 
     class create_issue(Reaction):
@@ -426,7 +411,7 @@ class Github(ServiceClass):
         base_url = "https://github.com/login/oauth/access_token"
         params = {"client_id": client_id, "client_secret": client_secret, "code": code}
 
-        r = requests.post(
+        r = http.post(
             f"{base_url}?{urlencode(params)}", headers={"Accept": "application/json"}
         )
 
@@ -446,7 +431,7 @@ class Github(ServiceClass):
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28",
         }
-        r = requests.get(url, headers=headers)
+        r = http.get(url, headers=headers)
 
         if r.status_code != 200:
             raise GithubApiError(f"Failed to retrieve user info: {r.text}")
@@ -461,6 +446,25 @@ class Github(ServiceClass):
         except GithubApiError:
             return False
 
+    def _github_headers(self, token: str) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+
+    def _parse_github_response(
+        self, r: HttpResponse, return_list: bool = False
+    ) -> Dict[str, Any] | List[Dict[str, Any]]:
+        if r.status_code not in [200, 201, 204]:
+            raise GithubApiError(f"GitHub API error: {r.status_code} - {r.text}")
+
+        if not r.text:
+            return [] if return_list else {}
+
+        result = r.json()
+        return result if return_list or isinstance(result, list) else result
+
     def _make_github_request(
         self,
         token: str,
@@ -471,62 +475,80 @@ class Github(ServiceClass):
     ) -> Dict[str, Any] | List[Dict[str, Any]]:
         """Make authenticated GitHub API request."""
         url = f"https://api.github.com{endpoint}"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/vnd.github+json",
-            "X-GitHub-Api-Version": "2022-11-28",
-        }
+        headers = self._github_headers(token)
 
         if method == "GET":
-            r = requests.get(url, headers=headers)
+            r = http.get(url, headers=headers)
         elif method == "POST":
-            r = requests.post(url, headers=headers, json=data)
+            r = http.post(url, headers=headers, json=data)
         elif method == "PUT":
-            r = requests.put(url, headers=headers, json=data)
+            r = http.put(url, headers=headers, json=data)
         else:
             raise GithubApiError(f"Unsupported HTTP method: {method}")
 
-        if r.status_code not in [200, 201, 204]:
-            raise GithubApiError(f"GitHub API error: {r.status_code} - {r.text}")
-
-        if not r.text:
-            return [] if return_list else {}
-
-        result = r.json()
-        return result if return_list or isinstance(result, list) else result
+        return self._parse_github_response(r, return_list)
 
-    def _get_user_repositories(self, token: str) -> List[Dict[str, Any]]:
+    async def _make_github_get_async(
+        self,
+        token: str,
+        endpoint: str,
+        return_list: bool = False,
+        cursor: PollCursor | None = None,
+    ) -> Dict[str, Any] | List[Dict[str, Any]] | None:
+        """Non-blocking authenticated GitHub API GET request.
+
+        With a cursor the request is conditional and returns None when the
+        resource did not change; such 304s do not count against the rate limit.
+        """
+        headers = self._github_headers(token)
+        if cursor is not None:
+            headers.update(cursor.conditional_headers())
+        r = await async_http.get(f"https://api.github.com{endpoint}", headers=headers)
+        if cursor is not None and cursor.not_modified(r):
+            return None
+        return self._parse_github_response(r, return_list)
+
+    async def _get_user_repositories(self, token: str) -> List[Dict[str, Any]]:
         """Fetch all repositories for the authenticated user."""
-        result = self._make_github_request(
+        result = await self._make_github_get_async(
             token, "/user/repos?sort=created&per_page=100", return_list=True
         )
         return result if isinstance(result, list) else []
 
-    def _get_repository_issues(
-        self, token: str, owner: str, repo: str
-    ) -> List[Dict[str, Any]]:
-        """Fetch issues for a specific repository."""
-        result = self._make_github_request(
+    async def _get_repository_issues(
+        self, token: str, owner: str, repo: str, cursor: PollCursor | None = None
+    ) -> List[Dict[str, Any]] | None:
+        """Fetch issues for a specific repository, None if unchanged since the cursor."""
+        params = {"state": "all", "per_page": 100}
+        if cursor is not None and cursor.since:
+            params["since"] = cursor.since
+        result = await self._make_github_get_async(
             token,
-            f"/repos/{owner}/{repo}/issues?state=all&per_page=100",
+            f"/repos/{owner}/{repo}/issues?{urlencode(params)}",
             return_list=True,
+            cursor=cursor,
         )
+        if result is None:
+            return None
         return result if isinstance(result, list) else []
 
-    def _get_repository_pulls(
-        self, token: str, owner: str, repo: str
-    ) -> List[Dict[str, Any]]:
-        """Fetch pull requests for a specific repository."""
-        result = self._make_github_request(
+    async def _get_repository_pulls(
+        self, token: str, owner: str, repo: str, cursor: PollCursor | None = None
+    ) -> List[Dict[str, Any]] | None:
+        """Fetch pull requests for a specific repository, None if unchanged since the cursor."""
+        result = await self._make_github_get_async(
             token,
             f"/repos/{owner}/{repo}/pulls?state=all&per_page=100",
             return_list=True,
+            cursor=cursor,
         )
+        if result is None:
+            return None
         return result if isinstance(result, list) else []
 
-    def _get_repository(self, token: str, owner: str, repo: str) -> Dict[str, Any]:
+    async def _get_repository(self, token: str, owner: str, repo: str) -> Dict[str, Any]:
         """Fetch details for a specific repository."""
-        result = self._make_github_request(token, f"/repos/{owner}/{repo}")
+        result = await self._make_github_get_async(token, f"/repos/{owner}/{repo}")
         return result if isinstance(result, dict) else {}
 
     def _create_issue(
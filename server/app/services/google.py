@@ -2,7 +2,7 @@ from sqlmodel import Session
 from pydantic import BaseModel
 from pydantic_core import ValidationError
 from sqlmodel import select
-import requests
+from services.http_client import http
 from urllib.parse import urlencode
 from fastapi import HTTPException, Response, Request
 from typing import Dict, Any, List
@@ -12,6 +12,7 @@ from email.mime.text import MIMEText
 from core.utils import generate_state
 from core.categories import ServiceCategory
 from services.oauth_lib import oauth_add_link, oauth_add_login
+from services.token_manager import TokenEndpoint
 from models import AreaAction, UserService, AreaReaction, User, Service
 from core.config import settings
 from services.services_classes import (
@@ -19,6 +20,7 @@ from services.services_classes import (
     Action,
     Reaction,
     get_component,
+    save_last_state,
 )
 from core.logger import logger
 from services.services_classes import oauth_service
@@ -58,7 +60,7 @@ class GoogleOauth(oauth_service):
             "grant_type": "authorization_code",
             "redirect_uri": redirect,
         }
-        r = requests.post(base_url, data=params)
+        r = http.post(base_url, data=params)
         if r.status_code != 200:
             raise GoogleApiError("Failed to retrieve Google token")
         try:
@@ -68,7 +70,7 @@ class GoogleOauth(oauth_service):
 
     def _get_user_info(self, token: str) -> Dict[str, Any]:
         url = "https://www.googleapis.com/oauth2/v2/userinfo"
-        r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+        r = http.get(url, headers={"Authorization": f"Bearer {token}"})
         if r.status_code != 200:
             raise GoogleApiError("Failed to fetch user info")
         return r.json()
@@ -123,6 +125,12 @@ class Gmail(ServiceClass):
     Supports filtering by sender, subject, and custom content.
     """
 
+    token_endpoint = TokenEndpoint(
+        "https://oauth2.googleapis.com/token",
+        settings.GOOGLE_CLIENT_ID,
+        settings.GOOGLE_CLIENT_SECRET,
+    )
+
     class new_email_sent(Action):
         """Trigger when new email is sent."""
 
@@ -239,7 +247,7 @@ class Gmail(ServiceClass):
             "grant_type": "authorization_code",
             "redirect_uri": redirect,
         }
-        r = requests.post(base_url, data=params)
+        r = http.post(base_url, data=params)
         if r.status_code != 200:
             raise GoogleApiError("Failed to retrieve Google token")
         try:
@@ -249,7 +257,7 @@ class Gmail(ServiceClass):
 
     def _get_user_info(self, token: str) -> Dict[str, Any]:
         url = "https://www.googleapis.com/oauth2/v2/userinfo"
-        r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+        r = http.get(url, headers={"Authorization": f"Bearer {token}"})
         if r.status_code != 200:
             raise GoogleApiError("Failed to fetch user info")
         return r.json()
@@ -262,8 +270,7 @@ class Gmail(ServiceClass):
     ) -> bool:
         if not area_action.last_state:
             area_action.last_state = message if message else None
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return False
         if message is None:
             return False
@@ -278,8 +285,7 @@ class Gmail(ServiceClass):
         if last_state_values == message_values:
             return False
         area_action.last_state = message
-        session.add(area_action)
-        session.commit()
+        save_last_state(session, area_action)
         return True
 
     def _get_latest_email(
@@ -297,7 +303,7 @@ class Gmail(ServiceClass):
         if subject_filter:
             query += f"subject:{subject_filter}"
         params = {"maxResults": 1, "q": query}
-        r = requests.get(
+        r = http.get(
             base_url, headers={"Authorization": f"Bearer {token}"}, params=params
         )
         if r.status_code != 200:
@@ -309,7 +315,7 @@ class Gmail(ServiceClass):
 
         msg_id = messages[0]["id"]
         detail_url = f"{base_url}/{msg_id}"
-        detail = requests.get(
+        detail = http.get(
             detail_url,
             headers={"Authorization": f"Bearer {token}"},
             params={"format": "metadata"},
@@ -327,7 +333,7 @@ class Gmail(ServiceClass):
         raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
         payload = {"raw": raw}
         url = "https://gmail.googleapis.com/gmail/v1/users/me/messages/send"
-        r = requests.post(
+        r = http.post(
             url,
             headers={
                 "Authorization": f"Bearer {token}",
@@ -367,5 +373,12 @@ class Gmail(ServiceClass):
             raise HTTPException(status_code=400, detail=e.message)
 
         return oauth_add_link(
-            session, self.name, user, token_res.access_token, request, is_mobile
+            session,
+            self.name,
+            user,
+            token_res.access_token,
+            request,
+            is_mobile,
+            refresh_token=token_res.refresh_token,
+            expires_in=token_res.expires_in,
         )
@@ -2,13 +2,14 @@ from sqlmodel import Session
 from pydantic import BaseModel
 from pydantic_core import ValidationError
 from sqlmodel import select
-import requests
+from services.http_client import http
 from urllib.parse import urlencode
 from fastapi import HTTPException, Response, Request
 from typing import Dict, Any, List
 
 from core.utils import generate_state
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint
 from models import AreaAction, UserService, User, Service
 from core.config import settings
 from services.services_classes import (
@@ -16,6 +17,7 @@ from services.services_classes import (
     Action,
     Reaction,
     get_component,
+    save_last_state,
 )
 from core.logger import logger
 from api.users.db import get_user_service_token
@@ -40,6 +42,12 @@ class GoogleCalendarApiError(Exception):
 
 
 class GoogleCalendar(ServiceClass):
+    token_endpoint = TokenEndpoint(
+        "https://oauth2.googleapis.com/token",
+        settings.GOOGLE_CLIENT_ID,
+        settings.GOOGLE_CLIENT_SECRET,
+    )
+
     def __init__(self) -> None:
         super().__init__(
             "Service email de Google",
@@ -67,7 +75,7 @@ class GoogleCalendar(ServiceClass):
                 calendar_id: int = self.service._find_calendar_id(token, calendar_name)
                 url = f"https://www.googleapis.com/calendar/v3/calendars/{calendar_id}/events"
                 headers = {"Authorization": f"Bearer {token}"}
-                r = requests.get(url, headers=headers)
+                r = http.get(url, headers=headers)
                 if r.status_code != 200:
                     raise GoogleCalendarApiError(
                         f"Failed to fetch calendar events: {r.text}"
@@ -124,7 +132,7 @@ class GoogleCalendar(ServiceClass):
                     "start": {"date": start_time},
                     "end": {"date": end_time},
                 }
-                r = requests.post(url, headers=headers, json=body)
+                r = http.post(url, headers=headers, json=body)
                 if r.status_code != 200:
                     raise GoogleCalendarApiError(f"Failed to create event: {r.text}")
                 logger.info(
@@ -183,7 +191,7 @@ class GoogleCalendar(ServiceClass):
                     "start": {"dateTime": start_time},
                     "end": {"dateTime": end_time},
                 }
-                r = requests.post(url, headers=headers, json=body)
+                r = http.post(url, headers=headers, json=body)
                 if r.status_code != 200:
                     raise GoogleCalendarApiError(f"Failed to create event: {r.text}")
                 logger.info(
@@ -196,7 +204,7 @@ class GoogleCalendar(ServiceClass):
         url = "https://www.googleapis.com/calendar/v3/users/me/calendarList"
         headers = {"Authorization": f"Bearer {access_token}"}
         params = {"minAccessRole": "reader", "maxResults": 250}
-        r = requests.get(url, headers=headers, params=params)
+        r = http.get(url, headers=headers, params=params)
         data = r.json()
         return data.get("items", [])
 
@@ -218,14 +226,12 @@ class GoogleCalendar(ServiceClass):
         """Check if the data is new compared to the last stored one."""
         if not area_action.last_state:
             area_action.last_state = data
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return False
 
         if data and data["id"] != area_action.last_state.get("id"):
             area_action.last_state = data
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return True
         return False
 
@@ -264,7 +270,7 @@ class GoogleCalendar(ServiceClass):
             "grant_type": "authorization_code",
             "redirect_uri": redirect,
         }
-        r = requests.post(base_url, data=params)
+        r = http.post(base_url, data=params)
         if r.status_code != 200:
             raise GoogleCalendarApiError("Failed to retrieve Google token")
         try:
@@ -274,7 +280,7 @@ class GoogleCalendar(ServiceClass):
 
     def _get_user_info(self, token: str) -> Dict[str, Any]:
         url = "https://www.googleapis.com/oauth2/v2/userinfo"
-        r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+        r = http.get(url, headers={"Authorization": f"Bearer {token}"})
         if r.status_code != 200:
             raise GoogleCalendarApiError("Failed to fetch user info")
         return r.json()
@@ -308,5 +314,12 @@ class GoogleCalendar(ServiceClass):
             raise HTTPException(status_code=400, detail=e.message)
 
         return oauth_add_link(
-            session, self.name, user, token_res.access_token, request, is_mobile
+            session,
+            self.name,
+            user,
+            token_res.access_token,
+            request,
+            is_mobile,
+            refresh_token=token_res.refresh_token,
+            expires_in=token_res.expires_in,
         )
@@ -0,0 +1,182 @@
+"""Shared HTTP client for all service integrations.
+
+Every upstream host gets its own keep-alive connection pool, so polls
+reuse TCP/TLS connections instead of opening a new one per request.
+All requests get a default timeout and follow redirects, like the
+`requests` module functions the services used before. HTTP/2 is used
+when enabled in the settings and the optional `h2` package is installed.
+
+Requests go through the per-service rate limiter (services.rate_limit):
+they wait for their budget, or fail with `RateLimitedError` when the
+upstream asked to back off for longer.
+
+`async_http` is the non-blocking counterpart used by async action checks.
+Its clients are bound to the service I/O loop (core.event_loop) and must
+only be used from coroutines running there.
+"""
+
+import asyncio
+import time
+from threading import Lock
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+from core.config import settings
+from core.logger import logger
+from services.rate_limit import rate_limiter
+
+HttpError = httpx.HTTPError
+Response = httpx.Response
+
+
+def _http2_available() -> bool:
+    if not settings.HTTP_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("HTTP_HTTP2 is enabled but 'h2' is not installed")
+        return False
+    return True
+
+
+def _host_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _client_options(pool_size: int) -> Dict[str, Any]:
+    return {
+        "follow_redirects": True,
+        "timeout": httpx.Timeout(
+            settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT
+        ),
+        "limits": httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=pool_size,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def _request_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Translate `requests` style keyword arguments to httpx ones."""
+    data = kwargs.get("data")
+    if isinstance(data, (str, bytes)):
+        kwargs["content"] = kwargs.pop("data")
+    if kwargs.get("timeout") is None:
+        kwargs.pop("timeout", None)
+    return kwargs
+
+
+class HttpClient:
+    """Lazily creates one pooled httpx.Client per upstream host."""
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, httpx.Client] = {}
+        self._lock = Lock()
+        self._http2 = _http2_available()
+
+    def _client_for(self, url: str) -> httpx.Client:
+        host = _host_of(url)
+        client = self._clients.get(host)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(host)
+            if client is None:
+                client = httpx.Client(
+                    http2=self._http2, **_client_options(settings.HTTP_POOL_SIZE)
+                )
+                self._clients[host] = client
+            return client
+
+    def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request; accepts the `requests` style keyword arguments."""
+        key = rate_limiter.key_for(url, kwargs)
+        wait = rate_limiter.acquire(key)
+        if wait > 0:
+            time.sleep(wait)
+        response = self._client_for(url).request(
+            method, url, **_request_kwargs(kwargs)
+        )
+        rate_limiter.observe(key, response)
+        return response
+
+    def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+class AsyncHttpClient:
+    """Lazily creates one pooled httpx.AsyncClient per upstream host."""
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._http2 = _http2_available()
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        host = _host_of(url)
+        client = self._clients.get(host)
+        if client is None:
+            client = httpx.AsyncClient(
+                http2=self._http2, **_client_options(settings.HTTP_ASYNC_POOL_SIZE)
+            )
+            self._clients[host] = client
+        return client
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request; accepts the `requests` style keyword arguments."""
+        key = rate_limiter.key_for(url, kwargs)
+        wait = rate_limiter.acquire(key)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        response = await self._client_for(url).request(
+            method, url, **_request_kwargs(kwargs)
+        )
+        rate_limiter.observe(key, response)
+        return response
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+http = HttpClient()
+async_http = AsyncHttpClient()
@@ -1,4 +1,4 @@
-import requests
+from services.http_client import async_http
 from sqlmodel import Session
 from typing import Dict, Any, List
 import xml.etree.ElementTree as ET
@@ -10,8 +10,11 @@ from services.services_classes import (
     Service as ServiceClass,
     Action,
     get_component,
+    save_last_state,
+    db_call,
 )
 from services.area_api import AreaApi
+from services.fetch_cache import fetch_cache
 from models import AreaAction
 
 
@@ -30,20 +33,20 @@ class IGNApi(AreaApi):
         super().__init__(IGNApiError)
         self.base_url = "https://www.ign.com"
 
-    def get_articles(self, count: int = 10) -> List[Dict[str, Any]]:
-        """Get latest articles from IGN RSS feed."""
+    async def _fetch_feed(self, feed: str) -> List[Dict[str, Any]]:
+        """Download and parse one IGN RSS feed."""
         try:
-            url = f"{self.base_url}/rss/articles"
-            response = requests.get(url, timeout=10)
+            url = f"{self.base_url}/rss/{feed}"
+            response = await async_http.get(url)
 
             if response.status_code != 200:
-                raise IGNApiError(f"Failed to fetch articles: {response.status_code}")
+                raise IGNApiError(f"Failed to fetch {feed}: {response.status_code}")
 
             root = ET.fromstring(response.content)
-            articles = []
+            items = []
 
-            for item in root.findall(".//item")[:count]:
-                article = {
+            for item in root.findall(".//item"):
+                entry = {
                     "title": item.find("title").text
                     if item.find("title") is not None
                     else "",
@@ -60,127 +63,38 @@ class IGNApi(AreaApi):
                     if item.find("guid") is not None
                     else "",
                 }
-                articles.append(article)
+                items.append(entry)
 
-            return articles
+            return items
+        except IGNApiError:
+            raise
         except ET.ParseError as e:
             raise IGNApiError(f"Failed to parse RSS feed: {str(e)}")
         except Exception as e:
-            raise IGNApiError(f"Error fetching articles: {str(e)}")
-
-    def get_reviews(self, count: int = 10) -> List[Dict[str, Any]]:
-        """Get latest reviews from IGN RSS feed."""
-        try:
-            url = f"{self.base_url}/rss/reviews"
-            response = requests.get(url, timeout=10)
-
-            if response.status_code != 200:
-                raise IGNApiError(f"Failed to fetch reviews: {response.status_code}")
+            raise IGNApiError(f"Error fetching {feed}: {str(e)}")
 
-            root = ET.fromstring(response.content)
-            reviews = []
+    async def _get_feed(self, feed: str, count: int) -> List[Dict[str, Any]]:
+        """Get the latest items of a feed, fetched once for all subscribers."""
+        items = await fetch_cache.get_or_fetch_async(
+            "IGN", "rss", feed, lambda: self._fetch_feed(feed)
+        )
+        return items[:count]
 
-            for item in root.findall(".//item")[:count]:
-                review = {
-                    "title": item.find("title").text
-                    if item.find("title") is not None
-                    else "",
-                    "link": item.find("link").text
-                    if item.find("link") is not None
-                    else "",
-                    "description": item.find("description").text
-                    if item.find("description") is not None
-                    else "",
-                    "pub_date": item.find("pubDate").text
-                    if item.find("pubDate") is not None
-                    else "",
-                    "guid": item.find("guid").text
-                    if item.find("guid") is not None
-                    else "",
-                }
-                reviews.append(review)
+    async def get_articles(self, count: int = 10) -> List[Dict[str, Any]]:
+        """Get latest articles from IGN RSS feed."""
+        return await self._get_feed("articles", count)
 
-            return reviews
-        except ET.ParseError as e:
-            raise IGNApiError(f"Failed to parse RSS feed: {str(e)}")
-        except Exception as e:
-            raise IGNApiError(f"Error fetching reviews: {str(e)}")
+    async def get_reviews(self, count: int = 10) -> List[Dict[str, Any]]:
+        """Get latest reviews from IGN RSS feed."""
+        return await self._get_feed("reviews", count)
 
-    def get_videos(self, count: int = 10) -> List[Dict[str, Any]]:
+    async def get_videos(self, count: int = 10) -> List[Dict[str, Any]]:
         """Get latest videos from IGN RSS feed."""
-        try:
-            url = f"{self.base_url}/rss/videos"
-            response = requests.get(url, timeout=10)
-
-            if response.status_code != 200:
-                raise IGNApiError(f"Failed to fetch videos: {response.status_code}")
-
-            root = ET.fromstring(response.content)
-            videos = []
+        return await self._get_feed("videos", count)
 
-            for item in root.findall(".//item")[:count]:
-                video = {
-                    "title": item.find("title").text
-                    if item.find("title") is not None
-                    else "",
-                    "link": item.find("link").text
-                    if item.find("link") is not None
-                    else "",
-                    "description": item.find("description").text
-                    if item.find("description") is not None
-                    else "",
-                    "pub_date": item.find("pubDate").text
-                    if item.find("pubDate") is not None
-                    else "",
-                    "guid": item.find("guid").text
-                    if item.find("guid") is not None
-                    else "",
-                }
-                videos.append(video)
-
-            return videos
-        except ET.ParseError as e:
-            raise IGNApiError(f"Failed to parse RSS feed: {str(e)}")
-        except Exception as e:
-            raise IGNApiError(f"Error fetching videos: {str(e)}")
-
-    def get_news(self, count: int = 10) -> List[Dict[str, Any]]:
+    async def get_news(self, count: int = 10) -> List[Dict[str, Any]]:
         """Get latest news from IGN RSS feed."""
-        try:
-            url = f"{self.base_url}/rss/news"
-            response = requests.get(url, timeout=10)
-
-            if response.status_code != 200:
-                raise IGNApiError(f"Failed to fetch news: {response.status_code}")
-
-            root = ET.fromstring(response.content)
-            news_items = []
-
-            for item in root.findall(".//item")[:count]:
-                news = {
-                    "title": item.find("title").text
-                    if item.find("title") is not None
-                    else "",
-                    "link": item.find("link").text
-                    if item.find("link") is not None
-                    else "",
-                    "description": item.find("description").text
-                    if item.find("description") is not None
-                    else "",
-                    "pub_date": item.find("pubDate").text
-                    if item.find("pubDate") is not None
-                    else "",
-                    "guid": item.find("guid").text
-                    if item.find("guid") is not None
-                    else "",
-                }
-                news_items.append(news)
-
-            return news_items
-        except ET.ParseError as e:
-            raise IGNApiError(f"Failed to parse RSS feed: {str(e)}")
-        except Exception as e:
-            raise IGNApiError(f"Error fetching news: {str(e)}")
+        return await self._get_feed("news", count)
 
 
 ign_api = IGNApi()
@@ -217,7 +131,7 @@ class IGN(ServiceClass):
                 "*/10 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -228,7 +142,7 @@ class IGN(ServiceClass):
                     else []
                 )
 
-                articles = ign_api.get_articles(count=5)
+                articles = await ign_api.get_articles(count=5)
 
                 if not articles:
                     return False
@@ -237,8 +151,7 @@ class IGN(ServiceClass):
 
                 if not area_action.last_state or "guid" not in area_action.last_state:
                     area_action.last_state = {"guid": latest_article["guid"]}
-                    session.add(area_action)
-                    session.commit()
+                    await db_call(save_last_state, session, area_action)
                     return False
 
                 if latest_article["guid"] == area_action.last_state.get("guid"):
@@ -253,13 +166,11 @@ class IGN(ServiceClass):
                         for keyword in keywords
                     ):
                         area_action.last_state = {"guid": latest_article["guid"]}
-                        session.add(area_action)
-                        session.commit()
+                        await db_call(save_last_state, session, area_action)
                         return False
 
                 area_action.last_state = {"guid": latest_article["guid"]}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
                 return True
 
             except IGNApiError as e:
@@ -288,7 +199,7 @@ class IGN(ServiceClass):
                 "*/15 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -299,7 +210,7 @@ class IGN(ServiceClass):
                     else []
                 )
 
-                reviews = ign_api.get_reviews(count=5)
+                reviews = await ign_api.get_reviews(count=5)
 
                 if not reviews:
                     return False
@@ -308,8 +219,7 @@ class IGN(ServiceClass):
 
                 if not area_action.last_state or "guid" not in area_action.last_state:
                     area_action.last_state = {"guid": latest_review["guid"]}
-                    session.add(area_action)
-                    session.commit()
+                    await db_call(save_last_state, session, area_action)
                     return False
 
                 if latest_review["guid"] == area_action.last_state.get("guid"):
@@ -324,13 +234,11 @@ class IGN(ServiceClass):
                         for keyword in keywords
                     ):
                         area_action.last_state = {"guid": latest_review["guid"]}
-                        session.add(area_action)
-                        session.commit()
+                        await db_call(save_last_state, session, area_action)
                         return False
 
                 area_action.last_state = {"guid": latest_review["guid"]}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
                 return True
 
             except IGNApiError as e:
@@ -359,7 +267,7 @@ class IGN(ServiceClass):
                 "*/10 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -370,7 +278,7 @@ class IGN(ServiceClass):
                     else []
                 )
 
-                videos = ign_api.get_videos(count=5)
+                videos = await ign_api.get_videos(count=5)
 
                 if not videos:
                     return False
@@ -379,8 +287,7 @@ class IGN(ServiceClass):
 
                 if not area_action.last_state or "guid" not in area_action.last_state:
                     area_action.last_state = {"guid": latest_video["guid"]}
-                    session.add(area_action)
-                    session.commit()
+                    await db_call(save_last_state, session, area_action)
                     return False
 
                 if latest_video["guid"] == area_action.last_state.get("guid"):
@@ -395,13 +302,11 @@ class IGN(ServiceClass):
                         for keyword in keywords
                     ):
                         area_action.last_state = {"guid": latest_video["guid"]}
-                        session.add(area_action)
-                        session.commit()
+                        await db_call(save_last_state, session, area_action)
                         return False
 
                 area_action.last_state = {"guid": latest_video["guid"]}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
                 return True
 
             except IGNApiError as e:
@@ -430,7 +335,7 @@ class IGN(ServiceClass):
                 "*/10 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -441,7 +346,7 @@ class IGN(ServiceClass):
                     else []
                 )
 
-                news_items = ign_api.get_news(count=5)
+                news_items = await ign_api.get_news(count=5)
 
                 if not news_items:
                     return False
@@ -450,8 +355,7 @@ class IGN(ServiceClass):
 
                 if not area_action.last_state or "guid" not in area_action.last_state:
                     area_action.last_state = {"guid": latest_news["guid"]}
-                    session.add(area_action)
-                    session.commit()
+                    await db_call(save_last_state, session, area_action)
                     return False
 
                 if latest_news["guid"] == area_action.last_state.get("guid"):
@@ -466,13 +370,11 @@ class IGN(ServiceClass):
                         for keyword in keywords
                     ):
                         area_action.last_state = {"guid": latest_news["guid"]}
-                        session.add(area_action)
-                        session.commit()
+                        await db_call(save_last_state, session, area_action)
                         return False
 
                 area_action.last_state = {"guid": latest_news["guid"]}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
                 return True
 
             except IGNApiError as e:
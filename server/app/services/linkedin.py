@@ -4,7 +4,7 @@ Provides LinkedIn automation service for professional networking and content man
 """
 
 from typing import Dict, Any, List
-import requests
+from services.http_client import http
 from urllib.parse import urlencode
 from pydantic import BaseModel
 from pydantic_core import ValidationError
@@ -16,6 +16,7 @@ from services.services_classes import (
     Action,
     Reaction,
     get_component,
+    save_last_state,
 )
 from services.oauth_lib import oauth_add_link
 from api.users.db import get_user_service_token
@@ -98,15 +99,13 @@ class LinkedIn(ServiceClass):
 
             if not area_action.last_state or "post_ids" not in area_action.last_state:
                 area_action.last_state = {"post_ids": list(current_post_ids)}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
                 return False
 
             previous_post_ids = set(area_action.last_state.get("post_ids", []))
 
             area_action.last_state = {"post_ids": list(current_post_ids)}
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
 
             new_posts = current_post_ids - previous_post_ids
             return len(new_posts) > 0
@@ -140,15 +139,13 @@ class LinkedIn(ServiceClass):
 
             if not area_action.last_state:
                 area_action.last_state = {"request_ids": list(current_request_ids)}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
                 return False
 
             previous_request_ids = set(area_action.last_state.get("request_ids", []))
 
             area_action.last_state = {"request_ids": list(current_request_ids)}
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
 
             new_requests = current_request_ids - previous_request_ids
             return len(new_requests) > 0
@@ -198,16 +195,14 @@ class LinkedIn(ServiceClass):
 
             if current_views >= threshold and not already_triggered:
                 area_action.last_state = {"triggered": True, "views": current_views}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
                 return True
 
             area_action.last_state = {
                 "triggered": already_triggered,
                 "views": current_views,
             }
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return False
 
     class share_post(Reaction):
@@ -328,7 +323,7 @@ class LinkedIn(ServiceClass):
             "Content-Type": "application/json",
         }
 
-        r = requests.request(method, url, headers=headers, json=data)
+        r = http.request(method, url, headers=headers, json=data)
 
         if r.status_code not in [200, 201, 204]:
             logger.error(f"LinkedIn API error: {r.status_code} - {r.text}")
@@ -523,7 +518,7 @@ class LinkedIn(ServiceClass):
             "redirect_uri": redirect,
         }
 
-        r = requests.post(
+        r = http.post(
             base_url,
             data=data,
             headers={"Content-Type": "application/x-www-form-urlencoded"},
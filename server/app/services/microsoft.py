@@ -1,7 +1,7 @@
 from sqlmodel import Session
 from pydantic import BaseModel
 from sqlmodel import select
-import requests
+from services.http_client import http
 from urllib.parse import urlencode
 from fastapi import HTTPException, Response, Request
 from typing import Dict, Any
@@ -10,6 +10,7 @@ import json
 from core.utils import generate_state
 from core.categories import ServiceCategory
 from services.oauth_lib import oauth_add_link, oauth_add_login
+from services.token_manager import TokenEndpoint
 from models import AreaAction, UserService, AreaReaction, User, Service
 from core.config import settings
 from services.services_classes import (
@@ -17,6 +18,7 @@ from services.services_classes import (
     Action,
     Reaction,
     get_component,
+    save_last_state,
 )
 from core.logger import logger
 from services.services_classes import oauth_service
@@ -56,14 +58,14 @@ class MicrosoftOauth(oauth_service):
             "redirect_uri": redirect,
             "grant_type": "authorization_code",
         }
-        r = requests.post(url, data=data)
+        r = http.post(url, data=data)
         if r.status_code != 200:
             raise MicrosoftApiError(f"Failed to get Microsoft token: {r.text}")
         return MicrosoftOAuthTokenRes(**r.json())
 
     def _get_user_info(self, token: str) -> Dict[str, Any]:
         url = "https://graph.microsoft.com/v1.0/me"
-        r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+        r = http.get(url, headers={"Authorization": f"Bearer {token}"})
         if r.status_code != 200:
             raise MicrosoftApiError("Failed to get Microsoft user info")
         data = r.json()
@@ -115,6 +117,12 @@ class MicrosoftOauth(oauth_service):
 class Outlook(ServiceClass):
     """Outlook services automation."""
 
+    token_endpoint = TokenEndpoint(
+        f"https://login.microsoftonline.com/{settings.MICROSOFT_DIR_TENANT}/oauth2/v2.0/token",
+        settings.MICROSOFT_CLIENT_ID,
+        settings.MICROSOFT_CLIENT_SECRET,
+    )
+
     def __init__(self) -> None:
         super().__init__(
             "Microsoft Outlook Service",
@@ -202,7 +210,7 @@ class Outlook(ServiceClass):
                         "toRecipients": [{"emailAddress": {"address": to}}],
                     }
                 }
-                r = requests.post(url, headers=headers, data=json.dumps(payload))
+                r = http.post(url, headers=headers, data=json.dumps(payload))
                 logger.error(r.status_code)
                 if r.status_code != 202:
                     raise MicrosoftApiError("Failed to send email")
@@ -246,7 +254,7 @@ class Outlook(ServiceClass):
             "redirect_uri": redirect,
             "grant_type": "authorization_code",
         }
-        r = requests.post(url, data=data)
+        r = http.post(url, data=data)
         if r.status_code != 200:
             raise MicrosoftApiError(f"Failed to get Microsoft token: {r.text}")
         return MicrosoftOAuthTokenRes(**r.json())
@@ -259,8 +267,7 @@ class Outlook(ServiceClass):
     ) -> bool:
         if not area_action.last_state:
             area_action.last_state = message if message else None
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return False
         if message is None:
             return False
@@ -269,8 +276,7 @@ class Outlook(ServiceClass):
         if last_state_values == message_values:
             return False
         area_action.last_state = message
-        session.add(area_action)
-        session.commit()
+        save_last_state(session, area_action)
         return True
 
     def _get_latest_email(
@@ -294,7 +300,7 @@ class Outlook(ServiceClass):
         }
         headers = {"Authorization": f"Bearer {token}"}
 
-        r = requests.get(base_url, headers=headers, params=params)
+        r = http.get(base_url, headers=headers, params=params)
         if r.status_code != 200:
             raise MicrosoftApiError("Outlook: Failed to get messages")
         messages = r.json().get("value", [])
@@ -302,7 +308,7 @@ class Outlook(ServiceClass):
 
     def _get_user_info(self, token: str) -> Dict[str, Any]:
         url = "https://graph.microsoft.com/v1.0/me"
-        r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+        r = http.get(url, headers={"Authorization": f"Bearer {token}"})
         if r.status_code != 200:
             raise MicrosoftApiError("Invalid token or expired")
         return r.json()
@@ -333,5 +339,12 @@ class Outlook(ServiceClass):
             raise HTTPException(status_code=400, detail=e.message)
 
         return oauth_add_link(
-            session, self.name, user, token_res.access_token, request, is_mobile
+            session,
+            self.name,
+            user,
+            token_res.access_token,
+            request,
+            is_mobile,
+            refresh_token=token_res.refresh_token,
+            expires_in=token_res.expires_in,
         )
@@ -12,6 +12,8 @@ from services.services_classes import (
     Action,
     Reaction,
     get_component,
+    save_last_state,
+    SeenIds,
 )
 from api.users.db import get_user_service_token
 from models.services.service import Service as ServiceModel
@@ -23,7 +25,7 @@ from core.utils import generate_state
 from pydantic import BaseModel
 from pydantic_core import ValidationError
 from urllib.parse import urlencode
-import requests
+from services.http_client import http
 from fastapi import Request, HTTPException, Response
 from models.users.user_service import UserService
 from core.logger import logger
@@ -81,29 +83,14 @@ class Notion(ServiceClass):
                 if not pages:
                     return False
 
-                page_ids = {page["id"] for page in pages}
-                previous_page_ids = set(
-                    area_action.last_state.get("page_ids", [])
-                    if area_action.last_state
-                    else []
-                )
-
-                if (
-                    not area_action.last_state
-                    or "page_ids" not in area_action.last_state
-                ):
-                    area_action.last_state = {"page_ids": list(page_ids)}
-                    session.add(area_action)
-                    session.commit()
-                    return False
+                seen = SeenIds.load(area_action.last_state, "page_ids")
+                first_poll = not seen.initialized
+                new_page_ids = seen.update(page["id"] for page in pages)
 
-                new_page_ids = page_ids - previous_page_ids
+                area_action.last_state = {"page_ids": seen.to_state()}
+                save_last_state(session, area_action)
 
-                area_action.last_state = {"page_ids": list(page_ids)}
-                session.add(area_action)
-                session.commit()
-
-                return len(new_page_ids) > 0
+                return not first_poll and len(new_page_ids) > 0
 
             except NotionApiError as e:
                 logger.error(f"{self.service.name} new_page check error: {e.message}")
@@ -148,29 +135,14 @@ class Notion(ServiceClass):
                 if not items:
                     return False
 
-                item_ids = {item["id"] for item in items}
-                previous_item_ids = set(
-                    area_action.last_state.get("item_ids", [])
-                    if area_action.last_state
-                    else []
-                )
+                seen = SeenIds.load(area_action.last_state, "item_ids")
+                first_poll = not seen.initialized
+                new_item_ids = seen.update(item["id"] for item in items)
 
-                if (
-                    not area_action.last_state
-                    or "item_ids" not in area_action.last_state
-                ):
-                    area_action.last_state = {"item_ids": list(item_ids)}
-                    session.add(area_action)
-                    session.commit()
-                    return False
-
-                new_item_ids = item_ids - previous_item_ids
+                area_action.last_state = {"item_ids": seen.to_state()}
+                save_last_state(session, area_action)
 
-                area_action.last_state = {"item_ids": list(item_ids)}
-                session.add(area_action)
-                session.commit()
-
-                return len(new_item_ids) > 0
+                return not first_poll and len(new_item_ids) > 0
 
             except NotionApiError as e:
                 logger.error(
@@ -203,41 +175,25 @@ class Notion(ServiceClass):
                     logger.error("Page Title is required")
                     return False
 
-                page_id = self.service._get_page_id_by_title(
-                    session, user_id, page_title
-                )
-                if not page_id:
+                # Search results already carry last_edited_time, no need to
+                # fetch the page itself
+                page = self.service._find_page_by_title(session, user_id, page_title)
+                if not page:
                     logger.error(f"Page '{page_title}' not found")
                     return False
 
-                page = self.service._get_page(session, user_id, page_id)
-
-                if not page:
-                    return False
+                cursor = self.load_cursor(area_action)
+                if cursor.since is None and area_action.last_state:
+                    cursor.since = area_action.last_state.get("last_edited_time")
 
                 last_edited_time = page.get("last_edited_time")
-                previous_edited_time = (
-                    area_action.last_state.get("last_edited_time")
-                    if area_action.last_state
-                    else None
-                )
-
-                if (
-                    not area_action.last_state
-                    or "last_edited_time" not in area_action.last_state
-                ):
-                    area_action.last_state = {"last_edited_time": last_edited_time}
-                    session.add(area_action)
-                    session.commit()
+                if last_edited_time == cursor.since:
                     return False
 
-                is_updated = last_edited_time != previous_edited_time
-
-                area_action.last_state = {"last_edited_time": last_edited_time}
-                session.add(area_action)
-                session.commit()
-
-                return is_updated
+                first_poll = cursor.since is None
+                cursor.since = last_edited_time
+                cursor.save(session, area_action)
+                return not first_poll
 
             except NotionApiError as e:
                 logger.error(
@@ -398,7 +354,7 @@ class Notion(ServiceClass):
             "redirect_uri": f"{settings.FRONT_URL}/callbacks/link/Notion",
         }
 
-        r = requests.post(url, headers=headers, json=data, timeout=10)
+        r = http.post(url, headers=headers, json=data)
 
         if r.status_code != 200:
             raise NotionApiError(f"Failed to exchange code: {r.text}")
@@ -433,7 +389,7 @@ class Notion(ServiceClass):
         headers = self._get_headers(session, user_id)
         url = f"https://api.notion.com/v1{endpoint}"
 
-        r = requests.request(method, url, headers=headers, json=data, timeout=10)
+        r = http.request(method, url, headers=headers, json=data)
 
         if r.status_code not in [200, 201]:
             raise NotionApiError(
@@ -471,19 +427,36 @@ class Notion(ServiceClass):
         endpoint = f"/pages/{page_id}"
         return self._make_request(session, user_id, "GET", endpoint)
 
+    def _page_title_matches(self, page: Dict[str, Any], title: str) -> bool:
+        title_array = page.get("properties", {}).get("title", {}).get("title", [])
+        if not title_array:
+            return False
+        return title_array[0].get("plain_text", "").lower() == title.lower()
+
     def _get_page_id_by_title(
         self, session: Session, user_id: int, title: str
     ) -> str | None:
         """Find a page ID by its title."""
         pages = self._search_pages(session, user_id)
         for page in pages:
-            properties = page.get("properties", {})
-            title_prop = properties.get("title", {})
-            title_array = title_prop.get("title", [])
-            if title_array:
-                page_title = title_array[0].get("plain_text", "")
-                if page_title.lower() == title.lower():
-                    return page["id"]
+            if self._page_title_matches(page, title):
+                return page["id"]
+        return None
+
+    def _find_page_by_title(
+        self, session: Session, user_id: int, title: str
+    ) -> Dict[str, Any] | None:
+        """Find a page by its title, letting Notion filter the search."""
+        data = {
+            "query": title,
+            "filter": {"value": "page", "property": "object"},
+            "sort": {"direction": "descending", "timestamp": "last_edited_time"},
+            "page_size": 10,
+        }
+        result = self._make_request(session, user_id, "POST", "/search", data)
+        for page in result.get("results", []):
+            if self._page_title_matches(page, title):
+                return page
         return None
 
     def _get_database_id_by_name(
@@ -591,11 +564,10 @@ class Notion(ServiceClass):
                 "Content-Type": "application/json",
                 "Notion-Version": "2022-06-28",
             }
-            r = requests.post(
+            r = http.post(
                 "https://api.notion.com/v1/search",
                 headers=headers,
                 json={"page_size": 1},
-                timeout=10,
             )
             return r.status_code == 200
         except Exception:
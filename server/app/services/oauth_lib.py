@@ -15,6 +15,8 @@ from core.security import sign_jwt
 from models.users.user_service import UserService
 from sqlmodel import select
 from fastapi.responses import HTMLResponse
+from services.connection_state import record_success
+from services.token_manager import expiry_from, token_manager
 
 def windowCloseAndCookie(
     id: int,
@@ -86,10 +88,13 @@ def oauth_add_link(
     access_token: str,
     request: Request | None = None,
     is_mobile: bool = False,
+    refresh_token: str | None = None,
+    expires_in: int | None = None,
 ) -> Response:
     """Link a service to existing authenticated user account.
 
-    Creates or updates service connection with OAuth token.
+    Creates or updates service connection with OAuth token. Services whose
+    tokens expire pass the refresh token and lifetime for the token manager.
     """
     existing = session.exec(select(User).where(User.id == user.id)).first()
 
@@ -108,16 +113,25 @@ def oauth_add_link(
             user_id=existing.id,
             service_id=service.id,
             access_token=access_token,
+            refresh_token=refresh_token,
+            token_expires_at=expiry_from(expires_in),
         )
+        record_success(new_user_service)
         session.add(new_user_service)
         session.commit()
         session.refresh(new_user_service)
+        token_manager.forget(existing.id, name)
 
         return windowCloseAndCookie(existing.id, name, request, is_mobile)
 
     """Already existing user, connecting to service"""
     service.access_token = access_token
+    if refresh_token is not None:
+        service.refresh_token = refresh_token
+    service.token_expires_at = expiry_from(expires_in)
+    record_success(service)
     session.commit()
+    token_manager.forget(existing.id, name)
 
     return windowCloseAndCookie(existing.id, name, request, is_mobile)
 
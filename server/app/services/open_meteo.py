@@ -2,6 +2,7 @@ from models import AreaAction
 from sqlmodel import Session
 from services.services_classes import Service, Action, get_component
 from services.area_api import AreaApi
+from services.fetch_cache import fetch_cache
 from core.categories import ServiceCategory
 from datetime import datetime
 from core.logger import logger
@@ -19,10 +20,16 @@ class OpenMeteoApi(AreaApi):
     def __init__(self):
         super().__init__(OpenMeteoApiError)
 
-    def get_current_temperature(
+    async def _get_shared(self, url: str, params: dict) -> dict:
+        """GET shared by every area polling the same coordinates."""
+        return await fetch_cache.get_or_fetch_async(
+            "OpenMeteo", url, params, lambda: self.get_async(url, params=params)
+        )
+
+    async def get_current_temperature(
         self, latitude: str, longitude: str, timezone: str = "auto"
     ) -> int:
-        res = self.get(
+        res = await self._get_shared(
             "https://api.open-meteo.com/v1/forecast",
             params={
                 "latitude": latitude,
@@ -43,10 +50,10 @@ class OpenMeteoApi(AreaApi):
 
         return int(res["hourly"]["temperature_2m"][time_index])
 
-    def get_current_visibility(
+    async def get_current_visibility(
         self, latitude: str, longitude: str, timezone: str = "auto"
     ) -> int:
-        res = self.get(
+        res = await self._get_shared(
             "https://api.open-meteo.com/v1/forecast",
             params={
                 "latitude": latitude,
@@ -67,10 +74,10 @@ class OpenMeteoApi(AreaApi):
 
         return int(res["hourly"]["visibility"][time_index])
 
-    def get_current_humidity(
+    async def get_current_humidity(
         self, latitude: str, longitude: str, timezone: str = "auto"
     ) -> int:
-        res = self.get(
+        res = await self._get_shared(
             "https://api.open-meteo.com/v1/forecast",
             params={
                 "latitude": latitude,
@@ -82,10 +89,10 @@ class OpenMeteoApi(AreaApi):
 
         return int(res["current"]["relative_humidity_2m"])
 
-    def get_current_wind_speed(
+    async def get_current_wind_speed(
         self, latitude: str, longitude: str, timezone: str = "auto"
     ) -> float:
-        res = self.get(
+        res = await self._get_shared(
             "https://api.open-meteo.com/v1/forecast",
             params={
                 "latitude": latitude,
@@ -97,10 +104,10 @@ class OpenMeteoApi(AreaApi):
 
         return float(res["current"]["relative_wind_speed_10m"])
 
-    def get_current_uv_index(
+    async def get_current_uv_index(
         self, latitude: str, longitude: str, timezone: str = "auto"
     ) -> float:
-        res = self.get(
+        res = await self._get_shared(
             "https://api.open-meteo.com/v1/forecast",
             params={
                 "latitude": latitude,
@@ -121,10 +128,10 @@ class OpenMeteoApi(AreaApi):
 
         return float(res["daily"]["uv_index_max"][time_index])
 
-    def get_current_cloud_cover(
+    async def get_current_cloud_cover(
         self, latitude: str, longitude: str, timezone: str = "auto"
     ) -> float:
-        res = self.get(
+        res = await self._get_shared(
             "https://api.open-meteo.com/v1/forecast",
             params={
                 "latitude": latitude,
@@ -137,10 +144,10 @@ class OpenMeteoApi(AreaApi):
 
         return float(res["current"]["cloud_cover"])
 
-    def get_current_air_quality(
+    async def get_current_air_quality(
         self, latitude: str, longitude: str, timezone: str = "auto"
     ) -> int:
-        res = self.get(
+        res = await self._get_shared(
             "https://air-quality-api.open-meteo.com/v1/air-quality",
             params={
                 "latitude": latitude,
@@ -221,7 +228,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -236,7 +243,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_temperature = open_meteo_api.get_current_temperature(
+            current_temperature = await open_meteo_api.get_current_temperature(
                 latitude, longitude, timezone
             )
 
@@ -257,7 +264,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -272,7 +279,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_temperature = open_meteo_api.get_current_temperature(
+            current_temperature = await open_meteo_api.get_current_temperature(
                 latitude, longitude, timezone
             )
 
@@ -293,7 +300,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -308,7 +315,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_visibility = open_meteo_api.get_current_visibility(
+            current_visibility = await open_meteo_api.get_current_visibility(
                 latitude, longitude, timezone
             )
 
@@ -329,7 +336,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -344,7 +351,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_humidity = open_meteo_api.get_current_humidity(
+            current_humidity = await open_meteo_api.get_current_humidity(
                 latitude, longitude, timezone
             )
 
@@ -365,7 +372,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -380,7 +387,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_humidity = open_meteo_api.get_current_humidity(
+            current_humidity = await open_meteo_api.get_current_humidity(
                 latitude, longitude, timezone
             )
 
@@ -401,7 +408,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -416,7 +423,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_wind_speed = open_meteo_api.get_current_wind_speed(
+            current_wind_speed = await open_meteo_api.get_current_wind_speed(
                 latitude, longitude, timezone
             )
 
@@ -437,7 +444,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -452,7 +459,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_wind_speed = open_meteo_api.get_current_wind_speed(
+            current_wind_speed = await open_meteo_api.get_current_wind_speed(
                 latitude, longitude, timezone
             )
 
@@ -473,7 +480,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -488,7 +495,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_uv_index = open_meteo_api.get_current_uv_index(
+            current_uv_index = await open_meteo_api.get_current_uv_index(
                 latitude, longitude, timezone
             )
 
@@ -509,7 +516,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -524,7 +531,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_uv_index = open_meteo_api.get_current_uv_index(
+            current_uv_index = await open_meteo_api.get_current_uv_index(
                 latitude, longitude, timezone
             )
 
@@ -545,7 +552,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -560,7 +567,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_cloud_cover = open_meteo_api.get_current_cloud_cover(
+            current_cloud_cover = await open_meteo_api.get_current_cloud_cover(
                 latitude, longitude, timezone
             )
 
@@ -581,7 +588,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             try:
@@ -596,7 +603,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            current_cloud_cover = open_meteo_api.get_current_cloud_cover(
+            current_cloud_cover = await open_meteo_api.get_current_cloud_cover(
                 latitude, longitude, timezone
             )
 
@@ -625,7 +632,7 @@ class OpenMeteo(Service):
                 config_schema,
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             air_quality_alert = get_component(area_action.config, "alert_level", "values")
@@ -634,7 +641,7 @@ class OpenMeteo(Service):
             latitude = get_component(area_action.config, "latitude", "values")
             timezone = get_component(area_action.config, "timezone", "values")
 
-            aqi = open_meteo_api.get_current_air_quality(latitude, longitude, timezone)
+            aqi = await open_meteo_api.get_current_air_quality(latitude, longitude, timezone)
 
             aqi_alert_level = next(
                 (
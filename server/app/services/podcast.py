@@ -6,11 +6,20 @@ Allows users to track new episodes, keyword matches, and episode counts.
 
 from models import AreaAction, AreaReaction
 from sqlmodel import Session
-from services.services_classes import Service, Action, Reaction, get_component
+from services.services_classes import (
+    Service,
+    Action,
+    Reaction,
+    get_component,
+    save_last_state,
+    db_call,
+    SeenIds,
+)
+from services.fetch_cache import fetch_cache
 from core.logger import logger
 from core.categories import ServiceCategory
 from typing import List, Dict, Any
-import requests
+from services.http_client import http, async_http, HttpError, Response
 import xml.etree.ElementTree as ET
 
 
@@ -84,7 +93,7 @@ class Podcast(Service):
                 "*/15 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             """Check if a new episode has been published."""
@@ -95,34 +104,19 @@ class Podcast(Service):
                     logger.error("RSS Feed URL is required")
                     return False
 
-                episodes = self.service._get_episodes_from_rss(rss_url)
+                episodes = await self.service._get_episodes_from_rss_async(rss_url)
 
                 if not episodes:
                     return False
 
-                episode_guids = {ep["guid"] for ep in episodes}
-                previous_guids = set(
-                    area_action.last_state.get("episode_guids", [])
-                    if area_action.last_state
-                    else []
-                )
-
-                if (
-                    not area_action.last_state
-                    or "episode_guids" not in area_action.last_state
-                ):
-                    area_action.last_state = {"episode_guids": list(episode_guids)}
-                    session.add(area_action)
-                    session.commit()
-                    return False
-
-                new_guids = episode_guids - previous_guids
+                seen = SeenIds.load(area_action.last_state, "episode_guids")
+                first_poll = not seen.initialized
+                new_guids = seen.update(ep["guid"] for ep in episodes)
 
-                area_action.last_state = {"episode_guids": list(episode_guids)}
-                session.add(area_action)
-                session.commit()
+                area_action.last_state = {"episode_guids": seen.to_state()}
+                await db_call(save_last_state, session, area_action)
 
-                return len(new_guids) > 0
+                return not first_poll and len(new_guids) > 0
 
             except PodcastApiError as e:
                 logger.error(f"Podcast new_episode check error: {e.message}")
@@ -144,7 +138,7 @@ class Podcast(Service):
                 "0 0 * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             """Check if episode count exceeds threshold."""
@@ -164,7 +158,7 @@ class Podcast(Service):
                     logger.error(f"Invalid threshold value: {threshold_str}")
                     return False
 
-                episodes = self.service._get_episodes_from_rss(rss_url)
+                episodes = await self.service._get_episodes_from_rss_async(rss_url)
                 current_count = len(episodes)
 
                 previous_count = (
@@ -175,13 +169,11 @@ class Podcast(Service):
 
                 if not area_action.last_state or "count" not in area_action.last_state:
                     area_action.last_state = {"count": current_count}
-                    session.add(area_action)
-                    session.commit()
+                    await db_call(save_last_state, session, area_action)
                     return False
 
                 area_action.last_state = {"count": current_count}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
 
                 return current_count >= threshold and previous_count < threshold
 
@@ -207,7 +199,7 @@ class Podcast(Service):
                 "*/15 * * * *",
             )
 
-        def check(
+        async def check_async(
             self, session: Session, area_action: AreaAction, user_id: int
         ) -> bool:
             """Check if new episode title contains keyword."""
@@ -225,43 +217,21 @@ class Podcast(Service):
 
                 keyword_lower = keyword.lower()
 
-                episodes = self.service._get_episodes_from_rss(rss_url)
+                episodes = await self.service._get_episodes_from_rss_async(rss_url)
 
                 if not episodes:
                     return False
 
-                matching_episode_guids = {
-                    ep["guid"]
-                    for ep in episodes
-                    if keyword_lower in ep["title"].lower()
-                }
-
-                previous_matching_guids = set(
-                    area_action.last_state.get("matching_guids", [])
-                    if area_action.last_state
-                    else []
+                seen = SeenIds.load(area_action.last_state, "matching_guids")
+                first_poll = not seen.initialized
+                new_matching = seen.update(
+                    ep["guid"] for ep in episodes if keyword_lower in ep["title"].lower()
                 )
 
-                if (
-                    not area_action.last_state
-                    or "matching_guids" not in area_action.last_state
-                ):
-                    area_action.last_state = {
-                        "matching_guids": list(matching_episode_guids)
-                    }
-                    session.add(area_action)
-                    session.commit()
-                    return False
-
-                new_matching = matching_episode_guids - previous_matching_guids
+                area_action.last_state = {"matching_guids": seen.to_state()}
+                await db_call(save_last_state, session, area_action)
 
-                area_action.last_state = {
-                    "matching_guids": list(matching_episode_guids)
-                }
-                session.add(area_action)
-                session.commit()
-
-                return len(new_matching) > 0
+                return not first_poll and len(new_matching) > 0
 
             except PodcastApiError as e:
                 logger.error(f"Podcast keyword_in_title error: {e.message}")
@@ -361,87 +331,99 @@ class Podcast(Service):
             oauth=False,
         )
 
-    def _get_episodes_from_rss(self, rss_url: str) -> List[Dict[str, Any]]:
-        """Parse RSS feed and extract episodes."""
-        try:
-            response = requests.get(rss_url, timeout=10)
-
-            if response.status_code != 200:
-                raise PodcastApiError(
-                    f"Failed to fetch RSS feed: {response.status_code}"
-                )
+    def _parse_feed(self, response: Response) -> Dict[str, Any]:
+        """Parse an RSS feed response into podcast info and episodes."""
+        if response.status_code != 200:
+            raise PodcastApiError(f"Failed to fetch RSS feed: {response.status_code}")
 
+        try:
             root = ET.fromstring(response.content)
-
-            channel = root.find("channel")
-            if channel is None:
-                raise PodcastApiError("Invalid RSS feed format: no channel found")
-
-            episodes = []
-            for item in channel.findall("item"):
-                title_elem = item.find("title")
-                guid_elem = item.find("guid")
-                pub_date_elem = item.find("pubDate")
-                description_elem = item.find("description")
-                link_elem = item.find("link")
-
-                episode = {
-                    "title": title_elem.text if title_elem is not None else "Untitled",
-                    "guid": guid_elem.text if guid_elem is not None else "",
-                    "published": pub_date_elem.text
-                    if pub_date_elem is not None
-                    else "",
-                    "description": description_elem.text
-                    if description_elem is not None
-                    else "",
-                    "link": link_elem.text if link_elem is not None else "",
-                }
-
-                episodes.append(episode)
-
-            return episodes
-
-        except requests.RequestException as e:
-            raise PodcastApiError(f"Network error: {str(e)}")
         except ET.ParseError as e:
             raise PodcastApiError(f"XML parsing error: {str(e)}")
-        except Exception as e:
-            raise PodcastApiError(f"Unexpected error: {str(e)}")
-
-    def _get_podcast_info(self, rss_url: str) -> Dict[str, Any]:
-        """Get podcast metadata from RSS feed."""
-        try:
-            response = requests.get(rss_url, timeout=10)
-
-            if response.status_code != 200:
-                raise PodcastApiError(
-                    f"Failed to fetch RSS feed: {response.status_code}"
-                )
 
-            root = ET.fromstring(response.content)
-            channel = root.find("channel")
-
-            if channel is None:
-                raise PodcastApiError("Invalid RSS feed format")
-
-            title_elem = channel.find("title")
-            description_elem = channel.find("description")
-            link_elem = channel.find("link")
-
-            episode_count = len(channel.findall("item"))
-
-            return {
-                "title": title_elem.text if title_elem is not None else "Unknown",
+        channel = root.find("channel")
+        if channel is None:
+            raise PodcastApiError("Invalid RSS feed format: no channel found")
+
+        episodes = []
+        for item in channel.findall("item"):
+            title_elem = item.find("title")
+            guid_elem = item.find("guid")
+            pub_date_elem = item.find("pubDate")
+            description_elem = item.find("description")
+            link_elem = item.find("link")
+
+            episode = {
+                "title": title_elem.text if title_elem is not None else "Untitled",
+                "guid": guid_elem.text if guid_elem is not None else "",
+                "published": pub_date_elem.text
+                if pub_date_elem is not None
+                else "",
                 "description": description_elem.text
                 if description_elem is not None
                 else "",
                 "link": link_elem.text if link_elem is not None else "",
-                "episode_count": episode_count,
             }
 
-        except requests.RequestException as e:
+            episodes.append(episode)
+
+        title_elem = channel.find("title")
+        description_elem = channel.find("description")
+        link_elem = channel.find("link")
+
+        info = {
+            "title": title_elem.text if title_elem is not None else "Unknown",
+            "description": description_elem.text
+            if description_elem is not None
+            else "",
+            "link": link_elem.text if link_elem is not None else "",
+            "episode_count": len(episodes),
+        }
+
+        return {"info": info, "episodes": episodes}
+
+    def _fetch_feed(self, rss_url: str) -> Dict[str, Any]:
+        """Download and parse an RSS feed into podcast info and episodes."""
+        try:
+            return self._parse_feed(http.get(rss_url))
+        except PodcastApiError:
+            raise
+        except HttpError as e:
             raise PodcastApiError(f"Network error: {str(e)}")
-        except ET.ParseError as e:
-            raise PodcastApiError(f"XML parsing error: {str(e)}")
         except Exception as e:
             raise PodcastApiError(f"Unexpected error: {str(e)}")
+
+    async def _fetch_feed_async(self, rss_url: str) -> Dict[str, Any]:
+        """Non-blocking `_fetch_feed`."""
+        try:
+            return self._parse_feed(await async_http.get(rss_url))
+        except PodcastApiError:
+            raise
+        except HttpError as e:
+            raise PodcastApiError(f"Network error: {str(e)}")
+        except Exception as e:
+            raise PodcastApiError(f"Unexpected error: {str(e)}")
+
+    def _get_feed(self, rss_url: str) -> Dict[str, Any]:
+        """Get a parsed feed, shared by every area polling the same URL."""
+        return fetch_cache.get_or_fetch(
+            self.name, "rss", rss_url, lambda: self._fetch_feed(rss_url)
+        )
+
+    async def _get_feed_async(self, rss_url: str) -> Dict[str, Any]:
+        """Non-blocking `_get_feed`, sharing the same cache entries."""
+        return await fetch_cache.get_or_fetch_async(
+            self.name, "rss", rss_url, lambda: self._fetch_feed_async(rss_url)
+        )
+
+    def _get_episodes_from_rss(self, rss_url: str) -> List[Dict[str, Any]]:
+        """Parse RSS feed and extract episodes."""
+        return self._get_feed(rss_url)["episodes"]
+
+    async def _get_episodes_from_rss_async(self, rss_url: str) -> List[Dict[str, Any]]:
+        """Non-blocking `_get_episodes_from_rss`."""
+        return (await self._get_feed_async(rss_url))["episodes"]
+
+    def _get_podcast_info(self, rss_url: str) -> Dict[str, Any]:
+        """Get podcast metadata from RSS feed."""
+        return self._get_feed(rss_url)["info"]
@@ -0,0 +1,254 @@
+"""Per-service rate limiting for the shared HTTP clients.
+
+Requests are counted in token buckets keyed by upstream host, route and
+credential (the Authorization header, an API key header or an `api_key`
+query parameter, hashed), so each user token or API key gets its own
+budget on each service. Rates come from `HTTP_RATE_LIMITS` (by host or
+parent domain), else `HTTP_RATE_LIMIT`/`HTTP_RATE_BURST`.
+
+The route is empty except where one credential is shared by many users:
+Discord calls all use the bot token, so they are scoped by major
+parameter (channel, guild or webhook) like Discord's own buckets, and
+OAuth token endpoints get their own `HTTP_RATE_LIMIT_TOKEN_ENDPOINT`
+budget, apart from the API calls of the same host.
+
+Responses tune the buckets: a 429/503 with `Retry-After`, or an exhausted
+`X-RateLimit-Remaining` with its reset, blocks the bucket until the
+upstream accepts requests again, instead of sending calls bound to fail.
+An `X-RateLimit-Limit` below the configured burst shrinks the burst.
+
+A request over budget waits for its token when that takes at most
+`HTTP_RATE_LIMIT_MAX_WAIT` seconds, else fails at once with
+`RateLimitedError`, which reactions propagate so the reaction queue
+retries them after `retry_after`.
+"""
+
+import hashlib
+import math
+import re
+import time
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import httpx
+
+from core.config import settings
+from services.services_classes import ReactionRetryError
+
+_CREDENTIAL_HEADERS = ("authorization", "x-riot-token", "x-api-key", "client-id")
+_CREDENTIAL_PARAMS = ("api_key", "key")
+_TOKEN_ENDPOINTS = ("token", "access_token", "accesstoken")
+_DISCORD_MAJOR_PARAM = re.compile(r"/(channels|guilds|webhooks)/(\d+)")
+
+Key = Tuple[str, str, str]
+
+
+class RateLimitedError(ReactionRetryError, httpx.HTTPError):
+    """Raised instead of sending a request the upstream would reject."""
+
+    def __init__(self, host: str, retry_after: float):
+        self.host = host
+        super().__init__(
+            f"{host}: rate limited, retry after {retry_after:.1f}s", retry_after
+        )
+
+
+class TokenBucket:
+    """`rate` requests per second on average, bursts of up to `burst`."""
+
+    def __init__(self, rate: float, burst: int, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float, max_wait: float) -> float:
+        """Seconds to wait before sending; the token is only taken if <= max_wait.
+
+        Tokens go negative while requests queue up, so each waits its turn.
+        """
+        self._refill(now)
+        wait = max(0.0, (1 - self.tokens) / self.rate, self.blocked_until - now)
+        if wait <= max_wait:
+            self.tokens -= 1
+        return wait
+
+    def block(self, until: float) -> None:
+        self.blocked_until = max(self.blocked_until, until)
+
+    def cap(self, burst: int) -> None:
+        """Shrink the burst to a smaller quota announced by the upstream."""
+        if 1 <= burst < self.burst:
+            self.burst = burst
+            self.tokens = min(self.tokens, burst)
+
+    def idle(self, now: float) -> bool:
+        """Whether the bucket is back to the state of a new one."""
+        self._refill(now)
+        return self.tokens >= self.burst and self.blocked_until <= now
+
+
+def _credential(headers: Optional[Mapping], params: Any) -> str:
+    secret = None
+    if headers:
+        lowered = {str(name).lower(): value for name, value in headers.items()}
+        secret = next(
+            (lowered[name] for name in _CREDENTIAL_HEADERS if name in lowered), None
+        )
+    if secret is None and isinstance(params, Mapping):
+        secret = next(
+            (params[name] for name in _CREDENTIAL_PARAMS if name in params), None
+        )
+    if secret is None:
+        return ""
+    return hashlib.sha256(str(secret).encode()).hexdigest()[:16]
+
+
+def _route(host: str, path: str) -> str:
+    if path.rstrip("/").rsplit("/", 1)[-1].lower() in _TOKEN_ENDPOINTS:
+        return "token"
+    if host == "discord.com" or host.endswith(".discord.com"):
+        match = _DISCORD_MAJOR_PARAM.search(path)
+        if match:
+            return f"{match.group(1)}/{match.group(2)}"
+    return ""
+
+
+def _header_seconds(value: Optional[str], now: float) -> Optional[float]:
+    """Seconds from now described by a Retry-After or rate limit reset header.
+
+    Accepts delays in seconds, epoch timestamps (GitHub, Discord) and HTTP
+    dates.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    if seconds > 1e9:
+        return max(0.0, seconds - time.time())
+    return max(0.0, seconds)
+
+
+class RateLimiter:
+    """Token buckets by (host, route, credential), shared by threads and loop."""
+
+    def __init__(self) -> None:
+        self._buckets: Dict[Key, TokenBucket] = {}
+        self._lock = Lock()
+        self.waits = 0
+        self.rejected = 0
+        self.upstream_limits = 0
+
+    @staticmethod
+    def limits_for(host: str, route: str = "") -> Tuple[float, int]:
+        """Configured (rate, burst) for `host` or its closest parent domain."""
+        if route == "token":
+            rate, burst = settings.HTTP_RATE_LIMIT_TOKEN_ENDPOINT
+            return float(rate), int(burst)
+        parts = host.split(".")
+        for index in range(len(parts) - 1):
+            limits = settings.HTTP_RATE_LIMITS.get(".".join(parts[index:]))
+            if limits is not None:
+                return float(limits[0]), int(limits[1])
+        return settings.HTTP_RATE_LIMIT, settings.HTTP_RATE_BURST
+
+    @staticmethod
+    def key_for(url: str, kwargs: Dict[str, Any]) -> Key:
+        parsed = httpx.URL(url)
+        return (
+            parsed.host,
+            _route(parsed.host, parsed.path),
+            _credential(kwargs.get("headers"), kwargs.get("params")),
+        )
+
+    def _bucket(self, key: Key, now: float) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= settings.HTTP_RATE_LIMIT_MAX_BUCKETS:
+                self._buckets = {
+                    other: kept
+                    for other, kept in self._buckets.items()
+                    if not kept.idle(now)
+                }
+            bucket = TokenBucket(*self.limits_for(key[0], key[1]), now)
+            self._buckets[key] = bucket
+        return bucket
+
+    def acquire(self, key: Key) -> float:
+        """Take a token for `key`; returns how long to wait before sending.
+
+        Raises `RateLimitedError` when that would exceed
+        `HTTP_RATE_LIMIT_MAX_WAIT`.
+        """
+        if not settings.HTTP_RATE_LIMIT_ENABLED:
+            return 0.0
+        max_wait = settings.HTTP_RATE_LIMIT_MAX_WAIT
+        with self._lock:
+            wait = self._bucket(key, time.monotonic()).reserve(
+                time.monotonic(), max_wait
+            )
+            if wait > max_wait:
+                self.rejected += 1
+            elif wait > 0:
+                self.waits += 1
+        if wait > max_wait:
+            raise RateLimitedError(key[0], wait)
+        return wait
+
+    def observe(self, key: Key, response: httpx.Response) -> None:
+        """Block `key` until the reset the upstream announced, if any."""
+        if not settings.HTTP_RATE_LIMIT_ENABLED:
+            return
+        now = time.monotonic()
+        headers = response.headers
+        delay = None
+        if response.status_code in (429, 503):
+            delay = _header_seconds(headers.get("Retry-After"), now)
+        if delay is None:
+            remaining = headers.get("X-RateLimit-Remaining")
+            try:
+                exhausted = remaining is not None and float(remaining) < 1
+            except ValueError:
+                exhausted = False
+            if exhausted or response.status_code == 429:
+                delay = _header_seconds(
+                    headers.get("X-RateLimit-Reset-After"), now
+                ) or _header_seconds(headers.get("X-RateLimit-Reset"), now)
+        if delay is None and response.status_code == 429:
+            delay = float(settings.HTTP_RATE_LIMIT_DEFAULT_BACKOFF)
+        try:
+            quota = int(headers.get("X-RateLimit-Limit", ""))
+        except ValueError:
+            quota = None
+        if delay is None and quota is None:
+            return
+        with self._lock:
+            bucket = self._bucket(key, now)
+            if quota is not None:
+                bucket.cap(quota)
+            if delay is not None:
+                bucket.block(now + math.ceil(delay * 10) / 10)
+                self.upstream_limits += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "buckets": len(self._buckets),
+                "waits": self.waits,
+                "rejected": self.rejected,
+                "upstream_limits": self.upstream_limits,
+            }
+
+
+rate_limiter = RateLimiter()
@@ -1,4 +1,4 @@
-import requests
+from services.http_client import http
 from urllib.parse import urlencode
 from sqlmodel import Session, select
 from fastapi import HTTPException, Response, Request
@@ -10,11 +10,14 @@ from core.utils import generate_state
 from core.logger import logger
 from core.categories import ServiceCategory
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint
 from services.services_classes import (
     Service as ServiceClass,
     Action,
     Reaction,
     get_component,
+    save_last_state,
+    SeenIds,
 )
 from models import AreaAction, AreaReaction, UserService, Service, User
 from api.users.db import get_user_service_token
@@ -41,6 +44,14 @@ class RedditApiError(Exception):
 class Reddit(ServiceClass):
     """Reddit automation service."""
 
+    token_endpoint = TokenEndpoint(
+        "https://www.reddit.com/api/v1/access_token",
+        settings.REDDIT_CLIENT_ID,
+        settings.REDDIT_CLIENT_SECRET,
+        basic_auth=True,
+        headers={"User-Agent": "AreaApp/1.0"},
+    )
+
     def __init__(self) -> None:
         super().__init__(
             "Reddit", ServiceCategory.SOCIAL, "#FF4500", "/images/Reddit_logo.webp", True
@@ -63,25 +74,57 @@ class Reddit(ServiceClass):
             try:
                 token: str = get_user_service_token(session, user_id, self.service.name)
                 subreddit = get_component(area_action.config, "Subreddit", "values")
+                cursor = self.load_cursor(area_action)
+                if cursor.token is None and area_action.last_state:
+                    cursor.token = area_action.last_state.get("name")
 
-                url = f"https://oauth.reddit.com/r/{subreddit}/new?limit=1"
+                url = f"https://oauth.reddit.com/r/{subreddit}/new"
                 headers = {
                     "Authorization": f"bearer {token}",
                     "User-Agent": "AreaApp/1.0",
                 }
-
-                r = requests.get(url, headers=headers)
+                state = area_action.last_state or {}
+                seen = SeenIds.load(state, "post_ids")
+                empty_polls = state.get("empty_polls", 0)
+                # A deleted post makes `before` list nothing forever: after
+                # too many empty polls, list the newest posts and diff them
+                resync = empty_polls >= settings.REDDIT_CURSOR_MAX_EMPTY_POLLS
+                # Only list what was posted after the newest post already seen
+                params = {"limit": 25 if resync else 1}
+                if cursor.token and not resync:
+                    params = {"limit": 100, "before": cursor.token}
+
+                r = http.get(url, headers=headers, params=params)
                 if r.status_code != 200:
                     raise RedditApiError(f"Failed get new post {r.text}")
 
                 posts = r.json().get("data", {}).get("children", [])
                 if not posts:
+                    if cursor.token:
+                        cursor.save(
+                            session,
+                            area_action,
+                            id=state.get("id"),
+                            post_ids=seen.to_state(),
+                            empty_polls=empty_polls + 1,
+                        )
                     return False
 
                 latest_post = posts[0]["data"]
-                return self.service._compare_post_state(
-                    session, area_action, latest_post
+                first_poll = cursor.token is None
+                known = seen.initialized
+                new_ids = seen.update(post["data"].get("name") for post in posts)
+                cursor.token = latest_post.get("name")
+                cursor.save(
+                    session,
+                    area_action,
+                    id=latest_post.get("id"),
+                    post_ids=seen.to_state(),
+                    empty_polls=0,
                 )
+                if resync:
+                    return known and bool(new_ids)
+                return not first_poll
             except RedditApiError as e:
                 logger.error(f"{self.service.name}: {e}")
             return False
@@ -110,7 +153,7 @@ class Reddit(ServiceClass):
                     "User-Agent": "AreaApp/1.0",
                 }
 
-                r = requests.get(url, headers=headers)
+                r = http.get(url, headers=headers)
                 if r.status_code != 200:
                     raise RedditApiError(f"Failed get new post {r.text}")
 
@@ -150,7 +193,7 @@ class Reddit(ServiceClass):
                     "User-Agent": "AreaApp/1.0",
                 }
 
-                r = requests.get(url, headers=headers)
+                r = http.get(url, headers=headers)
                 if r.status_code != 200:
                     raise RedditApiError(f"Failed get new post {r.text}")
 
@@ -200,7 +243,7 @@ class Reddit(ServiceClass):
                     "resubmit": True,
                 }
 
-                r = requests.post(url, headers=headers, data=data)
+                r = http.post(url, headers=headers, data=data)
                 if r.status_code != 200:
                     raise RedditApiError("Failed to post message")
                 logger.info(f"{self.service.name} - {self.name} - Posted to r/{subreddit} - User: {user_id}")
@@ -213,8 +256,7 @@ class Reddit(ServiceClass):
         """Check if the post is new compared to the last stored one."""
         if not area_action.last_state:
             area_action.last_state = post
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return False
 
         last_id = area_action.last_state.get("id")
@@ -223,8 +265,7 @@ class Reddit(ServiceClass):
             return False
 
         area_action.last_state = post
-        session.add(area_action)
-        session.commit()
+        save_last_state(session, area_action)
         return True
 
     def is_connected(self, session: Session, user_id: int) -> bool:
@@ -274,7 +315,7 @@ class Reddit(ServiceClass):
             "redirect_uri": redirect,
         }
         headers = {"User-Agent": "AreaApp/1.0"}
-        r = requests.post(url, data=data, auth=auth, headers=headers)
+        r = http.post(url, data=data, auth=auth, headers=headers)
         if r.status_code != 200:
             logger.error(f"Reddit token error: {r.text}")
             raise RedditApiError(f"Failed to get Reddit token: {r.text}")
@@ -283,7 +324,7 @@ class Reddit(ServiceClass):
     def _get_user_info(self, token: str) -> Dict[str, Any]:
         url = "https://oauth.reddit.com/api/v1/me"
         headers = {"Authorization": f"bearer {token}", "User-Agent": "AreaApp/1.0"}
-        r = requests.get(url, headers=headers)
+        r = http.get(url, headers=headers)
         if r.status_code != 200:
             raise RedditApiError("Failed to get Reddit user info")
         data = r.json()
@@ -303,5 +344,12 @@ class Reddit(ServiceClass):
             raise HTTPException(status_code=400, detail=e.message)
 
         return oauth_add_link(
-            session, self.name, user, token_res.access_token, request, is_mobile
+            session,
+            self.name,
+            user,
+            token_res.access_token,
+            request,
+            is_mobile,
+            refresh_token=token_res.refresh_token,
+            expires_in=token_res.expires_in,
         )
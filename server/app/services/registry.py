@@ -0,0 +1,182 @@
+"""Lazy service registry backed by a static manifest.
+
+`services/manifest.json` lists every integration with the module and class
+defining it and its catalog entry (what `to_dict()` returns). The catalog
+sync reads the manifest directly, and an integration module is only
+imported the first time the service itself is used (check, execute,
+OAuth, ...), so processes that touch a few services never load the others.
+
+Regenerate the manifest after changing an integration:
+
+    python -m services.registry generate
+
+Report the import cost of each integration, each measured in a fresh
+interpreter on top of the shared base modules:
+
+    python -m services.registry benchmark
+"""
+
+import importlib
+import json
+import subprocess
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterator, List
+
+MANIFEST_PATH = Path(__file__).with_name("manifest.json")
+
+# Modules defining the integrations, in catalog order
+SERVICE_MODULES: List[str] = [
+    "services.clash_royale",
+    "services.date_and_time",
+    "services.discord",
+    "services.email",
+    "services.github",
+    "services.ign",
+    "services.google",
+    "services.microsoft",
+    "services.open_meteo",
+    "services.podcast",
+    "services.reddit",
+    "services.spotify",
+    "services.strava",
+    "services.todoist",
+    "services.twitch",
+    "services.google_calendar",
+    "services.trakt",
+    "services.youtube",
+    "services.dropbox",
+    "services.notion",
+    # "services.linkedin", oauth doesn't work
+    "services.figma",
+    "services.calendly",
+    "services.riot_dev",
+]
+
+# Imported by every integration, excluded from the per-service cost
+BASE_MODULES: List[str] = [
+    "services.services_classes",
+    "services.oauth_lib",
+    "services.http_client",
+    "api.users.db",
+]
+
+
+class LazyRegistry(Mapping):
+    """Name -> service instance mapping that imports services on first access."""
+
+    def __init__(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        self._entries = entries
+        self._instances: Dict[str, Any] = {}
+        self._lock = Lock()
+
+    def __getitem__(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        entry = self._entries[name]
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                module = importlib.import_module(entry["module"])
+                instance = getattr(module, entry["class"])()
+                self._instances[name] = instance
+        return instance
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def catalog(self) -> Dict[str, Dict]:
+        """Catalog entries of every service, without importing any of them."""
+        return {name: entry["catalog"] for name, entry in self._entries.items()}
+
+    def loaded(self) -> List[str]:
+        """Names of the services imported so far."""
+        return list(self._instances)
+
+
+def load_manifest() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    with MANIFEST_PATH.open() as manifest:
+        return json.load(manifest)
+
+
+def build_manifest() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Import every integration and describe it, see `generate`."""
+    from services.services_classes import Service, oauth_service
+
+    manifest: Dict[str, Dict[str, Dict[str, Any]]] = {"services": {}, "oauth": {}}
+    for module_name in SERVICE_MODULES:
+        module = importlib.import_module(module_name)
+        for attr in vars(module).values():
+            if not isinstance(attr, type) or attr.__module__ != module_name:
+                continue
+            if issubclass(attr, Service):
+                section = "services"
+            elif issubclass(attr, oauth_service):
+                section = "oauth"
+            else:
+                continue
+            instance = attr()
+            manifest[section][instance.name] = {
+                "module": module_name,
+                "class": attr.__name__,
+                "catalog": json.loads(json.dumps(instance.to_dict())),
+            }
+    return manifest
+
+
+def generate() -> None:
+    manifest = build_manifest()
+    MANIFEST_PATH.write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+    print(
+        f"Wrote {len(manifest['services'])} services and "
+        f"{len(manifest['oauth'])} OAuth logins to {MANIFEST_PATH}"
+    )
+
+
+def measure_import(module_name: str, base: List[str] = BASE_MODULES) -> float:
+    """Seconds spent importing `module_name` in a fresh interpreter after `base`."""
+    code = (
+        "import importlib, time\n"
+        f"for base in {base!r}:\n"
+        "    importlib.import_module(base)\n"
+        "start = time.perf_counter()\n"
+        f"importlib.import_module({module_name!r})\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark() -> None:
+    shared = sum(
+        measure_import(name, BASE_MODULES[:index])
+        for index, name in enumerate(BASE_MODULES)
+    )
+    print(f"{'shared base modules':<32} {shared * 1000:8.1f} ms")
+    registry = measure_import("services.services")
+    print(f"{'services.services registry':<32} {registry * 1000:8.1f} ms")
+
+    costs = sorted(
+        ((measure_import(name), name) for name in SERVICE_MODULES), reverse=True
+    )
+    for cost, name in costs:
+        print(f"{name:<32} {cost * 1000:8.1f} ms")
+    print(f"{'all integrations':<32} {sum(cost for cost, _ in costs) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    commands = {"generate": generate, "benchmark": benchmark}
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        sys.exit(f"usage: python -m services.registry {{{'|'.join(commands)}}}")
+    commands[sys.argv[1]]()
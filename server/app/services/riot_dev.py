@@ -1,6 +1,6 @@
 from models import AreaAction
 from sqlmodel import Session
-from services.services_classes import Service, Action, get_component
+from services.services_classes import Service, Action, get_component, save_last_state
 from services.area_api import AreaApi
 from core.categories import ServiceCategory
 from core.logger import logger
@@ -163,16 +163,14 @@ class RiotDev(Service):
 
             if last_state is None or "last_game_id" not in last_state:
                 area_action.last_state = {"last_game_id": match_id}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
                 return False
 
             if last_state["last_game_id"] == match_id:
                 return False
 
             area_action.last_state = {"last_game_id": match_id}
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
 
             return is_win
 
@@ -222,16 +220,14 @@ class RiotDev(Service):
 
             if last_state is None or "last_game_id" not in last_state:
                 area_action.last_state = {"last_game_id": match_id}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
                 return False
 
             if last_state["last_game_id"] == match_id:
                 return False
 
             area_action.last_state = {"last_game_id": match_id}
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
 
             return not is_win
 
@@ -281,15 +277,13 @@ class RiotDev(Service):
 
             if last_state is None or "last_game_id" not in last_state:
                 area_action.last_state = {"last_game_id": match_id}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
                 return False
 
             if last_state["last_game_id"] == match_id:
                 return False
 
             area_action.last_state = {"last_game_id": match_id}
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
 
             return True
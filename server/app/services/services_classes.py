@@ -2,14 +2,57 @@
 
 Defines the core service system with automatic action/reaction discovery,
 OAuth integration, and JSON serialization for API and database operations.
+
+Actions and reactions implement either the blocking `check`/`execute` or
+the non-blocking `check_async`/`execute_async`. The action dispatcher runs
+async implementations on the service I/O loop; each side falls back to the
+other, so callers may use whichever fits their context.
+
+Async implementations must not touch the database on the loop: they go
+through `db_call`, which runs the session work in a worker thread.
 """
 
-from typing import Dict, Optional, Any, Union
+import asyncio
+import hashlib
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    TypeVar,
+)
+from core.config import settings
+from core.event_loop import run_coroutine
 from core.logger import logger
 from models import User, AreaAction, AreaReaction
 from sqlmodel import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import Response, Request
 
+if TYPE_CHECKING:
+    from services.token_manager import TokenEndpoint
+
+T = TypeVar("T")
+
+_db_slot: Optional[asyncio.Semaphore] = None
+
+
+class ReactionRetryError(Exception):
+    """Raised by a reaction the upstream asked to retry later, e.g. on a 429.
+
+    Reactions let it propagate instead of logging it, so the reaction queue
+    schedules another attempt.
+    """
+
+    def __init__(self, message, retry_after: Optional[float] = None):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
 
 class Action:
     """Base class for automation triggers.
@@ -32,9 +75,26 @@ class Action:
         )
         self.service: Service = None
 
+    @property
+    def is_async(self) -> bool:
+        """Whether this action implements `check_async` natively."""
+        return type(self).check_async is not Action.check_async
+
     def check(self, session: Session, area_action: AreaAction, user_id: int) -> bool:
         """Check if action condition is met. Override in subclasses."""
-        pass
+        if self.is_async:
+            return run_coroutine(self.check_async(session, area_action, user_id))
+        return False
+
+    async def check_async(
+        self, session: Session, area_action: AreaAction, user_id: int
+    ) -> bool:
+        """Non-blocking check. Defaults to running `check` in a worker thread."""
+        return await asyncio.to_thread(self.check, session, area_action, user_id)
+
+    def load_cursor(self, area_action: AreaAction) -> "PollCursor":
+        """Read the upstream cursor persisted in the action's last_state."""
+        return PollCursor.load(area_action.last_state)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert action to dictionary representation."""
@@ -63,9 +123,21 @@ class Reaction:
         )
         self.service: Service = None
 
+    @property
+    def is_async(self) -> bool:
+        """Whether this reaction implements `execute_async` natively."""
+        return type(self).execute_async is not Reaction.execute_async
+
     def execute(self, session: Session, area_action: AreaReaction, user_id: int):
         """Execute reaction with user configuration. Override in subclasses."""
-        pass
+        if self.is_async:
+            run_coroutine(self.execute_async(session, area_action, user_id))
+
+    async def execute_async(
+        self, session: Session, area_action: AreaReaction, user_id: int
+    ):
+        """Non-blocking execute. Defaults to running `execute` in a worker thread."""
+        await asyncio.to_thread(self.execute, session, area_action, user_id)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert reaction to dictionary representation."""
@@ -83,6 +155,9 @@ class Service:
     and provide OAuth integration, API management, and JSON serialization.
     """
 
+    # Set by services whose OAuth tokens expire, see services.token_manager
+    token_endpoint: Optional["TokenEndpoint"] = None
+
     def __init__(
         self,
         description: str,
@@ -125,6 +200,21 @@ class Service:
         logger.error(f"Action '{action_name}' not found in {self.name}")
         return False
 
+    async def check_async(
+        self, action_name: str, session: Session, area_action: AreaAction, user_id: int
+    ) -> bool:
+        """Async counterpart of `check`."""
+        action = self.actions.get(action_name)
+        if action:
+            return await action.check_async(session, area_action, user_id)
+        logger.error(f"Action '{action_name}' not found in {self.name}")
+        return False
+
+    def has_async_check(self, action_name: str) -> bool:
+        """Whether the named action should be dispatched on the async path."""
+        action = self.actions.get(action_name)
+        return action is not None and action.is_async
+
     def execute(
         self,
         reaction_name: str,
@@ -140,6 +230,21 @@ class Service:
         logger.error(f"Reaction '{reaction_name}' not found in {self.name}")
         return None
 
+    async def execute_async(
+        self,
+        reaction_name: str,
+        session: Session,
+        area_reaction: AreaReaction,
+        user_id: int,
+    ) -> Optional[Reaction]:
+        """Async counterpart of `execute`."""
+        reaction = self.reactions.get(reaction_name)
+        if reaction:
+            await reaction.execute_async(session, area_reaction, user_id)
+            return reaction
+        logger.error(f"Reaction '{reaction_name}' not found in {self.name}")
+        return None
+
     def get_actions_dict(self) -> Dict[str, Dict[str, Any]]:
         """Build a dictionary with all actions and their details."""
         return [action.to_dict() for action in self.actions.values()]
@@ -224,31 +329,135 @@ class oauth_service:
         }
 
 
-def create_service_dictionnary(
-    service_type: type,
-) -> Dict[str, Union[Service, oauth_service]]:
-    """Auto-discover and instantiate all service subclasses.
+class SeenIds:
+    """Bounded memory of the item IDs an action has already reported.
+
+    Stored in `last_state` as {"high": ..., "recent": [...]} instead of
+    every ID ever listed:
 
-    Recursively finds all subclasses of the given service type
-    and creates a registry dictionary for service discovery.
+    - monotonic sources (numeric IDs that grow over time, like Discord
+      snowflakes or GitHub ids) only keep the highest ID seen;
+    - other sources keep a ring of the `limit` most recent IDs and only
+      diff the first `limit` items of a listing, which must be ordered
+      newest first. Long IDs are stored as short hashes.
+
+    Legacy plain ID lists are read transparently.
     """
-    logger.info(f"Type class: {service_type.__name__}")
-    service_dict = {}
 
-    def get_all_subclasses(cls):
-        """Recursively collect all subclasses."""
-        all_subclasses = []
-        for subclass in cls.__subclasses__():
-            all_subclasses.append(subclass)
-            all_subclasses.extend(get_all_subclasses(subclass))
-        return all_subclasses
+    def __init__(
+        self, state: Any = None, monotonic: bool = False, limit: int | None = None
+    ) -> None:
+        self.monotonic = monotonic
+        self.limit = limit or settings.SEEN_IDS_LIMIT
+        self.initialized = state is not None
+        self.high: Optional[int] = None
+        self.recent: List[str] = []
+        if isinstance(state, dict):
+            self.high = state.get("high")
+            self.recent = list(state.get("recent", []))
+        elif isinstance(state, list):
+            if monotonic:
+                numbers = [n for n in map(self._number, state) if n is not None]
+                self.high = max(numbers, default=None)
+            else:
+                self.recent = [self._fingerprint(item_id) for item_id in state]
+
+    @classmethod
+    def load(cls, last_state: Optional[dict], key: str, **kwargs) -> "SeenIds":
+        """Read the seen IDs stored under `key` of an action's last_state."""
+        return cls((last_state or {}).get(key), **kwargs)
+
+    @staticmethod
+    def _fingerprint(item_id: Any) -> str:
+        item_id = str(item_id)
+        if len(item_id) <= 32:
+            return item_id
+        return hashlib.sha1(item_id.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _number(item_id: Any) -> Optional[int]:
+        try:
+            return int(item_id)
+        except (TypeError, ValueError):
+            return None
+
+    def update(self, item_ids: Iterable[Any]) -> List[Any]:
+        """Record a listing and return its IDs that were not seen before."""
+        item_ids = list(item_ids)
+        if self.monotonic:
+            numbers = [self._number(item_id) for item_id in item_ids]
+            new_ids = [
+                item_id
+                for item_id, number in zip(item_ids, numbers)
+                if number is not None and (self.high is None or number > self.high)
+            ]
+            for number in numbers:
+                if number is not None and (self.high is None or number > self.high):
+                    self.high = number
+        else:
+            window = item_ids[: self.limit]
+            known = set(self.recent)
+            fingerprints = [self._fingerprint(item_id) for item_id in window]
+            new_ids = [
+                item_id
+                for item_id, fingerprint in zip(window, fingerprints)
+                if fingerprint not in known
+            ]
+            self.recent = list(dict.fromkeys(fingerprints + self.recent))[: self.limit]
+        self.initialized = True
+        return new_ids
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"high": self.high, "recent": self.recent}
+
+
+class PollCursor:
+    """Upstream position of an incremental poll.
+
+    Stored in `last_state["cursor"]` next to the action's own state and sent
+    back upstream so that unchanged listings come back as a 304 or an empty
+    page instead of being fetched and diffed again:
+
+    - `etag`: validator of the last listing, sent as If-None-Match;
+    - `since`: time of the newest item seen, for `since=`/`after=` filters;
+    - `token`: opaque position such as a last-seen ID or a sync token.
+    """
 
-    for service_class in get_all_subclasses(service_type):
-        instance = service_class()
-        logger.info(instance.name)
-        service_dict[instance.name] = instance
+    KEY = "cursor"
+
+    def __init__(self, state: Optional[dict] = None) -> None:
+        state = state if isinstance(state, dict) else {}
+        self.etag: Optional[str] = state.get("etag")
+        self.since: Any = state.get("since")
+        self.token: Optional[str] = state.get("token")
+
+    @classmethod
+    def load(cls, last_state: Optional[dict]) -> "PollCursor":
+        """Read the cursor stored in an action's last_state."""
+        if not isinstance(last_state, dict):
+            return cls()
+        return cls(last_state.get(cls.KEY))
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers making the request conditional on the stored ETag."""
+        return {"If-None-Match": self.etag} if self.etag else {}
+
+    def not_modified(self, response) -> bool:
+        """Whether the listing is unchanged; remembers the new ETag otherwise."""
+        if response.status_code == 304:
+            return True
+        etag = response.headers.get("ETag")
+        if etag:
+            self.etag = etag
+        return False
 
-    return service_dict
+    def to_state(self) -> Dict[str, Any]:
+        return {"etag": self.etag, "since": self.since, "token": self.token}
+
+    def save(self, session: Session, area_action: AreaAction, **state: Any) -> None:
+        """Persist the action's state together with this cursor."""
+        area_action.last_state = {**state, self.KEY: self.to_state()}
+        save_last_state(session, area_action)
 
 
 def get_component(config: list, name: str, key: str):
@@ -258,3 +467,56 @@ def get_component(config: list, name: str, key: str):
                 return comp.get(key, None)
             return comp
     return None
+
+
+def save_last_state(session: Session, area_action: AreaAction) -> None:
+    """Persist `area_action.last_state`.
+
+    During an action tick the write is queued on the tick's state buffer
+    (`session.info["state_buffer"]`) and flushed in bulk with the other
+    checks; outside of a tick it is committed right away.
+    """
+    buffer = session.info.get("state_buffer")
+    # Read the key from the identity map: touching an expired attribute
+    # would refresh the row and autoflush the pending state right here
+    identity = inspect(area_action).identity
+    if (
+        buffer is not None
+        and identity is not None
+        and buffer.record(identity[0], area_action.last_state)
+    ):
+        # The buffer owns the write, keep a later commit from flushing it again
+        set_committed_value(area_action, "last_state", area_action.last_state)
+        return
+    session.add(area_action)
+    session.commit()
+
+
+async def db_call(
+    func: Callable[..., T], session: Session, *args: Any, **kwargs: Any
+) -> T:
+    """Run `func(session, ...)` in a worker thread, for coroutines on the loop.
+
+    The session's transaction is ended before returning, so its pooled
+    connection is not held while the coroutine waits on upstream APIs. At
+    most `ASYNC_DB_CONCURRENCY` calls run at once, below the engine's pool
+    size, so worker threads never queue for a connection. Sessions used this
+    way should not expire on commit, or the next attribute access would
+    reload the rows on the loop.
+    """
+    global _db_slot
+    if _db_slot is None:
+        _db_slot = asyncio.Semaphore(settings.ASYNC_DB_CONCURRENCY)
+
+    def run() -> T:
+        try:
+            result = func(session, *args, **kwargs)
+            session.commit()
+            return result
+        except BaseException:
+            # close() releases the connection without expiring loaded rows
+            session.close()
+            raise
+
+    async with _db_slot:
+        return await asyncio.to_thread(run)
@@ -1,4 +1,4 @@
-import requests
+from services.http_client import http, async_http
 from urllib.parse import urlencode
 from sqlmodel import Session, select
 from fastapi import HTTPException, Response, Request
@@ -11,11 +11,14 @@ from core.utils import generate_state
 from core.logger import logger
 from core.categories import ServiceCategory
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint
 from services.services_classes import (
     Service as ServiceClass,
     Action,
     Reaction,
     get_component,
+    save_last_state,
+    db_call,
 )
 from models import UserService, Service, User
 from api.users.db import get_user_service_token
@@ -42,6 +45,13 @@ class SpotifyApiError(Exception):
 class Spotify(ServiceClass):
     """Spotify automation service."""
 
+    token_endpoint = TokenEndpoint(
+        "https://accounts.spotify.com/api/token",
+        settings.SPOTIFY_CLIENT_ID,
+        settings.SPOTIFY_CLIENT_SECRET,
+        basic_auth=True,
+    )
+
     def __init__(self) -> None:
         super().__init__(
             "Spotify", ServiceCategory.MUSIC, "#1DB954", "images/Spotify_logo.webp", True
@@ -59,13 +69,17 @@ class Spotify(ServiceClass):
                 config_schema,
             )
 
-        def check(self, session, area_action, user_id):
+        async def check_async(self, session, area_action, user_id):
             try:
-                token = get_user_service_token(session, user_id, self.service.name)
+                token = await db_call(
+                    get_user_service_token, session, user_id, self.service.name
+                )
                 device_name = get_component(area_action.config, "Device name", "values")
 
                 url = "https://api.spotify.com/v1/me/player"
-                r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+                r = await async_http.get(
+                    url, headers={"Authorization": f"Bearer {token}"}
+                )
 
                 if r.status_code == 204:
                     current_active: bool = False
@@ -82,8 +96,7 @@ class Spotify(ServiceClass):
                     "previous_state", False
                 )
                 area_action.last_state = {"previous_state": current_active}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
 
                 return current_active and not previous_state
             except SpotifyApiError as e:
@@ -101,12 +114,16 @@ class Spotify(ServiceClass):
                 "Triggered when something is currently playing", config_schema
             )
 
-        def check(self, session, area_action, user_id):
+        async def check_async(self, session, area_action, user_id):
             try:
-                token = get_user_service_token(session, user_id, self.service.name)
+                token = await db_call(
+                    get_user_service_token, session, user_id, self.service.name
+                )
 
                 url = "https://api.spotify.com/v1/me/player"
-                r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+                r = await async_http.get(
+                    url, headers={"Authorization": f"Bearer {token}"}
+                )
                 if r.status_code == 204:
                     current_active: bool = False
                 elif r.status_code != 200:
@@ -118,8 +135,7 @@ class Spotify(ServiceClass):
                     "previous_state", False
                 )
                 area_action.last_state = {"previous_state": current_active}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
 
                 return current_active and not previous_state
             except SpotifyApiError as e:
@@ -155,9 +171,11 @@ class Spotify(ServiceClass):
                 "Triggered when volume is above a threshold", config_schema
             )
 
-        def check(self, session, area_action, user_id):
+        async def check_async(self, session, area_action, user_id):
             try:
-                token = get_user_service_token(session, user_id, self.service.name)
+                token = await db_call(
+                    get_user_service_token, session, user_id, self.service.name
+                )
                 try:
                     threshold = int(
                         get_component(area_action.config, "Threshold", "values")
@@ -166,7 +184,9 @@ class Spotify(ServiceClass):
                     raise SpotifyApiError("Incorrect threshold value")
 
                 url = "https://api.spotify.com/v1/me/player"
-                r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+                r = await async_http.get(
+                    url, headers={"Authorization": f"Bearer {token}"}
+                )
                 if r.status_code == 204:
                     return False
                 if r.status_code != 200:
@@ -179,8 +199,7 @@ class Spotify(ServiceClass):
                 current_state: bool = volume > threshold
 
                 area_action.last_state = {"previous_state": current_state}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
                 return current_state and not previous_state
             except SpotifyApiError as e:
                 logger.error(f"{self.service.name}: {e}")
@@ -215,9 +234,11 @@ class Spotify(ServiceClass):
                 "Triggered when volume is below a threshold", config_schema
             )
 
-        def check(self, session, area_action, user_id):
+        async def check_async(self, session, area_action, user_id):
             try:
-                token = get_user_service_token(session, user_id, self.service.name)
+                token = await db_call(
+                    get_user_service_token, session, user_id, self.service.name
+                )
                 try:
                     threshold = int(
                         get_component(area_action.config, "Threshold", "values")
@@ -225,7 +246,9 @@ class Spotify(ServiceClass):
                 except Exception:
                     raise SpotifyApiError("Incorrect threshold value")
                 url = "https://api.spotify.com/v1/me/player"
-                r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+                r = await async_http.get(
+                    url, headers={"Authorization": f"Bearer {token}"}
+                )
                 if r.status_code == 204:
                     return False
                 if r.status_code != 200:
@@ -236,8 +259,7 @@ class Spotify(ServiceClass):
                 )
                 current_state: bool = volume < threshold
                 area_action.last_state = {"previous_state": current_state}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
                 return current_state and not previous_state
             except SpotifyApiError as e:
                 logger.error(f"{self.service.name}: {e}")
@@ -256,13 +278,17 @@ class Spotify(ServiceClass):
                 "Triggered when your track is currently playing", config_schema
             )
 
-        def check(self, session, area_action, user_id):
+        async def check_async(self, session, area_action, user_id):
             try:
-                token = get_user_service_token(session, user_id, self.service.name)
+                token = await db_call(
+                    get_user_service_token, session, user_id, self.service.name
+                )
                 track_name = get_component(area_action.config, "Track name", "values")
 
                 url = "https://api.spotify.com/v1/me/player"
-                r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+                r = await async_http.get(
+                    url, headers={"Authorization": f"Bearer {token}"}
+                )
                 if r.status_code == 204:
                     current_track: str = None
                 elif r.status_code != 200:
@@ -278,8 +304,7 @@ class Spotify(ServiceClass):
                     "previous_state", False
                 )
                 area_action.last_state = {"previous_state": current_active}
-                session.add(area_action)
-                session.commit()
+                await db_call(save_last_state, session, area_action)
                 return current_active and not previous_state
             except SpotifyApiError as e:
                 logger.error(f"{self.service.name}: {e}")
@@ -324,7 +349,7 @@ class Spotify(ServiceClass):
 
                 url = "https://api.spotify.com/v1/me/player/volume"
                 params = {"volume_percent": volume_percent}
-                r = requests.put(
+                r = http.put(
                     url, headers={"Authorization": f"Bearer {token}"}, params=params
                 )
                 if r.status_code != 204:
@@ -357,7 +382,7 @@ class Spotify(ServiceClass):
 
                 url = "https://api.spotify.com/v1/me/player/repeat"
                 params = {"state": state}
-                r = requests.put(
+                r = http.put(
                     url, headers={"Authorization": f"Bearer {token}"}, params=params
                 )
                 if r.status_code == 404:
@@ -386,7 +411,7 @@ class Spotify(ServiceClass):
             try:
                 token = get_user_service_token(session, user_id, self.service.name)
                 url = "https://api.spotify.com/v1/me/player/next"
-                r = requests.post(url, headers={"Authorization": f"Bearer {token}"})
+                r = http.post(url, headers={"Authorization": f"Bearer {token}"})
                 if r.status_code == 404:
                     logger.info(
                         f"Spotify {self.name}: no active playback for user {user_id}"
@@ -413,7 +438,7 @@ class Spotify(ServiceClass):
             try:
                 token = get_user_service_token(session, user_id, self.service.name)
                 url = "https://api.spotify.com/v1/me/player/previous"
-                r = requests.post(url, headers={"Authorization": f"Bearer {token}"})
+                r = http.post(url, headers={"Authorization": f"Bearer {token}"})
                 if r.status_code == 404:
                     logger.info(
                         f"Spotify {self.name}: no active playback for user {user_id}"
@@ -438,7 +463,7 @@ class Spotify(ServiceClass):
             try:
                 token = get_user_service_token(session, user_id, self.service.name)
                 url = "https://api.spotify.com/v1/me/player/pause"
-                r = requests.put(url, headers={"Authorization": f"Bearer {token}"})
+                r = http.put(url, headers={"Authorization": f"Bearer {token}"})
                 if r.status_code == 404:
                     logger.info(
                         f"Spotify {self.name}: no active playback for user {user_id}"
@@ -511,7 +536,7 @@ class Spotify(ServiceClass):
             "redirect_uri": redirect,
             "grant_type": "authorization_code",
         }
-        r = requests.post(url, data=data, headers=headers)
+        r = http.post(url, data=data, headers=headers)
         if r.status_code != 200:
             logger.error(f"Spotify token error: {r.text}")
             raise SpotifyApiError(f"Failed to get Spotify token: {r.text}")
@@ -520,7 +545,7 @@ class Spotify(ServiceClass):
     def _get_user_info(self, token: str) -> Dict[str, Any]:
         url = "https://api.spotify.com/v1/me"
         headers = {"Authorization": f"Bearer {token}"}
-        r = requests.get(url, headers=headers)
+        r = http.get(url, headers=headers)
         if r.status_code != 200:
             raise SpotifyApiError(f"Failed to get Spotify user info: {r.text}")
         return r.json()
@@ -538,4 +563,11 @@ class Spotify(ServiceClass):
         except SpotifyApiError as e:
             raise HTTPException(status_code=400, detail=e.message)
 
-        return oauth_add_link(session, self.name, user, token_res.access_token)
+        return oauth_add_link(
+            session,
+            self.name,
+            user,
+            token_res.access_token,
+            refresh_token=token_res.refresh_token,
+            expires_in=token_res.expires_in,
+        )
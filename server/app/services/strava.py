@@ -1,4 +1,4 @@
-import requests
+from services.http_client import http
 from urllib.parse import urlencode
 from sqlmodel import Session, select
 from fastapi import HTTPException, Response, Request
@@ -11,11 +11,13 @@ from core.utils import generate_state
 from core.logger import logger
 from core.categories import ServiceCategory
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint
 from services.services_classes import (
     Service as ServiceClass,
     Action,
     Reaction,
     get_component,
+    save_last_state,
 )
 from models import AreaAction, UserService, Service, User
 from api.users.db import get_user_service_token
@@ -41,6 +43,12 @@ class StravaApiError(Exception):
 class Strava(ServiceClass):
     """Strava automation service."""
 
+    token_endpoint = TokenEndpoint(
+        "https://www.strava.com/oauth/token",
+        settings.STRAVA_CLIENT_ID,
+        settings.STRAVA_CLIENT_SECRET,
+    )
+
     def __init__(self) -> None:
         super().__init__(
             "Strava", ServiceCategory.FITNESS, "#fc4c02", "images/Strava_logo.webp", True
@@ -58,18 +66,38 @@ class Strava(ServiceClass):
         def check(self, session, area_action, user_id):
             try:
                 token = get_user_service_token(session, user_id, self.service.name)
+                cursor = self.load_cursor(area_action)
+                last_state = area_action.last_state or {}
+                if cursor.since is None and last_state.get("start_date"):
+                    cursor.since = self.service._epoch(last_state["start_date"])
+
                 url = "https://www.strava.com/api/v3/athlete/activities"
+                # Only list activities started after the newest one already seen
                 params = {"per_page": 1}
-                r = requests.get(
+                if cursor.since is not None:
+                    params = {"per_page": 30, "after": cursor.since}
+                r = http.get(
                     url, headers={"Authorization": f"Bearer {token}"}, params=params
                 )
                 if r.status_code != 200:
                     raise StravaApiError("Failed to fetch activities")
 
-                activity = r.json()[0] if r.json() else None
+                activities = [
+                    activity
+                    for activity in r.json()
+                    if activity.get("id") != last_state.get("id")
+                ]
+                if not activities:
+                    return False
+
+                latest = max(activities, key=lambda a: a.get("start_date", ""))
+                first_poll = cursor.since is None
+                cursor.since = self.service._epoch(latest["start_date"])
+                cursor.save(session, area_action, id=latest["id"])
+                return not first_poll
             except StravaApiError as e:
                 logger.error(f"{self.service.name}: {e}")
-            return self.service._compare_data(session, area_action, activity)
+            return False
 
     class new_routes_by_you(Action):
         """Triggered when a new routes is uploaded."""
@@ -87,7 +115,7 @@ class Strava(ServiceClass):
                 athlete_id: int = user_info.get("id", "")
                 url = f"https://www.strava.com/api/v3/athletes/{athlete_id}/routes"
                 params = {"per_page": 1}
-                r = requests.get(
+                r = http.get(
                     url, headers={"Authorization": f"Bearer {token}"}, params=params
                 )
                 if r.status_code != 200:
@@ -114,7 +142,7 @@ class Strava(ServiceClass):
             try:
                 token = get_user_service_token(session, user_id, self.service.name)
                 url = "https://www.strava.com/api/v3/athlete/clubs"
-                r = requests.get(url, headers={"Authorization": f"Bearer {token}"})
+                r = http.get(url, headers={"Authorization": f"Bearer {token}"})
                 if r.status_code != 200:
                     raise StravaApiError("Failed to fetch athlete clubs")
                 club = r.json()[-1] if r.json() else None
@@ -158,7 +186,7 @@ class Strava(ServiceClass):
                     "description": desc,
                     "start_date_local": datetime.now(timezone.utc).isoformat(),
                 }
-                r = requests.post(
+                r = http.post(
                     url, headers={"Authorization": f"Bearer {token}"}, data=data
                 )
                 if r.status_code != 201:
@@ -192,7 +220,7 @@ class Strava(ServiceClass):
                 data = {
                     "weight": new_weight,
                 }
-                r = requests.put(
+                r = http.put(
                     url, headers={"Authorization": f"Bearer {token}"}, data=data
                 )
                 if r.status_code != 200:
@@ -201,20 +229,22 @@ class Strava(ServiceClass):
             except StravaApiError as e:
                 logger.error(f"{self.service.name}: {e}")
 
+    def _epoch(self, timestamp: str) -> int:
+        """Convert a Strava ISO 8601 timestamp to epoch seconds."""
+        return int(datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp())
+
     def _compare_data(
         self, session: Session, area_action: AreaAction, data: Dict[str, Any]
     ) -> bool:
         """Check if the data is new compared to the last stored one."""
         if not area_action.last_state:
             area_action.last_state = data
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return False
 
         if data and data["id"] != area_action.last_state.get("id"):
             area_action.last_state = data
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return True
         return False
 
@@ -263,7 +293,7 @@ class Strava(ServiceClass):
             "code": code,
             "grant_type": "authorization_code",
         }
-        r = requests.post(url, data=data)
+        r = http.post(url, data=data)
         if r.status_code != 200:
             logger.error(f"Strava token error: {r.text}")
             raise StravaApiError(f"Failed to get Strava token: {r.text}")
@@ -272,7 +302,7 @@ class Strava(ServiceClass):
     def _get_user_info(self, token: str) -> Dict[str, Any]:
         url = "https://www.strava.com/api/v3/athlete"
         headers = {"Authorization": f"Bearer {token}"}
-        r = requests.get(url, headers=headers)
+        r = http.get(url, headers=headers)
         if r.status_code != 200:
             raise StravaApiError(f"Failed to get Strava user info: {r.text}")
         return r.json()
@@ -290,4 +320,11 @@ class Strava(ServiceClass):
         except StravaApiError as e:
             raise HTTPException(status_code=400, detail=e.message)
 
-        return oauth_add_link(session, self.name, user, token_res.access_token)
+        return oauth_add_link(
+            session,
+            self.name,
+            user,
+            token_res.access_token,
+            refresh_token=token_res.refresh_token,
+            expires_in=token_res.expires_in,
+        )
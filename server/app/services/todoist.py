@@ -12,6 +12,7 @@ from services.services_classes import (
     Action,
     Reaction,
     get_component,
+    save_last_state,
 )
 from models.services.service import Service
 from schemas.services.todoist import Task, Project
@@ -23,7 +24,7 @@ from core.utils import generate_state
 from pydantic import BaseModel
 from pydantic_core import ValidationError
 from urllib.parse import urlencode
-import requests
+from services.http_client import http
 import json
 from fastapi import Request, HTTPException, Response
 from models.users.user_service import UserService
@@ -68,7 +69,7 @@ class Todoist(ServiceClass):
                 token = get_user_service_token(session, user_id, self.service.name)
                 headers = {"Authorization": f"Bearer {token}"}
                 url = "https://api.todoist.com/sync/v9/completed/get_all"
-                r = requests.get(url, headers=headers)
+                r = http.get(url, headers=headers)
                 if r.status_code != 200:
                     raise TodoistApiError("Failed to fetch completed tasks")
 
@@ -91,15 +92,33 @@ class Todoist(ServiceClass):
             try:
                 token = get_user_service_token(session, user_id, self.service.name)
                 headers = {"Authorization": f"Bearer {token}"}
-                url = "https://api.todoist.com/rest/v2/tasks"
-                r = requests.get(url, headers=headers)
+                cursor = self.load_cursor(area_action)
+                first_poll = cursor.token is None
+                # Incremental sync: only tasks changed since the stored sync
+                # token come back, a full sync is done on the first poll
+                url = "https://api.todoist.com/sync/v9/sync"
+                data = {
+                    "sync_token": cursor.token or "*",
+                    "resource_types": json.dumps(["items"]),
+                }
+                r = http.post(url, headers=headers, data=data)
                 if r.status_code != 200:
-                    raise TodoistApiError("Failed to fetch tasks")
-
-                task = r.json()[-1] if len(r.json()) > 0 else None
+                    raise TodoistApiError("Failed to sync tasks")
+
+                result = r.json()
+                added = [
+                    item.get("added_at") or ""
+                    for item in result.get("items", [])
+                    if not item.get("is_deleted")
+                ]
+                new_tasks = [at for at in added if at > (cursor.since or "")]
+                cursor.token = result.get("sync_token", cursor.token)
+                cursor.since = max([cursor.since or "", *added]) or None
+                cursor.save(session, area_action)
+                return not first_poll and len(new_tasks) > 0
             except TodoistApiError as e:
                 logger.error(f"{self.service.name}: {e}")
-            return self.service._compare_data(session, area_action, task, "id")
+            return False
 
     class create_task(Reaction):
         service: "Todoist"
@@ -138,14 +157,12 @@ class Todoist(ServiceClass):
         """Check if the data is new compared to the last stored one."""
         if not area_action.last_state:
             area_action.last_state = data
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return False
 
         if data and data[key] != area_action.last_state.get(key):
             area_action.last_state = data
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return True
         return False
 
@@ -160,7 +177,7 @@ class Todoist(ServiceClass):
         base_url = "https://todoist.com/oauth/access_token"
         params = {"client_id": client_id, "client_secret": client_secret, "code": code}
 
-        r = requests.post(
+        r = http.post(
             f"{base_url}?{urlencode(params)}", headers={"Accept": "application/json"}
         )
 
@@ -185,7 +202,7 @@ class Todoist(ServiceClass):
     def _get_user_info(self, token):
         base_url = "https://api.todoist.com/api/v1/sync"
         params = {"sync_token": "'*'", "resource_types": json.dumps(["user"])}
-        email_r = requests.post(
+        email_r = http.post(
             f"{base_url}?{urlencode(params)}",
             headers={"Authorization": f"Bearer {token}"},
         )
@@ -206,7 +223,7 @@ class Todoist(ServiceClass):
             else:
                 return []
 
-        r = requests.get(
+        r = http.get(
             f"{base_url}?{urlencode(params)}",
             headers={"Authorization": f"Bearer {token}"},
         )
@@ -237,7 +254,7 @@ class Todoist(ServiceClass):
     def _get_projects(self, token) -> list[Project]:
         base_url = "https://api.todoist.com/api/v1/projects"
         params = {}
-        r = requests.get(
+        r = http.get(
             f"{base_url}?{urlencode(params)}",
             headers={"Authorization": f"Bearer {token}"},
         )
@@ -263,7 +280,7 @@ class Todoist(ServiceClass):
             else:
                 return
 
-        r = requests.post(
+        r = http.post(
             f"{base_url}", data=data, headers={"Authorization": f"Bearer {token}"}
         )
 
@@ -0,0 +1,314 @@
+"""Central OAuth token management for linked services.
+
+`UserService` rows carry the access token, the refresh token and, for
+providers issuing short-lived tokens, `token_expires_at`. The manager:
+
+- hands the polling path a cached, valid access token
+  (`get_user_service_token` goes through `token_manager.get_token`);
+- refreshes tokens `TOKEN_REFRESH_AHEAD` seconds before they expire, in
+  batches, from a background task, so checks rarely pay for a refresh;
+- coalesces concurrent refreshes of the same token: threads of a process
+  share a lock and workers serialize on the row (SELECT ... FOR UPDATE),
+  and whoever comes second reuses the freshly stored token.
+
+A service opts in by setting `token_endpoint` to a `TokenEndpoint`.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from core.config import settings
+from core.logger import logger
+from core.periodic import PeriodicTask
+from models import Service, UserService
+from services.connection_state import record_success, record_unauthorized
+from services.http_client import HttpError, http
+
+
+class TokenRefreshError(Exception):
+    """OAuth token refresh errors."""
+
+    def __init__(self, message, status_code: Optional[int] = None):
+        self.message = message
+        self.status_code = status_code
+        super().__init__(self.message)
+
+
+@dataclass(frozen=True)
+class TokenEndpoint:
+    """Where and how a service refreshes its OAuth tokens."""
+
+    url: str
+    client_id: str
+    client_secret: str
+    basic_auth: bool = False  # client credentials as HTTP basic auth
+    json_body: bool = False
+    headers: Dict[str, str] = field(default_factory=dict)
+    extra_params: Dict[str, str] = field(default_factory=dict)
+
+    def refresh(self, refresh_token: str) -> Dict[str, Any]:
+        data = {
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+            **self.extra_params,
+        }
+        kwargs: Dict[str, Any] = {"headers": self.headers}
+        if self.basic_auth:
+            kwargs["auth"] = (self.client_id, self.client_secret)
+        else:
+            data.update(client_id=self.client_id, client_secret=self.client_secret)
+        kwargs["json" if self.json_body else "data"] = data
+        try:
+            r = http.post(self.url, **kwargs)
+        except HttpError as e:
+            raise TokenRefreshError(f"Token refresh request failed: {e}")
+        if r.status_code != 200:
+            raise TokenRefreshError(
+                f"Token refresh failed: {r.status_code} {r.text}", r.status_code
+            )
+        return r.json()
+
+
+def expiry_from(expires_in: Optional[int]) -> Optional[datetime]:
+    """Absolute expiry of a token valid for `expires_in` seconds."""
+    if not expires_in:
+        return None
+    return datetime.now(timezone.utc) + timedelta(seconds=int(expires_in))
+
+
+def _endpoint_of(service_name: str) -> Optional[TokenEndpoint]:
+    from services.services import services_dico
+
+    if service_name not in services_dico:
+        return None
+    return getattr(services_dico[service_name], "token_endpoint", None)
+
+
+class TokenManager:
+    """Cached, proactively refreshed access tokens of linked services."""
+
+    def __init__(
+        self,
+        refresh_ahead: float = settings.TOKEN_REFRESH_AHEAD,
+        cache_ttl: float = settings.TOKEN_CACHE_TTL,
+        retry_after: float = settings.TOKEN_REFRESH_RETRY,
+    ) -> None:
+        self.refresh_ahead = refresh_ahead
+        self.cache_ttl = cache_ttl
+        self.retry_after = retry_after
+        self.hits = 0
+        self.misses = 0
+        self.refreshed = 0
+        self.failed = 0
+        # (user_id, service name) -> (access token, monotonic deadline)
+        self._tokens: Dict[Tuple[int, str], Tuple[str, float]] = {}
+        self._refresh_locks: Dict[Tuple[int, str], Lock] = {}
+        self._failed_until: Dict[Tuple[int, str], float] = {}
+        self._lock = Lock()
+        self._batches = PeriodicTask("Token refresh batch", self.refresh_due)
+
+    def _due(self, user_service: UserService) -> bool:
+        expires_at = user_service.token_expires_at
+        if expires_at is None or user_service.refresh_token is None:
+            return False
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        horizon = datetime.now(timezone.utc) + timedelta(seconds=self.refresh_ahead)
+        return expires_at <= horizon
+
+    def _remember(self, key: Tuple[int, str], user_service: UserService) -> None:
+        deadline = time.monotonic() + self.cache_ttl
+        if user_service.token_expires_at is not None:
+            expires_at = user_service.token_expires_at
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+            deadline = min(deadline, time.monotonic() + remaining - self.refresh_ahead)
+        with self._lock:
+            self._tokens[key] = (user_service.access_token, deadline)
+
+    def forget(self, user_id: int, service_name: Optional[str] = None) -> None:
+        """Drop cached tokens of a user, e.g. after linking or unlinking."""
+        with self._lock:
+            for key in [k for k in self._tokens if k[0] == user_id]:
+                if service_name is None or key[1] == service_name:
+                    del self._tokens[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self._failed_until.clear()
+
+    @staticmethod
+    def _load(session: Session, user_id: int, service_name: str):
+        return session.exec(
+            select(UserService)
+            .join(Service, Service.id == UserService.service_id)
+            .where(UserService.user_id == user_id, Service.name == service_name)
+        ).first()
+
+    def get_token(
+        self, session: Session, user_id: int, service_name: str
+    ) -> Optional[str]:
+        """Valid access token of the user for the service, None if not linked."""
+        key = (user_id, service_name)
+        with self._lock:
+            cached = self._tokens.get(key)
+            if cached is not None and cached[1] > time.monotonic():
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        user_service = self._load(session, user_id, service_name)
+        if user_service is None:
+            self.forget(user_id, service_name)
+            return None
+        if self._due(user_service):
+            self._refresh(session, user_service, service_name)
+        self._remember(key, user_service)
+        return user_service.access_token
+
+    def force_refresh(self, session: Session, user_id: int, service_name: str) -> bool:
+        """Refresh now, e.g. after the provider rejected the token with a 401."""
+        user_service = self._load(session, user_id, service_name)
+        if user_service is None:
+            return False
+        refreshed = self._refresh(session, user_service, service_name, force=True)
+        if refreshed:
+            self._remember((user_id, service_name), user_service)
+        return refreshed
+
+    def _refresh_lock(self, key: Tuple[int, str]) -> Lock:
+        with self._lock:
+            return self._refresh_locks.setdefault(key, Lock())
+
+    def _refresh(
+        self,
+        session: Session,
+        user_service: UserService,
+        service_name: str,
+        force: bool = False,
+    ) -> bool:
+        """Refresh `user_service` in place; returns whether the token changed."""
+        endpoint = _endpoint_of(service_name)
+        if endpoint is None or user_service.refresh_token is None:
+            return False
+        key = (user_service.user_id, service_name)
+        if not force and self._failed_until.get(key, 0) > time.monotonic():
+            return False
+
+        with self._refresh_lock(key):
+            previous = user_service.access_token
+            # Lock the row and reload it: another thread or worker may have
+            # refreshed it while we were waiting
+            session.exec(
+                select(UserService)
+                .where(UserService.id == user_service.id)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            ).first()
+            if user_service.access_token != previous or not (
+                force or self._due(user_service)
+            ):
+                session.commit()
+                return user_service.access_token != previous
+
+            try:
+                grant = endpoint.refresh(user_service.refresh_token)
+                user_service.access_token = grant["access_token"]
+            except (TokenRefreshError, KeyError, ValueError) as e:
+                session.rollback()
+                if getattr(e, "status_code", None) in (400, 401):
+                    # invalid_grant: the user revoked access or the token is dead
+                    record_unauthorized(user_service)
+                    session.add(user_service)
+                    session.commit()
+                with self._lock:
+                    self.failed += 1
+                    self._failed_until[key] = time.monotonic() + self.retry_after
+                logger.error(
+                    f"{service_name}: token refresh failed for user {key[0]}: {e}"
+                )
+                return False
+
+            user_service.refresh_token = grant.get(
+                "refresh_token", user_service.refresh_token
+            )
+            user_service.token_expires_at = expiry_from(grant.get("expires_in"))
+            record_success(user_service)
+            session.add(user_service)
+            session.commit()
+            with self._lock:
+                self.refreshed += 1
+                self._failed_until.pop(key, None)
+            logger.info(f"{service_name}: refreshed token for user {key[0]}")
+            return True
+
+    def _refresh_row(self, user_service_id: int, service_name: str) -> bool:
+        from core.engine import engine
+
+        with Session(engine) as session:
+            user_service = session.get(UserService, user_service_id)
+            if user_service is None:
+                return False
+            refreshed = self._refresh(session, user_service, service_name)
+            if refreshed:
+                self._remember((user_service.user_id, service_name), user_service)
+            return refreshed
+
+    def refresh_due(
+        self,
+        engine=None,
+        batch_size: int = settings.TOKEN_REFRESH_BATCH_SIZE,
+        workers: int = settings.TOKEN_REFRESH_WORKERS,
+    ) -> int:
+        """Refresh the tokens expiring soonest; returns how many were refreshed."""
+        if engine is None:
+            from core.engine import engine
+        horizon = datetime.now(timezone.utc) + timedelta(seconds=self.refresh_ahead)
+        with Session(engine) as session:
+            due = session.exec(
+                select(UserService.id, Service.name)
+                .join(Service, Service.id == UserService.service_id)
+                .where(
+                    UserService.refresh_token.is_not(None),
+                    UserService.token_expires_at <= horizon,
+                )
+                .order_by(UserService.token_expires_at)
+                .limit(batch_size)
+            ).all()
+        if not due:
+            return 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda row: self._refresh_row(*row), due))
+        refreshed = sum(results)
+        logger.debug(f"Token manager: refreshed {refreshed}/{len(due)} due tokens")
+        return refreshed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "entries": len(self._tokens),
+                "refreshed": self.refreshed,
+                "failed": self.failed,
+            }
+
+    def start(self, interval: float = settings.TOKEN_REFRESH_INTERVAL) -> None:
+        """Start background refreshes on the running event loop."""
+        self._batches.start(interval)
+
+    async def stop(self) -> None:
+        await self._batches.stop()
+
+
+token_manager = TokenManager()
@@ -11,11 +11,13 @@ from fastapi import HTTPException, Request, Response
 from models import AreaAction, Service, User, UserService, AreaReaction
 from services.area_api import AreaApi
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint
 from services.services_classes import (
     Service as ServiceClass,
     Action,
     Reaction,
     get_component,
+    save_last_state,
 )
 from sqlmodel import Session, select
 
@@ -249,6 +251,18 @@ trakt_api = TraktApi()
 
 
 class Trakt(ServiceClass):
+    token_endpoint = TokenEndpoint(
+        "https://api.trakt.tv/oauth/token",
+        settings.TRAKT_CLIENT_ID,
+        settings.TRAKT_CLIENT_SECRET,
+        json_body=True,
+        headers={
+            "User-Agent": "AreaApp/0.0.1",
+            "trakt-api-key": settings.TRAKT_CLIENT_ID,
+        },
+        extra_params={"redirect_uri": f"{settings.FRONT_URL}/callbacks/link/Trakt"},
+    )
+
     def __init__(self) -> None:
         super().__init__("Service Trakt", ServiceCategory.MOVIE, "#9F42C6", "images/Trakt_logo.webp", True)
 
@@ -274,8 +288,7 @@ class Trakt(ServiceClass):
                 or last_state["last_movie_title"] != last_movie_title
             ):
                 area_action.last_state = {"last_movie_title": last_movie_title}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
                 return True
 
             return False
@@ -302,8 +315,7 @@ class Trakt(ServiceClass):
                 or last_state["last_movie_title"] != last_movie_title
             ):
                 area_action.last_state = {"last_movie_title": last_movie_title}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
                 return True
 
             return False
@@ -494,4 +506,11 @@ class Trakt(ServiceClass):
         except TraktApiError as e:
             raise HTTPException(status_code=400, detail=e.message)
 
-        return oauth_add_link(session, self.name, user, token_res.access_token)
+        return oauth_add_link(
+            session,
+            self.name,
+            user,
+            token_res.access_token,
+            refresh_token=token_res.refresh_token,
+            expires_in=token_res.expires_in,
+        )
@@ -1,4 +1,4 @@
-import requests
+from services.http_client import http
 from urllib.parse import urlencode
 from sqlmodel import Session, select
 from fastapi import HTTPException, Response, Request
@@ -10,10 +10,12 @@ from core.utils import generate_state
 from core.logger import logger
 from core.categories import ServiceCategory
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint
 from services.services_classes import (
     Service as ServiceClass,
     Action,
     get_component,
+    save_last_state,
 )
 from models import AreaAction, UserService, Service, User
 from api.users.db import get_user_service_token
@@ -39,6 +41,12 @@ class TwitchApiError(Exception):
 class Twitch(ServiceClass):
     """Twitch automation service."""
 
+    token_endpoint = TokenEndpoint(
+        "https://id.twitch.tv/oauth2/token",
+        settings.TWITCH_CLIENT_ID,
+        settings.TWITCH_CLIENT_SECRET,
+    )
+
     def __init__(self) -> None:
         super().__init__("Twitch", ServiceCategory.STREAMING, "#6441a5", "images/Twitch_logo.webp", True)
 
@@ -63,7 +71,7 @@ class Twitch(ServiceClass):
                     "Client-Id": settings.TWITCH_CLIENT_ID,
                 }
                 params = {"broadcaster_id": broadcaster_id}
-                r = requests.get(url, headers=headers, params=params)
+                r = http.get(url, headers=headers, params=params)
                 if r.status_code != 200:
                     raise TwitchApiError("Failed to fetch followers")
 
@@ -92,7 +100,7 @@ class Twitch(ServiceClass):
                     "Client-Id": settings.TWITCH_CLIENT_ID,
                 }
                 params = {"user_id": user_id}
-                r = requests.get(url, headers=headers, params=params)
+                r = http.get(url, headers=headers, params=params)
                 if r.status_code != 200:
                     raise TwitchApiError("Failed to fetch followed")
 
@@ -121,7 +129,7 @@ class Twitch(ServiceClass):
                     "Client-Id": settings.TWITCH_CLIENT_ID,
                 }
                 params = {"first": 10}
-                r = requests.get(url, headers=headers, params=params)
+                r = http.get(url, headers=headers, params=params)
                 if r.status_code != 200:
                     raise TwitchApiError("Failed to fetch followed")
 
@@ -140,14 +148,12 @@ class Twitch(ServiceClass):
         """Check if the data is new compared to the last stored one."""
         if not area_action.last_state:
             area_action.last_state = data
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return False
 
         if data and data.get("total") > area_action.last_state.get("total"):
             area_action.last_state = data
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return True
         return False
 
@@ -198,7 +204,7 @@ class Twitch(ServiceClass):
             "redirect_uri": redirect,
             "grant_type": "authorization_code",
         }
-        r = requests.post(url, data=data)
+        r = http.post(url, data=data)
         if r.status_code != 200:
             logger.error(f"Twitch token error: {r.text}")
             raise TwitchApiError(f"Failed to get Twitch token: {r.text}")
@@ -210,7 +216,7 @@ class Twitch(ServiceClass):
             "Authorization": f"Bearer {token}",
             "Client-Id": settings.TWITCH_CLIENT_ID,
         }
-        r = requests.get(url, headers=headers)
+        r = http.get(url, headers=headers)
         if r.status_code != 200:
             raise TwitchApiError(f"Failed to get Twitch user info: {r.text}")
         return r.json().get("data")[0]
@@ -228,4 +234,11 @@ class Twitch(ServiceClass):
         except TwitchApiError as e:
             raise HTTPException(status_code=400, detail=e.message)
 
-        return oauth_add_link(session, self.name, user, token_res.access_token)
+        return oauth_add_link(
+            session,
+            self.name,
+            user,
+            token_res.access_token,
+            refresh_token=token_res.refresh_token,
+            expires_in=token_res.expires_in,
+        )
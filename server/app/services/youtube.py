@@ -2,7 +2,7 @@ from sqlmodel import Session
 from pydantic import BaseModel
 from pydantic_core import ValidationError
 from sqlmodel import select
-import requests
+from services.http_client import http
 from urllib.parse import urlencode
 from fastapi import HTTPException, Response, Request
 
@@ -10,6 +10,7 @@ from typing import Dict, Any
 from core.utils import generate_state
 from core.categories import ServiceCategory
 from services.oauth_lib import oauth_add_link
+from services.token_manager import TokenEndpoint
 from models import AreaAction, UserService, AreaReaction, User, Service
 from core.config import settings
 from services.services_classes import (
@@ -17,6 +18,7 @@ from services.services_classes import (
     Action,
     Reaction,
     get_component,
+    save_last_state,
 )
 from core.logger import logger
 from api.users.db import get_user_service_token
@@ -40,6 +42,12 @@ class YoutubeApiError(Exception):
 
 
 class Youtube(ServiceClass):
+    token_endpoint = TokenEndpoint(
+        "https://oauth2.googleapis.com/token",
+        settings.GOOGLE_CLIENT_ID,
+        settings.GOOGLE_CLIENT_SECRET,
+    )
+
     def __init__(self) -> None:
         super().__init__(
             "Service youtube de Google",
@@ -87,7 +95,7 @@ class Youtube(ServiceClass):
                 params = {"part": "statistics", "id": video_id}
                 headers = {"Authorization": f"Bearer {token}"}
 
-                r = requests.get(url, headers=headers, params=params)
+                r = http.get(url, headers=headers, params=params)
                 if r.status_code != 200:
                     raise YoutubeApiError(f"Failed to fetch video stats: {r.text}")
 
@@ -102,8 +110,7 @@ class Youtube(ServiceClass):
                 current_state = like_count > threshold
 
                 area_action.last_state = {"previous_state": current_state}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
 
                 return current_state and not previous_state
             except YoutubeApiError as e:
@@ -148,7 +155,7 @@ class Youtube(ServiceClass):
                 params = {"part": "statistics", "id": video_id}
                 headers = {"Authorization": f"Bearer {token}"}
 
-                r = requests.get(url, headers=headers, params=params)
+                r = http.get(url, headers=headers, params=params)
                 if r.status_code != 200:
                     raise YoutubeApiError(f"Failed to fetch video stats: {r.text}")
 
@@ -163,8 +170,7 @@ class Youtube(ServiceClass):
                 current_state = like_count < threshold
 
                 area_action.last_state = {"previous_state": current_state}
-                session.add(area_action)
-                session.commit()
+                save_last_state(session, area_action)
 
                 return current_state and not previous_state
             except YoutubeApiError as e:
@@ -189,7 +195,7 @@ class Youtube(ServiceClass):
                 }
                 headers = {"Authorization": f"Bearer {token}"}
 
-                r = requests.get(url, headers=headers, params=params)
+                r = http.get(url, headers=headers, params=params)
                 if r.status_code != 200:
                     raise YoutubeApiError(f"Failed to fetch liked videos: {r.text}")
 
@@ -224,7 +230,7 @@ class Youtube(ServiceClass):
                 }
                 headers = {"Authorization": f"Bearer {token}"}
 
-                r = requests.get(url, headers=headers, params=params)
+                r = http.get(url, headers=headers, params=params)
                 if r.status_code != 200:
                     raise YoutubeApiError(f"Failed to fetch subscriptions: {r.text}")
 
@@ -269,7 +275,7 @@ class Youtube(ServiceClass):
                 url = "https://www.googleapis.com/youtube/v3/videos/rate"
                 params = {"id": video_id, "rating": {rating}}
                 headers = {"Authorization": f"Bearer {token}"}
-                r = requests.post(url, headers=headers, params=params)
+                r = http.post(url, headers=headers, params=params)
                 if r.status_code != 204:
                     raise YoutubeApiError(f"Failed to like video: {r.text}")
                 logger.info(f"{self.service.name} - {self.name} - Rated video {video_id} with {rating} - User: {user_id}")
@@ -282,14 +288,12 @@ class Youtube(ServiceClass):
         """Check if the data is new compared to the last stored one."""
         if not area_action.last_state:
             area_action.last_state = data
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return False
 
         if data and data[key] != area_action.last_state.get(key):
             area_action.last_state = data
-            session.add(area_action)
-            session.commit()
+            save_last_state(session, area_action)
             return True
         return False
 
@@ -328,7 +332,7 @@ class Youtube(ServiceClass):
             "grant_type": "authorization_code",
             "redirect_uri": redirect,
         }
-        r = requests.post(base_url, data=params)
+        r = http.post(base_url, data=params)
         if r.status_code != 200:
             raise YoutubeApiError("Failed to retrieve Google token")
         try:
@@ -348,7 +352,7 @@ class Youtube(ServiceClass):
             "Authorization": f"Bearer {token}",
             "Accept": "application/json",
         }
-        r = requests.get(url, headers=headers, params=params)
+        r = http.get(url, headers=headers, params=params)
         if r.status_code != 200:
             raise YoutubeApiError(f"Failed to fetch channel: {r.text}")
         data = r.json()
@@ -360,7 +364,7 @@ class Youtube(ServiceClass):
         url = "https://www.googleapis.com/youtube/v3/channels"
         params = {"part": "id,snippet", "mine": "true"}
         headers = {"Authorization": f"Bearer {token}"}
-        r = requests.get(url, headers=headers, params=params)
+        r = http.get(url, headers=headers, params=params)
         if r.status_code != 200:
             raise YoutubeApiError(f"Failed to get channel info: {r.text}")
         data = r.json()
@@ -395,5 +399,12 @@ class Youtube(ServiceClass):
             raise HTTPException(status_code=400, detail=e.message)
 
         return oauth_add_link(
-            session, self.name, user, token_res.access_token, request, is_mobile
+            session,
+            self.name,
+            user,
+            token_res.access_token,
+            request,
+            is_mobile,
+            refresh_token=token_res.refresh_token,
+            expires_in=token_res.expires_in,
         )
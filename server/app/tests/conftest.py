@@ -1,4 +1,6 @@
 import os
+from types import SimpleNamespace
+
 import pytest
 from sqlmodel import SQLModel, Session, create_engine
 from fastapi.testclient import TestClient
@@ -8,6 +10,8 @@ os.environ["ENV"] = "tests"
 from main import app
 from core.config import settings
 from dependencies.db import get_session
+from core.user_cache import user_cache
+from services.token_manager import token_manager
 
 
 test_engine = create_engine(
@@ -26,6 +30,16 @@ def setup_test_database():
     SQLModel.metadata.drop_all(test_engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Do not let cached users and tokens leak between tests"""
+    user_cache.clear()
+    token_manager.clear()
+    yield
+    user_cache.clear()
+    token_manager.clear()
+
+
 @pytest.fixture
 def session():
     """Provide a database session for tests"""
@@ -68,3 +82,43 @@ def clean_database(session):
     session.commit()
     yield
 
+
+@pytest.fixture
+def area_with(session):
+    """Build areas of ExecutorService reactions from (name, order_index, delay)"""
+    from models import Area, AreaReaction, Reaction, Service, User
+
+    service = Service(
+        name="ExecutorService",
+        image_url="",
+        category="test",
+        color="#123456",
+        oauth_required=False,
+    )
+    user = User(name="executor", email="reaction-executor@example.com")
+    session.add_all([service, user])
+    session.commit()
+
+    def build(*reactions):
+        area = Area(user_id=user.id, name="area", description="", enable=True)
+        session.add(area)
+        session.commit()
+        for name, order_index, delay in reactions:
+            reaction = Reaction(service_id=service.id, name=name)
+            session.add(reaction)
+            session.commit()
+            session.add(
+                AreaReaction(
+                    area_id=area.id,
+                    reaction_id=reaction.id,
+                    order_index=order_index,
+                    delay=delay,
+                )
+            )
+        session.commit()
+        return area.id
+
+    yield SimpleNamespace(build=build, service=service, user=user)
+    session.delete(user)
+    session.delete(service)
+    session.commit()
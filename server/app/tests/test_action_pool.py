@@ -0,0 +1,151 @@
+import asyncio
+import time
+from functools import partial
+from threading import Lock
+
+from unittest.mock import patch
+
+from sqlmodel import Session, select
+
+from api.actions_process import pool
+from api.actions_process.pool import run_bounded, run_bounded_async
+from core.config import settings
+from core.engine import engine
+from services.services_classes import db_call
+
+
+class TestRunBounded:
+    """Test the bounded action check pool"""
+
+    def test_runs_all_jobs(self):
+        """Test every job runs when the deadline allows it"""
+        results = []
+        jobs = [lambda i=i: results.append(i) for i in range(10)]
+
+        skipped = run_bounded("TestService", jobs, time.monotonic() + 5)
+
+        assert skipped == 0
+        assert sorted(results) == list(range(10))
+
+    def test_expired_deadline_skips_jobs(self):
+        """Test jobs are skipped once the tick deadline has passed"""
+        results = []
+        jobs = [lambda i=i: results.append(i) for i in range(3)]
+
+        skipped = run_bounded("TestService", jobs, time.monotonic() - 1)
+
+        assert skipped == 3
+        assert results == []
+
+    def test_failing_job_does_not_stop_others(self):
+        """Test one failing check does not abort the tick"""
+        results = []
+
+        def fail():
+            raise RuntimeError("upstream down")
+
+        skipped = run_bounded(
+            "TestService",
+            [fail, lambda: results.append("ok")],
+            time.monotonic() + 5,
+        )
+
+        assert skipped == 0
+        assert results == ["ok"]
+
+    def test_service_concurrency_cap(self):
+        """Test no more than the per-service cap run at once"""
+        lock = Lock()
+        state = {"current": 0, "peak": 0}
+
+        def job():
+            with lock:
+                state["current"] += 1
+                state["peak"] = max(state["peak"], state["current"])
+            time.sleep(0.05)
+            with lock:
+                state["current"] -= 1
+
+        with patch.object(pool.settings, "ACTION_SERVICE_CONCURRENCY", 2):
+            skipped = run_bounded("CappedService", [job] * 6, time.monotonic() + 5)
+
+        assert skipped == 0
+        assert state["peak"] <= 2
+
+
+class TestRunBoundedAsync:
+    """Test the async action check lane"""
+
+    def test_runs_all_jobs(self):
+        """Test every coroutine job runs on the service loop"""
+        results = []
+
+        async def job(i):
+            await asyncio.sleep(0.01)
+            results.append(i)
+
+        jobs = [partial(job, i) for i in range(20)]
+        skipped = run_bounded_async("TestService", jobs, time.monotonic() + 5)
+
+        assert skipped == 0
+        assert sorted(results) == list(range(20))
+
+    def test_jobs_overlap_on_one_loop(self):
+        """Test waiting jobs do not hold a worker each"""
+        async def job():
+            await asyncio.sleep(0.2)
+
+        start = time.monotonic()
+        skipped = run_bounded_async("TestService", [job] * 50, time.monotonic() + 5)
+
+        assert skipped == 0
+        assert time.monotonic() - start < 1
+
+    def test_expired_deadline_skips_jobs(self):
+        """Test coroutine jobs are skipped once the tick deadline has passed"""
+        results = []
+
+        async def job():
+            results.append(1)
+
+        skipped = run_bounded_async("TestService", [job] * 3, time.monotonic() - 1)
+
+        assert skipped == 3
+        assert results == []
+
+    def test_failing_job_does_not_stop_others(self):
+        """Test one failing async check does not abort the tick"""
+        results = []
+
+        async def fail():
+            raise RuntimeError("upstream down")
+
+        async def ok():
+            results.append("ok")
+
+        skipped = run_bounded_async("TestService", [fail, ok], time.monotonic() + 5)
+
+        assert skipped == 0
+        assert results == ["ok"]
+
+    def test_db_work_holds_no_connection_across_awaits(self):
+        """Test more checks than pooled connections do not stall the loop"""
+        state = {"peak": 0}
+
+        def read(session):
+            return session.exec(select(1)).one()
+
+        async def job():
+            with Session(engine, expire_on_commit=False) as session:
+                await db_call(read, session)
+                state["peak"] = max(state["peak"], engine.pool.checkedout())
+                await asyncio.sleep(0.5)
+                await db_call(read, session)
+
+        jobs = [job] * 20
+        start = time.monotonic()
+        skipped = run_bounded_async("TestService", jobs, time.monotonic() + 10)
+
+        assert skipped == 0
+        assert time.monotonic() - start < 3
+        assert state["peak"] <= settings.ASYNC_DB_CONCURRENCY
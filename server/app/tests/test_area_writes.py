@@ -0,0 +1,271 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import select
+
+from core.security import sign_jwt
+from models import Action, Area, AreaAction, AreaReaction, Reaction, Service, User
+from tests.test_areas_listing import count_queries
+
+
+@pytest.fixture
+def owner(client, session):
+    """A signed-in user and a service with two actions and two reactions"""
+    service = Service(
+        name="WritesService",
+        image_url="",
+        category="test",
+        color="#123456",
+        oauth_required=False,
+    )
+    user = User(name="writer", email="area-writes@example.com")
+    session.add_all([service, user])
+    session.commit()
+    action = Action(service_id=service.id, name="poll", interval="* * * * *")
+    other_action = Action(service_id=service.id, name="watch", interval="*/5 * * * *")
+    reactions = [Reaction(service_id=service.id, name=f"react {i}") for i in range(2)]
+    session.add_all([action, other_action, *reactions])
+    session.commit()
+    client.cookies.set("access_token", f"Bearer {sign_jwt(user.id)}")
+
+    def payload(name="area", reaction_ids=None):
+        return {
+            "name": name,
+            "description": "description",
+            "action": {"action_id": action.id, "config": {"every": 1}},
+            "reactions": [
+                {"reaction_id": reaction_id, "config": {"n": i}}
+                for i, reaction_id in enumerate(
+                    reaction_ids or [reaction.id for reaction in reactions]
+                )
+            ],
+        }
+
+    yield SimpleNamespace(
+        user=user,
+        action=action,
+        other_action=other_action,
+        reactions=reactions,
+        payload=payload,
+    )
+    session.delete(user)
+    session.delete(service)
+    session.commit()
+
+
+def user_areas(session, user):
+    return session.exec(select(Area).where(Area.user_id == user.id)).all()
+
+
+def inserts(statements):
+    return [s for s in statements if s.startswith("INSERT")]
+
+
+class TestCreateArea:
+    """Test areas are written as one unit of work"""
+
+    def test_create_inserts_once_per_table(self, client, session, owner):
+        """Test the area, its action and its reactions take one INSERT each"""
+        client.get("/users/me")
+
+        with count_queries() as statements:
+            response = client.post("/users/areas/me", json=owner.payload())
+        assert response.status_code == 200
+
+        assert len(inserts(statements)) == 3
+        area_id = response.json()["area_id"]
+        reactions = session.exec(
+            select(AreaReaction).where(AreaReaction.area_id == area_id)
+        ).all()
+        assert [r.config for r in reactions] == [{"n": 0}, {"n": 1}]
+
+    def test_unknown_reaction_writes_nothing(self, client, session, owner):
+        """Test an invalid reaction leaves no half-written area behind"""
+        response = client.post(
+            "/users/areas/me",
+            json=owner.payload(reaction_ids=[owner.reactions[0].id, 999999]),
+        )
+
+        assert response.status_code == 404
+        assert user_areas(session, owner.user) == []
+
+    def test_failed_update_keeps_area(self, client, session, owner):
+        """Test an update rejected midway does not delete the original area"""
+        area_id = client.post("/users/areas/me", json=owner.payload()).json()["area_id"]
+
+        response = client.patch(
+            f"/users/areas/{area_id}", json=owner.payload(reaction_ids=[999999])
+        )
+
+        assert response.status_code == 404
+        assert [area.id for area in user_areas(session, owner.user)] == [area_id]
+
+
+class TestUpdateArea:
+    """Test areas are updated in place"""
+
+    @pytest.fixture
+    def area(self, client, session, owner):
+        """An enabled area whose trigger has a baseline"""
+        area_id = client.post("/users/areas/me", json=owner.payload()).json()["area_id"]
+        area_action = session.exec(
+            select(AreaAction).where(AreaAction.area_id == area_id)
+        ).one()
+        area_action.last_state = {"seen": [1, 2]}
+        session.get(Area, area_id).enable = True
+        session.commit()
+        return area_id
+
+    def reactions_of(self, session, area_id):
+        session.expire_all()
+        return session.exec(
+            select(AreaReaction)
+            .where(AreaReaction.area_id == area_id)
+            .order_by(AreaReaction.id)
+        ).all()
+
+    def test_rename_keeps_rows_and_state(self, client, session, owner, area):
+        """Test unchanged parts keep their ids and the trigger its baseline"""
+        before = [r.id for r in self.reactions_of(session, area)]
+        payload = owner.payload("renamed")
+        payload["reactions"][1]["config"] = {"n": 42}
+
+        with patch("api.users.areas.router.newJob") as new_job:
+            response = client.patch(f"/users/areas/{area}", json=payload)
+
+        assert response.json()["area_id"] == area
+        new_job.assert_not_called()
+        reactions = self.reactions_of(session, area)
+        assert [r.id for r in reactions] == before
+        assert reactions[1].config == {"n": 42}
+        updated = session.get(Area, area)
+        assert (updated.name, updated.enable) == ("renamed", True)
+        assert session.exec(
+            select(AreaAction).where(AreaAction.area_id == area)
+        ).one().last_state == {"seen": [1, 2]}
+
+    def test_partial_update(self, client, session, owner, area):
+        """Test only the fields sent are changed"""
+        response = client.patch(f"/users/areas/{area}", json={"description": "new"})
+
+        assert response.status_code == 200
+        session.expire_all()
+        assert session.get(Area, area).description == "new"
+        assert len(self.reactions_of(session, area)) == 2
+
+    def test_action_config_change_resets_state(self, client, session, owner, area):
+        """Test a new action config drops the trigger baseline"""
+        payload = owner.payload()
+        payload["action"]["config"] = {"every": 2}
+
+        client.patch(f"/users/areas/{area}", json=payload)
+
+        session.expire_all()
+        area_action = session.exec(
+            select(AreaAction).where(AreaAction.area_id == area)
+        ).one()
+        assert (area_action.config, area_action.last_state) == ({"every": 2}, None)
+
+    def test_action_change_schedules_new_trigger(self, client, owner, area):
+        """Test the scheduler only hears about a different trigger action"""
+        payload = owner.payload()
+        payload["action"]["action_id"] = owner.other_action.id
+
+        with patch("api.users.areas.router.isCronExists", return_value=False), patch(
+            "api.users.areas.router.newJob"
+        ) as new_job:
+            client.patch(f"/users/areas/{area}", json=payload)
+
+        new_job.assert_called_once_with(owner.other_action.id)
+
+    def test_reactions_added_and_removed(self, client, session, owner, area):
+        """Test extra reactions are appended and missing ones deleted"""
+        first, second = owner.reactions
+        before = [r.id for r in self.reactions_of(session, area)]
+
+        client.patch(
+            f"/users/areas/{area}",
+            json={"reactions": owner.payload(reaction_ids=[second.id])["reactions"]},
+        )
+        reactions = self.reactions_of(session, area)
+        assert [(r.id, r.reaction_id) for r in reactions] == [(before[0], second.id)]
+
+        ids = [second.id, first.id, first.id]
+        client.patch(
+            f"/users/areas/{area}",
+            json={"reactions": owner.payload(reaction_ids=ids)["reactions"]},
+        )
+        reactions = self.reactions_of(session, area)
+        assert [r.reaction_id for r in reactions] == ids
+        assert reactions[0].id == before[0]
+
+
+class TestImportAreas:
+    """Test the bulk area import"""
+
+    def test_import_creates_all(self, client, session, owner):
+        """Test many areas are created with a constant number of INSERTs"""
+        client.get("/users/me")
+        payload = {"areas": [owner.payload(f"area {i}") for i in range(20)]}
+
+        with count_queries() as statements:
+            response = client.post("/users/areas/me/import", json=payload)
+        assert response.status_code == 200
+
+        area_ids = response.json()["area_ids"]
+        assert len(area_ids) == 20
+        assert len(inserts(statements)) == 3
+        names = {area.id: area.name for area in user_areas(session, owner.user)}
+        assert [names[area_id] for area_id in area_ids] == [
+            f"area {i}" for i in range(20)
+        ]
+
+    def test_import_is_all_or_nothing(self, client, session, owner):
+        """Test one invalid area rejects the whole import"""
+        payload = {
+            "areas": [owner.payload("valid"), owner.payload("bad", [999999])]
+        }
+
+        response = client.post("/users/areas/me/import", json=payload)
+
+        assert response.status_code == 404
+        assert user_areas(session, owner.user) == []
+
+    def test_import_requires_areas(self, client, owner):
+        """Test an empty import is rejected"""
+        response = client.post("/users/areas/me/import", json={"areas": []})
+
+        assert response.status_code == 422
+
+
+class TestPublishArea:
+    """Test publishing copies an area in one transaction"""
+
+    def test_publish_copies_reactions(self, client, session, owner):
+        """Test the public copy keeps the reactions, their order and delay"""
+        area_id = client.post("/users/areas/me", json=owner.payload()).json()["area_id"]
+        reactions = session.exec(
+            select(AreaReaction).where(AreaReaction.area_id == area_id)
+        ).all()
+        for index, reaction in enumerate(reactions):
+            reaction.order_index, reaction.delay = index, 10 * index
+        session.commit()
+
+        with count_queries() as statements:
+            response = client.post(f"/users/areas/{area_id}/publish")
+        assert response.status_code == 200
+        assert len(inserts(statements)) == 3
+
+        public = session.exec(
+            select(Area).where(Area.user_id == owner.user.id, Area.is_public == True)
+        ).one()
+        copied = session.exec(
+            select(AreaReaction)
+            .where(AreaReaction.area_id == public.id)
+            .order_by(AreaReaction.order_index)
+        ).all()
+        assert [(r.order_index, r.delay) for r in copied] == [(0, 0), (1, 10)]
+        assert session.exec(
+            select(AreaAction).where(AreaAction.area_id == public.id)
+        ).one().config == {"every": 1}
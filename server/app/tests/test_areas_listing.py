@@ -0,0 +1,178 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.security import sign_jwt
+from models import Action, Area, AreaAction, Service, User
+
+
+@contextmanager
+def count_queries():
+    """Count the SQL statements run inside the block"""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def listing(session):
+    """A user owning a growing number of private and public areas"""
+    service = Service(
+        name="ListingService",
+        image_url="",
+        category="test",
+        color="#123456",
+        oauth_required=False,
+    )
+    user = User(name="lister", email="areas-listing@example.com")
+    session.add_all([service, user])
+    session.commit()
+    action = Action(service_id=service.id, name="poll", interval="* * * * *")
+    session.add(action)
+    session.commit()
+
+    def add_areas(count: int, is_public: bool):
+        areas = [
+            Area(user_id=user.id, name=f"area {i}", description="", is_public=is_public)
+            for i in range(count)
+        ]
+        session.add_all(areas)
+        session.commit()
+        session.add_all(
+            [AreaAction(area_id=area.id, action_id=action.id) for area in areas]
+        )
+        session.commit()
+        return areas
+
+    yield SimpleNamespace(
+        user=user, service=service, action=action, add_areas=add_areas
+    )
+    session.delete(user)
+    session.delete(service)
+    session.commit()
+
+
+class TestAreaListingQueries:
+    """Test area listings cost a constant number of queries"""
+
+    @pytest.mark.parametrize(
+        "url, is_public",
+        [
+            ("/areas/public", True),
+            ("/users/areas/me", False),
+            ("/users/areas/public", True),
+        ],
+    )
+    def test_constant_query_count(self, client, listing, url, is_public):
+        """Test the query count does not grow with the number of areas"""
+        client.cookies.set("access_token", f"Bearer {sign_jwt(listing.user.id)}")
+        # Resolve the user once so both counts are served by the user cache
+        client.get(url)
+
+        listing.add_areas(2, is_public)
+        with count_queries() as few:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json()) >= 2
+
+        listing.add_areas(20, is_public)
+        with count_queries() as many:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json()) >= 22
+
+        assert len(many) == len(few)
+
+    def test_listing_content(self, client, listing):
+        """Test each listed area carries its owner and action service color"""
+        listing.add_areas(1, True)
+
+        response = client.get("/areas/public")
+        areas = [
+            area for area in response.json() if area["user"]["id"] == listing.user.id
+        ]
+
+        assert areas[0]["user"]["name"] == "lister"
+        assert areas[0]["color"] == "#123456"
+
+
+class TestPublicAreasPagination:
+    """Test keyset pagination and filters of the public areas listing"""
+
+    def test_pages_cover_every_area_once(self, client, listing):
+        """Test following the cursor lists all areas newest first without repeats"""
+        listing.add_areas(3, True)
+        listing.add_areas(2, True)
+        params = {"service_id": listing.service.id, "limit": 2}
+
+        pages = []
+        while True:
+            response = client.get("/areas/public", params=params)
+            assert response.status_code == 200
+            pages.append([area["id"] for area in response.json()])
+            if "X-Next-Cursor" not in response.headers:
+                break
+            params["cursor"] = response.headers["X-Next-Cursor"]
+
+        ids = [area_id for page in pages for area_id in page]
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert ids == sorted(ids, reverse=True)
+
+    def test_filters(self, client, listing):
+        """Test filtering on service, category and action"""
+        listing.add_areas(2, True)
+
+        for params in [
+            {"service_id": listing.service.id},
+            {"action_id": listing.action.id},
+            {"category": "test", "service_id": listing.service.id},
+        ]:
+            assert len(client.get("/areas/public", params=params).json()) == 2
+        assert client.get("/areas/public", params={"service_id": -1}).json() == []
+
+    def test_unpaged_without_limit(self, client, listing):
+        """Test existing clients still get every area in one response"""
+        listing.add_areas(60, True)
+
+        response = client.get(
+            "/areas/public", params={"service_id": listing.service.id}
+        )
+
+        assert len(response.json()) == 60
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_cursor_alone_uses_default_page_size(self, client, listing):
+        """Test following a cursor without a limit keeps paging"""
+        listing.add_areas(3, True)
+        params = {"service_id": listing.service.id, "limit": 1}
+        cursor = client.get("/areas/public", params=params).headers["X-Next-Cursor"]
+
+        with patch("core.config.settings.PUBLIC_AREAS_PAGE_SIZE", 1):
+            response = client.get(
+                "/areas/public",
+                params={"service_id": listing.service.id, "cursor": cursor},
+            )
+
+        assert len(response.json()) == 1
+        assert "X-Next-Cursor" in response.headers
+
+    def test_limit_is_bounded(self, client):
+        """Test oversized pages are rejected"""
+        response = client.get("/areas/public", params={"limit": 10_000})
+        assert response.status_code == 422
+
+    def test_invalid_cursor(self, client):
+        """Test a malformed cursor is rejected"""
+        response = client.get("/areas/public", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
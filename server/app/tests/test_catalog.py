@@ -0,0 +1,88 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+
+from core.catalog import get_catalog, invalidate_catalog
+from core.security import sign_jwt
+from models import Action, Service, User
+
+
+class TestCatalogEndpoints:
+    """Test the catalog endpoints served from the in-memory snapshot"""
+
+    def test_services_list_matches_database(self, client, session):
+        """Test the snapshot lists every synced service"""
+        response = client.get("/services/list")
+
+        assert response.status_code == 200
+        names = {service["name"] for service in response.json()}
+        assert names == set(session.exec(select(Service.name)).all())
+
+    def test_services_list_runs_no_query(self, client):
+        """Test the list is served without touching the database"""
+        client.get("/services/list")
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", record)
+        try:
+            client.get("/services/list")
+        finally:
+            event.remove(Engine, "before_cursor_execute", record)
+        assert statements == []
+
+    def test_not_modified(self, client):
+        """Test a matching If-None-Match gets an empty 304"""
+        etag = client.get("/services/list").headers["ETag"]
+
+        response = client.get("/services/list", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        response = client.get("/services/list", headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+
+    def test_service_actions(self, client, session):
+        """Test per-service actions come from the snapshot"""
+        user = User(name="catalog", email="catalog@example.com")
+        session.add(user)
+        session.commit()
+        client.cookies.set("access_token", f"Bearer {sign_jwt(user.id)}")
+        service = session.exec(select(Service).where(Service.name == "Github")).one()
+        expected = session.exec(
+            select(Action.name).where(Action.service_id == service.id)
+        ).all()
+
+        response = client.get(f"/services/{service.id}/actions")
+        assert response.status_code == 200
+        assert sorted(action["name"] for action in response.json()) == sorted(expected)
+        assert client.get("/services/0/actions").json() == []
+
+        session.delete(user)
+        session.commit()
+
+    def test_about(self, client):
+        """Test /about.json keeps its shape and revalidates on the catalog"""
+        response = client.get("/about.json")
+        body = response.json()
+
+        assert body["client"]["host"] == "testserver"
+        assert isinstance(body["server"]["current_time"], int)
+        github = next(s for s in body["server"]["services"] if s["name"] == "Github")
+        assert {"name", "description"} <= set(github["actions"][0])
+
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+        response = client.get("/about.json", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_invalidation_rebuilds(self, session):
+        """Test a sync drops the snapshot and the next read rebuilds it"""
+        before = get_catalog(session)
+        invalidate_catalog()
+        after = get_catalog(session)
+
+        assert after is not before
+        assert after.services.etag == before.services.etag
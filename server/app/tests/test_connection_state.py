@@ -0,0 +1,206 @@
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlmodel import Session
+
+from core.security import sign_jwt
+from models import Service, User, UserService
+from services.connection_state import ConnectionRevalidator, connection_valid
+from tests.conftest import test_engine
+
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def link(session):
+    """A user and a factory linking them to a service"""
+    service = Service(
+        name="ConnService", image_url="", category="test", oauth_required=True
+    )
+    user = User(name="conn", email="connection-state@example.com")
+    session.add_all([service, user])
+    session.commit()
+
+    def make(**state):
+        user_service = UserService(
+            user_id=user.id, service_id=service.id, access_token="token", **state
+        )
+        session.add(user_service)
+        session.commit()
+        return user_service
+
+    make.user = user
+    make.service = service
+    yield make
+    session.delete(user)
+    session.delete(service)
+    session.commit()
+
+
+def stored(user_service_id):
+    with Session(test_engine) as session:
+        return session.get(UserService, user_service_id)
+
+
+class TestConnectionValid:
+    """Test validity is derived from the stored evidence"""
+
+    def test_new_link_is_valid(self):
+        """Test a link without any evidence yet counts as connected"""
+        assert connection_valid(UserService(access_token="token"))
+
+    def test_unauthorized_after_success(self):
+        """Test the most recent evidence wins"""
+        old, new = NOW - timedelta(hours=1), NOW
+        assert not connection_valid(
+            UserService(access_token="t", last_success_at=old, last_unauthorized_at=new)
+        )
+        assert connection_valid(
+            UserService(access_token="t", last_success_at=new, last_unauthorized_at=old)
+        )
+
+    def test_expired_token(self):
+        """Test an expired token is only valid if it can be refreshed"""
+        expired = NOW - timedelta(minutes=1)
+        assert not connection_valid(
+            UserService(access_token="t", token_expires_at=expired)
+        )
+        assert connection_valid(
+            UserService(access_token="t", refresh_token="r", token_expires_at=expired)
+        )
+
+
+class TestIsConnectedEndpoint:
+    """Test the endpoint answers from the database without probing"""
+
+    def test_no_live_probe(self, client, link):
+        """Test a valid link is reported without calling the service"""
+        link()
+        client.cookies.set("access_token", f"Bearer {sign_jwt(link.user.id)}")
+        probe = Mock(side_effect=AssertionError("live probe"))
+
+        with patch("services.services.services_dico", {"ConnService": probe}):
+            response = client.get(f"/services/{link.service.id}/is_connected")
+        assert response.json() == {"is_connected": True}
+
+    def test_invalid_link_is_removed(self, client, link):
+        """Test a rejected link reports disconnected and is deleted"""
+        user_service_id = link(last_unauthorized_at=NOW).id
+        client.cookies.set("access_token", f"Bearer {sign_jwt(link.user.id)}")
+
+        response = client.get(f"/services/{link.service.id}/is_connected")
+        assert response.json() == {"is_connected": False}
+        assert stored(user_service_id) is None
+
+
+class TestConnectionRevalidator:
+    """Test the background job re-probes stale links"""
+
+    def test_probes_only_stale_links(self, link):
+        """Test fresh links are skipped and probe results are recorded"""
+        stale = link(last_success_at=NOW - timedelta(hours=2))
+        revalidator = ConnectionRevalidator(freshness=3600)
+        service = Mock()
+        service.is_connected.return_value = False
+
+        with patch("services.services.services_dico", {"ConnService": service}):
+            assert revalidator.revalidate_stale(test_engine) == 1
+            assert revalidator.revalidate_stale(test_engine) == 0
+
+        assert service.is_connected.call_count == 1
+        assert not connection_valid(stored(stale.id))
+        assert revalidator.stats()["invalid"] == 1
+
+    def test_failing_links_do_not_block_others(self, link, session):
+        """Test a link whose probe errors waits its turn like the others"""
+        failing = link(last_success_at=NOW - timedelta(hours=3))
+        other = Service(
+            name="ConnHealthy", image_url="", category="test", oauth_required=True
+        )
+        session.add(other)
+        session.commit()
+        healthy = UserService(
+            user_id=link.user.id,
+            service_id=other.id,
+            access_token="token",
+            last_success_at=NOW - timedelta(hours=2),
+        )
+        session.add(healthy)
+        session.commit()
+        revalidator = ConnectionRevalidator(freshness=3600, batch_size=1)
+        broken = Mock()
+        broken.is_connected.side_effect = RuntimeError("upstream down")
+        working = Mock()
+        working.is_connected.return_value = True
+
+        with patch(
+            "services.services.services_dico",
+            {"ConnService": broken, "ConnHealthy": working},
+        ):
+            assert revalidator.revalidate_stale(test_engine) == 1
+            assert revalidator.revalidate_stale(test_engine) == 1
+            assert revalidator.revalidate_stale(test_engine) == 0
+
+        assert broken.is_connected.call_count == 1
+        assert working.is_connected.call_count == 1
+        assert stored(failing.id).last_checked_at is not None
+        assert revalidator.stats()["errors"] == 1
+
+        session.delete(other)
+        session.commit()
+
+    def test_probe_deadline(self, link):
+        """Test probes slower than the deadline are not waited for"""
+        user_service = link()
+        revalidator = ConnectionRevalidator()
+        service = Mock()
+        service.is_connected.side_effect = lambda *args: time.sleep(0.5) or True
+
+        with patch("services.services.services_dico", {"ConnService": service}):
+            start = time.monotonic()
+            results = revalidator.probe_many(
+                [(user_service.id, "ConnService")], deadline=0.05, engine=test_engine
+            )
+            assert time.monotonic() - start < 0.4
+            assert results == {}
+            time.sleep(0.6)
+
+        assert stored(user_service.id).last_success_at is not None
+
+
+class TestConnectedServicesEndpoint:
+    """Test the batch connection status of every service"""
+
+    def test_lists_every_service(self, client, link, session):
+        """Test one response covers linked and unlinked services"""
+        link(last_success_at=NOW)
+        other = Service(
+            name="ConnOther", image_url="", category="test", oauth_required=True
+        )
+        session.add(other)
+        session.commit()
+        client.cookies.set("access_token", f"Bearer {sign_jwt(link.user.id)}")
+
+        response = client.get("/services/connected")
+        assert response.status_code == 200
+        status = {s["name"]: s["is_connected"] for s in response.json()}
+        assert status["ConnService"] is True
+        assert status["ConnOther"] is False
+
+        session.delete(other)
+        session.commit()
+
+    def test_stale_links_are_probed_within_deadline(self, client, link):
+        """Test links not confirmed lately are probed before answering"""
+        link(last_success_at=NOW - timedelta(days=1))
+        client.cookies.set("access_token", f"Bearer {sign_jwt(link.user.id)}")
+        service = Mock()
+        service.is_connected.return_value = False
+
+        with patch("services.services.services_dico", {"ConnService": service}):
+            response = client.get("/services/connected")
+        status = {s["name"]: s["is_connected"] for s in response.json()}
+        assert status["ConnService"] is False
+        assert service.is_connected.call_count == 1
@@ -1,12 +1,14 @@
 from unittest.mock import Mock, patch
+from sqlalchemy.dialects import postgresql
 from sqlmodel import Session
 
 from core.db import (
     upsert_data,
-    sync_reactions_for_service,
-    sync_actions_for_service,
+    sync_reactions,
+    sync_actions,
     sync_services_catalog_to_db,
     sync_services_oauth_catalog_to_db,
+    catalog_fingerprint,
     init_db,
 )
 from models import Service
@@ -80,29 +82,58 @@ class TestUpsertData:
         mock_session.exec.assert_called_once()
 
 
-class TestSyncReactionsForService:
-    """Test sync_reactions_for_service function"""
+    def test_upsert_data_multiple_rows(self):
+        """Test a multi-row upsert updates columns from each proposed row"""
+        mock_session = Mock(spec=Session)
+
+        upsert_data(
+            session=mock_session,
+            model=Service,
+            values=[{"name": "a", "color": "#000"}, {"name": "b", "color": "#fff"}],
+            conflict_target=["name"],
+            update_fields=["color"],
+        )
+
+        stmt = mock_session.exec.call_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (name) DO UPDATE SET color = excluded.color" in sql
+        assert sql.count("%(name_m") == 2
+
+
+class TestSyncReactions:
+    """Test sync_reactions function"""
 
     def test_sync_reactions_add_new(self):
         """Test adding new reactions"""
         mock_session = Mock(spec=Session)
         mock_session.exec.return_value.all.return_value = []
 
-        service_data = {
-            "reactions": [
+        catalog = {
+            "service": {
+                "name": "service",
+                "reactions": [
+                    {
+                        "name": "new_reaction",
+                        "description": "A new reaction",
+                        "config_schema": {"type": "object"},
+                    }
+                ],
+            }
+        }
+
+        with patch("core.db.upsert_data") as mock_upsert:
+            sync_reactions(mock_session, catalog, {"service": 1})
+
+            mock_upsert.assert_called_once()
+            args, kwargs = mock_upsert.call_args
+            assert kwargs["values"] == [
                 {
+                    "service_id": 1,
                     "name": "new_reaction",
                     "description": "A new reaction",
                     "config_schema": {"type": "object"},
                 }
             ]
-        }
-        service_id = 1
-
-        with patch("core.db.upsert_data") as mock_upsert:
-            sync_reactions_for_service(mock_session, service_data, service_id)
-
-            mock_upsert.assert_called_once()
 
     def test_sync_reactions_delete_removed(self):
         """Test deleting reactions that are no longer in JSON"""
@@ -113,11 +144,10 @@ class TestSyncReactionsForService:
         mock_session = Mock(spec=Session)
         mock_session.exec.return_value.all.return_value = [mock_existing_reaction]
 
-        service_data = {"reactions": []}
-        service_id = 1
+        catalog = {"service": {"name": "service", "reactions": []}}
 
         with patch("core.db.logger") as mock_logger:
-            sync_reactions_for_service(mock_session, service_data, service_id)
+            sync_reactions(mock_session, catalog, {"service": 1})
 
             mock_session.delete.assert_called_once_with(mock_existing_reaction)
             mock_logger.info.assert_called()
@@ -126,59 +156,67 @@ class TestSyncReactionsForService:
         """Test updating existing reactions"""
         mock_existing_reaction = Mock()
         mock_existing_reaction.name = "existing_reaction"
+        mock_existing_reaction.service_id = 1
 
         mock_session = Mock(spec=Session)
         mock_session.exec.return_value.all.return_value = [mock_existing_reaction]
 
-        service_data = {
-            "reactions": [
-                {
-                    "name": "existing_reaction",
-                    "description": "Updated description",
-                    "config_schema": {"type": "updated"},
-                }
-            ]
+        catalog = {
+            "service": {
+                "name": "service",
+                "reactions": [
+                    {
+                        "name": "existing_reaction",
+                        "description": "Updated description",
+                        "config_schema": {"type": "updated"},
+                    }
+                ],
+            }
         }
-        service_id = 1
 
         with patch("core.db.upsert_data") as mock_upsert:
-            sync_reactions_for_service(mock_session, service_data, service_id)
+            sync_reactions(mock_session, catalog, {"service": 1})
 
             mock_upsert.assert_called_once()
+            mock_session.delete.assert_not_called()
 
     def test_sync_reactions_empty_service_data(self):
         """Test sync with empty service data"""
         mock_session = Mock(spec=Session)
         mock_session.exec.return_value.all.return_value = []
 
-        service_data = {}
-        service_id = 1
+        catalog = {"service": {"name": "service"}}
+
+        with patch("core.db.upsert_data") as mock_upsert:
+            sync_reactions(mock_session, catalog, {"service": 1})
 
-        sync_reactions_for_service(mock_session, service_data, service_id)
+            mock_upsert.assert_not_called()
 
 
-class TestSyncActionsForService:
-    """Test sync_actions_for_service function"""
+class TestSyncActions:
+    """Test sync_actions function"""
 
     def test_sync_actions_add_new(self):
         """Test adding new actions"""
         mock_session = Mock(spec=Session)
         mock_session.exec.return_value.all.return_value = []
 
-        service_data = {
-            "actions": [
-                {
-                    "name": "new_action",
-                    "interval": 60,
-                    "description": "A new action",
-                    "config_schema": {"type": "object"},
-                }
-            ]
+        catalog = {
+            "service": {
+                "name": "service",
+                "actions": [
+                    {
+                        "name": "new_action",
+                        "interval": 60,
+                        "description": "A new action",
+                        "config_schema": {"type": "object"},
+                    }
+                ],
+            }
         }
-        service_id = 1
 
         with patch("core.db.upsert_data") as mock_upsert:
-            sync_actions_for_service(mock_session, service_data, service_id)
+            sync_actions(mock_session, catalog, {"service": 1})
 
             mock_upsert.assert_called_once()
 
@@ -186,15 +224,15 @@ class TestSyncActionsForService:
         """Test deleting actions that are no longer in JSON"""
         mock_existing_action = Mock()
         mock_existing_action.name = "old_action"
+        mock_existing_action.service_id = 1
 
         mock_session = Mock(spec=Session)
         mock_session.exec.return_value.all.return_value = [mock_existing_action]
 
-        service_data = {"actions": []}
-        service_id = 1
+        catalog = {"service": {"name": "service", "actions": []}}
 
         with patch("core.db.logger") as mock_logger:
-            sync_actions_for_service(mock_session, service_data, service_id)
+            sync_actions(mock_session, catalog, {"service": 1})
 
             mock_session.delete.assert_called_once_with(mock_existing_action)
             mock_logger.info.assert_called()
@@ -204,23 +242,42 @@ class TestSyncActionsForService:
         mock_session = Mock(spec=Session)
         mock_session.exec.return_value.all.return_value = []
 
-        service_data = {
-            "actions": [
-                {
-                    "name": "timed_action",
-                    "interval": 120,
-                    "description": "Action with interval",
-                }
-            ]
+        catalog = {
+            "service": {
+                "name": "service",
+                "actions": [
+                    {
+                        "name": "timed_action",
+                        "interval": 120,
+                        "description": "Action with interval",
+                    }
+                ],
+            }
         }
-        service_id = 1
 
         with patch("core.db.upsert_data") as mock_upsert:
-            sync_actions_for_service(mock_session, service_data, service_id)
+            sync_actions(mock_session, catalog, {"service": 1})
+
+            args, kwargs = mock_upsert.call_args
+            assert kwargs["values"][0]["interval"] == 120
+            assert "interval" in kwargs["update_fields"]
 
+    def test_sync_actions_one_upsert_for_all_services(self):
+        """Test actions of every service are upserted in a single statement"""
+        mock_session = Mock(spec=Session)
+        mock_session.exec.return_value.all.return_value = []
+
+        catalog = {
+            "first": {"name": "first", "actions": [{"name": "a", "interval": 1}]},
+            "second": {"name": "second", "actions": [{"name": "b", "interval": 2}]},
+        }
+
+        with patch("core.db.upsert_data") as mock_upsert:
+            sync_actions(mock_session, catalog, {"first": 1, "second": 2})
+
+            mock_upsert.assert_called_once()
             args, kwargs = mock_upsert.call_args
-            assert kwargs["values"]["interval"] == 120
-            assert kwargs["update_fields"]["interval"] == 120
+            assert [row["service_id"] for row in kwargs["values"]] == [1, 2]
 
 
 class TestSyncServicesCatalogToDB:
@@ -229,12 +286,13 @@ class TestSyncServicesCatalogToDB:
     def test_sync_services_add_new_service(self):
         """Test adding a new service"""
         mock_session = Mock(spec=Session)
-        mock_session.exec.return_value.all.return_value = []
+        mock_session.exec.return_value.all.side_effect = [
+            [],
+            [("test_service", 1)],
+            [],
+        ]
         mock_session.commit = Mock()
 
-        mock_result = Mock()
-        mock_result.scalar_one.return_value = 1
-
         catalog = {
             "test_service": {
                 "name": "test_service",
@@ -247,19 +305,19 @@ class TestSyncServicesCatalogToDB:
         }
 
         with (
-            patch("core.db.upsert_data", return_value=mock_result) as mock_upsert,
-            patch("core.db.sync_actions_for_service") as mock_sync_actions,
-            patch("core.db.sync_reactions_for_service") as mock_sync_reactions,
+            patch("core.db.upsert_data") as mock_upsert,
+            patch("core.db.sync_actions") as mock_sync_actions,
+            patch("core.db.sync_reactions") as mock_sync_reactions,
             patch("core.db.logger"),
         ):
             sync_services_catalog_to_db(mock_session, catalog)
 
             mock_upsert.assert_called_once()
             mock_sync_actions.assert_called_once_with(
-                mock_session, catalog["test_service"], 1
+                mock_session, catalog, {"test_service": 1}
             )
             mock_sync_reactions.assert_called_once_with(
-                mock_session, catalog["test_service"], 1
+                mock_session, catalog, {"test_service": 1}
             )
             mock_session.commit.assert_called_once()
 
@@ -275,6 +333,9 @@ class TestSyncServicesCatalogToDB:
             [],
             [],
             [],
+            [],
+            [],
+            [],
         ]
         mock_session.commit = Mock()
 
@@ -292,9 +353,6 @@ class TestSyncServicesCatalogToDB:
         mock_session.exec.return_value.all.return_value = []
         mock_session.commit = Mock()
 
-        mock_result = Mock()
-        mock_result.scalar_one.return_value = 1
-
         catalog = {
             "complex_service": {
                 "name": "complex_service",
@@ -305,9 +363,9 @@ class TestSyncServicesCatalogToDB:
         }
 
         with (
-            patch("core.db.upsert_data", return_value=mock_result),
-            patch("core.db.sync_actions_for_service") as mock_sync_actions,
-            patch("core.db.sync_reactions_for_service") as mock_sync_reactions,
+            patch("core.db.upsert_data"),
+            patch("core.db.sync_actions") as mock_sync_actions,
+            patch("core.db.sync_reactions") as mock_sync_reactions,
             patch("core.db.logger"),
         ):
             sync_services_catalog_to_db(mock_session, catalog)
@@ -360,8 +418,14 @@ class TestInitDB:
     @patch("core.db.SQLModel")
     @patch("core.db.sync_services_catalog_to_db")
     @patch("core.db.sync_services_oauth_catalog_to_db")
+    @patch("core.db.build_catalog")
     def test_init_db_success(
-        self, mock_sync_oauth, mock_sync_services, mock_sqlmodel, mock_session_class
+        self,
+        mock_build_catalog,
+        mock_sync_oauth,
+        mock_sync_services,
+        mock_sqlmodel,
+        mock_session_class,
     ):
         """Test successful database initialization"""
         mock_session = Mock()
@@ -375,13 +439,20 @@ class TestInitDB:
         mock_sqlmodel.metadata.create_all.assert_called_once()
         mock_sync_services.assert_called_once_with(mock_session, catalog)
         mock_sync_oauth.assert_called_once_with(mock_session, oauth_catalog)
+        mock_build_catalog.assert_called_once_with(mock_session)
 
     @patch("core.db.Session")
     @patch("core.db.SQLModel")
     @patch("core.db.sync_services_catalog_to_db")
     @patch("core.db.sync_services_oauth_catalog_to_db")
+    @patch("core.db.build_catalog")
     def test_init_db_with_empty_catalogs(
-        self, mock_sync_oauth, mock_sync_services, mock_sqlmodel, mock_session_class
+        self,
+        mock_build_catalog,
+        mock_sync_oauth,
+        mock_sync_services,
+        mock_sqlmodel,
+        mock_session_class,
     ):
         """Test database initialization with empty catalogs"""
         mock_session = Mock()
@@ -393,6 +464,79 @@ class TestInitDB:
         mock_sync_oauth.assert_called_once_with(mock_session, {})
 
 
+    @patch("core.db.Session")
+    @patch("core.db.SQLModel")
+    @patch("core.db.sync_services_catalog_to_db")
+    @patch("core.db.sync_services_oauth_catalog_to_db")
+    @patch("core.db.build_catalog")
+    def test_init_db_skips_unchanged_catalog(
+        self,
+        mock_build_catalog,
+        mock_sync_oauth,
+        mock_sync_services,
+        mock_sqlmodel,
+        mock_session_class,
+    ):
+        """Test the sync is skipped when the stored fingerprint matches"""
+        catalog = {"service1": {"name": "service1"}}
+        oauth_catalog = {"github": {"name": "github"}}
+        mock_session = Mock()
+        mock_session.get.return_value = Mock(
+            fingerprint=catalog_fingerprint(catalog, oauth_catalog)
+        )
+        mock_session_class.return_value.__enter__.return_value = mock_session
+
+        init_db(catalog, oauth_catalog)
+
+        mock_sync_services.assert_not_called()
+        mock_sync_oauth.assert_not_called()
+        mock_build_catalog.assert_called_once_with(mock_session)
+
+
+    @patch("core.db.Session")
+    @patch("core.db.SQLModel")
+    @patch("core.db.upgrade_schema")
+    @patch("core.db.sync_services_catalog_to_db")
+    @patch("core.db.sync_services_oauth_catalog_to_db")
+    @patch("core.db.build_catalog")
+    def test_init_db_runs_migrations(
+        self,
+        mock_build_catalog,
+        mock_sync_oauth,
+        mock_sync_services,
+        mock_upgrade_schema,
+        mock_sqlmodel,
+        mock_session_class,
+    ):
+        """Test the schema is migrated instead of created when enabled"""
+        mock_session_class.return_value.__enter__.return_value = Mock()
+
+        with patch("core.db.settings.DB_MIGRATIONS", True):
+            init_db({}, {})
+
+        mock_upgrade_schema.assert_called_once()
+        mock_sqlmodel.metadata.create_all.assert_not_called()
+
+
+class TestCatalogFingerprint:
+    """Test the catalog fingerprint gating the startup sync"""
+
+    def test_fingerprint_ignores_key_order(self):
+        """Test equal catalogs hash the same whatever their key order"""
+        first = {"a": {"name": "a", "color": "#fff"}, "b": {"name": "b"}}
+        second = {"b": {"name": "b"}, "a": {"color": "#fff", "name": "a"}}
+
+        assert catalog_fingerprint(first, {}) == catalog_fingerprint(second, {})
+
+    def test_fingerprint_changes_with_catalog(self):
+        """Test any catalog change gives a new fingerprint"""
+        catalog = {"a": {"name": "a", "actions": [{"name": "x", "interval": 1}]}}
+        changed = {"a": {"name": "a", "actions": [{"name": "x", "interval": 2}]}}
+
+        assert catalog_fingerprint(catalog, {}) != catalog_fingerprint(changed, {})
+        assert catalog_fingerprint(catalog, {}) != catalog_fingerprint({}, catalog)
+
+
 class TestDatabaseEdgeCases:
     """Test edge cases and error conditions"""
 
@@ -421,39 +565,44 @@ class TestDatabaseEdgeCases:
         mock_session = Mock(spec=Session)
         mock_session.exec.return_value.all.return_value = []
 
-        service_data = {
-            "reactions": [
-                {"name": "valid_reaction"},
-                {"name": "another_valid"},
-            ]
+        catalog = {
+            "service": {
+                "name": "service",
+                "reactions": [
+                    {"name": "valid_reaction"},
+                    {"name": "another_valid"},
+                ],
+            }
         }
-        service_id = 1
 
         with patch("core.db.upsert_data") as mock_upsert:
-            sync_reactions_for_service(mock_session, service_data, service_id)
-            assert mock_upsert.call_count == 2
+            sync_reactions(mock_session, catalog, {"service": 1})
+            args, kwargs = mock_upsert.call_args
+            assert len(kwargs["values"]) == 2
 
     def test_sync_actions_with_interval(self):
         """Test sync with action that has interval field"""
         mock_session = Mock(spec=Session)
         mock_session.exec.return_value.all.return_value = []
 
-        service_data = {
-            "actions": [
-                {
-                    "name": "action_with_interval",
-                    "description": "Test action",
-                    "interval": 300,
-                }
-            ]
+        catalog = {
+            "service": {
+                "name": "service",
+                "actions": [
+                    {
+                        "name": "action_with_interval",
+                        "description": "Test action",
+                        "interval": 300,
+                    }
+                ],
+            }
         }
-        service_id = 1
 
         with patch("core.db.upsert_data") as mock_upsert:
-            sync_actions_for_service(mock_session, service_data, service_id)
+            sync_actions(mock_session, catalog, {"service": 1})
 
             args, kwargs = mock_upsert.call_args
-            assert kwargs["values"]["interval"] == 300
+            assert kwargs["values"][0]["interval"] == 300
 
 
 class TestDatabaseIntegration:
@@ -462,12 +611,15 @@ class TestDatabaseIntegration:
     def test_complete_service_sync_workflow(self):
         """Test complete service synchronization workflow"""
         mock_session = Mock(spec=Session)
-        mock_session.exec.return_value.all.return_value = []
+        mock_session.exec.return_value.all.side_effect = [
+            [],
+            [("test_service", 1)],
+            [],
+            [],
+            [],
+        ]
         mock_session.commit = Mock()
 
-        mock_result = Mock()
-        mock_result.scalar_one.return_value = 1
-
         catalog = {
             "test_service": {
                 "name": "test_service",
@@ -495,7 +647,7 @@ class TestDatabaseIntegration:
         }
 
         with (
-            patch("core.db.upsert_data", return_value=mock_result) as mock_upsert,
+            patch("core.db.upsert_data") as mock_upsert,
             patch("core.db.logger"),
         ):
             sync_services_catalog_to_db(mock_session, catalog)
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.fetch_cache import FetchCache
+
+
+class TestFetchCache:
+    """Test shared upstream fetch coalescing"""
+
+    def test_same_key_fetched_once(self):
+        """Test N callers of one resource cost one fetch"""
+        cache = FetchCache(ttl=30)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return {"episodes": [1, 2, 3]}
+
+        results = [
+            cache.get_or_fetch("Podcast", "rss", "https://feed", fetch)
+            for _ in range(5)
+        ]
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert cache.stats()["hits"] == 4
+        assert cache.stats()["misses"] == 1
+
+    def test_params_are_part_of_key(self):
+        """Test different params are fetched separately"""
+        cache = FetchCache(ttl=30)
+
+        first = cache.get_or_fetch("OpenMeteo", "/v1", {"lat": 1}, lambda: "a")
+        second = cache.get_or_fetch("OpenMeteo", "/v1", {"lat": 2}, lambda: "b")
+        third = cache.get_or_fetch("OpenMeteo", "/v1", {"lat": 1}, lambda: "c")
+
+        assert (first, second, third) == ("a", "b", "a")
+
+    def test_expired_entry_is_refetched(self):
+        """Test entries expire after the ttl"""
+        cache = FetchCache(ttl=0)
+        values = iter(["old", "new"])
+
+        cache.get_or_fetch("IGN", "rss", "news", lambda: next(values))
+        time.sleep(0.01)
+
+        assert cache.get_or_fetch("IGN", "rss", "news", lambda: next(values)) == "new"
+
+    def test_errors_are_not_cached(self):
+        """Test a failed fetch is retried by the next caller"""
+        cache = FetchCache(ttl=30)
+
+        def fail():
+            raise RuntimeError("down")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_fetch("IGN", "rss", "news", fail)
+
+        assert cache.get_or_fetch("IGN", "rss", "news", lambda: "ok") == "ok"
+
+    def test_concurrent_callers_share_in_flight_fetch(self):
+        """Test concurrent callers wait for the in-flight fetch"""
+        cache = FetchCache(ttl=30)
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    cache.get_or_fetch("ClashRoyale", "/players", "#TAG", slow_fetch)
+                )
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["value"] * 8
+
+    def test_async_callers_share_in_flight_fetch(self):
+        """Test concurrent coroutines wait for one async fetch"""
+        cache = FetchCache(ttl=30)
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "feed"
+
+        async def scenario():
+            return await asyncio.gather(
+                *(
+                    cache.get_or_fetch_async("IGN", "rss", "news", fetch)
+                    for _ in range(10)
+                )
+            )
+
+        assert asyncio.run(scenario()) == ["feed"] * 10
+        assert len(calls) == 1
+
+    def test_async_errors_reach_waiters(self):
+        """Test a failed async fetch raises for every waiter and is not cached"""
+        cache = FetchCache(ttl=30)
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        async def scenario():
+            return await asyncio.gather(
+                *(
+                    cache.get_or_fetch_async("IGN", "rss", "news", fail)
+                    for _ in range(3)
+                ),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(scenario())
+        assert all(isinstance(result, ValueError) for result in results)
+        assert cache.stats()["entries"] == 0
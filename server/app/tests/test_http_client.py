@@ -0,0 +1,49 @@
+import httpx
+
+from services.http_client import HttpClient
+
+
+class TestHttpClient:
+    """Test the shared pooled HTTP client"""
+
+    def test_one_client_per_host(self):
+        """Test connections are pooled per upstream host"""
+        client = HttpClient()
+
+        first = client._client_for("https://api.github.com/user")
+        second = client._client_for("https://api.github.com/repos/a/b")
+        other = client._client_for("https://discord.com/api/v10/users/@me")
+
+        assert first is second
+        assert first is not other
+        client.close()
+
+    def test_default_timeout_and_redirects(self):
+        """Test pooled clients get the configured defaults"""
+        client = HttpClient()
+
+        pooled = client._client_for("https://api.spotify.com/v1/me")
+
+        assert pooled.follow_redirects is True
+        assert pooled.timeout.read is not None
+        client.close()
+
+    def test_raw_data_sent_as_content(self):
+        """Test requests-style raw data is sent as the request body"""
+        client = HttpClient()
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["body"] = request.content
+            seen["method"] = request.method
+            return httpx.Response(200, json={"ok": True})
+
+        client._clients["https://api.figma.com"] = httpx.Client(
+            transport=httpx.MockTransport(handler)
+        )
+
+        r = client.post("https://api.figma.com/v1/files", data='{"a": 1}')
+
+        assert r.json() == {"ok": True}
+        assert seen == {"body": b'{"a": 1}', "method": "POST"}
+        client.close()
@@ -0,0 +1,131 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from core.oauth_state import (
+    MemoryStateStore,
+    OAuthStateStore,
+    PostgresStateStore,
+    create_state_store,
+)
+from models import OAuthState
+from tests.conftest import test_engine
+
+
+@pytest.fixture
+def postgres_store():
+    store = PostgresStateStore(test_engine)
+    yield store
+    with Session(test_engine) as session:
+        session.exec(delete(OAuthState))
+        session.commit()
+
+
+def expire(store, state):
+    """Push a stored token's expiry into the past"""
+    if isinstance(store, MemoryStateStore):
+        user_id, _, is_mobile = store._states[state]
+        store._states[state] = (user_id, 0.0, is_mobile)
+        store._heap = [(0.0, state)]
+        return
+    with Session(test_engine) as session:
+        row = session.get(OAuthState, state)
+        row.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        session.add(row)
+        session.commit()
+
+
+@pytest.fixture(params=["memory", "postgres"])
+def store(request):
+    if request.param == "memory":
+        return MemoryStateStore()
+    return request.getfixturevalue("postgres_store")
+
+
+class TestOAuthStateStore:
+    """Test both state backends behave the same"""
+
+    def test_single_use(self, store):
+        """Test a state resolves once and is then gone"""
+        store.store("abc", 7, is_mobile=True)
+
+        assert store.pop("abc") == (7, True)
+        assert store.pop("abc") is None
+        assert store.stats()["consumed"] == 1
+        assert store.stats()["missing"] == 1
+
+    def test_expired_state_is_rejected(self, store):
+        """Test an expired state returns None and is removed"""
+        store.store("old", 1)
+        expire(store, "old")
+
+        assert store.pop("old") is None
+        assert store.size() == 0
+        assert store.stats()["expired"] == 1
+
+    def test_eviction(self, store):
+        """Test cleanup removes only expired states and counts them"""
+        store.store("old", 1)
+        store.store("new", 2)
+        expire(store, "old")
+
+        assert store.cleanup() == 1
+        stats = store.stats()
+        assert stats["size"] == 1
+        assert stats["evicted"] == 1
+        assert store.pop("new") == (2, False)
+
+    def test_shared_between_workers(self, postgres_store):
+        """Test a state stored by one worker is consumed by another"""
+        postgres_store.store("shared", 3)
+
+        other_worker = PostgresStateStore(test_engine)
+        assert other_worker.pop("shared") == (3, False)
+        assert postgres_store.pop("shared") is None
+
+
+class TestMemoryStateStore:
+    """Test the in-memory expiry heap"""
+
+    def test_consumed_states_leave_no_entry(self):
+        """Test stale heap entries of consumed states are skipped and compacted"""
+        store = MemoryStateStore(ttl=0)
+        for index in range(100):
+            store.store(f"s{index}", index)
+            store.pop(f"s{index}")
+
+        assert store.cleanup() == 0
+        assert store.size() == 0
+        assert len(store._heap) == 0
+
+    def test_background_eviction(self):
+        """Test the eviction task removes expired states on its own"""
+        store = MemoryStateStore(ttl=0)
+        store.store("abc", 1)
+
+        async def run():
+            store.start(interval=0.01)
+            await asyncio.sleep(0.1)
+            await store.stop()
+
+        asyncio.run(run())
+        assert store.size() == 0
+        assert store.stats()["evicted"] == 1
+
+    def test_unknown_backend(self):
+        """Test a misconfigured backend fails loudly"""
+        with pytest.raises(ValueError):
+            create_state_store("redis")
+
+    def test_incomplete_backend(self):
+        """Test a backend missing an operation fails when created"""
+
+        class PutOnlyStore(OAuthStateStore):
+            def put(self, state, user_id, is_mobile):
+                pass
+
+        with pytest.raises(TypeError):
+            PutOnlyStore()
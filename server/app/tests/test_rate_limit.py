@@ -0,0 +1,197 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from services.http_client import AsyncHttpClient, HttpClient
+from services.rate_limit import RateLimitedError, RateLimiter, TokenBucket
+from services.services_classes import ReactionRetryError
+
+
+@pytest.fixture
+def limiter():
+    limiter = RateLimiter()
+    with patch("services.http_client.rate_limiter", limiter):
+        yield limiter
+
+
+def mocked_client(handler, client_class=HttpClient):
+    client = client_class()
+    transport = httpx.MockTransport(handler)
+    pooled_class = httpx.Client if client_class is HttpClient else httpx.AsyncClient
+    pooled = pooled_class(transport=transport)
+    client._client_for = lambda url: pooled
+    return client
+
+
+class TestTokenBucket:
+    """Test the token bucket arithmetic"""
+
+    def test_burst_then_rate(self):
+        """Test a burst goes through and later requests wait their turn"""
+        bucket = TokenBucket(rate=2, burst=3, now=0)
+
+        assert [bucket.reserve(0, 10) for _ in range(3)] == [0, 0, 0]
+        assert bucket.reserve(0, 10) == pytest.approx(0.5)
+        assert bucket.reserve(0, 10) == pytest.approx(1.0)
+
+    def test_over_max_wait_takes_no_token(self):
+        """Test a rejected request does not use up the budget"""
+        bucket = TokenBucket(rate=1, burst=1, now=0)
+        bucket.reserve(0, 0)
+
+        assert bucket.reserve(0, 0.5) == pytest.approx(1.0)
+        assert bucket.reserve(1, 0) == 0
+
+
+class TestRateLimiter:
+    """Test buckets are keyed and tuned per service and credential"""
+
+    def test_keyed_by_host_and_credential(self):
+        """Test each token or API key gets its own hashed bucket"""
+        url = "https://api.github.com/user"
+        alice = RateLimiter.key_for(url, {"headers": {"Authorization": "token a"}})
+        bob = RateLimiter.key_for(url, {"headers": {"authorization": "token b"}})
+        riot = RateLimiter.key_for(
+            "https://europe.api.riotgames.com/x", {"params": {"api_key": "RGAPI"}}
+        )
+
+        assert alice[0] == bob[0] == "api.github.com"
+        assert alice != bob
+        assert "token a" not in alice[1]
+        assert riot[0] == "europe.api.riotgames.com" and riot[2]
+
+    def test_discord_keyed_by_major_parameter(self):
+        """Test the shared bot token gets a budget per channel and guild"""
+        bot = {"headers": {"Authorization": "Bot a"}}
+        base = "https://discord.com/api/v10"
+        first = RateLimiter.key_for(f"{base}/channels/1/messages?limit=10", bot)
+        again = RateLimiter.key_for(f"{base}/channels/1/messages", bot)
+        other = RateLimiter.key_for(f"{base}/channels/2/messages", bot)
+        guild = RateLimiter.key_for(f"{base}/guilds/1/members", bot)
+
+        assert first == again
+        assert len({first, other, guild}) == 3
+        assert first[1] == "channels/1" and guild[1] == "guilds/1"
+
+    def test_token_endpoint_has_its_own_limit(self):
+        """Test OAuth token calls do not share the API budget of their host"""
+        token = RateLimiter.key_for("https://discord.com/api/v10/oauth2/token", {})
+        github = RateLimiter.key_for("https://github.com/login/oauth/access_token", {})
+        api = RateLimiter.key_for("https://discord.com/api/v10/users/@me", {})
+
+        assert token[1] == github[1] == "token"
+        assert token != api
+        with patch(
+            "core.config.settings.HTTP_RATE_LIMIT_TOKEN_ENDPOINT", (3, 30)
+        ):
+            assert RateLimiter.limits_for(*token[:2]) == (3, 30)
+
+    def test_limits_by_parent_domain(self):
+        """Test regional hosts use the limits of their parent domain"""
+        assert RateLimiter.limits_for("europe.api.riotgames.com") == (0.8, 20)
+
+    def test_rejects_when_wait_too_long(self, limiter):
+        """Test a request is refused instead of waiting past the max wait"""
+        key = ("slow.example.com", "", "")
+        with patch.dict(
+            "core.config.settings.HTTP_RATE_LIMITS", {"slow.example.com": (0.1, 1)}
+        ):
+            assert limiter.acquire(key) == 0
+            with pytest.raises(RateLimitedError) as error:
+                limiter.acquire(key)
+
+        assert isinstance(error.value, ReactionRetryError)
+        assert isinstance(error.value, httpx.HTTPError)
+        assert error.value.retry_after == pytest.approx(10, abs=0.1)
+        assert limiter.stats()["rejected"] == 1
+
+
+class TestUpstreamHeaders:
+    """Test the HTTP layer honours upstream rate limit headers"""
+
+    def test_retry_after_blocks_key(self, limiter):
+        """Test a 429 stops requests for that key until Retry-After"""
+        calls = []
+
+        def handler(request):
+            calls.append(request.headers["Authorization"])
+            return httpx.Response(429, headers={"Retry-After": "30"})
+
+        client = mocked_client(handler)
+        client.get("https://discord.com/api", headers={"Authorization": "Bot a"})
+
+        with pytest.raises(RateLimitedError) as error:
+            client.get("https://discord.com/api", headers={"Authorization": "Bot a"})
+        client.get("https://discord.com/api", headers={"Authorization": "Bot b"})
+
+        assert calls == ["Bot a", "Bot b"]
+        assert 29 < error.value.retry_after <= 30.1
+
+    @pytest.mark.parametrize(
+        "headers",
+        [
+            {"X-RateLimit-Reset-After": "20"},
+            {"X-RateLimit-Reset": "20"},
+            {"X-RateLimit-Reset": "epoch+20"},
+        ],
+    )
+    def test_exhausted_quota_blocks_until_reset(self, limiter, headers):
+        """Test an exhausted quota is not spent again before its reset"""
+        headers = {
+            "X-RateLimit-Remaining": "0",
+            **{
+                name: value.replace("epoch+20", str(int(time.time()) + 20))
+                for name, value in headers.items()
+            },
+        }
+        client = mocked_client(lambda request: httpx.Response(200, headers=headers))
+        client.get("https://api.github.com/user")
+
+        with pytest.raises(RateLimitedError) as error:
+            client.get("https://api.github.com/user")
+        assert 18 < error.value.retry_after <= 21
+
+    def test_remaining_quota_does_not_block(self, limiter):
+        """Test requests keep flowing while quota remains"""
+        headers = {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": "3600"}
+        client = mocked_client(lambda request: httpx.Response(200, headers=headers))
+
+        for _ in range(3):
+            assert client.get("https://api.github.com/user").status_code == 200
+        assert limiter.stats()["upstream_limits"] == 0
+
+    def test_announced_limit_shrinks_burst(self, limiter):
+        """Test an X-RateLimit-Limit below the configured burst is honoured"""
+        headers = {"X-RateLimit-Limit": "2", "X-RateLimit-Remaining": "1"}
+        client = mocked_client(lambda request: httpx.Response(200, headers=headers))
+        url = "https://discord.com/api/v10/channels/1/messages"
+
+        for _ in range(3):
+            client.get(url)
+        with pytest.raises(RateLimitedError):
+            with patch("core.config.settings.HTTP_RATE_LIMIT_MAX_WAIT", 0):
+                client.get(url)
+        assert limiter.stats()["upstream_limits"] == 0
+
+    def test_async_client_waits_its_turn(self, limiter):
+        """Test the async client sleeps for a short wait instead of failing"""
+        client = mocked_client(
+            lambda request: httpx.Response(200), client_class=AsyncHttpClient
+        )
+
+        async def burst():
+            return [
+                (await client.get("https://waits.example.com/")).status_code
+                for _ in range(3)
+            ]
+
+        with patch.dict(
+            "core.config.settings.HTTP_RATE_LIMITS", {"waits.example.com": (10, 1)}
+        ):
+            start = time.monotonic()
+            assert asyncio.run(burst()) == [200, 200, 200]
+        assert time.monotonic() - start >= 0.18
+        assert limiter.stats()["waits"] == 2
@@ -0,0 +1,129 @@
+import threading
+import time
+from unittest.mock import patch
+
+from api.actions_process.reactions import dispatch_reactions, plan_reactions
+from core.config import settings
+from core.engine import engine
+
+
+class RecordingService:
+    """Stands in for an integration, recording when each reaction runs"""
+
+    def __init__(self, duration=0.2):
+        self.duration = duration
+        self.started = {}
+        self.finished = {}
+        self.threads = {}
+
+    def execute(self, reaction_name, session, area_reaction, user_id):
+        self.started[reaction_name] = time.monotonic()
+        self.threads[reaction_name] = threading.current_thread()
+        if reaction_name == "fail":
+            raise RuntimeError("upstream rejected the call")
+        time.sleep(self.duration)
+        self.finished[reaction_name] = time.monotonic()
+
+
+def run(session, area_id, recorder):
+    with patch(
+        "api.actions_process.reactions.services_dico",
+        {"ExecutorService": recorder},
+    ):
+        future = dispatch_reactions(session, area_id)
+        return future.result(timeout=5)
+
+
+class TestReactionPlan:
+    """Test reactions are grouped into stages"""
+
+    def test_stages_follow_order_index(self, session, area_with):
+        """Test reactions sharing an order_index form one stage"""
+        area_id = area_with.build(("c", 1, 0), ("a", 0, 0), ("b", 0, 0))
+
+        plan = plan_reactions(session, area_id)
+
+        assert [[r.reaction_name for r in stage] for stage in plan.stages] == [
+            ["a", "b"],
+            ["c"],
+        ]
+
+    def test_missing_area(self, session):
+        """Test a deleted area plans nothing"""
+        assert plan_reactions(session, 999999) is None
+        assert dispatch_reactions(session, 999999) is None
+
+
+class TestReactionExecutor:
+    """Test stages run in order and reactions of a stage concurrently"""
+
+    def test_stage_runs_concurrently(self, session, area_with):
+        """Test a slow reaction does not hold back its stage siblings"""
+        area_id = area_with.build(("a", 0, 0), ("b", 0, 0), ("c", 0, 0))
+        recorder = RecordingService(duration=0.3)
+
+        start = time.monotonic()
+        assert run(session, area_id, recorder) is True
+
+        assert set(recorder.finished) == {"a", "b", "c"}
+        assert time.monotonic() - start < 0.8
+
+    def test_stages_are_sequential(self, session, area_with):
+        """Test a stage starts once the previous one finished"""
+        area_id = area_with.build(("first", 0, 0), ("second", 5, 0))
+        recorder = RecordingService()
+
+        run(session, area_id, recorder)
+
+        assert recorder.started["second"] >= recorder.finished["first"]
+
+    def test_failure_stops_later_stages(self, session, area_with):
+        """Test a failing reaction skips the following stages only"""
+        area_id = area_with.build(("fail", 0, 0), ("sibling", 0, 0), ("later", 1, 0))
+        recorder = RecordingService()
+
+        assert run(session, area_id, recorder) is False
+
+        assert "sibling" in recorder.finished
+        assert "later" not in recorder.started
+
+    def test_delay_holds_no_connection(self, session, area_with):
+        """Test a delayed reaction returns at once and waits without a session"""
+        area_id = area_with.build(("delayed", 0, 1))
+        recorder = RecordingService(duration=0)
+
+        with patch(
+            "api.actions_process.reactions.services_dico",
+            {"ExecutorService": recorder},
+        ):
+            start = time.monotonic()
+            future = dispatch_reactions(session, area_id)
+            assert time.monotonic() - start < 0.5
+            time.sleep(0.3)
+            assert engine.pool.checkedout() == 0
+            assert recorder.started == {}
+            future.result(timeout=5)
+
+        assert recorder.started["delayed"] - start >= 1
+
+    def test_reactions_run_off_the_loop(self, session, area_with):
+        """Test reactions run in worker threads within the connection budget"""
+        names = [f"r{i}" for i in range(20)]
+        area_id = area_with.build(*((name, 0, 0) for name in names))
+        recorder = RecordingService(duration=0.2)
+        checked_out = []
+        execute = recorder.execute
+
+        def execute_and_measure(*args):
+            checked_out.append(engine.pool.checkedout())
+            execute(*args)
+
+        recorder.execute = execute_and_measure
+
+        start = time.monotonic()
+        assert run(session, area_id, recorder) is True
+
+        assert set(recorder.finished) == set(names)
+        assert {t.name for t in recorder.threads.values()}.isdisjoint({"service-io"})
+        assert max(checked_out) <= settings.REACTION_CONCURRENCY
+        assert time.monotonic() - start < 2
@@ -0,0 +1,300 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock, patch
+
+import httpx
+import pytest
+from sqlmodel import Session, select
+
+from api.actions_process.reaction_queue import ReactionQueue, retry_delay
+from api.actions_process.router import check_area_action
+from models import Action, AreaAction, ReactionJob
+from services.services_classes import ReactionRetryError
+from tests.conftest import test_engine
+from tests.test_reaction_executor import RecordingService
+
+
+class FlakyService(RecordingService):
+    """Rate limited on "limited", fails on "fail", hangs on "hang" until released"""
+
+    def __init__(self, duration=0):
+        super().__init__(duration)
+        self.release = threading.Event()
+
+    def execute(self, reaction_name, session, area_reaction, user_id):
+        if reaction_name == "limited":
+            raise ReactionRetryError("rate limited", retry_after=30)
+        if reaction_name == "hang":
+            self.release.wait(10)
+        super().execute(reaction_name, session, area_reaction, user_id)
+
+
+@pytest.fixture
+def service():
+    recorder = FlakyService(duration=0)
+    with patch(
+        "api.actions_process.reactions.services_dico",
+        {"ExecutorService": recorder},
+    ):
+        yield recorder
+    recorder.release.set()
+
+
+@pytest.fixture
+def queue():
+    return ReactionQueue(engine=test_engine, batch_size=10)
+
+
+def jobs_of(session, area_id):
+    session.expire_all()
+    return {
+        job.reaction_name: job
+        for job in session.exec(
+            select(ReactionJob).where(ReactionJob.area_id == area_id)
+        ).all()
+    }
+
+
+class TestEnqueue:
+    """Test triggered reactions are queued once"""
+
+    def test_idempotent_per_trigger(self, session, area_with, queue):
+        """Test replaying a trigger does not queue its reactions again"""
+        area_id = area_with.build(("a", 0, 0), ("b", 1, 0))
+
+        assert queue.enqueue(session, area_id, "tick-1") == 2
+        assert queue.enqueue(session, area_id, "tick-1") == 0
+        assert queue.enqueue(session, area_id, "tick-2") == 2
+
+        jobs = session.exec(
+            select(ReactionJob).where(ReactionJob.area_id == area_id)
+        ).all()
+        assert sorted((job.reaction_name, job.stage) for job in jobs) == [
+            ("a", 0),
+            ("a", 0),
+            ("b", 1),
+            ("b", 1),
+        ]
+
+    def test_delay_postpones_first_stage(self, session, area_with, queue):
+        """Test a delayed reaction is not due before its delay"""
+        area_id = area_with.build(("later", 0, 60))
+        queue.enqueue(session, area_id, "tick")
+
+        assert queue.claim() == []
+
+
+class TestTriggerKey:
+    """Test checks queue each trigger once"""
+
+    def test_replayed_tick_queues_once(self, session, area_with, queue):
+        """Test checking an area twice in the same tick queues its reactions once"""
+        area_id = area_with.build(("a", 0, 0), ("b", 1, 0))
+        action = Action(
+            service_id=area_with.service.id, name="poll", interval="* * * * *"
+        )
+        session.add(action)
+        session.commit()
+        area_action = AreaAction(area_id=area_id, action_id=action.id)
+        session.add(area_action)
+        session.commit()
+        checker = Mock()
+        checker.check.return_value = True
+
+        with patch(
+            "api.actions_process.router.services_dico", {"ExecutorService": checker}
+        ), patch("api.actions_process.router.reaction_queue", queue), patch(
+            "core.config.settings.REACTION_QUEUE_BACKEND", "postgres"
+        ):
+            for tick in (1_700_000_000, 1_700_000_000, 1_700_000_060):
+                check_area_action(
+                    area_action.id, area_with.user.id, "ExecutorService", "poll", tick
+                )
+
+        assert queue.enqueued == 4
+        runs = session.exec(
+            select(ReactionJob.run_id).where(ReactionJob.area_id == area_id)
+        ).all()
+        assert sorted(set(runs)) == [
+            f"{area_id}:{area_action.id}:1700000000",
+            f"{area_id}:{area_action.id}:1700000060",
+        ]
+
+
+class TestWorker:
+    """Test workers run due jobs stage by stage"""
+
+    def test_stages_run_in_order(self, session, area_with, queue, service):
+        """Test a stage is only claimed once the previous one is done"""
+        area_id = area_with.build(("a", 0, 0), ("b", 0, 0), ("c", 1, 0))
+        queue.enqueue(session, area_id, "tick")
+
+        assert queue.run_due() == 2
+        assert set(service.finished) == {"a", "b"}
+        assert queue.run_due() == 1
+        assert {job.status for job in jobs_of(session, area_id).values()} == {"done"}
+
+    def test_stage_delay_counts_from_previous_stage(
+        self, session, area_with, queue, service
+    ):
+        """Test a later stage waits its delay after the previous one finished"""
+        area_id = area_with.build(("a", 0, 0), ("b", 1, 1))
+        queue.enqueue(session, area_id, "tick")
+
+        queue.run_due()
+        assert queue.run_due() == 0
+        time.sleep(1.1)
+        assert queue.run_due() == 1
+
+    def test_retry_after_is_honoured(self, session, area_with, queue, service):
+        """Test a rate limited reaction is retried when the upstream asked"""
+        area_id = area_with.build(("limited", 0, 0), ("next", 1, 0))
+        queue.enqueue(session, area_id, "tick")
+
+        queue.run_due()
+
+        jobs = jobs_of(session, area_id)
+        limited = jobs["limited"]
+        assert (limited.status, limited.attempts) == ("pending", 1)
+        wait = limited.run_after - datetime.now(timezone.utc)
+        assert timedelta(seconds=25) < wait <= timedelta(seconds=30)
+        assert limited.last_error == "rate limited"
+        assert jobs["next"].status == "pending"
+        assert queue.retried == 1
+
+    def test_gives_up_and_skips_later_stages(self, session, area_with, service):
+        """Test a job failing too often fails and skips the rest of its run"""
+        queue = ReactionQueue(engine=test_engine, max_attempts=1)
+        area_id = area_with.build(("fail", 0, 0), ("ok", 0, 0), ("after", 1, 0))
+        queue.enqueue(session, area_id, "tick")
+
+        queue.run_due()
+
+        statuses = {
+            name: job.status for name, job in jobs_of(session, area_id).items()
+        }
+        assert statuses == {"fail": "failed", "ok": "done", "after": "skipped"}
+        assert "after" not in service.started
+
+    def test_hanging_job_does_not_hold_its_batch(self, session, area_with, service):
+        """Test a hanging reaction times out and the others are recorded"""
+        queue = ReactionQueue(engine=test_engine, job_timeout=0.3)
+        area_id = area_with.build(("hang", 0, 0), ("a", 0, 0), ("b", 0, 0))
+        queue.enqueue(session, area_id, "tick")
+
+        start = time.monotonic()
+        assert queue.run_due() == 3
+        assert time.monotonic() - start < 2
+
+        jobs = jobs_of(session, area_id)
+        assert (jobs["a"].status, jobs["b"].status) == ("done", "done")
+        assert (jobs["hang"].status, jobs["hang"].attempts) == ("pending", 1)
+        assert "no outcome after 0.3s" in jobs["hang"].last_error
+        assert queue.claim() == []
+
+    def test_batch_deadline_records_finished_jobs(
+        self, session, area_with, service
+    ):
+        """Test jobs still running at the batch deadline do not lose the others"""
+        queue = ReactionQueue(engine=test_engine, lease=0.6)
+        area_id = area_with.build(("hang", 0, 0), ("a", 0, 0))
+        queue.enqueue(session, area_id, "tick")
+
+        queue.run_due()
+
+        jobs = jobs_of(session, area_id)
+        assert jobs["a"].status == "done"
+        assert jobs["hang"].status == "pending"
+        assert "not run before the end of its batch" in jobs["hang"].last_error
+
+    def test_locked_jobs_are_skipped(self, session, area_with, queue):
+        """Test a job locked by another worker is not claimed twice"""
+        area_id = area_with.build(("a", 0, 0), ("b", 0, 0))
+        queue.enqueue(session, area_id, "tick")
+
+        with Session(test_engine) as other_worker:
+            locked = other_worker.exec(
+                select(ReactionJob)
+                .where(ReactionJob.area_id == area_id, ReactionJob.reaction_name == "a")
+                .with_for_update()
+            ).one()
+            claimed = queue.claim()
+
+        assert [job.reaction_name for job in claimed] == ["b"]
+        assert locked.reaction_name == "a"
+
+    def test_expired_lease_is_reclaimed(self, session, area_with, queue):
+        """Test the job of a dead worker is claimed again after its lease"""
+        area_id = area_with.build(("a", 0, 0))
+        queue.enqueue(session, area_id, "tick")
+        [job] = queue.claim()
+        assert queue.claim() == []
+
+        stored = session.get(ReactionJob, job.id)
+        stored.locked_until = datetime.now(timezone.utc) - timedelta(seconds=1)
+        session.commit()
+
+        [again] = queue.claim()
+        assert (again.id, again.attempts) == (job.id, 2)
+
+    def test_purge_finished(self, session, area_with, queue, service):
+        """Test old finished jobs are deleted"""
+        area_id = area_with.build(("a", 0, 0))
+        queue.enqueue(session, area_id, "tick")
+        queue.run_due()
+
+        with patch("api.actions_process.reaction_queue.settings") as settings:
+            settings.REACTION_JOB_RETENTION = -60
+            assert queue.purge_finished() >= 1
+
+        assert jobs_of(session, area_id) == {}
+
+
+class TestRetryDelay:
+    """Test the backoff between attempts"""
+
+    def test_exponential_and_capped(self):
+        """Test the delay doubles per attempt up to the cap"""
+        with patch("api.actions_process.reaction_queue.settings") as settings:
+            settings.REACTION_RETRY_BASE_DELAY = 10
+            settings.REACTION_RETRY_MAX_DELAY = 60
+            delays = [retry_delay(n, RuntimeError()) for n in range(1, 6)]
+
+        assert delays == [10, 20, 40, 60, 60]
+
+    def test_upstream_retry_after(self):
+        """Test the delay asked by the upstream wins"""
+        assert retry_delay(1, ReactionRetryError("429", retry_after=7)) == 7
+
+    def test_discord_rate_limit_is_retryable(self):
+        """Test Discord's 429 surfaces as a retryable error"""
+        from services.discord import Discord
+
+        response = Mock(status_code=429)
+        response.json.return_value = {"retry_after": 2.5}
+
+        with pytest.raises(ReactionRetryError) as error:
+            Discord()._handle_bot_response(response)
+        assert error.value.retry_after == 2.5
+
+    def test_discord_rate_limit_during_check(self):
+        """Test a Discord 429 while checking an action is not a failure"""
+        from services.discord import Discord
+
+        discord = Discord()
+        area_action = Mock(config=[], last_state={})
+        response = httpx.Response(429, json={"retry_after": 1})
+
+        with patch(
+            "services.discord.async_http.get", AsyncMock(return_value=response)
+        ):
+            triggered = asyncio.run(
+                discord.actions["new_message_in_channel"].check_async(
+                    Mock(), area_action, 1
+                )
+            )
+
+        assert triggered is False
+        assert area_action.last_state == {}
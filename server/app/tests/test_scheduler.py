@@ -0,0 +1,187 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from cron.scheduler import CronExpression, TriggerScheduler, next_fire, spread_offset
+
+
+class TestCronExpression:
+    """Test cron expression parsing and next fire computation"""
+
+    def test_every_minute(self):
+        """Test '* * * * *' fires on the next minute"""
+        expr = CronExpression("* * * * *")
+        assert expr.next_after(datetime(2025, 1, 1, 10, 30, 15)) == datetime(
+            2025, 1, 1, 10, 31
+        )
+
+    def test_step_minutes(self):
+        """Test '*/15' minute steps"""
+        expr = CronExpression("*/15 * * * *")
+        assert expr.next_after(datetime(2025, 1, 1, 10, 31)) == datetime(
+            2025, 1, 1, 10, 45
+        )
+        assert expr.next_after(datetime(2025, 1, 1, 10, 45)) == datetime(
+            2025, 1, 1, 11, 0
+        )
+
+    def test_hour_step(self):
+        """Test '0 */6 * * *' fires every six hours"""
+        expr = CronExpression("0 */6 * * *")
+        assert expr.next_after(datetime(2025, 1, 1, 7, 0)) == datetime(
+            2025, 1, 1, 12, 0
+        )
+
+    def test_daily_rolls_over_month(self):
+        """Test '0 0 * * *' rolls over month and year boundaries"""
+        expr = CronExpression("0 0 * * *")
+        assert expr.next_after(datetime(2025, 12, 31, 23, 59)) == datetime(
+            2026, 1, 1, 0, 0
+        )
+
+    def test_day_of_month(self):
+        """Test '* * 1 * *' only fires on the first of the month"""
+        expr = CronExpression("* * 1 * *")
+        assert expr.next_after(datetime(2025, 2, 14, 12, 0)) == datetime(
+            2025, 3, 1, 0, 0
+        )
+
+    def test_weekday_list_and_range(self):
+        """Test weekday ranges with 7 as Sunday"""
+        expr = CronExpression("30 9 * * 6-7")
+        # 2025-01-01 is a Wednesday, next Saturday is the 4th
+        assert expr.next_after(datetime(2025, 1, 1, 0, 0)) == datetime(
+            2025, 1, 4, 9, 30
+        )
+        assert expr.next_after(datetime(2025, 1, 4, 9, 30)) == datetime(
+            2025, 1, 5, 9, 30
+        )
+
+    @pytest.mark.parametrize(
+        "expression", ["* * * *", "60 * * * *", "*/0 * * * *", "a * * * *"]
+    )
+    def test_invalid_expressions(self, expression):
+        """Test invalid expressions are rejected"""
+        with pytest.raises(ValueError):
+            CronExpression(expression)
+
+
+class TestTriggerScheduler:
+    """Test in-memory job registration"""
+
+    def test_add_remove_has(self):
+        """Test jobs can be registered and removed"""
+        scheduler = TriggerScheduler(lambda action_id, tick: None)
+
+        scheduler.add(1, "*/5 * * * *")
+        assert scheduler.has(1)
+        assert scheduler.jobs() == {1: "*/5 * * * *"}
+
+        assert scheduler.remove(1) is True
+        assert not scheduler.has(1)
+        assert scheduler.remove(1) is False
+
+    def test_invalid_interval_not_registered(self):
+        """Test an invalid interval does not register the job"""
+        scheduler = TriggerScheduler(lambda action_id, tick: None)
+
+        with pytest.raises(ValueError):
+            scheduler.add(1, "not a cron")
+        assert not scheduler.has(1)
+
+    def test_due_job_is_fired(self):
+        """Test a due job runs its runner and is rescheduled"""
+        fired = []
+
+        async def scenario():
+            scheduler = TriggerScheduler(lambda action_id, tick: fired.append(action_id))
+            scheduler.start()
+            scheduler.add(7, "* * * * *")
+            scheduler._heap[:] = [(0.0, entry[1], entry[2]) for entry in scheduler._heap]
+            scheduler._wakeup.set()
+            for _ in range(50):
+                if fired:
+                    break
+                await asyncio.sleep(0.01)
+            await scheduler.stop()
+            return scheduler
+
+        scheduler = asyncio.run(scenario())
+        assert fired == [7]
+        assert len(scheduler._heap) == 1
+
+    def test_in_flight_ticks_are_referenced(self):
+        """Test a running tick is kept alive until it finishes"""
+        release = threading.Event()
+
+        async def scenario():
+            scheduler = TriggerScheduler(lambda action_id, tick: release.wait(5))
+            scheduler.start()
+            scheduler.add(7, "* * * * *")
+            scheduler._heap[:] = [(0.0, entry[1], entry[2]) for entry in scheduler._heap]
+            scheduler._wakeup.set()
+            for _ in range(50):
+                if scheduler._running:
+                    break
+                await asyncio.sleep(0.01)
+            in_flight = len(scheduler._fires)
+            release.set()
+            for _ in range(50):
+                if not scheduler._fires:
+                    break
+                await asyncio.sleep(0.01)
+            await scheduler.stop()
+            return in_flight, len(scheduler._fires)
+
+        assert asyncio.run(scenario()) == (1, 0)
+
+    def test_job_removed_while_due_keeps_loop_running(self):
+        """Test a job removed from another thread does not stop the loop"""
+        fired = []
+
+        async def scenario():
+            scheduler = TriggerScheduler(lambda action_id, tick: fired.append(action_id))
+            scheduler.start()
+            scheduler.add(7, "* * * * *")
+            scheduler.add(8, "* * * * *")
+            scheduler._heap[:] = [(0.0, entry[1], entry[2]) for entry in scheduler._heap]
+            # Lose the race: the job is gone after the stale entry check
+            scheduler._is_current = lambda generation, action_id: True
+            scheduler.remove(7)
+            scheduler._wakeup.set()
+            for _ in range(50):
+                if fired:
+                    break
+                await asyncio.sleep(0.01)
+            running = not scheduler._task.done()
+            await scheduler.stop()
+            return running
+
+        assert asyncio.run(scenario()) is True
+        assert fired == [8]
+
+
+class TestSpread:
+    """Test actions are spread over their cron minute"""
+
+    def test_offsets_spread_and_stable(self):
+        """Test offsets stay within the spread and differ between actions"""
+        offsets = [spread_offset(action_id) for action_id in range(1, 51)]
+
+        assert all(0 <= offset < 50 for offset in offsets)
+        assert len({int(offset) for offset in offsets}) > 35
+        assert spread_offset(7) == spread_offset(7)
+
+    def test_next_fire_keeps_interval(self):
+        """Test the offset shifts fire times without skipping ticks"""
+        expression = CronExpression("*/5 * * * *")
+        with patch("core.config.settings.SCHEDULER_SPREAD", 50):
+            offset = timedelta(seconds=spread_offset(3))
+            first = next_fire(expression, 3, datetime(2025, 1, 1, 10, 0, 0))
+            second = next_fire(expression, 3, first)
+
+        assert first == datetime(2025, 1, 1, 10, 0) + offset
+        assert second - first == timedelta(minutes=5)
@@ -0,0 +1,88 @@
+from pathlib import Path
+
+from sqlalchemy import UniqueConstraint, inspect
+from sqlmodel import SQLModel
+
+from tests.conftest import test_engine
+
+VERSIONS = Path(__file__).resolve().parent.parent / "migrations" / "versions"
+
+
+def named_objects(table):
+    """Names of the indexes and unique constraints declared on a model table"""
+    names = {index.name for index in table.indexes}
+    names |= {
+        constraint.name
+        for constraint in table.constraints
+        if isinstance(constraint, UniqueConstraint) and constraint.name
+    }
+    return names
+
+
+class TestHotPathIndexes:
+    """Test the indexes backing the pipeline's lookups exist"""
+
+    def test_indexes_created(self):
+        """Test the lookup columns are indexed in the database"""
+        inspector = inspect(test_engine)
+        indexed = {
+            (table, tuple(index["column_names"]))
+            for table in ("area", "area_action", "area_reaction", "reaction_condition")
+            for index in inspector.get_indexes(table)
+        }
+
+        assert ("area_action", ("action_id",)) in indexed
+        assert ("area_action", ("area_id",)) in indexed
+        assert ("area_reaction", ("area_id",)) in indexed
+        assert ("reaction_condition", ("area_reaction_id",)) in indexed
+        assert ("area", ("user_id", "is_public", "id")) in indexed
+
+    def test_enabled_private_areas_partial_index(self):
+        """Test the areas actions run for have a partial index"""
+        indexes = {
+            index["name"]: index for index in inspect(test_engine).get_indexes("area")
+        }
+
+        predicate = indexes["ix_area_enabled_private"]["dialect_options"][
+            "postgresql_where"
+        ]
+        assert "enable" in predicate and "is_public" in predicate
+
+    def test_user_service_unique_link(self):
+        """Test a user links a service at most once"""
+        constraints = inspect(test_engine).get_unique_constraints("user_service")
+
+        assert {
+            "name": "uq_user_service_user_service",
+            "column_names": ["user_id", "service_id"],
+        } in [
+            {"name": c["name"], "column_names": c["column_names"]}
+            for c in constraints
+        ]
+
+
+class TestMigrations:
+    """Test the Alembic revisions follow the models"""
+
+    def test_revisions_chain(self):
+        """Test each revision builds on the previous one"""
+        revisions = sorted(path.name for path in VERSIONS.glob("*.py"))
+        previous = "None"
+        for name in revisions:
+            source = (VERSIONS / name).read_text()
+            revision = name.split("_")[0]
+            assert f'revision = "{revision}"' in source
+            expected = previous if previous == "None" else f'"{previous}"'
+            assert f"down_revision = {expected}" in source
+            previous = revision
+
+    def test_every_table_and_index_migrated(self):
+        """Test the models' tables, indexes and unique constraints have a revision"""
+        source = "\n".join(path.read_text() for path in VERSIONS.glob("*.py"))
+        missing = []
+        for table in SQLModel.metadata.sorted_tables:
+            for name in {table.name} | named_objects(table):
+                if f'"{name}"' not in source:
+                    missing.append(name)
+
+        assert missing == []
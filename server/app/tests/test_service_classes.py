@@ -0,0 +1,201 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import httpx
+
+from services.services import services_dico
+from services.services_classes import Action, PollCursor, SeenIds, Service
+
+
+class SampleService(Service):
+    def __init__(self) -> None:
+        super().__init__("Sample service", "test")
+
+    class sync_action(Action):
+        def __init__(self):
+            super().__init__("Blocking check")
+
+        def check(self, session, area_action, user_id):
+            return threading.current_thread() is not threading.main_thread()
+
+    class async_action(Action):
+        def __init__(self):
+            super().__init__("Non-blocking check")
+
+        async def check_async(self, session, area_action, user_id):
+            await asyncio.sleep(0)
+            return user_id == 42
+
+
+class TestAsyncActions:
+    """Test the sync/async check contracts"""
+
+    def test_is_async_detection(self):
+        """Test only actions overriding check_async are dispatched async"""
+        service = SampleService()
+
+        assert service.has_async_check("async_action")
+        assert not service.has_async_check("sync_action")
+        assert not service.has_async_check("missing")
+
+    def test_sync_check_falls_back_to_thread(self):
+        """Test check_async runs a blocking check in a worker thread"""
+        service = SampleService()
+
+        assert asyncio.run(service.check_async("sync_action", None, None, 1)) is True
+
+    def test_async_check_callable_from_sync_code(self):
+        """Test check bridges to check_async on the service loop"""
+        service = SampleService()
+
+        assert service.check("async_action", None, None, 42) is True
+        assert service.check("async_action", None, None, 1) is False
+
+    def test_polling_integrations_are_async(self):
+        """Test the high-volume integrations poll without blocking"""
+        for service_name in ["Discord", "Github", "Spotify", "OpenMeteo", "Podcast", "IGN"]:
+            service = services_dico[service_name]
+            assert all(action.is_async for action in service.actions.values())
+
+
+class TestSeenIds:
+    """Test the bounded seen-ID state used by list-diffing actions"""
+
+    def test_first_listing_initializes(self):
+        """Test an empty state reports every ID and becomes initialized"""
+        seen = SeenIds.load(None, "episode_guids")
+
+        assert not seen.initialized
+        assert seen.update(["b", "a"]) == ["b", "a"]
+        assert seen.initialized
+
+    def test_only_unseen_ids_are_new(self):
+        """Test IDs already in the ring are not reported again"""
+        seen = SeenIds()
+        seen.update(["b", "a"])
+
+        assert seen.update(["c", "b", "a"]) == ["c"]
+
+    def test_ring_is_bounded(self):
+        """Test the stored ring never exceeds the limit"""
+        seen = SeenIds(limit=3)
+        for index in range(10):
+            seen.update([str(index)])
+
+        assert seen.to_state()["recent"] == ["9", "8", "7"]
+
+    def test_long_ids_are_hashed(self):
+        """Test long IDs are stored as short fingerprints"""
+        url = "https://example.com/podcast/episodes/" + "x" * 200
+        seen = SeenIds()
+        seen.update([url])
+
+        assert len(seen.to_state()["recent"][0]) == 16
+        assert seen.update([url]) == []
+
+    def test_monotonic_high_watermark(self):
+        """Test increasing IDs only keep the highest one"""
+        seen = SeenIds(monotonic=True)
+        seen.update(["1100", "1050"])
+
+        assert seen.update(["1200", "1100", "900"]) == ["1200"]
+        assert seen.to_state() == {"high": 1200, "recent": []}
+
+    def test_state_round_trip(self):
+        """Test a stored state is restored as-is"""
+        seen = SeenIds()
+        seen.update(["b", "a"])
+        restored = SeenIds.load({"ids": seen.to_state()}, "ids")
+
+        assert restored.initialized
+        assert restored.update(["a", "b"]) == []
+
+    def test_legacy_lists_are_read(self):
+        """Test last_state written as plain ID lists keeps working"""
+        legacy = {"message_ids": ["10", "12", "11"], "repo_ids": ["x"]}
+
+        assert SeenIds.load(legacy, "message_ids", monotonic=True).high == 12
+        assert SeenIds.load(legacy, "repo_ids").update(["y", "x"]) == ["y"]
+
+
+class TestPollCursor:
+    """Test the upstream cursor persisted by incremental polls"""
+
+    def test_empty_state(self):
+        """Test a fresh action has no cursor and sends no validator"""
+        cursor = PollCursor.load(None)
+
+        assert cursor.to_state() == {"etag": None, "since": None, "token": None}
+        assert cursor.conditional_headers() == {}
+
+    def test_etag_is_captured_and_sent(self):
+        """Test the listing ETag is remembered and sent as If-None-Match"""
+        cursor = PollCursor()
+        response = httpx.Response(200, headers={"ETag": 'W/"abc"'})
+
+        assert not cursor.not_modified(response)
+        assert cursor.conditional_headers() == {"If-None-Match": 'W/"abc"'}
+
+    def test_not_modified(self):
+        """Test a 304 keeps the stored ETag"""
+        cursor = PollCursor({"etag": '"abc"'})
+
+        assert cursor.not_modified(httpx.Response(304))
+        assert cursor.etag == '"abc"'
+
+    def test_action_reads_cursor_from_last_state(self):
+        """Test the cursor is stored next to the action's own state"""
+        cursor = PollCursor({"since": "2025-01-01T00:00:00Z", "token": "t3_x"})
+        area_action = SimpleNamespace(
+            last_state={"pr_ids": {"high": 3}, "cursor": cursor.to_state()}
+        )
+        restored = SampleService().actions["sync_action"].load_cursor(area_action)
+
+        assert restored.to_state() == cursor.to_state()
+
+
+class TestRedditCursor:
+    """Test Reddit's new_post cursor recovers from a deleted post"""
+
+    def poll(self, area_action, *names):
+        posts = [{"data": {"name": name, "id": name}} for name in names]
+        listing = {"data": {"children": posts}}
+        http = Mock()
+        http.get.return_value = httpx.Response(200, json=listing)
+        with patch("services.reddit.http", http), patch(
+            "services.reddit.get_user_service_token", return_value="token"
+        ), patch("services.services_classes.save_last_state"), patch(
+            "core.config.settings.REDDIT_CURSOR_MAX_EMPTY_POLLS", 2
+        ):
+            triggered = services_dico["Reddit"].check("new_post", None, area_action, 1)
+        return triggered, http.get.call_args.kwargs["params"]
+
+    def test_resync_after_empty_polls(self):
+        """Test a stale cursor falls back to diffing the newest posts"""
+        area_action = SimpleNamespace(
+            config=[{"name": "Subreddit", "values": "python"}], last_state=None
+        )
+
+        assert self.poll(area_action, "t3_a") == (False, {"limit": 1})
+        for _ in range(2):
+            triggered, params = self.poll(area_action)
+            assert (triggered, params["before"]) == (False, "t3_a")
+
+        triggered, params = self.poll(area_action, "t3_c", "t3_b", "t3_a")
+        assert (triggered, params) == (True, {"limit": 25})
+        assert area_action.last_state["cursor"]["token"] == "t3_c"
+        assert area_action.last_state["empty_polls"] == 0
+
+    def test_quiet_subreddit_does_not_trigger(self):
+        """Test a resync listing only known posts triggers nothing"""
+        area_action = SimpleNamespace(
+            config=[{"name": "Subreddit", "values": "python"}], last_state=None
+        )
+        self.poll(area_action, "t3_a")
+        self.poll(area_action)
+        self.poll(area_action)
+
+        assert self.poll(area_action, "t3_a") == (False, {"limit": 25})
+        assert self.poll(area_action)[1]["before"] == "t3_a"
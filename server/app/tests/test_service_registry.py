@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+
+from services.registry import (
+    SERVICE_MODULES,
+    LazyRegistry,
+    build_manifest,
+    load_manifest,
+)
+from services.services import get_json_services, services_dico
+
+
+def sample_registry():
+    return LazyRegistry(
+        {
+            "Decoder": {
+                "module": "json",
+                "class": "JSONDecoder",
+                "catalog": {"name": "Decoder"},
+            }
+        }
+    )
+
+
+class TestLazyRegistry:
+    """Test services are only instantiated when used"""
+
+    def test_lookup_does_not_import(self):
+        """Test membership and catalog come from the manifest alone"""
+        registry = sample_registry()
+
+        assert "Decoder" in registry
+        assert "Missing" not in registry
+        assert list(registry) == ["Decoder"]
+        assert registry.catalog() == {"Decoder": {"name": "Decoder"}}
+        assert registry.loaded() == []
+
+    def test_first_access_instantiates_once(self):
+        """Test a service is created on first access and then reused"""
+        registry = sample_registry()
+
+        decoder = registry["Decoder"]
+        assert isinstance(decoder, json.JSONDecoder)
+        assert registry["Decoder"] is decoder
+        assert registry.loaded() == ["Decoder"]
+
+    def test_startup_imports_no_integration(self):
+        """Test importing the registry and reading the catalog loads no integration"""
+        code = (
+            "import sys\n"
+            "from services.services import get_json_services\n"
+            "get_json_services()\n"
+            f"print([m for m in {SERVICE_MODULES!r} if m in sys.modules])\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            check=True,
+        )
+        assert result.stdout.strip().splitlines()[-1] == "[]"
+
+
+class TestManifest:
+    """Test the static manifest stays in sync with the integrations"""
+
+    def test_manifest_is_up_to_date(self):
+        """Test the manifest matches the code, regenerate it if this fails"""
+        assert build_manifest() == load_manifest()
+
+    def test_registry_matches_catalog(self):
+        """Test every manifest entry resolves to the service it describes"""
+        catalog = get_json_services()
+        for name in ["Github", "Podcast", "Notion"]:
+            assert services_dico[name].name == name
+            service_dict = json.loads(json.dumps(services_dico[name].to_dict()))
+            assert service_dict == catalog[name]
@@ -0,0 +1,99 @@
+import pytest
+from sqlmodel import Session
+
+from api.actions_process.state_buffer import StateBuffer
+from core.config import settings
+from models import Action, Area, AreaAction, Service, User
+from services.services_classes import save_last_state
+from tests.conftest import test_engine
+
+
+def stored_state(area_action_id):
+    with Session(test_engine) as session:
+        return session.get(AreaAction, area_action_id).last_state
+
+
+@pytest.fixture
+def area_actions(session):
+    """Three areas polling the same action"""
+    service = Service(
+        name="StateBufferService", image_url="", category="test", oauth_required=False
+    )
+    user = User(name="state", email="state-buffer@example.com")
+    session.add_all([service, user])
+    session.commit()
+    action = Action(service_id=service.id, name="poll", interval="* * * * *")
+    areas = [Area(user_id=user.id, name=f"area {i}", enable=True) for i in range(3)]
+    session.add_all([action, *areas])
+    session.commit()
+    rows = [
+        AreaAction(area_id=area.id, action_id=action.id, config={}) for area in areas
+    ]
+    session.add_all(rows)
+    session.commit()
+    yield rows
+    session.delete(user)
+    session.delete(service)
+    session.commit()
+
+
+class TestStateBuffer:
+    """Test per-tick batching of last_state writes"""
+
+    def test_flush_writes_all_states(self, session, area_actions):
+        """Test queued states are written by one flush"""
+        buffer = StateBuffer()
+        for index, area_action in enumerate(area_actions):
+            assert buffer.record(area_action.id, {"ids": [index]})
+        buffer.record(area_actions[0].id, None)
+
+        assert buffer.flush() == 3
+
+        assert [stored_state(row.id) for row in area_actions] == [
+            None,
+            {"ids": [1]},
+            {"ids": [2]},
+        ]
+
+    def test_flush_in_batches(self, session, area_actions):
+        """Test flushing more rows than the batch size"""
+        buffer = StateBuffer()
+        for area_action in area_actions:
+            buffer.record(area_action.id, {"seen": area_action.id})
+
+        original = settings.STATE_FLUSH_BATCH_SIZE
+        settings.STATE_FLUSH_BATCH_SIZE = 2
+        try:
+            assert buffer.flush() == 3
+        finally:
+            settings.STATE_FLUSH_BATCH_SIZE = original
+
+        assert all(stored_state(row.id) == {"seen": row.id} for row in area_actions)
+
+    def test_save_last_state_defers_to_buffer(self, session, area_actions):
+        """Test checks inside a tick do not commit their state themselves"""
+        area_action = area_actions[0]
+        buffer = StateBuffer()
+        session.info["state_buffer"] = buffer
+
+        area_action.last_state = {"guid": "abc"}
+        save_last_state(session, area_action)
+        session.commit()
+        assert stored_state(area_action.id) is None
+
+        buffer.flush()
+        assert stored_state(area_action.id) == {"guid": "abc"}
+        session.info.pop("state_buffer")
+
+    def test_save_last_state_after_flush_commits(self, session, area_actions):
+        """Test late writes after the flush are committed directly"""
+        area_action = area_actions[0]
+        buffer = StateBuffer()
+        buffer.flush()
+        session.info["state_buffer"] = buffer
+
+        area_action.last_state = {"count": 4}
+        save_last_state(session, area_action)
+
+        assert stored_state(area_action.id) == {"count": 4}
+        session.info.pop("state_buffer")
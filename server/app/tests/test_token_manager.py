@@ -0,0 +1,145 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlmodel import Session
+
+from models import Service, User, UserService
+from services.token_manager import TokenEndpoint, TokenManager
+from tests.conftest import test_engine
+from tests.test_areas_listing import count_queries
+
+ENDPOINT = TokenEndpoint("https://auth.example.com/token", "id", "secret")
+
+
+def token_response(access_token, status_code=200):
+    response = Mock(status_code=status_code, text="")
+    response.json.return_value = {
+        "access_token": access_token,
+        "refresh_token": f"refresh-{access_token}",
+        "expires_in": 3600,
+    }
+    return response
+
+
+@pytest.fixture
+def linked(session):
+    """A user linked to an OAuth service through an expiring token"""
+    service = Service(
+        name="TokenService", image_url="", category="test", oauth_required=True
+    )
+    user = User(name="tokens", email="token-manager@example.com")
+    session.add_all([service, user])
+    session.commit()
+
+    def link(expires_in: int):
+        user_service = UserService(
+            user_id=user.id,
+            service_id=service.id,
+            access_token="old",
+            refresh_token="refresh-old",
+            token_expires_at=datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+        )
+        session.add(user_service)
+        session.commit()
+        return user_service
+
+    with patch("services.token_manager._endpoint_of", return_value=ENDPOINT):
+        yield user, link
+    session.delete(user)
+    session.delete(service)
+    session.commit()
+
+
+def stored(user_service_id):
+    with Session(test_engine) as session:
+        return session.get(UserService, user_service_id)
+
+
+class TestTokenManager:
+    """Test cached, proactively refreshed service tokens"""
+
+    def test_valid_token_is_cached(self, session, linked):
+        """Test a valid token is loaded once and then served from memory"""
+        user, link = linked
+        link(expires_in=3600)
+        manager = TokenManager()
+
+        assert manager.get_token(session, user.id, "TokenService") == "old"
+        with count_queries() as statements:
+            assert manager.get_token(session, user.id, "TokenService") == "old"
+        assert statements == []
+        assert manager.stats()["hits"] == 1
+
+    def test_expiring_token_is_refreshed(self, session, linked):
+        """Test a token about to expire is refreshed and stored"""
+        user, link = linked
+        user_service = link(expires_in=60)
+        manager = TokenManager(refresh_ahead=300)
+
+        with patch("services.token_manager.http") as http:
+            http.post.return_value = token_response("new")
+            assert manager.get_token(session, user.id, "TokenService") == "new"
+
+        data = http.post.call_args.kwargs["data"]
+        assert data["grant_type"] == "refresh_token"
+        assert data["refresh_token"] == "refresh-old"
+        row = stored(user_service.id)
+        assert row.refresh_token == "refresh-new"
+        assert row.token_expires_at > datetime.now(timezone.utc) + timedelta(minutes=50)
+
+    def test_concurrent_refreshes_are_coalesced(self, linked):
+        """Test threads asking for the same expiring token refresh it once"""
+        user, link = linked
+        link(expires_in=60)
+        manager = TokenManager(refresh_ahead=300)
+        results = []
+
+        def slow_post(*args, **kwargs):
+            time.sleep(0.05)
+            return token_response("new")
+
+        def worker():
+            with Session(test_engine) as session:
+                results.append(manager.get_token(session, user.id, "TokenService"))
+
+        with patch("services.token_manager.http") as http:
+            http.post.side_effect = slow_post
+            threads = [threading.Thread(target=worker) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert http.post.call_count == 1
+        assert results == ["new"] * 5
+
+    def test_batch_refreshes_only_due_tokens(self, linked):
+        """Test the background batch picks the tokens expiring soon"""
+        user, link = linked
+        due = link(expires_in=60)
+        manager = TokenManager(refresh_ahead=300)
+
+        with patch("services.token_manager.http") as http:
+            http.post.return_value = token_response("new")
+            assert manager.refresh_due(test_engine) == 1
+            assert manager.refresh_due(test_engine) == 0
+
+        assert stored(due.id).access_token == "new"
+        assert http.post.call_count == 1
+
+    def test_failed_refresh_backs_off(self, session, linked):
+        """Test a rejected refresh is not retried on every check"""
+        user, link = linked
+        link(expires_in=60)
+        manager = TokenManager(refresh_ahead=300, retry_after=60)
+
+        with patch("services.token_manager.http") as http:
+            http.post.return_value = token_response("new", status_code=400)
+            assert manager.get_token(session, user.id, "TokenService") == "old"
+            assert manager.get_token(session, user.id, "TokenService") == "old"
+
+        assert http.post.call_count == 1
+        assert manager.stats()["failed"] == 1
@@ -0,0 +1,84 @@
+import pytest
+
+from core.security import sign_jwt
+from core.user_cache import UserCache, user_cache
+from models import User
+from tests.test_areas_listing import count_queries
+
+
+def user_lookups(statements):
+    return [
+        s
+        for s in statements
+        if "FROM users" in s and "users.id =" in s and "oauth_login" not in s
+    ]
+
+
+@pytest.fixture
+def cached_user(session, client):
+    """A signed-in user"""
+    user = User(name="cached", email="user-cache@example.com")
+    session.add(user)
+    session.commit()
+    client.cookies.set("access_token", f"Bearer {sign_jwt(user.id)}")
+    user_id = user.id
+    yield user
+    session.expire_all()
+    leftover = session.get(User, user_id)
+    if leftover is not None:
+        session.delete(leftover)
+        session.commit()
+
+
+class TestUserCache:
+    """Test authenticated users are cached between requests"""
+
+    def test_repeated_requests_skip_user_lookup(self, client, cached_user):
+        """Test only the first request loads the user from the database"""
+        with count_queries() as first:
+            assert client.get("/users/me").status_code == 200
+        hits = user_cache.stats()["hits"]
+        with count_queries() as second:
+            response = client.get("/users/me")
+
+        assert response.json()["email"] == "user-cache@example.com"
+        assert len(user_lookups(first)) == 1
+        assert user_lookups(second) == []
+        assert user_cache.stats()["hits"] == hits + 1
+
+    def test_update_invalidates(self, client, cached_user):
+        """Test a profile update is visible on the next request"""
+        client.get("/users/me")
+        response = client.patch(
+            "/users/me", json={"name": "renamed", "email": "user-cache@example.com"}
+        )
+        assert response.status_code == 200
+
+        assert client.get("/users/me").json()["name"] == "renamed"
+
+    def test_delete_invalidates(self, client, cached_user):
+        """Test a deleted user can no longer authenticate"""
+        client.get("/users/me")
+        assert client.delete("/users/me").status_code == 200
+
+        assert client.get("/users/me").status_code == 403
+
+    def test_size_and_ttl_bounds(self, session, cached_user):
+        """Test entries expire and the least recently used is evicted"""
+        cache = UserCache(ttl=60, max_size=1)
+        cache.get_user(session, cached_user.id, 1)
+        cache.get_user(session, cached_user.id, 2)
+        assert cache.stats()["entries"] == 1
+
+        cache.get_user(session, cached_user.id, 1)
+        assert cache.stats()["hits"] == 0
+
+        expired = UserCache(ttl=0, max_size=10)
+        expired.get_user(session, cached_user.id)
+        expired.get_user(session, cached_user.id)
+        assert expired.stats() == {
+            "hits": 0,
+            "misses": 2,
+            "hit_ratio": 0.0,
+            "entries": 1,
+        }
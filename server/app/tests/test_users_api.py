@@ -1,3 +1,7 @@
+from core.security import sign_jwt
+from models import User
+
+
 
 
 class TestUsersAPIAuthentication:
@@ -40,3 +44,28 @@ class TestUsersAPIAuthentication:
         headers = {"Cookie": "access_token=Bearer invalid_token"}
         response = client.get("/users/me", headers=headers)
         assert response.status_code == 403
+
+
+class TestMetricsEndpoint:
+    """Test the internal counters are only exposed to admins"""
+
+    def test_requires_admin(self, client, session):
+        """Test anonymous and regular users are refused, admins served"""
+        assert client.get("/metrics").status_code == 403
+
+        user = User(name="user", email="metrics-user@example.com", role="user")
+        admin = User(name="admin", email="metrics-admin@example.com", role="admin")
+        session.add_all([user, admin])
+        session.commit()
+
+        client.cookies.set("access_token", f"Bearer {sign_jwt(user.id)}")
+        assert client.get("/metrics").status_code == 403
+
+        client.cookies.set("access_token", f"Bearer {sign_jwt(admin.id)}")
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert "reaction_queue" in response.json()
+
+        session.delete(user)
+        session.delete(admin)
+        session.commit()
@@ -0,0 +1,97 @@
+import math
+
+import pytest
+from sqlalchemy import delete, insert
+from sqlmodel import select
+
+from core.config import settings
+from core.security import sign_jwt
+from models import OAuthLogin, User, UserOAuthLogin
+from tests.test_areas_listing import count_queries
+
+SEEDED_USERS = 10_000
+
+
+@pytest.fixture
+def seeded(client, session):
+    """An admin and 10k users, every third one linked to an OAuth login"""
+    session.exec(delete(User))
+    session.commit()
+    admin = User(name="admin", email="admin@example.com", role="admin")
+    session.add(admin)
+    session.commit()
+    session.execute(
+        insert(User),
+        [
+            {"name": f"user{i}", "email": f"user{i}@example.com", "role": "user"}
+            for i in range(SEEDED_USERS)
+        ],
+    )
+    oauth_login = session.exec(select(OAuthLogin).order_by(OAuthLogin.id)).first()
+    user_ids = session.exec(
+        select(User.id).where(User.id != admin.id).order_by(User.id)
+    ).all()
+    session.execute(
+        insert(UserOAuthLogin),
+        [
+            {
+                "user_id": user_id,
+                "oauth_login_id": oauth_login.id,
+                "email": f"linked{user_id}@example.com",
+                "access_token": "token",
+            }
+            for user_id in user_ids[::3]
+        ],
+    )
+    session.commit()
+    client.cookies.set("access_token", f"Bearer {sign_jwt(admin.id)}")
+    yield oauth_login, set(user_ids[::3])
+    session.exec(delete(User))
+    session.commit()
+
+
+class TestUsersListing:
+    """Test the admin user listing on a seeded database"""
+
+    def test_streamed_listing_query_count(self, client, seeded):
+        """Test listing 10k users costs one query per page of users"""
+        oauth_login, linked = seeded
+        client.get("/users/me")
+
+        with count_queries() as statements:
+            response = client.get("/users/")
+        assert response.status_code == 200
+        users = response.json()
+        assert len(users) == SEEDED_USERS + 1
+
+        pages = math.ceil(len(users) / settings.ADMIN_USERS_PAGE_SIZE)
+        assert len(statements) <= pages + 1
+        for user in users:
+            status = {login["id"]: login["connected"] for login in user["oauth_login"]}
+            assert status[oauth_login.id] == (user["id"] in linked)
+
+    def test_paginated_listing(self, client, seeded):
+        """Test pages follow the X-Next-Cursor header without overlap"""
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 1000}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/users/", params=params)
+            assert response.status_code == 200
+            seen.extend(user["id"] for user in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        assert len(seen) == SEEDED_USERS + 1
+        assert seen == sorted(set(seen))
+
+    def test_single_profile_is_one_query(self, client, seeded):
+        """Test /users/me builds the profile in a single query"""
+        client.get("/users/me")
+
+        with count_queries() as statements:
+            response = client.get("/users/me")
+        assert response.status_code == 200
+        assert len(statements) == 1